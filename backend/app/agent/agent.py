@@ -1,13 +1,31 @@
-from typing import TypedDict, Tuple, Literal, List, Dict, Optional
+import logging
+import operator
+from typing import Annotated, Callable, TypedDict, Tuple, Literal, List, Dict, Optional
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 
-from ..config import settings
+from ..cassette import CassetteMiss
+from ..instrument import external_wait, instrument_node
+from ..llm import get_llm
+from ..memprofile import track_memory
+from ..usage import current_usage
 from .prompt import DEFAULT_SYSTEM_PROMPT, TRANSLATE_SYSTEM_PROMPT, RESEARCH_SYSTEM_PROMPT
-from .tools import web_search, format_search_results, SearchResult
+from .prefetch import PrefetchHandle, run_search
+from .sufficiency import assess_search_results
+from .tools import format_search_results, postprocess_search_results, SearchResult
+
+
+logger = logging.getLogger(__name__)
 
 
 class AgentState(TypedDict):
-    """에이전트 상태 정의"""
+    """
+    에이전트 상태 정의.
+
+    노드는 바꾼 키만 담은 dict를 반환하고 LangGraph가 채널별로 병합한다.
+    search_results는 회차마다 새 결과를 이어 붙이는 reducer(operator.add)를 쓰고,
+    나머지 키는 마지막으로 쓴 값이 남는다.
+    """
     question: str
     mode: Literal["translate", "general", "research"]
     system_prompt: str
@@ -15,9 +33,40 @@ class AgentState(TypedDict):
     answer: str
     used_search: bool
     raw_response: dict
-    search_results: List[Dict]  # 검색 결과 저장
+    search_results: Annotated[List[SearchResult], operator.add]  # 검색 결과 (추가만 함)
     research_iterations: int  # 연구 반복 횟수
     max_iterations: int  # 최대 반복 횟수
+    search_assessment: Dict  # 마지막 검색 회차 후 충분성 평가 (sufficiency.assess_search_results)
+    history: List[Dict]  # 이전 대화 메시지 (WebSocket 세션에서 사용)
+    requested_mode: Optional[str]  # 호출자가 정한 모드 (None이면 detect_mode가 질문으로 판별)
+
+
+# 번역 요청 키워드
+TRANSLATION_KEYWORDS = [
+    "번역해줘",
+    "번역 해줘",
+    "번역해 줘",
+    "번역 부탁",
+    "이 문서 번역",
+    "이 파일 번역",
+    "translate",
+    "translation",
+]
+
+# 명시적인 연구 요청 키워드만 감지 (더 엄격하게)
+# "분석해줘", "상세히", "자세히" 같은 일반적인 키워드는 제외
+RESEARCH_KEYWORDS = [
+    "연구해줘",
+    "조사해줘",
+    "리서치",
+    "research",
+    "deep research",
+    "보고서 작성",
+    "보고서 만들어",
+    "report",
+    "심층 연구",
+    "상세 연구",
+]
 
 
 def _is_translation_request(question: str) -> bool:
@@ -25,17 +74,7 @@ def _is_translation_request(question: str) -> bool:
     질문이 '번역' 요청인지 간단한 키워드 기반으로 판별한다.
     """
     lowered = question.lower()
-    keywords = [
-        "번역해줘",
-        "번역 해줘",
-        "번역해 줘",
-        "번역 부탁",
-        "이 문서 번역",
-        "이 파일 번역",
-        "translate",
-        "translation",
-    ]
-    return any(k in lowered for k in keywords)
+    return any(k in lowered for k in TRANSLATION_KEYWORDS)
 
 
 def _is_research_request(question: str) -> bool:
@@ -44,88 +83,145 @@ def _is_research_request(question: str) -> bool:
     명시적인 키워드만 감지하여 불필요한 연구 모드 진입을 방지.
     """
     lowered = question.lower()
-    # 명시적인 연구 요청 키워드만 감지 (더 엄격하게)
-    research_keywords = [
-        "연구해줘",
-        "조사해줘",
-        "리서치",
-        "research",
-        "deep research",
-        "보고서 작성",
-        "보고서 만들어",
-        "report",
-        "심층 연구",
-        "상세 연구",
-    ]
-    # "분석해줘", "상세히", "자세히" 같은 일반적인 키워드는 제외
-    return any(k in lowered for k in research_keywords)
-
-
-def detect_mode(state: AgentState) -> AgentState:
-    """번역/연구/일반 모드 판단"""
+    return any(k in lowered for k in RESEARCH_KEYWORDS)
+
+
+def classify_mode(question: str) -> Literal["translate", "general", "research"]:
+    """질문만으로 에이전트 모드를 판별한다 (detect_mode와 같은 우선순위)."""
+    if _is_translation_request(question):
+        return "translate"
+    if _is_research_request(question):
+        return "research"
+    return "general"
+
+
+def detect_mode(state: AgentState) -> Dict:
+    """번역/연구/일반 모드 판단 (호출자가 모드를 정했으면 그대로 사용)"""
     try:
-        question = state["question"]
-        is_translate = _is_translation_request(question)
-        is_research = _is_research_request(question)
-        
-        # TypedDict는 copy()가 없으므로 dict()로 변환
-        new_state = dict(state)
-        if is_translate:
-            new_state["mode"] = "translate"
-            new_state["system_prompt"] = TRANSLATE_SYSTEM_PROMPT
-        elif is_research:
-            new_state["mode"] = "research"
-            new_state["system_prompt"] = RESEARCH_SYSTEM_PROMPT
-            new_state["max_iterations"] = 2  # 최대 2회 검색 반복 (성능 최적화)
-            new_state["research_iterations"] = 0
-            new_state["search_results"] = []
-        else:
-            new_state["mode"] = "general"
-            new_state["system_prompt"] = DEFAULT_SYSTEM_PROMPT
-        
-        return new_state
+        mode = state.get("requested_mode") or classify_mode(state["question"])
     except Exception as e:
-        # 에러 발생 시 기본 상태 반환
-        new_state = dict(state)
-        new_state["mode"] = "general"
-        new_state["system_prompt"] = DEFAULT_SYSTEM_PROMPT
-        return new_state
+        # 에러 발생 시 일반 모드
+        mode = "general"
+
+    if mode == "translate":
+        return {"mode": "translate", "system_prompt": TRANSLATE_SYSTEM_PROMPT}
+    if mode == "research":
+        return {
+            "mode": "research",
+            "system_prompt": RESEARCH_SYSTEM_PROMPT,
+            "max_iterations": 2,  # 최대 2회 검색 반복 (성능 최적화)
+            "research_iterations": 0,
+        }
+    return {"mode": "general", "system_prompt": DEFAULT_SYSTEM_PROMPT}
 
 
-def perform_search(state: AgentState) -> AgentState:
-    """웹 검색 수행 (연구 모드에서만 사용)"""
+def perform_search(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """웹 검색 수행 (연구 모드에서만 사용, 첫 검색은 요청 도착 시 시작된 추측 검색 결과를 우선 사용)"""
     try:
         question = state["question"]
         iterations = state.get("research_iterations", 0)
         max_iter = state.get("max_iterations", 3)
-        
-        # TypedDict는 copy()가 없으므로 dict()로 변환
-        new_state = dict(state)
-        
+
         # 최대 반복 횟수 체크
         if iterations >= max_iter:
-            return new_state
-        
+            return {}
+
         # 검색 수행
         search_query = question if iterations == 0 else f"{question} 상세 정보"
-        results = web_search(search_query, max_results=5)
-        
-        # 검색 결과 저장
-        existing_results = new_state.get("search_results", [])
-        for result in results:
-            existing_results.append(result.to_dict())
-        new_state["search_results"] = existing_results
-        new_state["research_iterations"] = iterations + 1
-        new_state["used_search"] = True
-        
-        return new_state
+        prefetch = _get_prefetch(config)
+        with external_wait():
+            results = prefetch.take(search_query) if prefetch is not None else None
+            if results is None:
+                results = run_search(question, search_query)
+        usage = current_usage()
+        if usage is not None:
+            usage.add_search()
+
+        # 답변 생성 전에 지금까지 모은 결과로 추가 검색이 필요한지 평가 (LLM 호출 없음)
+        assessment = assess_search_results(question, state.get("search_results", []) + results)
+
+        # 이번 회차 결과만 반환하면 reducer가 기존 결과 뒤에 이어 붙인다
+        return {
+            "search_results": results,
+            "research_iterations": iterations + 1,
+            "used_search": True,
+            "search_assessment": {
+                **assessment.to_dict(),
+                "round": iterations + 1,
+                "round_results": len(results),
+            },
+        }
+    except CassetteMiss:
+        # 재생 모드의 녹화 누락은 검색 실패로 덮지 않고 요청 실패로 알린다 (LLM 라우터와 같은 처리)
+        raise
     except Exception as e:
         # 검색 실패 시 기존 상태 유지
-        return dict(state)
+        return {}
 
 
-def call_llm(state: AgentState) -> AgentState:
-    """OpenAI LLM 호출"""
+# 스트리밍 이벤트 콜백: {"type": "token", "content": ...} 형태의 dict를 받는다
+EventCallback = Callable[[Dict], None]
+
+
+class GenerationCancelled(Exception):
+    """
+    사용자가 생성을 취소했을 때 emit 콜백이 발생시키는 예외.
+    노드의 일반 에러 처리에 삼켜지지 않고 run_agent 호출자까지 전달된다.
+    """
+
+
+def _get_emit(config: Optional[RunnableConfig]) -> Optional[EventCallback]:
+    """그래프 실행 config에서 스트리밍 이벤트 콜백을 꺼낸다."""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("emit")
+
+
+def _get_prefetch(config: Optional[RunnableConfig]) -> Optional[PrefetchHandle]:
+    """그래프 실행 config에서 추측 검색 핸들을 꺼낸다."""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("prefetch")
+
+
+def _stream_completion(messages: list, emit: EventCallback) -> Tuple[str, dict]:
+    """
+    스트리밍 모드로 LLM을 호출하며 토큰마다 emit을 호출한다.
+    반환값은 비스트리밍 호출과 같은 (answer, raw_response) 형태로 맞춘다.
+    """
+    stream = get_llm().stream(messages, stream_options={"include_usage": True})
+    parts: List[str] = []
+    raw: dict = {"choices": []}
+    finish_reason = None
+    # 취소 등으로 중간에 빠져나가면 연결을 닫아 남은 토큰 생성을 중단시킨다
+    with stream:
+        for chunk in stream:
+            raw["id"] = chunk.id
+            raw["model"] = chunk.model
+            raw["created"] = chunk.created
+            if chunk.usage is not None:
+                raw["usage"] = chunk.usage.model_dump()
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta.content
+            if delta:
+                parts.append(delta)
+                emit({"type": "token", "content": delta})
+
+    answer = "".join(parts)
+    raw["object"] = "chat.completion"
+    raw["choices"] = [{
+        "index": 0,
+        "message": {"role": "assistant", "content": answer},
+        "finish_reason": finish_reason,
+    }]
+    return answer, raw
+
+
+def call_llm(state: AgentState, config: Optional[RunnableConfig] = None) -> Dict:
+    """LLM 호출 (공급자 라우터 경유, config에 emit 콜백이 있으면 토큰 스트리밍)"""
     try:
         question = state["question"]
         system_prompt = state["system_prompt"]
@@ -133,77 +229,69 @@ def call_llm(state: AgentState) -> AgentState:
         
         # 연구 모드인 경우 검색 결과를 포함
         messages = [{"role": "system", "content": system_prompt}]
+        # 같은 세션의 이전 대화가 있으면 시스템 프롬프트 뒤에 이어 붙임
+        messages.extend(state.get("history") or [])
         
         if mode == "research" and state.get("search_results"):
-            # 검색 결과를 컨텍스트에 추가
-            search_context = format_search_results([
-                SearchResult(**r) for r in state["search_results"]
-            ])
+            # 검색 결과를 중복 제거·재정렬·압축한 뒤 컨텍스트에 추가
+            search_context = format_search_results(postprocess_search_results(question, state["search_results"]))
             user_content = f"{search_context}\n\n질문: {question}"
         else:
             user_content = question
         
         messages.append({"role": "user", "content": user_content})
         
-        client = settings.client
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=messages,
-        )
-
-        answer = response.choices[0].message.content or ""
-        
-        # TypedDict는 copy()가 없으므로 dict()로 변환
-        new_state = dict(state)
-        new_state["answer"] = answer
-        new_state["raw_response"] = response.model_dump()
-        new_state["messages"] = messages
+        emit = _get_emit(config)
+        if emit is not None:
+            # 답변 생성 시작 시 이전에 보낸 토큰은 버리도록 알림 (재생성이 없어도 이벤트 순서는 유지)
+            emit({"type": "reset"})
+            answer, raw_response = _stream_completion(messages, emit)
+        else:
+            response = get_llm().complete(messages)
+            answer = response.choices[0].message.content or ""
+            raw_response = response.model_dump()
 
-        return new_state
+        return {"answer": answer, "raw_response": raw_response, "messages": messages}
+    except GenerationCancelled:
+        raise
     except Exception as e:
         # LLM 호출 실패 시 에러 메시지 반환
-        new_state = dict(state)
-        new_state["answer"] = f"오류가 발생했습니다: {str(e)}"
-        new_state["raw_response"] = {}
-        new_state["messages"] = []
-        return new_state
+        return {"answer": f"오류가 발생했습니다: {str(e)}", "raw_response": {}, "messages": []}
 
 
 def should_continue_research(state: AgentState) -> str:
     """
-    연구를 계속할지 결정하는 조건부 엣지 함수.
-    연구 모드에서만 사용되며, 추가 검색이 필요한지 판단합니다.
-    성능 최적화: 최대 2회 검색으로 제한하고, 빠르게 종료 조건 추가.
+    검색 직후(답변 생성 전) 한 번 더 검색할지 결정하는 조건부 엣지 함수.
+    perform_search가 남긴 충분성 평가 점수가 기준보다 낮을 때만 추가 검색하므로
+    연구 모드는 보통 LLM을 한 번만 호출한다. 결정 근거는 로그로 남긴다.
     """
-    mode = state.get("mode", "general")
-    if mode != "research":
-        return "end"
-    
+    if state.get("mode", "general") != "research":
+        return "llm"
+
     iterations = state.get("research_iterations", 0)
-    max_iter = state.get("max_iterations", 2)  # 3회 -> 2회로 감소
-    
-    # 최대 반복 횟수에 도달한 경우 종료
-    if iterations >= max_iter:
-        return "end"
-    
-    # 첫 번째 검색이 아직 수행되지 않은 경우 검색 수행
-    if iterations == 0:
-        return "search"
-    
-    # 첫 검색 후 답변을 확인하여 충분성 판단
-    answer = state.get("answer", "")
-    
-    # 충분히 긴 답변이거나, 구조화된 보고서 형식이 있으면 종료
-    if len(answer) > 1500:  # 2000 -> 1500으로 낮춤 (더 빠른 종료)
-        return "end"
-    
-    # 보고서 형식 키워드가 있으면 종료 (이미 충분한 정보)
-    report_keywords = ["## 요약", "## 주요 발견사항", "## 상세 분석", "## 출처"]
-    if any(keyword in answer for keyword in report_keywords):
-        return "end"
-    
-    # 추가 검색이 필요한 경우만 수행
-    return "search"
+    max_iter = state.get("max_iterations", 2)
+    assessment = state.get("search_assessment") or {}
+
+    if assessment.get("round") != iterations:
+        # 이번 회차 검색이 예외로 실패해 평가가 없음
+        decision, reason = "llm", "검색 실패"
+    elif assessment.get("sufficient"):
+        decision, reason = "llm", assessment["reason"]
+    elif iterations >= max_iter:
+        decision, reason = "llm", f"{assessment['reason']}, 최대 검색 횟수({max_iter}) 도달"
+    elif not assessment.get("round_results"):
+        # 검색이 비활성화되었거나 결과가 없으면 쿼리를 바꿔도 나아지지 않음
+        decision, reason = "llm", "이번 회차 검색 결과 없음"
+    else:
+        decision, reason = "search", assessment["reason"]
+        if assessment.get("missing_terms"):
+            reason += f", 빠진 핵심어: {', '.join(assessment['missing_terms'][:5])}"
+
+    logger.info(
+        "research: %d회차 검색 후 %s (%s)",
+        iterations, "추가 검색" if decision == "search" else "답변 생성", reason,
+    )
+    return decision
 
 
 def should_search_first(state: AgentState) -> str:
@@ -218,7 +306,7 @@ def should_search_first(state: AgentState) -> str:
     return "llm"  # 바로 LLM 호출
 
 
-def detect_search_usage(state: AgentState) -> AgentState:
+def detect_search_usage(state: AgentState) -> Dict:
     """답변 내용 기반으로 웹 검색 사용 여부 추정"""
     try:
         answer = state.get("answer", "")
@@ -232,16 +320,19 @@ def detect_search_usage(state: AgentState) -> AgentState:
             "확인 결과",
             "조사 결과",
         ]
-        # TypedDict는 copy()가 없으므로 dict()로 변환
-        new_state = dict(state)
         # 실제 검색을 수행했거나, 답변에 검색 키워드가 포함된 경우
-        new_state["used_search"] = state.get("used_search", False) or any(
+        used_search = state.get("used_search", False) or any(
             keyword in answer for keyword in search_keywords
         )
-        return new_state
+        return {"used_search": used_search}
     except Exception as e:
         # 에러 발생 시 기존 상태 유지
-        return dict(state)
+        return {}
+
+
+def _node(name: str, fn: Callable) -> Callable:
+    """그래프 노드 함수에 실행 시간/메모리 계측을 씌운다."""
+    return instrument_node(name, track_memory(f"node:{name}", fn))
 
 
 def create_agent_graph():
@@ -249,11 +340,11 @@ def create_agent_graph():
     try:
         workflow = StateGraph(AgentState)
 
-        # 노드 추가
-        workflow.add_node("detect_mode", detect_mode)
-        workflow.add_node("perform_search", perform_search)
-        workflow.add_node("call_llm", call_llm)
-        workflow.add_node("detect_search", detect_search_usage)
+        # 노드 추가 (profile_nodes() 블록 안이면 시간 계측, MEMORY_PROFILING이면 메모리 계측)
+        workflow.add_node("detect_mode", _node("detect_mode", detect_mode))
+        workflow.add_node("perform_search", _node("perform_search", perform_search))
+        workflow.add_node("call_llm", _node("call_llm", call_llm))
+        workflow.add_node("detect_search", _node("detect_search", detect_search_usage))
 
         # 엣지 정의
         workflow.set_entry_point("detect_mode")
@@ -268,18 +359,18 @@ def create_agent_graph():
             }
         )
         
-        # 검색 후 LLM 호출
-        workflow.add_edge("perform_search", "call_llm")
-        
-        # LLM 호출 후 연구 모드면 추가 검색 여부 판단
+        # 검색 후 결과가 충분하면 LLM 호출, 부족하면 답변 생성 전에 한 번 더 검색
         workflow.add_conditional_edges(
-            "call_llm",
+            "perform_search",
             should_continue_research,
             {
                 "search": "perform_search",
-                "end": "detect_search",
+                "llm": "call_llm",
             }
         )
+
+        # 답변은 한 번만 생성
+        workflow.add_edge("call_llm", "detect_search")
         
         # 최종 종료
         workflow.add_edge("detect_search", END)
@@ -301,40 +392,78 @@ def get_agent_graph() -> StateGraph:
     return _agent_graph
 
 
-def run_agent(question: str) -> Tuple[str, bool, dict, Optional[List[Dict]]]:
+def initial_state(
+    question: str,
+    history: Optional[List[Dict]] = None,
+    mode: Optional[Literal["translate", "general", "research"]] = None,
+) -> AgentState:
+    """그래프 실행 초기 상태"""
+    return {
+        "question": question.strip(),
+        "mode": "general",  # detect_mode에서 설정됨
+        "system_prompt": "",
+        "messages": [],
+        "answer": "",
+        "used_search": False,
+        "raw_response": {},
+        "search_results": [],
+        "research_iterations": 0,
+        "max_iterations": 2,  # 기본값도 2회로 설정
+        "search_assessment": {},
+        "history": list(history or []),
+        "requested_mode": mode,
+    }
+
+
+def run_agent(
+    question: str,
+    emit: Optional[EventCallback] = None,
+    history: Optional[List[Dict]] = None,
+    prefetch: Optional[PrefetchHandle] = None,
+    mode: Optional[Literal["translate", "general", "research"]] = None,
+) -> Tuple[str, bool, dict, Optional[List[Dict]]]:
     """
     사용자 질문을 받아 LangGraph 기반 에이전트를 실행하고 결과를 반환한다.
 
     - 번역 요청인 경우: BASE + TRANSLATE 프롬프트 조합 사용
-    - 연구 요청인 경우: BASE + RESEARCH 프롬프트 조합 사용 (다단계 검색)
+    - 연구 요청인 경우: BASE + RESEARCH 프롬프트 조합 사용 (검색 결과가 부족하면 답변 생성 전에 재검색)
     - 그 외: BASE + ANALYZE 프롬프트 조합 사용
 
+    emit이 주어지면 LLM 토큰을 {"type": "token"} 이벤트로 전달한다.
+    답변을 다시 생성하기 직전에는 {"type": "reset"} 이벤트가 전달된다.
+    emit이 GenerationCancelled를 발생시키면 생성을 멈추고 그 예외를 그대로 전달한다.
+
+    history는 이전 대화 메시지 목록({"role", "content"})으로, 모드 판별에는 쓰지 않고
+    LLM 호출 시 현재 질문 앞에 넣는다.
+
+    prefetch는 요청 도착 시 시작한 첫 검색 핸들(SearchPrefetcher.start)로, 연구 모드의 첫 검색에서
+    쿼리가 같으면 그 결과를 사용한다. 핸들 해제는 호출자 몫이다.
+
+    mode를 주면 질문 키워드로 모드를 판별하지 않는다. 질문에 문서 본문이 섞여 있어
+    본문의 "report", "번역해줘" 같은 단어로 모드가 바뀌면 안 되는 경우(다중 문서 비교)에 쓴다.
+
     반환: (answer, used_search, raw_model_dict, sources)
     """
     try:
         graph = get_agent_graph()
 
-        # 초기 상태
-        initial_state: AgentState = {
-            "question": question.strip(),
-            "mode": "general",  # detect_mode에서 설정됨
-            "system_prompt": "",
-            "messages": [],
-            "answer": "",
-            "used_search": False,
-            "raw_response": {},
-            "search_results": [],
-            "research_iterations": 0,
-            "max_iterations": 2,  # 기본값도 2회로 설정
-        }
-
         # 그래프 실행
-        final_state = graph.invoke(initial_state)
+        configurable: Dict = {}
+        if emit:
+            configurable["emit"] = emit
+        if prefetch is not None:
+            configurable["prefetch"] = prefetch
+        config: RunnableConfig = {"configurable": configurable} if configurable else {}
+        final_state = graph.invoke(initial_state(question, history, mode), config=config)
 
         # 소스 정보 추출 (연구 모드인 경우)
         sources = None
         if final_state.get("search_results"):
-            sources = final_state["search_results"]
+            # 원문 페이지 본문은 응답 크기를 키우므로 출처 목록에서는 제외
+            sources = [
+                {k: v for k, v in r.to_dict().items() if k != "page_content"}
+                for r in final_state["search_results"]
+            ]
 
         # 안전하게 값 추출
         answer = final_state.get("answer", "답변을 생성할 수 없습니다.")
@@ -347,6 +476,8 @@ def run_agent(question: str) -> Tuple[str, bool, dict, Optional[List[Dict]]]:
             raw_response,
             sources,
         )
+    except GenerationCancelled:
+        raise
     except Exception as e:
         # 에러 발생 시 기본값 반환
         error_msg = f"에이전트 실행 중 오류가 발생했습니다: {str(e)}"
@@ -0,0 +1,115 @@
+"""
+위험 조항 추출 요청 처리.
+
+문서 전체를 LLM에 보내는 대신 조항 분할 + 로컬 규칙 점수로 후보만 고르고,
+LLM은 후보 조항이 실제로 위험한지 구조화된(JSON) 형태로 검증만 한다.
+로컬 선별 덕분에 15,000자 한도를 넘는 긴 계약서도 처리할 수 있다.
+"""
+
+import json
+import logging
+from typing import Callable, Dict, List, Optional
+
+from ..config import settings
+from ..files.clauses import Clause, find_risk_candidates, load_rules, segment_clauses
+from ..llm import get_llm
+from ..prompts.clauses import CLAUSE_REVIEW_PROMPT
+
+
+logger = logging.getLogger(__name__)
+
+_SEVERITY_LABELS = {"high": "높음", "medium": "중간", "low": "낮음"}
+
+
+def _build_review_message(question: str, candidates: List[Clause]) -> str:
+    parts = [f"사용자 요청: {question}", "", "[위험 후보 조항]"]
+    for clause in candidates:
+        parts.append(f"[{clause.clause_id}] (규칙: {', '.join(clause.categories)})\n{clause.text}")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def _parse_items(content: str) -> List[Dict]:
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        logger.warning("clause review: LLM이 JSON이 아닌 응답을 반환함")
+        return []
+    items = data.get("items", []) if isinstance(data, dict) else []
+    return [item for item in items if isinstance(item, dict) and item.get("id")]
+
+
+def _format_answer(verified: List[Dict], total: int, candidates: int) -> str:
+    """검증된 위험 조항을 마크다운 답변으로 정리한다."""
+    header = f"전체 {total}개 조항 중 규칙으로 {candidates}개 후보를 선별해 검토했습니다."
+    if not verified:
+        return f"{header}\n\n위험하다고 판단된 조항이 없습니다."
+
+    lines = [header, "", f"## 위험 조항 ({len(verified)}개)", ""]
+    for item in verified:
+        severity = _SEVERITY_LABELS.get(item.get("severity", ""), item.get("severity", "-"))
+        title = item.get("heading") or item["id"]
+        lines.append(f"### {title} — {item.get('category', '-')} (위험도: {severity})")
+        if item.get("summary"):
+            lines.append(f"- **요약**: {item['summary']}")
+        if item.get("reason"):
+            lines.append(f"- **이유**: {item['reason']}")
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+def review_clauses(
+    question: str,
+    doc_text: str,
+    emit: Optional[Callable[[Dict], None]] = None,
+) -> tuple:
+    """
+    위험 조항 추출을 실행한다.
+
+    반환값은 run_agent와 같은 (answer, used_search, raw, sources)에
+    조항 분석 메타데이터 dict를 덧붙인 5-튜플이다.
+    """
+    rules = load_rules(str(settings.CLAUSE_RULES_PATH) if settings.CLAUSE_RULES_PATH else None)
+    clauses = segment_clauses(doc_text)
+    candidates = find_risk_candidates(
+        clauses,
+        rules,
+        max_candidates=settings.CLAUSE_MAX_CANDIDATES,
+        char_budget=settings.CLAUSE_CONTEXT_BUDGET,
+    )
+    by_id = {c.clause_id: c for c in candidates}
+    report = {
+        "total_clauses": len(clauses),
+        "candidates": len(candidates),
+        "candidate_chars": sum(len(c.text) for c in candidates),
+        "document_chars": len(doc_text),
+        "verified": [],
+    }
+
+    raw: dict = {}
+    verified: List[Dict] = []
+    if candidates:
+        response = get_llm().complete(
+            [
+                {"role": "system", "content": CLAUSE_REVIEW_PROMPT},
+                {"role": "user", "content": _build_review_message(question, candidates)},
+            ],
+            response_format={"type": "json_object"},
+        )
+        raw = response.model_dump()
+        for item in _parse_items(response.choices[0].message.content or ""):
+            clause = by_id.get(item["id"])
+            # 후보에 없는 id(환각)와 위험하지 않다고 판정된 항목은 제외
+            if clause is None or not item.get("risky"):
+                continue
+            item.setdefault("category", clause.categories[0] if clause.categories else None)
+            item["heading"] = clause.heading
+            item["rule_score"] = clause.score
+            item["text"] = clause.text
+            verified.append(item)
+
+    report["verified"] = verified
+    answer = _format_answer(verified, len(clauses), len(candidates))
+    if emit is not None:
+        emit({"type": "token", "content": answer})
+    return answer, False, raw, None, {"clauses": report}
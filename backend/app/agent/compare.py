@@ -0,0 +1,147 @@
+"""
+다중 문서 비교 분석용 검색/프롬프트 구성 모듈.
+
+문서마다 조각(chunk) 인덱스를 만들고, 질문과 관련도가 높은 구절을
+공유 토큰 예산 안에서 문서별로 고르게 발췌해 하나의 비교 질문으로 묶는다.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+from ..files.chunker import chunk_text
+from ..files.langid import estimate_tokens
+from ..files.loader import ExtractedDocument
+from ..prompts.compare import COMPARE_PROMPT
+from .tools import tokenize_list
+
+
+COMPARE_CHUNK_SIZE = 800
+
+# BM25 파라미터
+_K1 = 1.2
+_B = 0.75
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+
+def _terms(text: str) -> List[str]:
+    """
+    BM25 색인/질의용 용어 목록.
+    한글 토큰은 조사가 붙은 형태("자동갱신은")도 맞도록 음절 바이그램을 함께 넣는다.
+    """
+    terms: List[str] = []
+    for token in tokenize_list(text):
+        terms.append(token)
+        if len(token) > 2 and _HANGUL_RE.search(token):
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return terms
+
+
+class DocumentIndex:
+    """문서 하나의 조각 목록과 BM25 점수 계산용 통계."""
+
+    def __init__(self, doc_id: str, doc: ExtractedDocument) -> None:
+        self.doc_id = doc_id
+        self.doc = doc
+        self.chunks = chunk_text(doc.text, max_chars=COMPARE_CHUNK_SIZE, overlap=0)
+        # 한국어는 영어보다 글자당 토큰이 많으므로 예산은 언어별 추정 토큰 수로 잰다
+        self.chunk_tokens = [estimate_tokens(c) for c in self.chunks]
+        self.total_tokens = sum(self.chunk_tokens)
+        self._term_counts = [Counter(_terms(c)) for c in self.chunks]
+        self._lengths = [sum(tc.values()) for tc in self._term_counts]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        self._doc_freq: Counter = Counter()
+        for tc in self._term_counts:
+            self._doc_freq.update(tc.keys())
+
+    def scores(self, query_terms: List[str]) -> List[float]:
+        n = len(self.chunks)
+        scores = [0.0] * n
+        if not n or not self._avg_length:
+            return scores
+        for term in set(query_terms):
+            df = self._doc_freq.get(term, 0)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i, tc in enumerate(self._term_counts):
+                tf = tc.get(term, 0)
+                if tf:
+                    norm = _K1 * (1 - _B + _B * self._lengths[i] / self._avg_length)
+                    scores[i] += idf * tf * (_K1 + 1) / (tf + norm)
+        return scores
+
+    def select(self, query_terms: List[str], budget: int) -> List[int]:
+        """
+        budget(토큰) 안에서 점수 높은 조각의 번호를 원문 순서로 반환한다.
+        점수가 같으면 앞쪽 조각을 우선해, 관련 용어가 없을 때는 문서 앞부분이 선택된다.
+        """
+        scores = self.scores(query_terms)
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+        chosen: List[int] = []
+        used = 0
+        for i in ranked:
+            size = self.chunk_tokens[i]
+            if used + size > budget:
+                continue
+            chosen.append(i)
+            used += size
+        return sorted(chosen)
+
+
+def select_passages(
+    indexes: List[DocumentIndex],
+    question: str,
+    budget: int,
+) -> Dict[str, List[int]]:
+    """
+    공유 토큰 예산을 문서 수로 나눠 문서별 구절을 고른다.
+    짧은 문서가 다 쓰지 못한 예산은 남은 문서들에 다시 나눠 준다.
+    """
+    query_terms = _terms(question)
+    selected: Dict[str, List[int]] = {}
+    remaining = budget
+    # 짧은 문서부터 처리해야 남는 예산을 긴 문서에 넘겨줄 수 있음
+    pending = sorted(indexes, key=lambda idx: idx.total_tokens)
+    while pending:
+        index = pending.pop(0)
+        share = remaining // (len(pending) + 1)
+        chosen = index.select(query_terms, share)
+        selected[index.doc_id] = chosen
+        remaining -= sum(index.chunk_tokens[i] for i in chosen)
+    return selected
+
+
+def build_compare_question(
+    docs: List[ExtractedDocument],
+    question: str,
+    budget: int,
+) -> tuple[str, List[dict]]:
+    """
+    비교 질문 텍스트와 문서별 발췌 정보(응답용)를 만든다.
+    각 구절은 [D{문서}-{조각}] 태그로 표시해 답변에서 인용할 수 있게 한다.
+    """
+    indexes = [DocumentIndex(f"D{i}", doc) for i, doc in enumerate(docs, 1)]
+    selected = select_passages(indexes, question, budget)
+
+    parts = [COMPARE_PROMPT, ""]
+    documents = []
+    for index in indexes:
+        chosen = selected.get(index.doc_id, [])
+        parts.append(f"=== [{index.doc_id}] {index.doc.filename} ===")
+        for i in chosen:
+            parts.append(f"[{index.doc_id}-{i + 1}] {index.chunks[i]}")
+        parts.append("")
+        documents.append({
+            "id": index.doc_id,
+            "filename": index.doc.filename,
+            "chars": len(index.doc.text),
+            "chunks": len(index.chunks),
+            "selected_chunks": [i + 1 for i in chosen],
+            "selected_tokens": sum(index.chunk_tokens[i] for i in chosen),
+            "extraction": index.doc.report(),
+        })
+    parts.append(f"질문: {question}")
+    return "\n".join(parts), documents
@@ -0,0 +1,315 @@
+"""
+연구 모드용 원문 페이지 수집 모듈.
+
+Tavily 검색 결과의 짧은 스니펫만으로는 답변 깊이가 부족하므로,
+상위 결과 URL의 실제 페이지를 동시에 가져와 본문 텍스트를 추출한다.
+
+- 하나의 공유 httpx.AsyncClient(커넥션 풀)를 전용 이벤트 루프 스레드에서 사용
+- 호스트별 동시 요청 수 제한, 요청 타임아웃, 응답 크기 상한
+- URL + ETag 기반 디스크 캐시 (If-None-Match 재검증)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import settings
+from ..files.chunker import chunk_text
+from .tools import SearchResult, lexical_overlap, tokenize
+
+
+logger = logging.getLogger(__name__)
+
+PAGE_CHUNK_SIZE = 1_000
+PAGE_TEXT_BUDGET = 3_000  # 페이지 하나에서 결과에 붙일 최대 본문 길이(문자)
+CACHE_FRESH_SECONDS = 600  # 이 시간 안에 받은 페이지는 재검증 없이 사용
+CACHE_NO_ETAG_TTL = 6 * 3600  # ETag가 없는 페이지의 캐시 유효 시간
+
+_USER_AGENT = "Mozilla/5.0 (compatible; ai-assistants-research/0.1)"
+_SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg", "iframe", "template"}
+_MAIN_TAGS = {"article", "main"}
+_BLOCK_TAGS = {
+    "p", "div", "section", "br", "li", "ul", "ol", "tr", "table",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre",
+}
+_VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "col", "embed"}
+
+
+class _MainContentParser(HTMLParser):
+    """스크립트/내비게이션 등을 제외하고 본문 텍스트를 모으는 HTML 파서."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self._main_depth = 0
+        self.all_parts: List[str] = []
+        self.main_parts: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._append("\n")
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _MAIN_TAGS:
+            self._main_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _VOID_TAGS:
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _MAIN_TAGS:
+            self._main_depth = max(0, self._main_depth - 1)
+        if tag in _BLOCK_TAGS:
+            self._append("\n")
+
+    def handle_data(self, data: str) -> None:
+        self._append(data)
+
+    def _append(self, text: str) -> None:
+        if self._skip_depth:
+            return
+        self.all_parts.append(text)
+        if self._main_depth:
+            self.main_parts.append(text)
+
+
+def _clean_lines(text: str) -> str:
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n\n".join(line for line in lines if line)
+
+
+def extract_main_text(html: str) -> str:
+    """
+    HTML에서 본문 텍스트를 추출한다.
+
+    <article>/<main> 영역이 충분히 길면 그 부분만, 아니면 문서 전체에서
+    스크립트·내비게이션·헤더/푸터를 제외한 텍스트를 사용한다.
+    """
+    parser = _MainContentParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    main_text = _clean_lines("".join(parser.main_parts))
+    if len(main_text) >= 200:
+        return main_text
+    return _clean_lines("".join(parser.all_parts))
+
+
+class PageCache:
+    """URL + ETag 기반 페이지 본문 디스크 캐시 (URL 해시당 JSON 파일 하나)."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            entry = json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url: str, etag: Optional[str], text: str) -> None:
+        entry = {"url": url, "etag": etag, "text": text, "fetched_at": time.time()}
+        path = self._path(url)
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning("페이지 캐시 저장 실패 (%s): %s", url, e)
+
+
+class PageFetcher:
+    """
+    공유 커넥션 풀로 여러 페이지를 동시에 가져오는 수집기.
+
+    httpx.AsyncClient는 생성된 이벤트 루프에 묶이므로, 전용 스레드에서
+    이벤트 루프를 하나 띄워 두고 동기 코드(그래프 노드)에서는
+    fetch_pages()로 작업을 넘겨 결과를 기다린다.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        max_bytes: int,
+        per_host: int,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.per_host = max(1, per_host)
+        self.cache = PageCache(cache_dir) if cache_dir else None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="page-fetcher", daemon=True)
+        self._thread.start()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3.0)),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                follow_redirects=True,
+                headers={"User-Agent": _USER_AGENT, "Accept": "text/html,text/plain;q=0.9"},
+            )
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = (urlsplit(url).hostname or "").lower()
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return self._host_limits[host]
+
+    async def _download(self, url: str, etag: Optional[str]) -> tuple[int, Optional[str], str]:
+        """(status, etag, text) 반환. 본문은 max_bytes까지만 읽는다."""
+        headers = {"If-None-Match": etag} if etag else {}
+        async with self._get_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return 304, etag, ""
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if content_type and not content_type.startswith(("text/html", "text/plain", "application/xhtml")):
+                return response.status_code, None, ""
+
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                buffer.extend(chunk)
+                if len(buffer) >= self.max_bytes:
+                    del buffer[self.max_bytes:]
+                    break
+            encoding = response.charset_encoding or "utf-8"
+            try:
+                raw = buffer.decode(encoding, errors="replace")
+            except LookupError:
+                raw = buffer.decode("utf-8", errors="replace")
+
+            text = raw if content_type.startswith("text/plain") else extract_main_text(raw)
+            return response.status_code, response.headers.get("etag"), text
+
+    async def _fetch_one(self, url: str) -> Optional[str]:
+        cached = self.cache.get(url) if self.cache else None
+        if cached:
+            age = time.time() - cached.get("fetched_at", 0)
+            if age < CACHE_FRESH_SECONDS or (not cached.get("etag") and age < CACHE_NO_ETAG_TTL):
+                return cached["text"]
+
+        try:
+            async with self._host_limit(url):
+                status, etag, text = await self._download(url, cached.get("etag") if cached else None)
+        except Exception as e:
+            logger.info("페이지 수집 실패 (%s): %s", url, e)
+            return cached["text"] if cached else None
+
+        if status == 304 and cached:
+            if self.cache:
+                self.cache.put(url, cached.get("etag"), cached["text"])
+            return cached["text"]
+        if text and self.cache:
+            self.cache.put(url, etag, text)
+        return text or None
+
+    async def fetch_many(self, urls: List[str]) -> Dict[str, str]:
+        unique = list(dict.fromkeys(u for u in urls if u and u.startswith(("http://", "https://"))))
+        texts = await asyncio.gather(*(self._fetch_one(u) for u in unique))
+        return {url: text for url, text in zip(unique, texts) if text}
+
+    def fetch_pages(self, urls: List[str]) -> Dict[str, str]:
+        """동기 코드에서 호출하는 진입점. 전체 작업에도 타임아웃을 둔다."""
+        future = asyncio.run_coroutine_threadsafe(self.fetch_many(urls), self._loop)
+        try:
+            return future.result(timeout=self.timeout * 2 + 1)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.info("페이지 수집 전체 타임아웃: %d개 URL", len(urls))
+            return {}
+
+    def close(self) -> None:
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=5)
+            self._client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_fetcher: Optional[PageFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_page_fetcher() -> PageFetcher:
+    """설정값으로 생성한 PageFetcher 싱글톤 반환"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = PageFetcher(
+                timeout=settings.FETCH_TIMEOUT,
+                max_bytes=settings.FETCH_MAX_BYTES,
+                per_host=settings.FETCH_PER_HOST,
+                cache_dir=settings.FETCH_CACHE_DIR,
+            )
+    return _fetcher
+
+
+def select_relevant_chunks(question: str, text: str, budget: int = PAGE_TEXT_BUDGET) -> str:
+    """페이지 본문을 조각으로 나눈 뒤 질문과 관련도 높은 조각만 budget 이내로 고른다."""
+    chunks = chunk_text(text, max_chars=PAGE_CHUNK_SIZE, overlap=0)
+    if not chunks:
+        return ""
+    query_tokens = tokenize(question)
+    ranked = sorted(
+        range(len(chunks)),
+        key=lambda i: (lexical_overlap(query_tokens, chunks[i]), -i),
+        reverse=True,
+    )
+    chosen: List[int] = []
+    used = 0
+    for i in ranked:
+        if used + len(chunks[i]) > budget:
+            continue
+        chosen.append(i)
+        used += len(chunks[i])
+    return "\n\n".join(chunks[i] for i in sorted(chosen))
+
+
+def enrich_with_page_content(
+    question: str,
+    results: List[SearchResult],
+    top_n: Optional[int] = None,
+) -> List[SearchResult]:
+    """
+    상위 top_n개 검색 결과의 원문 페이지를 가져와 page_content를 채운다.
+
+    실패한 페이지는 기존 스니펫만 사용하며, 검색 흐름을 중단시키지 않는다.
+    """
+    top_n = settings.FETCH_TOP_N if top_n is None else top_n
+    targets = [r for r in results if r.url][:top_n]
+    if not targets:
+        return results
+
+    pages = get_page_fetcher().fetch_pages([r.url for r in targets])
+    for result in targets:
+        text = pages.get(result.url)
+        if text:
+            result.page_content = select_relevant_chunks(question, text) or None
+    return results
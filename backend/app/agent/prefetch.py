@@ -0,0 +1,171 @@
+"""
+연구 모드 첫 검색의 추측 실행(speculative prefetch).
+
+연구 모드 그래프는 detect_mode → perform_search → call_llm 순서로 실행되지만,
+첫 검색 쿼리는 질문 원문이므로 요청이 도착하는 순간 이미 알 수 있다.
+질문이 연구 요청으로 보이면 요청 도착 즉시 백그라운드에서 검색(+원문 수집)을 시작하고,
+의미 기반 캐시 조회, 스케줄러 슬롯 대기, 모드 판별, 프롬프트 조립은 그동안 계속 진행한다.
+
+- 그래프가 검색 분기를 타면 perform_search가 진행 중인(또는 끝난) 결과를 그대로 가져다 쓴다 (hit)
+- 캐시 적중, 취소 등으로 검색 분기에 가지 않으면 결과를 버린다 (waste)
+- 같은 질문의 추측 검색이 이미 진행 중이면 새로 시작하지 않고 합류한다 (single-flight 후속 요청 등)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ..config import settings
+from .fetch import enrich_with_page_content
+from .tools import SearchResult, web_search
+
+
+def run_search(question: str, query: str) -> List[SearchResult]:
+    """검색 한 회차: 웹 검색 후 설정에 따라 상위 결과의 원문 페이지를 채운다."""
+    results = web_search(query, max_results=5)
+    if settings.FETCH_PAGES and results:
+        # 상위 결과의 원문 페이지를 동시에 수집해 본문 발췌를 채움
+        results = enrich_with_page_content(question, results)
+    return results
+
+
+class _Entry:
+    __slots__ = ("query", "future", "started", "finished", "refs", "used", "closed")
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.future: Optional[Future] = None
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.refs = 0
+        self.used = False
+        self.closed = False
+
+
+class PrefetchHandle:
+    """요청 하나가 들고 다니는 추측 검색 참조. run_agent에 넘기고 요청이 끝나면 release한다."""
+
+    __slots__ = ("_prefetcher", "_entry", "_released")
+
+    def __init__(self, prefetcher: "SearchPrefetcher", entry: _Entry) -> None:
+        self._prefetcher = prefetcher
+        self._entry = entry
+        self._released = False
+
+    def take(self, query: str) -> Optional[List[SearchResult]]:
+        """
+        query가 추측한 쿼리와 같으면 검색 결과를 반환한다 (아직 진행 중이면 완료까지 대기).
+        쿼리가 다르거나 이미 폐기된 검색이면 None. 검색 중 예외는 그대로 전달된다.
+        """
+        return self._prefetcher._take(self._entry, query)
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._prefetcher._release(self._entry)
+
+
+class SearchPrefetcher:
+    """질문별 추측 검색을 시작/공유/폐기하고 적중·낭비 통계를 집계한다."""
+
+    def __init__(self, workers: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="search-prefetch")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Entry] = {}
+        self.started = 0
+        self.joined = 0
+        self.hits = 0
+        self.wasted = 0
+        self.failed = 0
+        self.hidden_seconds = 0.0  # 적중한 검색 중 다른 작업과 겹쳐 응답 시간에서 빠진 시간 합계
+
+    def start(self, question: str) -> Optional[PrefetchHandle]:
+        """질문이 연구 요청으로 보이면 첫 검색을 백그라운드에서 시작하고 핸들을 반환한다."""
+        # 순환 import 방지 (agent 모듈이 이 모듈의 run_search를 사용)
+        from .agent import classify_mode
+
+        query = question.strip()
+        if not query or classify_mode(query) != "research":
+            return None
+
+        with self._lock:
+            entry = self._inflight.get(query)
+            if entry is not None:
+                self.joined += 1
+            else:
+                entry = _Entry(query)
+                self._inflight[query] = entry
+                self.started += 1
+                entry.future = self._executor.submit(self._search, entry)
+            entry.refs += 1
+        return PrefetchHandle(self, entry)
+
+    def _search(self, entry: _Entry) -> List[SearchResult]:
+        try:
+            return run_search(entry.query, entry.query)
+        finally:
+            entry.finished = time.monotonic()
+
+    def _take(self, entry: _Entry, query: str) -> Optional[List[SearchResult]]:
+        with self._lock:
+            if entry.closed or query != entry.query:
+                return None
+            first_use = not entry.used
+            entry.used = True
+        taken = time.monotonic()
+        try:
+            results = entry.future.result()
+        except Exception:
+            with self._lock:
+                self.failed += int(first_use)
+            raise
+        if first_use:
+            with self._lock:
+                self.hits += 1
+                self.hidden_seconds += min(entry.finished or taken, taken) - entry.started
+        return results
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            entry.closed = True
+            if self._inflight.get(entry.query) is entry:
+                del self._inflight[entry.query]
+            if not entry.used:
+                self.wasted += 1
+                # 아직 시작 전이면 취소, 이미 실행 중이면 결과가 검색 캐시에만 남는다
+                entry.future.cancel()
+
+    def stats_dict(self) -> dict:
+        with self._lock:
+            settled = self.hits + self.failed + self.wasted
+            return {
+                "enabled": True,
+                "started": self.started,
+                "joined": self.joined,
+                "in_flight": len(self._inflight),
+                "hits": self.hits,
+                "wasted": self.wasted,
+                "failed": self.failed,
+                "hit_ratio": round(self.hits / settled, 3) if settled else 0.0,
+                "waste_ratio": round(self.wasted / settled, 3) if settled else 0.0,
+                "hidden_ms_avg": round(self.hidden_seconds * 1000 / self.hits, 1) if self.hits else 0.0,
+            }
+
+
+_prefetcher: Optional[SearchPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Optional[SearchPrefetcher]:
+    """설정에서 켜져 있으면 추측 검색기 싱글톤, 아니면 None."""
+    global _prefetcher
+    if not settings.SEARCH_PREFETCH:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = SearchPrefetcher(settings.SEARCH_PREFETCH_WORKERS)
+    return _prefetcher
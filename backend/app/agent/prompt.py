@@ -6,7 +6,7 @@
 """
 
 from ..prompts.base import BASE_PROMPT
-from ..prompts.translate import TRANSLATE_PROMPT
+from ..prompts.translate import SEGMENT_FORMAT_PROMPT, TRANSLATE_PROMPT
 from ..prompts.analyze import ANALYZE_PROMPT
 from ..prompts.research import RESEARCH_PROMPT
 
@@ -27,6 +27,14 @@ TRANSLATE_SYSTEM_PROMPT = "\n\n".join(
     ]
 ).strip()
 
+# 문서 구간 번역: 번역 규칙 + 구간 표시 유지 규칙
+SEGMENT_TRANSLATE_SYSTEM_PROMPT = "\n\n".join(
+    [
+        TRANSLATE_SYSTEM_PROMPT,
+        SEGMENT_FORMAT_PROMPT,
+    ]
+).strip()
+
 # 연구 모드: Deep Research를 위한 심층 연구 프롬프트
 RESEARCH_SYSTEM_PROMPT = "\n\n".join(
     [
@@ -0,0 +1,149 @@
+"""
+대화형 질문과 대량 문서 작업 사이의 우선순위 스케줄러.
+
+짧은 일반 질문이 몇 분씩 걸리는 번역/연구 작업 뒤에 줄 서지 않도록,
+요청을 모드와 예상 토큰 비용으로 interactive / bulk 두 레인으로 나눠 실행 슬롯을 배분한다.
+
+- 전체 슬롯 중 bulk 레인은 최대 bulk_share 비율까지만 동시에 쓴다 (나머지는 대화형 몫).
+- 빈 슬롯은 interactive 대기열에 먼저 준다.
+- 단, bulk 대기열의 가장 오래된 요청이 max_wait초 넘게 기다렸다면 그 요청에 먼저 준다 (기아 방지).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Literal, Tuple
+
+
+Lane = Literal["interactive", "bulk"]
+LANES: Tuple[Lane, ...] = ("interactive", "bulk")
+
+# 대화형으로 취급하는 모드 (그 외 번역/연구/비교/조항 추출은 bulk)
+INTERACTIVE_MODES = ("general",)
+
+# 예상 토큰 = 입력 글자 수 / CHARS_PER_TOKEN (한/영 혼합 문서 기준 대략값)
+CHARS_PER_TOKEN = 3.0
+
+_WAIT_SAMPLES = 1_000
+
+
+def estimate_cost(text_chars: int) -> int:
+    """입력 글자 수로 예상 입력 토큰 수를 대략 계산한다."""
+    return int(text_chars / CHARS_PER_TOKEN) + 1
+
+
+def classify_lane(mode: str, text_chars: int, interactive_max_tokens: int) -> Lane:
+    """모드(detect_mode/classify_mode 결과)와 입력 길이로 레인을 정한다."""
+    if mode in INTERACTIVE_MODES and estimate_cost(text_chars) <= interactive_max_tokens:
+        return "interactive"
+    return "bulk"
+
+
+class _Waiter:
+    __slots__ = ("future", "since")
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.since = time.monotonic()
+
+
+class PriorityScheduler:
+    """
+    두 레인의 실행 슬롯 배분기.
+
+    모든 상태 변경은 이벤트 루프 스레드에서만 일어나므로 별도 락이 필요 없다.
+    """
+
+    def __init__(self, slots: int, bulk_share: float, max_wait: float) -> None:
+        self.slots = max(1, slots)
+        # bulk가 모든 슬롯을 차지하지 못하도록 최소 1슬롯은 대화형 몫으로 남긴다
+        self.bulk_limit = min(self.slots - 1, math.ceil(self.slots * bulk_share)) if self.slots > 1 else 1
+        self.max_wait = max_wait
+        self._running: Dict[Lane, int] = {lane: 0 for lane in LANES}
+        self._waiting: Dict[Lane, Deque[_Waiter]] = {lane: deque() for lane in LANES}
+        self._completed: Dict[Lane, int] = {lane: 0 for lane in LANES}
+        self._waits: Dict[Lane, Deque[float]] = {lane: deque(maxlen=_WAIT_SAMPLES) for lane in LANES}
+        self.promotions = 0
+
+    def _free(self) -> int:
+        return self.slots - sum(self._running.values())
+
+    def _can_start(self, lane: Lane) -> bool:
+        if self._free() <= 0:
+            return False
+        return lane == "interactive" or self._running["bulk"] < self.bulk_limit
+
+    def _next_lane(self) -> Lane | None:
+        """다음 빈 슬롯을 받을 레인. 없으면 None."""
+        bulk = self._waiting["bulk"]
+        if bulk and self._can_start("bulk") and time.monotonic() - bulk[0].since >= self.max_wait:
+            self.promotions += 1
+            return "bulk"
+        for lane in LANES:
+            if self._waiting[lane] and self._can_start(lane):
+                return lane
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            lane = self._next_lane()
+            if lane is None:
+                return
+            waiter = self._waiting[lane].popleft()
+            if waiter.future.done():
+                # 기다리다 취소된 요청
+                continue
+            self._start(lane, waiter.since)
+            waiter.future.set_result(None)
+
+    def _start(self, lane: Lane, since: float) -> None:
+        self._running[lane] += 1
+        self._waits[lane].append(time.monotonic() - since)
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane) -> AsyncIterator[None]:
+        """레인 슬롯을 얻을 때까지 기다렸다가 작업 동안 점유한다."""
+        waiter = _Waiter(asyncio.get_running_loop().create_future())
+        self._waiting[lane].append(waiter)
+        # 빈 슬롯이 있으면 여기서 바로 배정됨 (기한을 넘긴 bulk 대기 요청이 있으면 그쪽이 먼저)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 슬롯을 받은 직후 취소됨: 반납
+                self._release(lane)
+            elif waiter in self._waiting[lane]:
+                self._waiting[lane].remove(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _release(self, lane: Lane) -> None:
+        self._running[lane] -= 1
+        self._completed[lane] += 1
+        self._dispatch()
+
+    def stats_dict(self) -> dict:
+        lanes = {}
+        for lane in LANES:
+            waits: List[float] = sorted(self._waits[lane])
+            lanes[lane] = {
+                "running": self._running[lane],
+                "waiting": len(self._waiting[lane]),
+                "completed": self._completed[lane],
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                "wait_p95_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+                "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            "slots": self.slots,
+            "bulk_limit": self.bulk_limit,
+            "max_wait_s": self.max_wait,
+            "starvation_promotions": self.promotions,
+            "lanes": lanes,
+        }
@@ -0,0 +1,69 @@
+"""
+WebSocket 채팅 연결별 서버 측 상태.
+
+연결 하나가 채팅 하나에 대응하며, 업로드된 문서와 대화 기록을 연결이 살아 있는 동안 보관해
+매 턴마다 문서/기록을 다시 보내지 않아도 되게 한다. 진행 중인 생성은 취소할 수 있다.
+"""
+
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional
+
+from ..config import settings
+from ..files.loader import ExtractedDocument
+from .agent import GenerationCancelled
+
+
+class ChatSession:
+    """연결 하나의 문서, 대화 기록, 진행 중 생성 작업."""
+
+    def __init__(self) -> None:
+        self.doc: Optional[ExtractedDocument] = None
+        self.history: List[Dict] = []
+        self.turns = 0
+        self.task: Optional[asyncio.Task] = None
+        self._cancel = threading.Event()
+
+    @property
+    def busy(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def history_messages(self) -> List[Dict]:
+        """LLM에 넘길 최근 대화 (WS_HISTORY_TURNS 턴, 질문/답변 쌍)"""
+        return self.history[-2 * settings.WS_HISTORY_TURNS:] if settings.WS_HISTORY_TURNS > 0 else []
+
+    def add_turn(self, question: str, answer: str) -> None:
+        self.turns += 1
+        self.history.append({"role": "user", "content": question})
+        self.history.append({"role": "assistant", "content": answer})
+        # 보관 기록도 LLM에 넘기는 분량만 유지
+        del self.history[:-2 * max(settings.WS_HISTORY_TURNS, 1)]
+
+    def clear(self) -> None:
+        self.doc = None
+        self.history.clear()
+        self.turns = 0
+
+    def new_generation(self) -> None:
+        self._cancel = threading.Event()
+
+    def cancel(self) -> bool:
+        """진행 중인 생성을 취소한다. 취소할 작업이 있었으면 True."""
+        if not self.busy:
+            return False
+        self._cancel.set()
+        return True
+
+    def wrap_emit(self, emit: Callable[[Dict], None]) -> Callable[[Dict], None]:
+        """
+        워커 스레드용 emit. 취소가 요청되면 다음 이벤트 시점에 GenerationCancelled를 발생시켜
+        LLM 스트림을 닫고 남은 노드 실행을 중단시킨다.
+        """
+        cancel = self._cancel
+
+        def guarded(event: Dict) -> None:
+            if cancel.is_set():
+                raise GenerationCancelled()
+            emit(event)
+
+        return guarded
@@ -0,0 +1,139 @@
+"""
+동일한 에이전트 요청의 단일 실행(single-flight) 병합.
+
+링크나 문서를 공유한 여러 사용자가 같은 질문을 동시에 보내면,
+정규화된 키(모드, 질문, 문서 해시)가 같은 요청들은 진행 중인 실행 하나에 합류해
+같은 결과를 받는다. 스트리밍 구독자는 합류 시점까지 버퍼된 이벤트를 먼저 재생받은 뒤
+이후 이벤트를 실시간으로 받는다.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from ..cache import make_key
+from .scheduler import Lane, PriorityScheduler
+
+
+# 워커 스레드에서 실행할 함수: emit 콜백을 받아 결과를 반환
+FlightFunc = Callable[[Callable[[dict], None]], Any]
+
+_END = object()
+
+
+def flight_key(mode: str, question: str, doc_hash: Optional[str] = None) -> str:
+    """공백/대소문자 차이를 무시한 요청 병합 키"""
+    normalized = " ".join(question.split()).lower()
+    return make_key("agent-flight", mode, normalized, doc_hash)
+
+
+class _Flight:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.future: asyncio.Future = loop.create_future()
+        self.events: List[dict] = []
+        self.subscribers: List[asyncio.Queue] = []
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """
+    키별 진행 중 실행을 추적하는 병합기.
+
+    모든 상태 변경은 이벤트 루프 스레드에서만 일어나므로 별도 락이 필요 없다.
+    워커 스레드의 emit은 call_soon_threadsafe로 루프에 넘겨 순서를 보장한다.
+    """
+
+    def __init__(self, scheduler: Optional[PriorityScheduler] = None) -> None:
+        # 스케줄러가 있으면 병합된 실행 하나가 레인 슬롯 하나를 점유한다
+        self.scheduler = scheduler
+        self._flights: Dict[str, _Flight] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_streams = 0
+
+    def _join(self, key: str, fn: FlightFunc, lane: Optional[Lane]) -> tuple[_Flight, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            return flight, False
+
+        loop = asyncio.get_running_loop()
+        flight = _Flight(loop)
+        self._flights[key] = flight
+        self.executions += 1
+        # 태스크 참조를 보관해 실행 도중 가비지 컬렉션되지 않도록 함
+        flight.task = loop.create_task(self._execute(key, flight, fn, lane))
+        return flight, True
+
+    async def _execute(self, key: str, flight: _Flight, fn: FlightFunc, lane: Optional[Lane]) -> None:
+        loop = asyncio.get_running_loop()
+
+        def broadcast(event: Any) -> None:
+            if event is not _END:
+                flight.events.append(event)
+            for queue in flight.subscribers:
+                queue.put_nowait(event)
+
+        def emit(event: dict) -> None:
+            loop.call_soon_threadsafe(broadcast, event)
+
+        try:
+            if self.scheduler is not None and lane is not None:
+                async with self.scheduler.slot(lane):
+                    result = await asyncio.to_thread(fn, emit)
+            else:
+                result = await asyncio.to_thread(fn, emit)
+        except Exception as e:
+            flight.future.set_exception(e)
+            # 구독자가 모두 떠난 뒤 실패해도 "예외 미회수" 경고가 남지 않도록 표시
+            flight.future.exception()
+        else:
+            flight.future.set_result(result)
+        finally:
+            # 완료 후 새로 들어오는 요청은 새 실행을 시작하도록 즉시 제거
+            self._flights.pop(key, None)
+            flight.done = True
+            broadcast(_END)
+
+    async def run(self, key: str, fn: FlightFunc, lane: Optional[Lane] = None) -> Any:
+        """같은 키의 실행이 있으면 합류해 결과만 기다린다."""
+        flight, _leader = self._join(key, fn, lane)
+        return await asyncio.shield(flight.future)
+
+    async def stream(self, key: str, fn: FlightFunc, lane: Optional[Lane] = None) -> AsyncIterator[dict]:
+        """
+        이벤트를 스트리밍으로 받는다. 마지막에 {"type": "result", "result": ...}를 내보내며,
+        실행이 실패하면 그 예외를 그대로 발생시킨다.
+        """
+        flight, leader = self._join(key, fn, lane)
+        if not leader:
+            self.coalesced_streams += 1
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for event in flight.events:
+            queue.put_nowait(event)
+        if flight.done:
+            queue.put_nowait(_END)
+        flight.subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is _END:
+                    break
+                yield event
+        finally:
+            flight.subscribers.remove(queue)
+
+        result = await asyncio.shield(flight.future)
+        yield {"type": "result", "result": result}
+
+    def stats_dict(self) -> dict:
+        requests = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "executions": self.executions,
+            "coalesced_requests": self.coalesced,
+            "coalesced_streams": self.coalesced_streams,
+            # 병합으로 아낀 실행 비율 (중복 작업 절감률)
+            "saved_ratio": round(self.coalesced / requests, 4) if requests else 0.0,
+        }
@@ -0,0 +1,141 @@
+"""
+연구 모드 검색 결과 충분성 평가 (LLM 호출 없음).
+
+답변을 한 번 생성해 본 뒤 길이/제목 키워드로 재검색 여부를 정하면 부족한 경우마다
+보고서 전체를 다시 생성해야 한다. 대신 검색 직후, 첫 답변 생성 전에 다음 세 가지로 점수를 매기고
+점수가 RESEARCH_SUFFICIENCY_THRESHOLD보다 낮을 때만 한 번 더 검색한다.
+
+- coverage: 질문의 핵심어 중 검색 결과(제목/스니펫/원문)에 등장하는 비율
+- diversity: 서로 다른 출처 호스트 수 (TARGET_SOURCES개 이상이면 1.0)
+- relevance: 검색 엔진 score 평균 (score가 없으면 제외하고 가중치를 나머지에 배분)
+
+따라서 연구 모드는 보통 검색 1회 + LLM 호출 1회로 끝난다.
+"""
+
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from ..config import settings
+from .tools import SearchResult, token_matches, tokenize, tokenize_list
+
+
+COVERAGE_WEIGHT = 0.6
+DIVERSITY_WEIGHT = 0.2
+RELEVANCE_WEIGHT = 0.2
+TARGET_SOURCES = 3  # 검색 한 회차 결과 수(최대 3개)와 맞춤
+
+# 요청 형식을 나타낼 뿐 검색 결과에 나올 필요가 없는 단어
+_REQUEST_WORDS = {
+    "연구해줘", "조사해줘", "리서치", "리서치해줘", "research", "deep", "보고서", "작성", "작성해줘",
+    "만들어", "만들어줘", "report", "심층", "연구", "상세", "상세히", "자세히", "정보", "해줘", "알려줘",
+    "대해", "대해서", "관련", "관련해", "관련된", "대한", "about", "the", "and", "for", "on", "of", "please",
+}
+
+# 핵심어 끝에 붙은 조사 ("동향을", "시장의")는 떼고 비교한다 (긴 것부터 확인)
+_PARTICLES = ("에서", "으로", "에게", "까지", "부터", "을", "를", "이", "가", "은", "는", "의", "에", "로", "와", "과", "도")
+
+
+class SearchAssessment:
+    """검색 결과 충분성 평가 결과"""
+
+    __slots__ = ("score", "coverage", "diversity", "relevance", "results", "missing_terms", "sufficient", "reason")
+
+    def __init__(
+        self,
+        score: float,
+        coverage: float,
+        diversity: float,
+        relevance: Optional[float],
+        results: int,
+        missing_terms: List[str],
+        sufficient: bool,
+        reason: str,
+    ):
+        self.score = score
+        self.coverage = coverage
+        self.diversity = diversity
+        self.relevance = relevance
+        self.results = results
+        self.missing_terms = missing_terms
+        self.sufficient = sufficient
+        self.reason = reason
+
+    def to_dict(self) -> Dict:
+        return {
+            "score": round(self.score, 3),
+            "coverage": round(self.coverage, 3),
+            "diversity": round(self.diversity, 3),
+            "relevance": None if self.relevance is None else round(self.relevance, 3),
+            "results": self.results,
+            "missing_terms": self.missing_terms,
+            "sufficient": self.sufficient,
+            "reason": self.reason,
+        }
+
+
+def _strip_particle(term: str) -> str:
+    for particle in _PARTICLES:
+        if term.endswith(particle) and len(term) - len(particle) >= 2:
+            return term[: -len(particle)]
+    return term
+
+
+def key_terms(question: str) -> List[str]:
+    """질문에서 요청 표현을 뺀 핵심어 (조사 제거, 등장 순서 유지, 중복 제거)."""
+    terms = (_strip_particle(t) for t in tokenize_list(question) if t not in _REQUEST_WORDS)
+    return list(dict.fromkeys(t for t in terms if t not in _REQUEST_WORDS))
+
+
+def _host(url: str) -> str:
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def assess_search_results(
+    question: str,
+    results: List[SearchResult],
+    threshold: Optional[float] = None,
+) -> SearchAssessment:
+    """
+    검색 결과가 질문에 답하기에 충분한지 평가한다.
+    threshold를 생략하면 RESEARCH_SUFFICIENCY_THRESHOLD를 쓴다.
+    """
+    threshold = settings.RESEARCH_SUFFICIENCY_THRESHOLD if threshold is None else threshold
+    if not results:
+        return SearchAssessment(0.0, 0.0, 0.0, None, 0, key_terms(question), False, "검색 결과 없음")
+
+    terms = key_terms(question)
+    if terms:
+        # 결과 전체를 한 번만 토큰화하고 핵심어별로 등장 여부를 따로 봐야 빠진 단어를 알 수 있다
+        corpus_tokens: set[str] = set()
+        for r in results:
+            corpus_tokens |= tokenize(f"{r.title} {r.content} {r.page_content or ''}")
+        missing = [t for t in terms if not token_matches(t, corpus_tokens)]
+        coverage = 1 - len(missing) / len(terms)
+    else:
+        # 핵심어가 없으면(요청 표현뿐인 질문) 어휘 기준으로는 판단하지 않음
+        missing = []
+        coverage = 1.0
+
+    hosts = {_host(r.url) for r in results} - {""}
+    diversity = min(1.0, len(hosts) / TARGET_SOURCES)
+
+    scores = [r.score for r in results if r.score is not None]
+    relevance = sum(scores) / len(scores) if scores else None
+
+    if relevance is None:
+        weight = COVERAGE_WEIGHT + DIVERSITY_WEIGHT
+        score = (COVERAGE_WEIGHT * coverage + DIVERSITY_WEIGHT * diversity) / weight
+    else:
+        score = COVERAGE_WEIGHT * coverage + DIVERSITY_WEIGHT * diversity + RELEVANCE_WEIGHT * relevance
+
+    sufficient = score >= threshold
+    reason = (
+        f"점수 {score:.2f} {'>=' if sufficient else '<'} 기준 {threshold:.2f} "
+        f"(핵심어 {len(terms) - len(missing)}/{len(terms)}, 출처 {len(hosts)}곳, "
+        f"평균 score {'-' if relevance is None else f'{relevance:.2f}'})"
+    )
+    return SearchAssessment(score, coverage, diversity, relevance, len(results), missing, sufficient, reason)
@@ -4,23 +4,45 @@
 웹 검색 도구를 제공하여 Deep Research 기능을 지원합니다.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import importlib.util
+import logging
 import os
+import re
 
-try:
+from ..cache import get_cache, make_key
+from ..cassette import CassetteMiss, get_cassette
+from ..config import settings
+from ..usage import current_usage
+
+
+logger = logging.getLogger(__name__)
+
+
+# tavily는 연구 모드에서만 쓰이므로 설치 여부만 확인하고 실제 import는 첫 검색 시점으로 미룬다
+TAVILY_AVAILABLE = importlib.util.find_spec("tavily") is not None
+
+
+@lru_cache(maxsize=4)
+def _get_tavily_client(api_key: str):
+    """Tavily 클라이언트를 지연 import/생성하여 재사용."""
     from tavily import TavilyClient
-    TAVILY_AVAILABLE = True
-except ImportError:
-    TAVILY_AVAILABLE = False
+
+    return TavilyClient(api_key=api_key)
 
 
+@dataclass(slots=True)
 class SearchResult:
-    """검색 결과를 담는 데이터 클래스"""
-    def __init__(self, title: str, url: str, content: str, score: Optional[float] = None):
-        self.title = title
-        self.url = url
-        self.content = content
-        self.score = score
+    """검색 결과 레코드 (slots 사용으로 인스턴스마다 __dict__를 두지 않음)"""
+    title: str
+    url: str
+    content: str
+    score: Optional[float] = None
+    page_content: Optional[str] = None  # 원문 페이지에서 추출한 본문 (fetch 단계에서 채워짐)
 
     def to_dict(self) -> Dict:
         return {
@@ -28,6 +50,7 @@ class SearchResult:
             "url": self.url,
             "content": self.content,
             "score": self.score,
+            "page_content": self.page_content,
         }
 
 
@@ -45,15 +68,30 @@ def web_search(query: str, max_results: int = 5) -> List[SearchResult]:
     Returns:
         SearchResult 리스트
     """
-    if not TAVILY_AVAILABLE:
-        return []
-    
     tavily_key = os.getenv("TAVILY_API_KEY")
-    if not tavily_key:
+    enabled = TAVILY_AVAILABLE and bool(tavily_key)
+    # 카세트를 쓰는 중에는 검색이 비활성화된 경우(빈 결과)도 녹화/재생해
+    # 녹화 환경과 재생 환경의 Tavily 설정이 달라도 같은 결과가 나오게 한다
+    cassette = get_cassette()
+    if not enabled and cassette is None:
         return []
     
-    try:
-        client = TavilyClient(api_key=tavily_key)
+    # 같은 쿼리는 TTL 동안 캐시된 결과를 재사용 (워커 간 공유 가능한 백엔드 사용)
+    # 카세트를 쓰는 중에는 캐시를 거치지 않는다: 데워진 캐시가 녹화를 건너뛰게 하거나 재생 결과를 바꾸지 않도록
+    cache = get_cache("search", default_ttl=settings.SEARCH_CACHE_TTL) if cassette is None else None
+    cache_key = make_key("tavily", query, min(max_results, 3))
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        # 추측 검색 스레드에서는 요청 컨텍스트가 없으므로 기록되지 않음
+        usage = current_usage()
+        if usage is not None:
+            usage.add_cache_hit("search")
+        return [SearchResult(**r) for r in cached]
+
+    def search() -> Dict:
+        if not enabled:
+            return {"results": []}
+        client = _get_tavily_client(tavily_key)
         # 검색 깊이를 "basic"으로 변경하여 속도 향상 (advanced는 느림)
         # max_results를 3개로 제한하여 처리 시간 단축
         response = client.search(
@@ -61,6 +99,13 @@ def web_search(query: str, max_results: int = 5) -> List[SearchResult]:
             max_results=min(max_results, 3),  # 최대 3개로 제한 (속도 향상)
             search_depth="basic",  # advanced -> basic으로 변경 (속도 향상, 2-3배 빠름)
         )
+        return {"results": response.get("results", [])}
+
+    try:
+        if cassette is not None:
+            response = cassette.exchange("search", cassette.key("tavily", query, min(max_results, 3)), search)
+        else:
+            response = search()
         
         results = []
         for result in response.get("results", []):
@@ -70,18 +115,230 @@ def web_search(query: str, max_results: int = 5) -> List[SearchResult]:
                 content=result.get("content", ""),
                 score=result.get("score"),
             ))
-        
+
+        if results and cache is not None:
+            cache.set(cache_key, [r.to_dict() for r in results])
         return results
+    except CassetteMiss:
+        # 재생 모드에서 녹화되지 않은 검색을 빈 결과로 숨기면 재생이 조용히 다른 경로를 타므로 그대로 전달
+        raise
     except Exception as e:
-        # 에러 발생 시 빈 리스트 반환 (모델 내장 검색에 의존)
-        print(f"웹 검색 오류: {e}")
+        # 에러 발생 시 빈 리스트 반환 (모델 내장 검색에 의존), 실패는 로그와 사용량 원장에 남긴다
+        logger.warning("웹 검색 실패 (query=%r): %s", query, e)
+        usage = current_usage()
+        if usage is not None:
+            usage.add_search_error()
         return []
 
 
+# 검색 결과 후처리 설정
+SNIPPET_BUDGET = 4_000  # 전체 검색 컨텍스트에 포함할 최대 스니펫 길이(문자)
+MAX_SNIPPET_PER_RESULT = 800  # 결과 하나당 최대 스니펫 길이(문자)
+MAX_PAGE_SNIPPET_PER_RESULT = 1_600  # 원문 페이지가 있는 결과의 최대 스니펫 길이(문자)
+LEXICAL_WEIGHT = 0.6  # 재정렬 시 질문-본문 어휘 중복도 가중치 (나머지는 Tavily score)
+
+# URL 정규화 시 제거할 추적용 쿼리 파라미터
+_TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+_TOKEN_RE = re.compile(r"[0-9a-zA-Z가-힣]+")
+# 토큰 뒤에 붙는 한국어 조사로 볼 한글 길이 (1~2자: "에", "를", "에서", "으로")
+_PARTICLE_RE = re.compile(r"[가-힣]{1,2}")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    중복 제거용 URL 정규화.
+
+    스킴/호스트 소문자화, www. 및 기본 포트 제거, fragment와 추적용 쿼리 제거,
+    쿼리 정렬, 끝의 슬래시 제거를 수행한다.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or ""
+    # http/https는 같은 문서로 취급
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _content_hash(content: str) -> str:
+    """공백/대소문자 차이를 무시한 본문 해시."""
+    normalized = " ".join(content.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def tokenize_list(text: str) -> list[str]:
+    """2자 이상 영숫자/한글 토큰 목록 (등장 빈도 보존)."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) >= 2]
+
+
+def tokenize(text: str) -> set[str]:
+    """어휘 중복도 계산용 토큰 집합."""
+    return set(tokenize_list(text))
+
+
+def lexical_overlap(query_tokens: set[str], text: str) -> float:
+    """질문 토큰 중 text에 등장하는 비율 (0~1)."""
+    if not query_tokens:
+        return 0.0
+    text_tokens = tokenize(text)
+    if not text_tokens:
+        return 0.0
+    hits = sum(1 for q in query_tokens if token_matches(q, text_tokens))
+    return hits / len(query_tokens)
+
+
+def token_matches(query_token: str, text_tokens: set[str]) -> bool:
+    """
+    query_token이 text_tokens에 있는지.
+    본문 토큰이 query_token 뒤에 짧은 한글 조사만 붙은 형태("langgraph에", "연구를")여도 일치로 본다.
+    반대 방향(본문 토큰이 질문 토큰의 접두사)이나 영문 접미사("information" → "informational")는 허용하지 않는다.
+    """
+    if query_token in text_tokens:
+        return True
+    return any(
+        t.startswith(query_token) and _PARTICLE_RE.fullmatch(t[len(query_token):]) is not None
+        for t in text_tokens
+    )
+
+
+def dedupe_results(results: List[SearchResult]) -> List[SearchResult]:
+    """
+    정규화된 URL과 본문 해시 기준으로 중복 결과를 제거한다.
+
+    같은 문서가 여러 번 나오면 score가 더 높은 쪽을 남기고, 첫 등장 순서를 유지한다.
+    """
+    kept: List[SearchResult] = []
+    index_by_key: Dict[str, int] = {}
+    for result in results:
+        keys = [f"url:{canonicalize_url(result.url)}" if result.url else None]
+        if result.content:
+            keys.append(f"hash:{_content_hash(result.content)}")
+        keys = [k for k in keys if k]
+
+        existing = next((index_by_key[k] for k in keys if k in index_by_key), None)
+        if existing is None:
+            for k in keys:
+                index_by_key[k] = len(kept)
+            kept.append(result)
+            continue
+
+        if (result.score or 0.0) > (kept[existing].score or 0.0):
+            kept[existing] = result
+        for k in keys:
+            index_by_key.setdefault(k, existing)
+    return kept
+
+
+def rerank_results(question: str, results: List[SearchResult]) -> List[SearchResult]:
+    """Tavily score와 질문-본문 어휘 중복도를 결합해 관련도 순으로 재정렬한다."""
+    query_tokens = tokenize(question)
+
+    def relevance(result: SearchResult) -> float:
+        lexical = lexical_overlap(query_tokens, f"{result.title} {result.content}")
+        score = result.score if result.score is not None else 0.0
+        return LEXICAL_WEIGHT * lexical + (1 - LEXICAL_WEIGHT) * score
+
+    return sorted(results, key=relevance, reverse=True)
+
+
+def compress_snippet(question: str, content: str, max_chars: int) -> str:
+    """
+    본문에서 질문과 관련도가 높은 문장만 골라 max_chars 이내로 압축한다.
+
+    선택된 문장은 원문 순서대로 이어 붙여 문맥이 깨지지 않도록 한다.
+    """
+    if max_chars <= 0 or not content:
+        return ""
+    if len(content) <= max_chars:
+        return content.strip()
+
+    # 결과 내부에서 반복되는 문장(내비게이션, 보일러플레이트 등)은 한 번만 사용
+    sentences = list(dict.fromkeys(
+        s.strip() for s in _SENTENCE_SPLIT_RE.split(content) if s and s.strip()
+    ))
+    if not sentences:
+        return content[:max_chars].strip()
+
+    query_tokens = tokenize(question)
+    ranked = sorted(
+        range(len(sentences)),
+        # 동점이면 앞쪽 문장을 우선 (리드 문장이 보통 요약 역할)
+        key=lambda i: (lexical_overlap(query_tokens, sentences[i]), -i),
+        reverse=True,
+    )
+
+    chosen: List[int] = []
+    used = 0
+    for i in ranked:
+        length = len(sentences[i]) + 1
+        if used + length > max_chars:
+            continue
+        chosen.append(i)
+        used += length
+
+    if not chosen:
+        return sentences[ranked[0]][:max_chars].strip()
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def postprocess_search_results(
+    question: str,
+    results: List[SearchResult],
+    budget: int = SNIPPET_BUDGET,
+    per_result: int = MAX_SNIPPET_PER_RESULT,
+) -> List[SearchResult]:
+    """
+    검색 결과 후처리: 중복 제거 → 재정렬 → 스니펫 압축.
+
+    전체 스니펫 길이가 budget을 넘지 않도록 관련도 높은 결과부터 예산을 배분하며,
+    예산이 소진되면 나머지 결과는 제외한다. 원본 SearchResult는 변경하지 않는다.
+    """
+    processed: List[SearchResult] = []
+    remaining = budget
+    for result in rerank_results(question, dedupe_results(results)):
+        if remaining <= 0:
+            break
+        if result.page_content:
+            # 원문 페이지가 있으면 Tavily 스니펫 대신 본문에서 더 길게 발췌
+            limit = max(per_result, MAX_PAGE_SNIPPET_PER_RESULT)
+            snippet = compress_snippet(question, result.page_content, min(limit, remaining))
+        else:
+            snippet = compress_snippet(question, result.content, min(per_result, remaining))
+        if not snippet:
+            continue
+        remaining -= len(snippet)
+        processed.append(SearchResult(
+            title=result.title,
+            url=result.url,
+            content=snippet,
+            score=result.score,
+        ))
+    return processed
+
+
 def format_search_results(results: List[SearchResult]) -> str:
     """
     검색 결과를 프롬프트에 포함할 수 있는 형식으로 포맷팅합니다.
-    
+
+    스니펫 길이 조정은 postprocess_search_results에서 수행하므로
+    여기서는 내용을 그대로 사용합니다.
+
     Args:
         results: SearchResult 리스트
         
@@ -90,11 +347,8 @@ def format_search_results(results: List[SearchResult]) -> str:
     """
     if not results:
         return ""
-    
-    formatted = "=== 웹 검색 결과 ===\n\n"
+
+    parts = ["=== 웹 검색 결과 ===\n"]
     for i, result in enumerate(results, 1):
-        formatted += f"[{i}] {result.title}\n"
-        formatted += f"URL: {result.url}\n"
-        formatted += f"내용: {result.content[:500]}...\n\n"  # 최대 500자
-        
-    return formatted
+        parts.append(f"[{i}] {result.title}\nURL: {result.url}\n내용: {result.content}\n")
+    return "\n".join(parts)
@@ -0,0 +1,201 @@
+"""
+업로드 문서 번역 파이프라인.
+
+문서를 언어별 구간으로 나눠 이미 한국어인 구간은 그대로 두고,
+나머지 구간만 묶음(batch) 단위로 LLM에 보내 번역한 뒤 원래 순서대로 결과 파일에 이어 쓴다.
+작업 전에 언어별 구간 수와 예상 토큰 수(plan)를 계산해 응답/스트림 첫 이벤트로 알려준다.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from ..config import settings
+from ..files.artifacts import get_artifact_store
+from ..files.langid import Segment, estimate_tokens, language_counts, segment_by_language
+from ..llm import get_llm
+from .prompt import SEGMENT_TRANSLATE_SYSTEM_PROMPT
+
+
+logger = logging.getLogger(__name__)
+
+# 번역이 필요 없는 구간 언어
+SKIP_LANGUAGES = ("ko", "none")
+
+# 번역문 토큰 수 / 원문 토큰 수 (한국어 출력 기준 대략값)
+OUTPUT_TOKEN_RATIO = 1.1
+
+_MARKER_RE = re.compile(r"<<(\d+)>>")
+
+
+@dataclass
+class TranslationPlan:
+    """번역 작업 범위: 구간 목록과 LLM 호출 묶음."""
+
+    segments: List[Segment]
+    batches: List[List[int]] = field(default_factory=list)  # 묶음별 구간 번호
+
+    @property
+    def translate_indexes(self) -> List[int]:
+        return [i for batch in self.batches for i in batch]
+
+    def to_dict(self) -> dict:
+        targets = [self.segments[i] for i in self.translate_indexes]
+        input_tokens = sum(estimate_tokens(s.text, s.language) for s in targets)
+        # 묶음마다 시스템 프롬프트가 반복 전송됨
+        prompt_tokens = estimate_tokens(SEGMENT_TRANSLATE_SYSTEM_PROMPT, "ko") * len(self.batches)
+        return {
+            "segments": language_counts(self.segments),
+            "translate_segments": len(targets),
+            "skipped_segments": len(self.segments) - len(targets),
+            "translate_chars": sum(len(s.text) for s in targets),
+            "batches": len(self.batches),
+            "estimated_tokens": {
+                "input": input_tokens + prompt_tokens,
+                "output": int(input_tokens * OUTPUT_TOKEN_RATIO),
+            },
+        }
+
+
+def plan_translation(doc_text: str, batch_chars: Optional[int] = None) -> TranslationPlan:
+    """번역할 구간을 batch_chars 이하 묶음으로 나눈다. 한국어 구간은 묶음에서 제외한다."""
+    batch_chars = batch_chars or settings.TRANSLATE_BATCH_CHARS
+    plan = TranslationPlan(segment_by_language(doc_text))
+    current: List[int] = []
+    used = 0
+    for segment in plan.segments:
+        if segment.language in SKIP_LANGUAGES:
+            continue
+        if current and used + len(segment.text) > batch_chars:
+            plan.batches.append(current)
+            current, used = [], 0
+        current.append(segment.index)
+        used += len(segment.text)
+    if current:
+        plan.batches.append(current)
+    return plan
+
+
+def _split_markers(content: str, count: int) -> Optional[List[str]]:
+    """<<n>> 표시로 번역문을 구간별로 나눈다. 표시가 입력과 맞지 않으면 None."""
+    parts = _MARKER_RE.split(content)
+    found: Dict[int, str] = {}
+    for number, text in zip(parts[1::2], parts[2::2]):
+        found[int(number)] = text.strip()
+    if sorted(found) != list(range(1, count + 1)):
+        return None
+    return [found[n] for n in range(1, count + 1)]
+
+
+def _translate_batch(question: str, segments: List[Segment]) -> tuple[List[str], dict]:
+    """
+    구간 묶음을 한 번에 번역한다. 반환값의 raw usage에는 다시 번역한 호출까지 합산된다.
+
+    번역문의 <<n>> 표시 개수가 맞지 않으면 구간 경계를 알 수 없으므로,
+    그 묶음만 구간 하나씩 다시 번역한다 (구간 하나짜리 요청은 표시 없이 와도 전체가 그 구간의 번역).
+    """
+    body = f"사용자 요청: {question}\n\n" + "\n\n".join(f"<<{n}>>\n{s.text}" for n, s in enumerate(segments, 1))
+    response = get_llm().complete([
+        {"role": "system", "content": SEGMENT_TRANSLATE_SYSTEM_PROMPT},
+        {"role": "user", "content": body},
+    ])
+    content = response.choices[0].message.content or ""
+    raw = response.model_dump()
+    translated = _split_markers(content, len(segments))
+    if translated is not None:
+        return translated, raw
+    if len(segments) == 1:
+        return [_MARKER_RE.sub("", content).strip()], raw
+
+    logger.warning("translate: 번역문의 구간 표시가 맞지 않아 %d개 구간을 하나씩 다시 번역함", len(segments))
+    usage: dict = {}
+    _merge_usage(usage, raw)
+    translated = []
+    for segment in segments:
+        (text,), raw = _translate_batch(question, [segment])
+        translated.append(text)
+        _merge_usage(usage, raw)
+    raw["usage"] = usage
+    return translated, raw
+
+
+def _merge_usage(total: dict, raw: dict) -> None:
+    for key, value in (raw.get("usage") or {}).items():
+        if isinstance(value, int):
+            total[key] = total.get(key, 0) + value
+
+
+def translate_document(
+    question: str,
+    doc_text: str,
+    emit: Optional[Callable[[Dict], None]] = None,
+    output_format: str = "md",
+    title: Optional[str] = None,
+) -> tuple:
+    """
+    문서를 한국어로 번역해 결과 파일(artifact)에 구간 단위로 이어 쓴다.
+
+    반환값은 run_agent와 같은 4-튜플에 {"translation": plan, "artifact": 파일 정보}를
+    덧붙인 5-튜플이다. answer에는 앞부분 미리보기(TRANSLATE_PREVIEW_CHARS)만 담고,
+    전체 번역은 GET /artifacts/{id}로 내려받는다.
+
+    emit이 주어지면 먼저 {"type": "plan"} 이벤트로 작업 범위를 알리고,
+    구간을 파일에 쓸 때마다 {"type": "progress"} 이벤트를, 미리보기 분량까지는 token 이벤트를 보낸다.
+    """
+    plan = plan_translation(doc_text)
+    plan_dict = plan.to_dict()
+    writer = get_artifact_store().create(output_format, total=len(plan.segments))
+    if emit is not None:
+        emit({"type": "plan", "translation": plan_dict, "artifact": writer.to_dict()})
+
+    separator = "\n\n" if output_format == "md" else "\n"
+    preview_limit = settings.TRANSLATE_PREVIEW_CHARS
+    preview: List[str] = []
+    preview_len = 0
+    pending: Dict[int, str] = {}  # 번역됐지만 아직 파일에 쓰지 않은 구간
+    raw: dict = {}
+    usage: dict = {}
+
+    def write(text: str, segments_done: int) -> None:
+        nonlocal preview_len
+        writer.write(text, segments_done)
+        if preview_len < preview_limit:
+            piece = text[: preview_limit - preview_len]
+            preview.append(piece)
+            preview_len += len(piece)
+            if emit is not None:
+                emit({"type": "token", "content": piece})
+        if emit is not None:
+            emit({"type": "progress", "artifact": writer.to_dict()})
+
+    def flush(upto: int) -> None:
+        """upto 이전 구간 중 아직 쓰지 않은 부분을 원문 순서대로 파일에 쓴다."""
+        start = writer.done
+        if upto <= start:
+            return
+        parts = [pending.pop(i, plan.segments[i].text) for i in range(start, upto)]
+        write(separator.join(p for p in parts if p) + separator, upto)
+
+    try:
+        if output_format == "md" and title:
+            write(f"# {title} (번역)\n\n", 0)
+        if not plan.batches:
+            write("문서가 이미 한국어로 되어 있어 번역할 구간이 없습니다.\n\n", 0)
+        for batch in plan.batches:
+            translated, raw = _translate_batch(question, [plan.segments[i] for i in batch])
+            _merge_usage(usage, raw)
+            pending.update(zip(batch, translated))
+            flush(batch[-1] + 1)
+        flush(len(plan.segments))
+        writer.finish()
+    except Exception:
+        writer.fail()
+        raise
+
+    answer = "".join(preview).strip()
+    if writer.bytes > len(answer.encode("utf-8")) + 8:
+        answer += "\n\n…(미리보기입니다. 전체 번역은 결과 파일을 내려받아 확인하세요.)"
+    if raw:
+        raw["usage"] = usage
+    return answer, False, raw, None, {"translation": plan_dict, "artifact": writer.to_dict()}
@@ -0,0 +1,74 @@
+"""
+에이전트/파일 로더가 공유하는 캐시 계층.
+
+CACHE_BACKEND 설정에 따라 memory(프로세스 내 LRU), sqlite(로컬 워커 간 공유 WAL 파일),
+redis(Redis 프로토콜 서버) 중 하나를 사용한다.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from ..config import settings
+from .base import CacheBackend, CacheStats, make_key
+from .memory import MemoryCache
+from .redis import RedisCache
+from .sqlite import SQLiteCache
+
+
+logger = logging.getLogger(__name__)
+
+_caches: Dict[str, CacheBackend] = {}
+_caches_lock = threading.Lock()
+
+
+def _create_cache(namespace: str, max_bytes: int, default_ttl: Optional[float]) -> CacheBackend:
+    backend = settings.CACHE_BACKEND
+    try:
+        if backend == "sqlite":
+            return SQLiteCache(namespace, max_bytes, settings.CACHE_SQLITE_PATH, default_ttl)
+        if backend == "redis":
+            return RedisCache(namespace, max_bytes, settings.CACHE_REDIS_URL, default_ttl)
+    except Exception as e:
+        # 공유 캐시를 열 수 없어도 서비스는 동작해야 하므로 프로세스 내 캐시로 대체
+        logger.warning("%s 캐시 초기화 실패, memory 캐시로 대체: %s", backend, e)
+    return MemoryCache(namespace, max_bytes, default_ttl)
+
+
+def get_cache(
+    namespace: str,
+    max_bytes: Optional[int] = None,
+    default_ttl: Optional[float] = None,
+) -> CacheBackend:
+    """namespace별 캐시 인스턴스 반환 (처음 호출 시 생성)"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _create_cache(namespace, max_bytes or settings.CACHE_MAX_BYTES, default_ttl)
+            _caches[namespace] = cache
+        return cache
+
+
+def all_cache_stats() -> Dict[str, dict]:
+    """생성된 모든 캐시의 통계"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    stats = {}
+    for cache in caches:
+        try:
+            stats[cache.namespace] = cache.stats_dict()
+        except Exception as e:
+            stats[cache.namespace] = {"backend": cache.backend_name, "error": str(e)}
+    return stats
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheStats",
+    "MemoryCache",
+    "RedisCache",
+    "SQLiteCache",
+    "all_cache_stats",
+    "get_cache",
+    "make_key",
+]
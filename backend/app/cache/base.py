@@ -0,0 +1,122 @@
+"""
+캐시 공통 인터페이스와 키 해싱/통계 유틸리티.
+
+모든 백엔드는 같은 키 해싱(make_key), TTL, 크기 기반 축출, 통계 형식을 따른다.
+값은 pickle로 직렬화하므로 신뢰할 수 있는 저장소에만 연결해야 한다.
+공유 백엔드(sqlite/redis)는 저장소 오류와 복원할 수 없는 값을 캐시 미스로 처리하고 로그만 남기며,
+직렬화할 수 없는 값을 저장하려는 것은 호출자 버그이므로 모든 백엔드에서 예외를 그대로 낸다.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """
+    임의의 값 조합으로 일관된 캐시 키(SHA-256 hex)를 만든다.
+
+    dict는 키 순서와 무관하게 같은 해시가 나오도록 정렬해 직렬화하며,
+    bytes는 내용 해시로 대체해 긴 본문이 키 계산을 느리게 하지 않도록 한다.
+    """
+    def _default(value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return {"__bytes__": hashlib.sha256(value).hexdigest()}
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key=repr)
+        return repr(value)
+
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def serialize(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize(data: bytes) -> Any:
+    return pickle.loads(data)
+
+
+class CacheStats:
+    """백엔드 공통 통계 카운터 (프로세스 단위)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+
+class CacheBackend(ABC):
+    """
+    캐시 백엔드 기본 클래스.
+
+    namespace별로 인스턴스를 만들며, max_bytes(직렬화 크기 기준)를 넘으면
+    가장 오래 사용되지 않은 항목부터 축출한다. ttl이 None이면 default_ttl을 사용하고,
+    default_ttl도 None이면 만료되지 않는다.
+    """
+
+    backend_name = "base"
+
+    def __init__(self, namespace: str, max_bytes: int, default_ttl: Optional[float] = None) -> None:
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl and ttl > 0 else None
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """값 반환. 없거나 만료되었으면 None."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """값 저장. 크기 상한을 넘으면 오래된 항목을 축출한다."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """항목 삭제."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """이 namespace의 모든 항목 삭제."""
+
+    @abstractmethod
+    def _usage(self) -> tuple[int, int]:
+        """(항목 수, 총 바이트) 반환."""
+
+    def stats_dict(self) -> dict:
+        entries, size = self._usage()
+        return {
+            "backend": self.backend_name,
+            "namespace": self.namespace,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            **self.stats.to_dict(),
+        }
@@ -0,0 +1,76 @@
+"""
+프로세스 내 LRU 캐시 백엔드.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .base import CacheBackend, serialize
+
+
+class MemoryCache(CacheBackend):
+    """
+    OrderedDict 기반 LRU 캐시.
+
+    값은 객체 그대로 보관하고(역직렬화 비용 없음), 크기 계산에만 직렬화 길이를 사용한다.
+    워커 간 공유되지 않으며 재시작하면 비워진다.
+    """
+
+    backend_name = "memory"
+
+    def __init__(self, namespace: str, max_bytes: int, default_ttl: Optional[float] = None) -> None:
+        super().__init__(namespace, max_bytes, default_ttl)
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[str, tuple[Optional[float], int, Any]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.incr("misses")
+                return None
+            expires_at, size, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.stats.incr("expired")
+                self.stats.incr("misses")
+                return None
+            self._entries.move_to_end(key)
+            self.stats.incr("hits")
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        size = len(serialize(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (self._expires_at(ttl), size, value)
+            self._bytes += size
+            self.stats.incr("sets")
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.incr("evictions")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _usage(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
@@ -0,0 +1,259 @@
+"""
+Redis 프로토콜(RESP) 캐시 백엔드.
+
+redis 패키지 의존성 없이 소켓으로 RESP2 명령을 직접 보낸다.
+Redis 호환 서버(Redis, Valkey, KeyDB 등)라면 어디든 연결할 수 있어
+여러 인스턴스가 캐시를 공유할 때 사용한다.
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Any, List, Optional
+from urllib.parse import urlsplit
+
+from .base import CacheBackend, deserialize, serialize
+
+
+logger = logging.getLogger(__name__)
+
+
+class RedisError(Exception):
+    """서버가 에러 응답(-ERR ...)을 반환한 경우."""
+
+
+class RespConnection:
+    """단일 소켓 위의 최소 RESP2 클라이언트 (파이프라이닝 지원)."""
+
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None, timeout: float = 2.0) -> None:
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis 연결이 종료되었습니다.")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RedisError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisError(f"알 수 없는 응답 형식: {line!r}")
+
+    def execute(self, *args: Any) -> Any:
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: List[tuple]) -> List[Any]:
+        """
+        여러 명령을 한 번에 보내고 응답을 순서대로 반환한다 (RTT 1회).
+        에러 응답이 있으면 나머지 응답까지 모두 읽은 뒤(다음 명령과 응답이 어긋나지 않도록) 첫 에러를 발생시킨다.
+        """
+        self._sock.sendall(b"".join(self._encode(c) for c in commands))
+        replies: List[Any] = []
+        error: Optional[RedisError] = None
+        for _ in commands:
+            try:
+                replies.append(self._read_reply())
+            except RedisError as e:
+                error = error or e
+                replies.append(None)
+        if error is not None:
+            raise error
+        return replies
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis 프로토콜 캐시.
+
+    만료는 서버의 PX TTL에 맡기고, 크기 기반 축출은 namespace별
+    LRU 정렬 집합(ZSET)과 크기 해시(HASH), 총 바이트 카운터로 구현한다.
+    서버에서 만료된 키는 크기 해시에 남아 있으므로, 조회가 빗나갔는데 크기 해시에 항목이 있으면
+    만료로 세고 장부(ZSET/HASH/바이트)에서 지운다.
+    """
+
+    backend_name = "redis"
+
+    def __init__(
+        self,
+        namespace: str,
+        max_bytes: int,
+        url: str,
+        default_ttl: Optional[float] = None,
+    ) -> None:
+        super().__init__(namespace, max_bytes, default_ttl)
+        parts = urlsplit(url)
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or 6379
+        self._db = int(parts.path.lstrip("/") or 0)
+        self._password = parts.password
+        self._local = threading.local()
+
+        prefix = f"cache:{namespace}"
+        self._prefix = f"{prefix}:v:"
+        self._lru_key = f"{prefix}:lru"
+        self._sizes_key = f"{prefix}:sizes"
+        self._bytes_key = f"{prefix}:bytes"
+
+    def _conn(self) -> RespConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = RespConnection(self._host, self._port, self._db, self._password)
+            self._local.conn = conn
+        return conn
+
+    def _run(self, commands: List[tuple]) -> List[Any]:
+        try:
+            return self._conn().pipeline(commands)
+        except (OSError, ConnectionError):
+            # 끊어진 커넥션은 한 번만 재연결해 재시도
+            self._drop_connection()
+            return self._conn().pipeline(commands)
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            data, _, tracked = self._run([
+                ("GET", self._prefix + key),
+                ("ZADD", self._lru_key, "XX", time.time(), key),
+                ("HGET", self._sizes_key, key),
+            ])
+        except (OSError, RedisError) as e:
+            # 캐시 서버 장애는 요청 실패가 아니라 캐시 미스로 처리
+            logger.warning("Redis 캐시 조회 실패: %s", e)
+            self._drop_connection()
+            data = tracked = None
+        if data is None:
+            if tracked is not None:
+                # 값은 PX로 사라졌지만 장부에는 남아 있음: 만료로 세고 크기/LRU 정리
+                self.stats.incr("expired")
+                self.delete(key)
+            self.stats.incr("misses")
+            return None
+        try:
+            value = deserialize(data)
+        except Exception as e:
+            # 다른 버전의 워커가 저장했거나 손상된 값은 지우고 미스로 처리
+            logger.warning("Redis 캐시 값 복원 실패, 항목 삭제: %s", e)
+            self.delete(key)
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            self._set(key, value, ttl)
+        except (OSError, RedisError) as e:
+            logger.warning("Redis 캐시 저장 실패: %s", e)
+            self._drop_connection()
+
+    def _set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        data = serialize(value)
+        size = len(data)
+        if size > self.max_bytes:
+            return
+
+        expires_at = self._expires_at(ttl)
+        set_cmd: tuple = ("SET", self._prefix + key, data)
+        if expires_at is not None:
+            set_cmd += ("PX", max(1, int((expires_at - time.time()) * 1000)))
+
+        previous, *_ = self._run([
+            ("HGET", self._sizes_key, key),
+            set_cmd,
+            ("HSET", self._sizes_key, key, size),
+            ("ZADD", self._lru_key, time.time(), key),
+        ])
+        delta = size - int(previous or 0)
+        total = self._run([("INCRBY", self._bytes_key, delta)])[0]
+        self.stats.incr("sets")
+
+        while total > self.max_bytes:
+            popped = self._run([("ZPOPMIN", self._lru_key)])[0]
+            if not popped:
+                break
+            victim = popped[0].decode()
+            victim_size, *_ = self._run([
+                ("HGET", self._sizes_key, victim),
+                ("DEL", self._prefix + victim),
+                ("HDEL", self._sizes_key, victim),
+            ])
+            total = self._run([("DECRBY", self._bytes_key, int(victim_size or 0))])[0]
+            self.stats.incr("evictions")
+
+    def delete(self, key: str) -> None:
+        try:
+            self._delete(key)
+        except (OSError, RedisError) as e:
+            logger.warning("Redis 캐시 삭제 실패: %s", e)
+            self._drop_connection()
+
+    def _delete(self, key: str) -> None:
+        size, *_ = self._run([
+            ("HGET", self._sizes_key, key),
+            ("DEL", self._prefix + key),
+            ("HDEL", self._sizes_key, key),
+            ("ZREM", self._lru_key, key),
+        ])
+        if size:
+            self._run([("DECRBY", self._bytes_key, int(size))])
+
+    def clear(self) -> None:
+        try:
+            self._clear()
+        except (OSError, RedisError) as e:
+            logger.warning("Redis 캐시 비우기 실패: %s", e)
+            self._drop_connection()
+
+    def _clear(self) -> None:
+        members = self._run([("ZRANGE", self._lru_key, 0, -1)])[0] or []
+        commands = [("DEL", self._prefix + m.decode()) for m in members]
+        commands += [("DEL", self._lru_key), ("DEL", self._sizes_key), ("DEL", self._bytes_key)]
+        self._run(commands)
+
+    def _usage(self) -> tuple[int, int]:
+        count, size = self._run([("ZCARD", self._lru_key), ("GET", self._bytes_key)])
+        return int(count or 0), int(size or 0)
@@ -0,0 +1,242 @@
+"""
+의미 기반(근사 중복) 질문 캐시.
+
+"LangGraph에 대해 조사해줘"와 "LangGraph 리서치"처럼 표현만 다른 질문에
+같은 답변을 재사용하기 위해, 정규화한 질문을 문자 n-gram 해싱 벡터로 임베딩하고
+코사인 유사도 검색으로 캐시를 조회한다. 외부 모델 다운로드 없이 NumPy만 사용한다.
+
+문자 n-gram 벡터는 "Australia"/"Austria"나 "2023년"/"2024년"처럼 고유명사·숫자 하나만 다른
+질문도 유사도가 높게 나오므로, 유사도가 기준을 넘더라도 정규화 후 내용 단어가 서로 같은
+(조사 차이만 허용) 항목만 적중으로 본다.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# 모드 키워드 외에 의미에 영향이 적은 요청 표현 (단어 전체가 일치할 때만 제거)
+_FILLER_PHRASES = [
+    "좀", "알려줘", "알려 줘", "알려주세요", "설명해줘", "부탁해", "부탁", "please", "tell me about", "about",
+]
+# 앞 단어에 붙어 쓰이는 조사/요청 어미 ("LangGraph에 대해", "정리해줘"): 단어 끝에서만 제거
+_FILLER_SUFFIXES = ["에 대해서", "에 대해", "에 관해", "에 대한", "해주세요", "해 주세요", "해줘", "해 줘"]
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+_MAX_PARTICLE_CHARS = 2  # 내용 단어 비교 시 무시하는 끝 조사 길이 ("서울의", "LangGraph를")
+_GUARD_CANDIDATES = 5  # 유사도 기준을 넘은 항목 중 내용 단어를 확인할 최대 수
+
+_MODE_IDS = {"general": 0, "translate": 1, "research": 2}
+
+
+@lru_cache(maxsize=16)
+def _phrase_pattern(strip_phrases: Tuple[str, ...]) -> re.Pattern:
+    """
+    제거할 표현을 하나의 정규식으로 만든다. 긴 표현을 먼저 두어 "deep research"가
+    "research"보다 먼저 지워지고, 단어 경계를 요구해 "좀비"의 "좀"이나 "aboutness"의 "about"은 남긴다.
+    """
+    def alternation(phrases: Iterable[str]) -> str:
+        ordered = sorted({_SPACE_RE.sub(" ", p.lower()).strip() for p in phrases if p.strip()}, key=len, reverse=True)
+        return "|".join(re.escape(p) for p in ordered)
+
+    whole = alternation((*strip_phrases, *_FILLER_PHRASES))
+    suffixes = alternation(_FILLER_SUFFIXES)
+    return re.compile(rf"(?<!\w)(?:{whole})(?!\w)|(?:{suffixes})(?!\w)")
+
+
+def normalize_question(question: str, strip_phrases: Iterable[str] = ()) -> str:
+    """
+    유니코드/대소문자/문장부호를 정규화하고 모드 키워드와 요청 표현을 단어 단위로 제거한다.
+    "리서치해줘"처럼 어미를 떼어야 키워드가 드러나는 경우가 있어 더 지울 것이 없을 때까지 반복한다.
+    """
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text)).strip()
+    pattern = _phrase_pattern(tuple(strip_phrases))
+    while True:
+        stripped = _SPACE_RE.sub(" ", pattern.sub(" ", text)).strip()
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def _same_term(a: str, b: str) -> bool:
+    """같은 단어이거나, 한쪽이 다른 쪽에 짧은 한글 조사만 붙은 형태인지."""
+    if a == b:
+        return True
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    rest = longer[len(shorter):]
+    return (
+        len(shorter) >= 2
+        and longer.startswith(shorter)
+        and len(rest) <= _MAX_PARTICLE_CHARS
+        and _HANGUL_RE.fullmatch(rest) is not None
+    )
+
+
+def same_content_terms(a: List[str], b: List[str]) -> bool:
+    """
+    정규화된 두 질문의 내용 단어가 (순서/조사 차이를 빼면) 서로 같은지.
+    키워드만 있던 질문("조사해줘", "research")처럼 한쪽이라도 내용 단어가 없으면 같다고 보지 않는다.
+    """
+    if not a or not b:
+        return False
+    return all(any(_same_term(x, y) for y in b) for x in a) and all(any(_same_term(y, x) for x in a) for y in b)
+
+
+class HashingVectorizer:
+    """문자 n-gram을 고정 차원으로 해싱하는 경량 벡터화기 (L2 정규화)."""
+
+    def __init__(self, dim: int = 256, ngram_range: Tuple[int, int] = (2, 4)) -> None:
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {text} "
+        lo, hi = self.ngram_range
+        indices = []
+        signs = []
+        for n in range(lo, hi + 1):
+            for i in range(len(padded) - n + 1):
+                h = zlib.crc32(padded[i:i + n].encode("utf-8"))
+                indices.append(h % self.dim)
+                # 해시 충돌로 인한 편향을 줄이기 위해 부호도 해시에서 결정
+                signs.append(1.0 if (h >> 31) & 1 else -1.0)
+        if indices:
+            np.add.at(vector, np.asarray(indices), np.asarray(signs, dtype=np.float32))
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """
+    고정 용량 벡터 인덱스 + 답변 저장소.
+
+    - 조회: 같은 모드이면서 신선도 창(mode별 TTL) 안에 있는 항목을 코사인 유사도 순으로 확인
+    - 적중: 유사도가 threshold 이상이고 내용 단어가 같을 때 (유사도만 넘은 항목은 rejected로 집계)
+    - 축출: 용량이 차면 가장 오래 사용되지 않은 슬롯을 덮어씀
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        dim: int = 256,
+        threshold: float = 0.9,
+        freshness: Optional[Dict[str, float]] = None,
+        strip_phrases: Iterable[str] = (),
+    ) -> None:
+        self.capacity = capacity
+        self.threshold = threshold
+        self.freshness = freshness or {}
+        self.strip_phrases = tuple(strip_phrases)
+        self.vectorizer = HashingVectorizer(dim)
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._modes = np.full(capacity, -1, dtype=np.int8)
+        self._created_at = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._values: list = [None] * capacity
+        self._slot_keys: list = [None] * capacity
+        self._terms: list = [None] * capacity  # 슬롯별 내용 단어 (정규화 질문을 공백으로 나눈 것)
+        self._slots: Dict[Tuple[str, str], int] = {}  # (모드, 정규화 질문) -> 슬롯
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0  # 유사도는 기준을 넘었지만 내용 단어가 달라 미스로 처리한 조회
+        self._lookup_seconds = 0.0
+
+    def _candidates(self, vector: np.ndarray, mode: str, now: float) -> List[Tuple[int, float]]:
+        """유사도가 threshold 이상인 항목 (유사도 내림차순, 최대 _GUARD_CANDIDATES개)."""
+        n = self._size
+        if n == 0:
+            return []
+        scores = self._vectors[:n] @ vector
+        invalid = self._modes[:n] != _MODE_IDS.get(mode, 0)
+        window = self.freshness.get(mode)
+        if window is not None:
+            invalid |= self._created_at[:n] < now - window
+        scores[invalid] = -1.0
+        above = np.flatnonzero(scores >= self.threshold)
+        if above.size > _GUARD_CANDIDATES:
+            above = above[np.argpartition(scores[above], -_GUARD_CANDIDATES)[-_GUARD_CANDIDATES:]]
+        ordered = above[np.argsort(scores[above])[::-1]]
+        return [(int(i), float(scores[i])) for i in ordered]
+
+    def lookup(self, question: str, mode: str) -> Optional[Tuple[Any, float]]:
+        """(저장된 값, 유사도) 반환. 적중하지 않으면 None."""
+        started = time.perf_counter()
+        normalized = normalize_question(question, self.strip_phrases)
+        vector = self.vectorizer.transform(normalized)
+        terms = normalized.split()
+        now = time.time()
+        hit: Optional[Tuple[Any, float]] = None
+        with self._lock:
+            candidates = self._candidates(vector, mode, now)
+            for index, score in candidates:
+                if same_content_terms(terms, self._terms[index]):
+                    self._last_used[index] = now
+                    hit = (self._values[index], score)
+                    break
+            if hit is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if candidates:
+                    self.rejected += 1
+            self._lookup_seconds += time.perf_counter() - started
+        return hit
+
+    def store(self, question: str, mode: str, value: Any) -> None:
+        normalized = normalize_question(question, self.strip_phrases)
+        if not normalized:
+            # 내용 단어가 없는 질문은 어떤 질문과도 같다고 판단할 수 없으므로 저장하지 않음
+            return
+        vector = self.vectorizer.transform(normalized)
+        key = (mode, normalized)
+        now = time.time()
+        with self._lock:
+            # 정규화 결과가 같은 질문이 이미 있으면 그 슬롯을 갱신, 아니면 새 슬롯 할당
+            index = self._slots.get(key)
+            if index is None:
+                if self._size < self.capacity:
+                    index = self._size
+                    self._size += 1
+                else:
+                    index = int(np.argmin(self._last_used))
+                    self._slots.pop(self._slot_keys[index], None)
+                    self.evictions += 1
+                self._slots[key] = index
+                self._slot_keys[index] = key
+            self._vectors[index] = vector
+            self._terms[index] = normalized.split()
+            self._modes[index] = _MODE_IDS.get(mode, 0)
+            self._created_at[index] = now
+            self._last_used[index] = now
+            self._values[index] = value
+
+    def stats_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+            "avg_lookup_ms": round(self._lookup_seconds / lookups * 1000, 3) if lookups else 0.0,
+            "index_bytes": int(self._vectors.nbytes),
+        }
@@ -0,0 +1,173 @@
+"""
+SQLite(WAL) 파일 기반 캐시 백엔드.
+
+같은 호스트의 여러 uvicorn 워커가 하나의 파일을 공유하며, 재시작 후에도 유지된다.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .base import CacheBackend, deserialize, serialize
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries (namespace, accessed_at);
+"""
+
+# 조회 시마다 accessed_at을 갱신하면 쓰기가 늘어나므로 이 간격보다 오래된 경우에만 갱신
+_TOUCH_INTERVAL = 5.0
+
+
+class SQLiteCache(CacheBackend):
+    """
+    SQLite WAL 모드 캐시.
+
+    스레드마다 별도 커넥션을 사용하고, 쓰기 후 namespace의 총 크기가 max_bytes를 넘으면
+    accessed_at이 가장 오래된 항목부터 삭제한다.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(
+        self,
+        namespace: str,
+        max_bytes: int,
+        path: Path,
+        default_ttl: Optional[float] = None,
+    ) -> None:
+        super().__init__(namespace, max_bytes, default_ttl)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            # 잠금 시간 초과 등 캐시 파일 오류는 요청 실패가 아니라 캐시 미스로 처리
+            logger.warning("SQLite 캐시 조회 실패: %s", e)
+            self.stats.incr("misses")
+            return None
+
+    def _get(self, key: str) -> Optional[Any]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            self.stats.incr("misses")
+            return None
+
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self.stats.incr("expired")
+            self.stats.incr("misses")
+            return None
+
+        if now - accessed_at > _TOUCH_INTERVAL:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+        try:
+            restored = deserialize(value)
+        except Exception as e:
+            # 다른 버전의 워커가 저장했거나 손상된 값은 지우고 미스로 처리
+            logger.warning("SQLite 캐시 값 복원 실패, 항목 삭제: %s", e)
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return restored
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        data = serialize(value)
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self._set(key, data, ttl)
+        except sqlite3.Error as e:
+            logger.warning("SQLite 캐시 저장 실패: %s", e)
+
+    def _set(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.namespace, key, data, len(data), self._expires_at(ttl), time.time()),
+        )
+        self.stats.incr("sets")
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, time.time()),
+        )
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        overflow = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at",
+            (self.namespace,),
+        ):
+            victims.append((self.namespace, key))
+            freed += size
+            if freed >= overflow:
+                break
+        conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+        self.stats.incr("evictions", len(victims))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+        except sqlite3.Error as e:
+            logger.warning("SQLite 캐시 삭제 실패: %s", e)
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logger.warning("SQLite 캐시 비우기 실패: %s", e)
+
+    def _usage(self) -> tuple[int, int]:
+        count, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        return count, size
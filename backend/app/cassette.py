@@ -0,0 +1,159 @@
+"""
+외부 호출 녹화/재생(cassette).
+
+run_agent의 성능은 LLM/검색 응답 속도에 크게 좌우되므로, 코드 변경이 파이프라인 자체를
+빠르게/느리게 했는지 알기 어렵다. 녹화 모드에서는 모든 채팅 완성 호출과 web_search 교환을
+소요 시간과 함께 압축 파일(gzip JSON Lines)에 기록하고, 재생 모드에서는 같은 요청에
+녹화된 응답을 결정적으로 돌려준다 (녹화된 지연 시간 그대로 또는 지연 없이).
+
+- CASSETTE_MODE: off | record | replay
+- CASSETTE_PATH: 카세트 파일 경로
+- CASSETTE_LATENCY: recorded(녹화된 지연 재현) | zero(지연 없음)
+
+요청 키는 요청 내용(메시지와 호출 인자, 또는 검색 쿼리) 해시이며 모델/공급자 이름은 포함하지 않는다.
+같은 키가 여러 번 녹화되면 녹화 순서대로 돌려주고, 다 쓰면 마지막 응답을 반복한다.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import make_key
+from .config import settings
+
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+CASSETTE_VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 녹화되지 않은 요청이 들어온 경우."""
+
+
+class Cassette:
+    """녹화 항목 보관소. 녹화 모드는 메모리에 모았다가 save()에서 한 번에 쓴다."""
+
+    def __init__(self, path: Path, mode: str, latency: str = "recorded") -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"지원하지 않는 카세트 모드입니다: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = latency != "zero"
+        self._lock = threading.Lock()
+        self._entries: List[dict] = []
+        self._index: Dict[Tuple[str, str], List[dict]] = {}
+        self._cursor: Dict[Tuple[str, str], int] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"카세트 파일이 없습니다: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"카세트 버전이 맞지 않습니다: {header.get('version')}")
+            for line in f:
+                entry = json.loads(line)
+                self._index.setdefault((entry["kind"], entry["key"]), []).append(entry)
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return make_key("cassette", *parts)
+
+    def record(self, kind: str, key: str, response: Any, latency: float, duration: Optional[float] = None) -> None:
+        """
+        교환 하나를 기록한다. latency는 응답(스트림은 첫 청크)까지의 시간,
+        duration은 스트림 전체 시간(초).
+        """
+        entry = {"kind": kind, "key": key, "latency": round(latency, 6), "response": response}
+        if duration is not None:
+            entry["duration"] = round(duration, 6)
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+
+    def replay(self, kind: str, key: str) -> dict:
+        """녹화된 항목을 순서대로 반환한다. 없으면 CassetteMiss."""
+        with self._lock:
+            entries = self._index.get((kind, key))
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"카세트에 녹화되지 않은 {kind} 요청입니다 (key={key[:12]})")
+            position = self._cursor.get((kind, key), 0)
+            self._cursor[(kind, key)] = min(position + 1, len(entries) - 1)
+            self.replayed += 1
+            return entries[position]
+
+    def wait(self, seconds: float) -> None:
+        """재생 시 녹화된 지연 시간을 재현한다 (zero 모드면 바로 반환)."""
+        if self.replay_latency and seconds > 0:
+            time.sleep(seconds)
+
+    def exchange(self, kind: str, key: str, call: Callable[[], Any]) -> Any:
+        """
+        JSON으로 직렬화 가능한 결과를 돌려주는 호출(웹 검색 등)을 녹화/재생한다.
+        녹화 모드에서는 call()을 실행해 기록하고, 재생 모드에서는 call()을 실행하지 않는다.
+        """
+        if self.mode == "replay":
+            entry = self.replay(kind, key)
+            self.wait(entry["latency"])
+            return entry["response"]
+        started = time.perf_counter()
+        response = call()
+        self.record(kind, key, response, time.perf_counter() - started)
+        return response
+
+    def save(self) -> None:
+        """녹화 모드: 모은 항목을 카세트 파일로 쓴다 (임시 파일에 쓴 뒤 교체)."""
+        if self.mode != "record":
+            return
+        with self._lock:
+            entries = list(self._entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".part")
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "entries": len(entries)}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+        logger.info("cassette: %d개 교환을 %s에 저장", len(entries), self.path)
+
+    def stats_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "path": str(self.path),
+            "latency": "recorded" if self.replay_latency else "zero",
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """CASSETTE_MODE가 record/replay면 카세트 싱글톤, off면 None."""
+    global _cassette
+    if settings.CASSETTE_MODE == "off":
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(settings.CASSETTE_PATH, settings.CASSETTE_MODE, settings.CASSETTE_LATENCY)
+            if _cassette.mode == "record":
+                # 서버/스크립트가 어떻게 끝나든 녹화분을 남긴다
+                atexit.register(_cassette.save)
+    return _cassette
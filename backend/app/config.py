@@ -1,20 +1,184 @@
+import json
 import os
+import tempfile
 from functools import lru_cache
+from pathlib import Path
 
 from dotenv import load_dotenv
-from openai import OpenAI
 
 
 load_dotenv()
 
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
+
+
+def _llm_provider_config(name: str, api_key: str, model: str) -> dict:
+    """
+    LLM_PROVIDERS 항목 하나의 설정. 공급자별 값은 LLM_<NAME>_* 환경 변수로 덮어쓴다.
+
+    - openai: OpenAI API (LLM_OPENAI_BASE_URL이 없으면 SDK 기본값/OPENAI_BASE_URL 사용)
+    - stub: 프로세스 내 결정적 응답기 (테스트/벤치마크용, 네트워크 호출 없음)
+    - 그 외 이름: OpenAI 호환 엔드포인트 (LLM_<NAME>_BASE_URL 필수)
+    """
+    prefix = f"LLM_{name.upper()}_"
+    kind = name if name in ("openai", "stub") else "compatible"
+    base_url = os.getenv(prefix + "BASE_URL") or None
+    if kind == "compatible" and not base_url:
+        raise ValueError(f"LLM 공급자 '{name}'의 {prefix}BASE_URL이 설정되어 있지 않습니다.")
+    return {
+        "name": name,
+        "kind": kind,
+        "base_url": base_url,
+        # 호환 엔드포인트에는 OpenAI 키를 보내지 않음 (키가 필요 없는 로컬 서버는 관례상 "EMPTY")
+        "api_key": os.getenv(prefix + "API_KEY") or (api_key if kind == "openai" else "EMPTY"),
+        "model": os.getenv(prefix + "MODEL") or model,
+        "timeout": _env_float(prefix + "TIMEOUT", _env_float("LLM_TIMEOUT", 60.0)),
+        "connect_timeout": _env_float(prefix + "CONNECT_TIMEOUT", _env_float("LLM_CONNECT_TIMEOUT", 5.0)),
+        "max_connections": _env_int(prefix + "MAX_CONNECTIONS", _env_int("LLM_MAX_CONNECTIONS", 20)),
+        "max_retries": _env_int(prefix + "MAX_RETRIES", _env_int("LLM_MAX_RETRIES", 2)),
+        # stub 전용: 첫 토큰까지 인위적 지연(초)
+        "delay": _env_float(prefix + "DELAY", 0.0),
+    }
+
+
+# 모델별 100만 토큰당 가격(USD): [입력, 출력, 캐시된 입력]. USAGE_PRICES(JSON)로 덮어쓰거나 추가한다
+DEFAULT_USAGE_PRICES = {
+    "gpt-4o-mini": [0.15, 0.60, 0.075],
+    "gpt-4o": [2.50, 10.00, 1.25],
+    "gpt-4.1-mini": [0.40, 1.60, 0.10],
+    "gpt-4.1": [2.00, 8.00, 0.50],
+}
+
+
+def _usage_prices() -> dict[str, list[float]]:
+    prices = dict(DEFAULT_USAGE_PRICES)
+    raw = os.getenv("USAGE_PRICES")
+    if raw and raw.strip():
+        try:
+            extra = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"USAGE_PRICES가 올바른 JSON이 아닙니다: {e}") from e
+        for model, values in extra.items():
+            values = [float(v) for v in values]
+            # 캐시된 입력 가격을 생략하면 입력 가격과 같게 본다
+            prices[model] = (values + values[:1])[:3] if len(values) == 2 else values[:3]
+    return prices
+
+
 class Settings:
-    """환경 설정 및 OpenAI 클라이언트 래퍼."""
+    """환경 설정 (LLM 클라이언트는 app.llm에서 공급자별로 생성)."""
 
     OPENAI_API_KEY: str
     OPENAI_MODEL: str
     TAVILY_API_KEY: str | None
-    _client: OpenAI | None = None
+
+    # LLM 공급자 (우선순위 없이 최근 지연 시간으로 선택)
+    LLM_PROVIDERS: list[dict]
+    LLM_LATENCY_WINDOW: int
+    LLM_FAILURE_COOLDOWN: float
+    LLM_PROBE_INTERVAL: float
+
+    # 외부 호출 녹화/재생 (성능 회귀 측정용)
+    CASSETTE_MODE: str
+    CASSETTE_PATH: Path
+    CASSETTE_LATENCY: str
+
+    # 메모리 프로파일링 (선택)
+    MEMORY_PROFILING: bool
+    MEMORY_TRACE_FRAMES: int
+    MEMORY_SNAPSHOT_SAMPLE: float
+    MEMORY_RSS_INTERVAL: float
+    DEBUG_TOKEN: str | None
+
+    # 요청별 토큰 사용량/비용 원장
+    USAGE_LEDGER: bool
+    USAGE_LEDGER_PATH: Path
+    USAGE_LEDGER_RETENTION_DAYS: float
+    USAGE_PRICES: dict[str, list[float]]
+
+    # 연구 모드 원문 페이지 수집 (선택)
+    FETCH_PAGES: bool
+    FETCH_TOP_N: int
+    FETCH_TIMEOUT: float
+    FETCH_MAX_BYTES: int
+    FETCH_PER_HOST: int
+    FETCH_CACHE_DIR: Path | None
+
+    # 연구 모드 첫 검색 추측 실행
+    SEARCH_PREFETCH: bool
+    SEARCH_PREFETCH_WORKERS: int
+
+    # 연구 모드 검색 충분성 판단
+    RESEARCH_SUFFICIENCY_THRESHOLD: float
+
+    # 캐시 백엔드: memory | sqlite | redis
+    CACHE_BACKEND: str
+    CACHE_SQLITE_PATH: Path
+    CACHE_REDIS_URL: str
+    CACHE_MAX_BYTES: int
+    SEARCH_CACHE_TTL: float
+
+    # 문서 텍스트 추출 결과 캐시
+    EXTRACTION_CACHE_MEMORY_BYTES: int
+    EXTRACTION_CACHE_SHARED_BYTES: int
+
+    # 다중 문서 처리
+    EXTRACTION_WORKERS: int
+    COMPARE_MAX_FILES: int
+    COMPARE_CONTEXT_BUDGET: int
+    COMPARE_MAX_TEXT_LENGTH: int
+
+    # 위험 조항 추출 (로컬 규칙 선별 후 LLM 검증)
+    CLAUSE_RULES_PATH: Path | None
+    CLAUSE_MAX_TEXT_LENGTH: int
+    CLAUSE_MAX_CANDIDATES: int
+    CLAUSE_CONTEXT_BUDGET: int
+
+    # 문서 번역 (언어 판별로 한국어 구간은 건너뜀)
+    TRANSLATE_BATCH_CHARS: int
+    TRANSLATE_PREVIEW_CHARS: int
+    ARTIFACT_DIR: Path
+    ARTIFACT_TTL: float
+
+    # 의미 기반 질문 캐시 (유사 질문에 캐시된 답변 재사용)
+    SEMANTIC_CACHE_ENABLED: bool
+    SEMANTIC_CACHE_THRESHOLD: float
+    SEMANTIC_CACHE_CAPACITY: int
+    SEMANTIC_CACHE_TTL: dict[str, float]
+
+    # 대화형/대량 작업 우선순위 스케줄링
+    SCHEDULER_SLOTS: int
+    SCHEDULER_BULK_SHARE: float
+    SCHEDULER_INTERACTIVE_MAX_TOKENS: int
+    SCHEDULER_MAX_WAIT: float
+
+    # WebSocket 채팅 세션
+    WS_HISTORY_TURNS: int
+
+    # 콜드 스타트: 기동 시 그래프 컴파일 및 OpenAI 커넥션 예열
+    WARMUP_ON_STARTUP: bool
+    WARMUP_TIMEOUT: float
 
     def __init__(self) -> None:
         api_key = os.getenv("OPENAI_API_KEY")
@@ -28,12 +192,117 @@ class Settings:
         self.OPENAI_MODEL = model
         self.TAVILY_API_KEY = tavily_key  # 선택적: 없어도 동작 (모델 내장 검색 사용)
 
-    @property
-    def client(self) -> OpenAI:
-        """OpenAI 클라이언트를 지연 초기화하여 반환."""
-        if self._client is None:
-            self._client = OpenAI(api_key=self.OPENAI_API_KEY)
-        return self._client
+        # 쉼표로 구분한 공급자 이름 목록 (예: "openai,local,stub")
+        names = [n.strip().lower() for n in os.getenv("LLM_PROVIDERS", "openai").split(",") if n.strip()]
+        self.LLM_PROVIDERS = [_llm_provider_config(n, api_key, model) for n in dict.fromkeys(names or ["openai"])]
+        # 공급자별로 최근 몇 번의 호출 지연 시간을 보고 고를지
+        self.LLM_LATENCY_WINDOW = _env_int("LLM_LATENCY_WINDOW", 50)
+        # 호출이 실패한 공급자는 이 시간(초) 동안 다른 공급자를 먼저 시도
+        self.LLM_FAILURE_COOLDOWN = _env_float("LLM_FAILURE_COOLDOWN", 30.0)
+        # 이 시간(초) 동안 선택되지 않은 공급자는 지연 시간을 다시 재기 위해 한 번 선택
+        self.LLM_PROBE_INTERVAL = _env_float("LLM_PROBE_INTERVAL", 60.0)
+
+        # off | record(LLM/검색 교환 녹화) | replay(녹화분만으로 실행)
+        self.CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").strip().lower() or "off"
+        self.CASSETTE_PATH = Path(
+            os.getenv("CASSETTE_PATH", str(Path(tempfile.gettempdir()) / "ai-assistants" / "cassette.jsonl.gz"))
+        )
+        # recorded: 녹화된 지연 시간 재현, zero: 지연 없이 재생 (앱 자체 오버헤드만 측정)
+        self.CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "recorded").strip().lower()
+
+        # tracemalloc은 모든 할당을 추적해 느려지므로 필요할 때만 켠다
+        self.MEMORY_PROFILING = _env_bool("MEMORY_PROFILING", False)
+        self.MEMORY_TRACE_FRAMES = _env_int("MEMORY_TRACE_FRAMES", 5)
+        # 구간 전후 스냅샷 비교(상위 할당 위치)를 수행할 비율, 나머지 구간은 증가량만 집계
+        self.MEMORY_SNAPSHOT_SAMPLE = _env_float("MEMORY_SNAPSHOT_SAMPLE", 0.1)
+        self.MEMORY_RSS_INTERVAL = _env_float("MEMORY_RSS_INTERVAL", 0.05)
+        # /debug/* 엔드포인트 접근 토큰 (비어 있으면 엔드포인트 비활성화)
+        self.DEBUG_TOKEN = os.getenv("DEBUG_TOKEN") or None
+
+        # 요청마다 모드/토큰/비용/노드별 지연 시간을 SQLite에 기록 (백그라운드 스레드에서 묶어서 씀)
+        self.USAGE_LEDGER = _env_bool("USAGE_LEDGER", True)
+        self.USAGE_LEDGER_PATH = Path(
+            os.getenv("USAGE_LEDGER_PATH", str(Path(tempfile.gettempdir()) / "ai-assistants" / "usage.sqlite3"))
+        )
+        # 이보다 오래된 기록은 주기적으로 삭제 (0이면 보관)
+        self.USAGE_LEDGER_RETENTION_DAYS = _env_float("USAGE_LEDGER_RETENTION_DAYS", 30.0)
+        self.USAGE_PRICES = _usage_prices()
+
+        self.FETCH_PAGES = _env_bool("FETCH_PAGES", False)
+        self.FETCH_TOP_N = _env_int("FETCH_TOP_N", 3)
+        self.FETCH_TIMEOUT = _env_float("FETCH_TIMEOUT", 5.0)
+        self.FETCH_MAX_BYTES = _env_int("FETCH_MAX_BYTES", 1_000_000)
+        self.FETCH_PER_HOST = _env_int("FETCH_PER_HOST", 2)
+        # 빈 문자열이면 디스크 캐시 비활성화
+        cache_dir = os.getenv("FETCH_CACHE_DIR", str(Path(tempfile.gettempdir()) / "ai-assistants" / "pages"))
+        self.FETCH_CACHE_DIR = Path(cache_dir) if cache_dir.strip() else None
+
+        # 연구 요청으로 보이는 질문은 도착 즉시 첫 검색을 백그라운드에서 시작
+        self.SEARCH_PREFETCH = _env_bool("SEARCH_PREFETCH", True)
+        self.SEARCH_PREFETCH_WORKERS = _env_int("SEARCH_PREFETCH_WORKERS", 4)
+
+        # 검색 결과 충분성 점수(0~1)가 이 값보다 낮을 때만 답변 생성 전에 추가 검색
+        self.RESEARCH_SUFFICIENCY_THRESHOLD = _env_float("RESEARCH_SUFFICIENCY_THRESHOLD", 0.5)
+
+        self.CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").strip().lower()
+        self.CACHE_SQLITE_PATH = Path(
+            os.getenv("CACHE_SQLITE_PATH", str(Path(tempfile.gettempdir()) / "ai-assistants" / "cache.sqlite3"))
+        )
+        self.CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+        self.CACHE_MAX_BYTES = _env_int("CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        self.SEARCH_CACHE_TTL = _env_float("SEARCH_CACHE_TTL", 3600.0)
+
+        self.EXTRACTION_CACHE_MEMORY_BYTES = _env_int("EXTRACTION_CACHE_MEMORY_BYTES", 32 * 1024 * 1024)
+        # 공유 계층은 CACHE_BACKEND가 sqlite/redis일 때만 사용 ("extraction" namespace)
+        self.EXTRACTION_CACHE_SHARED_BYTES = _env_int("EXTRACTION_CACHE_SHARED_BYTES", 512 * 1024 * 1024)
+
+        self.EXTRACTION_WORKERS = max(1, _env_int("EXTRACTION_WORKERS", min(4, os.cpu_count() or 1)))
+        self.COMPARE_MAX_FILES = _env_int("COMPARE_MAX_FILES", 5)
+        # 비교 분석 시 모든 문서가 나눠 쓰는 발췌 예산(추정 토큰), 한국어 기준 단일 문서 한도(15,000자)와 비슷하게 유지
+        self.COMPARE_CONTEXT_BUDGET = _env_int("COMPARE_CONTEXT_BUDGET", 9_000)
+        # 비교할 문서는 발췌 전에 자르지 않도록 길게 읽고, 프롬프트 크기는 발췌 예산으로 제한
+        self.COMPARE_MAX_TEXT_LENGTH = _env_int("COMPARE_MAX_TEXT_LENGTH", 1_000_000)
+
+        # 비어 있으면 기본 규칙(한국어/영어 책임·위약금·해지·면책·자동갱신) 사용
+        clause_rules = os.getenv("CLAUSE_RULES_PATH", "")
+        self.CLAUSE_RULES_PATH = Path(clause_rules) if clause_rules.strip() else None
+        # 조항 추출은 로컬에서 선별하므로 일반 문서 한도(15,000자)보다 훨씬 긴 문서까지 읽는다
+        self.CLAUSE_MAX_TEXT_LENGTH = _env_int("CLAUSE_MAX_TEXT_LENGTH", 1_000_000)
+        self.CLAUSE_MAX_CANDIDATES = _env_int("CLAUSE_MAX_CANDIDATES", 40)
+        self.CLAUSE_CONTEXT_BUDGET = _env_int("CLAUSE_CONTEXT_BUDGET", 20_000)
+
+        # 번역 LLM 호출 한 번에 보내는 원문 구간의 최대 길이(문자)
+        self.TRANSLATE_BATCH_CHARS = _env_int("TRANSLATE_BATCH_CHARS", 4_000)
+        # 번역 결과는 파일로 내려받고, 응답 answer에는 앞부분 미리보기만 담는다
+        self.TRANSLATE_PREVIEW_CHARS = _env_int("TRANSLATE_PREVIEW_CHARS", 2_000)
+        self.ARTIFACT_DIR = Path(
+            os.getenv("ARTIFACT_DIR", str(Path(tempfile.gettempdir()) / "ai-assistants" / "artifacts"))
+        )
+        self.ARTIFACT_TTL = _env_float("ARTIFACT_TTL", 24 * 3600.0)
+
+        self.SEMANTIC_CACHE_ENABLED = _env_bool("SEMANTIC_CACHE_ENABLED", False)
+        self.SEMANTIC_CACHE_THRESHOLD = _env_float("SEMANTIC_CACHE_THRESHOLD", 0.9)
+        self.SEMANTIC_CACHE_CAPACITY = _env_int("SEMANTIC_CACHE_CAPACITY", 10_000)
+        # 모드별 신선도 창(초): 연구 모드는 최신 정보가 중요해 짧게 유지
+        self.SEMANTIC_CACHE_TTL = {
+            "general": _env_float("SEMANTIC_CACHE_TTL_GENERAL", 24 * 3600.0),
+            "research": _env_float("SEMANTIC_CACHE_TTL_RESEARCH", 3600.0),
+            "translate": _env_float("SEMANTIC_CACHE_TTL_TRANSLATE", 24 * 3600.0),
+        }
+
+        # 동시에 실행하는 에이전트 작업 수와 그중 번역/연구 등 대량 작업이 쓸 수 있는 최대 비율
+        self.SCHEDULER_SLOTS = _env_int("SCHEDULER_SLOTS", 8)
+        self.SCHEDULER_BULK_SHARE = _env_float("SCHEDULER_BULK_SHARE", 0.5)
+        # 일반 모드라도 예상 입력 토큰이 이보다 많으면 대량 작업으로 분류
+        self.SCHEDULER_INTERACTIVE_MAX_TOKENS = _env_int("SCHEDULER_INTERACTIVE_MAX_TOKENS", 2_000)
+        # 대량 작업이 이 시간(초) 넘게 기다리면 대화형보다 먼저 슬롯을 받음 (기아 방지)
+        self.SCHEDULER_MAX_WAIT = _env_float("SCHEDULER_MAX_WAIT", 30.0)
+
+        # /ws/agent 연결에서 LLM에 함께 넘기는 최근 대화 턴 수
+        self.WS_HISTORY_TURNS = _env_int("WS_HISTORY_TURNS", 6)
+
+        self.WARMUP_ON_STARTUP = _env_bool("WARMUP_ON_STARTUP", True)
+        self.WARMUP_TIMEOUT = _env_float("WARMUP_TIMEOUT", 5.0)
 
 
 @lru_cache(maxsize=1)
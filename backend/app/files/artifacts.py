@@ -0,0 +1,140 @@
+"""
+서버 측 결과 파일(artifact) 저장소.
+
+긴 번역 결과를 하나의 응답 문자열로 들고 있지 않도록, 작업 중에는 구간 단위로
+`<id>.<ext>.part` 파일에 이어 쓰고 완료되면 `<id>.<ext>`로 이름을 바꾼다.
+완료 여부를 파일 이름으로 판단하므로 재시작이나 다른 워커에서도 다운로드할 수 있다.
+"""
+
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..config import settings
+
+
+ARTIFACT_FORMATS = {"md": "text/markdown; charset=utf-8", "txt": "text/plain; charset=utf-8"}
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ArtifactWriter:
+    """결과 파일 하나에 텍스트를 이어 쓰며 진행 상황을 기록한다."""
+
+    def __init__(self, store: "ArtifactStore", artifact_id: str, fmt: str, total: int) -> None:
+        self.store = store
+        self.id = artifact_id
+        self.format = fmt
+        self.path = store.directory / f"{artifact_id}.{fmt}"
+        self.part_path = self.path.with_name(self.path.name + ".part")
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+        self.status = "writing"
+        self._file = open(self.part_path, "w", encoding="utf-8", newline="\n")
+
+    def write(self, text: str, segments_done: Optional[int] = None) -> None:
+        self._file.write(text)
+        # 다른 요청에서 진행 중인 파일 크기를 볼 수 있도록 바로 내보냄
+        self._file.flush()
+        self.bytes += len(text.encode("utf-8"))
+        if segments_done is not None:
+            self.done = segments_done
+
+    def finish(self) -> None:
+        self._file.close()
+        self.part_path.replace(self.path)
+        self.done = self.total
+        self.status = "complete"
+
+    def fail(self) -> None:
+        self._file.close()
+        self.part_path.unlink(missing_ok=True)
+        self.status = "failed"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "segments_done": self.done,
+            "segments_total": self.total,
+            "bytes": self.bytes,
+            "url": f"/artifacts/{self.id}",
+        }
+
+
+class ArtifactStore:
+    """ARTIFACT_DIR 아래 결과 파일 생성/조회. 오래된 파일은 새 파일을 만들 때 정리한다."""
+
+    def __init__(self, directory: Path, ttl: float) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self._writers: Dict[str, ArtifactWriter] = {}
+        self._lock = threading.Lock()
+
+    def create(self, fmt: str, total: int) -> ArtifactWriter:
+        if fmt not in ARTIFACT_FORMATS:
+            raise ValueError(f"지원하지 않는 결과 형식입니다: {fmt} (md 또는 txt)")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._cleanup()
+        writer = ArtifactWriter(self, uuid.uuid4().hex, fmt, total)
+        with self._lock:
+            self._writers[writer.id] = writer
+        return writer
+
+    def _cleanup(self) -> None:
+        cutoff = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+        with self._lock:
+            for artifact_id, writer in list(self._writers.items()):
+                if writer.status != "writing" and not writer.path.exists():
+                    del self._writers[artifact_id]
+
+    def find(self, artifact_id: str) -> Optional[Path]:
+        """완료된 결과 파일 경로. 없거나 아직 작성 중이면 None."""
+        if not _ID_RE.match(artifact_id):
+            return None
+        for fmt in ARTIFACT_FORMATS:
+            path = self.directory / f"{artifact_id}.{fmt}"
+            if path.exists():
+                return path
+        return None
+
+    def status(self, artifact_id: str) -> Optional[dict]:
+        with self._lock:
+            writer = self._writers.get(artifact_id)
+        if writer is not None:
+            return writer.to_dict()
+        # 다른 워커/재시작 전에 만들어진 완료 파일
+        path = self.find(artifact_id)
+        if path is None:
+            return None
+        return {
+            "id": artifact_id,
+            "format": path.suffix.lstrip("."),
+            "status": "complete",
+            "bytes": path.stat().st_size,
+            "url": f"/artifacts/{artifact_id}",
+        }
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """설정값으로 생성한 ArtifactStore 싱글톤 반환"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(settings.ARTIFACT_DIR, settings.ARTIFACT_TTL)
+    return _store
@@ -0,0 +1,74 @@
+"""
+긴 텍스트를 검색/프롬프트 예산에 맞는 조각(chunk)으로 나누는 유틸리티.
+"""
+
+import re
+
+
+DEFAULT_CHUNK_SIZE = 1_200
+DEFAULT_CHUNK_OVERLAP = 150
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?。])\s+")
+
+
+def _split_long(paragraph: str, max_chars: int) -> list[str]:
+    """max_chars보다 긴 문단을 문장 단위(불가능하면 고정 길이)로 나눈다."""
+    pieces: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_SPLIT_RE.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(
+    text: str,
+    max_chars: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> list[str]:
+    """
+    텍스트를 문단 경계를 우선으로 max_chars 이하의 조각으로 나눈다.
+
+    인접 조각 사이에는 overlap 글자만큼 앞 조각의 끝부분을 이어 붙여
+    경계에 걸친 문장의 문맥이 끊기지 않도록 한다.
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+
+    units: list[str] = []
+    for paragraph in _PARAGRAPH_SPLIT_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) > max_chars:
+            units.extend(_split_long(paragraph, max_chars))
+        else:
+            units.append(paragraph)
+
+    chunks: list[str] = []
+    current = ""
+    for unit in units:
+        if current and len(current) + 2 + len(unit) > max_chars:
+            chunks.append(current)
+            tail = current[-overlap:] if overlap > 0 else ""
+            current = f"{tail}\n\n{unit}" if tail and len(tail) + 2 + len(unit) <= max_chars else unit
+        else:
+            current = f"{current}\n\n{unit}" if current else unit
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,186 @@
+"""
+계약서 조항 분할 및 로컬 위험 점수 계산.
+
+"위험한 조항만 뽑아줘" 같은 추출형 질문에서 문서 전체를 LLM에 보내지 않도록,
+문서를 번호가 붙은 조항 단위로 나누고 어휘/정규식 규칙으로 위험 후보를 먼저 고른다.
+규칙은 기본값(한국어/영어) 외에 CLAUSE_RULES_PATH의 JSON 파일로 교체할 수 있다.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# 조항 머리: "제 3 조", "제3조의2", "Article 5", "Section 2.1", "Clause 7", "12.", "3.2)"
+_HEADING_RE = re.compile(
+    r"^[ \t]*(?:"
+    r"제\s*\d+\s*조(?:\s*의\s*\d+)?"
+    r"|(?:article|section|clause)\s+\d+(?:\.\d+)*\.?"
+    r"|\d+(?:\.\d+)*[.)]"
+    r")(?=\s|\(|$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# 기본 위험 규칙: 범주 -> 가중치와 패턴 목록
+DEFAULT_RULES: Dict[str, dict] = {
+    "liability": {
+        "weight": 1.0,
+        "patterns": [
+            r"손해\s*배상", r"배상\s*책임", r"배상하여야", r"배상한다", r"책임을?\s*(?:지지|부담)", r"면책",
+            r"\bliab(?:le|ility)\b", r"\bdamages\b", r"consequential",
+        ],
+    },
+    "penalty": {
+        "weight": 1.0,
+        "patterns": [
+            r"위약금", r"지체\s*상금", r"지연\s*(?:손해|이자)", r"벌금", r"가산금",
+            r"\bpenalt(?:y|ies)\b", r"liquidated\s+damages", r"late\s+(?:fee|payment)",
+        ],
+    },
+    "termination": {
+        "weight": 0.8,
+        "patterns": [
+            r"해지", r"해제", r"계약\s*종료", r"일방적",
+            r"\bterminat(?:e|ion)\b", r"\bunilateral(?:ly)?\b", r"without\s+(?:cause|notice)",
+        ],
+    },
+    "indemnity": {
+        "weight": 1.0,
+        "patterns": [
+            r"면책\s*(?:의무|보장)", r"보상\s*(?:하여야|해야|책임)", r"구상",
+            r"\bindemnif(?:y|ies|ication)\b", r"hold\s+harmless",
+        ],
+    },
+    "auto_renewal": {
+        "weight": 0.9,
+        "patterns": [
+            r"자동\s*(?:으로\s*)?(?:갱신|연장)", r"묵시적\s*(?:갱신|연장)",
+            r"auto(?:matic(?:ally)?)?[\s-]*renew", r"\brenew(?:s|ed)?\s+automatically",
+        ],
+    },
+}
+
+# 위험도를 높이는 수식어 (일방성, 무제한 등)
+_AMPLIFIERS = [r"일체", r"무제한", r"전액", r"즉시", r"사전\s*통지\s*없이", r"\bsole\b", r"\bunlimited\b", r"\bany\s+and\s+all\b"]
+_AMPLIFIER_RE = re.compile("|".join(_AMPLIFIERS), re.IGNORECASE)
+
+# 영어는 단어 단위로만 본다 ("determine", "intermediate" 안의 term은 제외)
+_EXTRACTION_TARGET_RE = re.compile(r"조항|조건|계약|\bclauses?\b|\bprovisions?\b|\bterms?\b", re.IGNORECASE)
+# "계약 기간 뽑아줘"처럼 위험과 무관한 추출 요청은 일반 문서 질의로 처리되도록 위험 관련 표현만 본다
+_EXTRACTION_RISK_RE = re.compile(r"위험|독소|불리|주의\s*해야|risk|danger|unfavou?rable|red\s*flag", re.IGNORECASE)
+
+
+@dataclass
+class Clause:
+    """번호가 붙은 조항 하나."""
+
+    index: int
+    heading: str
+    text: str
+    score: float = 0.0
+    categories: List[str] = field(default_factory=list)
+
+    @property
+    def clause_id(self) -> str:
+        return f"C{self.index}"
+
+
+def is_clause_extraction_request(question: str) -> bool:
+    """질문이 '위험한 조항 추출'류의 요청인지 판별한다."""
+    return bool(_EXTRACTION_TARGET_RE.search(question) and _EXTRACTION_RISK_RE.search(question))
+
+
+def segment_clauses(text: str) -> List[Clause]:
+    """
+    조항 머리(제N조, Article N, 1.1 등)를 기준으로 문서를 조항 단위로 나눈다.
+    조항 머리가 없으면 빈 줄 기준 문단을 조항으로 본다.
+    """
+    starts = [m.start() for m in _HEADING_RE.finditer(text)]
+    pieces: List[str] = []
+    if starts:
+        if text[:starts[0]].strip():
+            pieces.append(text[:starts[0]])
+        pieces.extend(text[a:b] for a, b in zip(starts, starts[1:] + [len(text)]))
+    else:
+        pieces = re.split(r"\n\s*\n", text)
+
+    clauses = []
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        match = _HEADING_RE.match(piece)
+        heading = match.group(0).strip() if match else ""
+        clauses.append(Clause(index=len(clauses) + 1, heading=heading, text=piece))
+    return clauses
+
+
+@dataclass
+class RuleSet:
+    """컴파일된 위험 규칙 모음."""
+
+    rules: Dict[str, tuple]  # 범주 -> (가중치, 컴파일된 정규식)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, dict]) -> "RuleSet":
+        compiled = {}
+        for category, spec in raw.items():
+            patterns = spec.get("patterns", [])
+            if patterns:
+                compiled[category] = (
+                    float(spec.get("weight", 1.0)),
+                    re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE),
+                )
+        return cls(compiled)
+
+    def score(self, clause: Clause) -> None:
+        """범주별 매칭 횟수(상한 3)와 가중치로 점수를 매기고, 수식어가 있으면 가산한다."""
+        score = 0.0
+        categories = []
+        for category, (weight, regex) in self.rules.items():
+            hits = len(regex.findall(clause.text))
+            if hits:
+                categories.append(category)
+                score += weight * min(hits, 3)
+        if categories and _AMPLIFIER_RE.search(clause.text):
+            score *= 1.3
+        clause.score = round(score, 3)
+        clause.categories = categories
+
+
+@lru_cache(maxsize=4)
+def load_rules(path: Optional[str] = None) -> RuleSet:
+    """규칙 파일(JSON)이 주어지면 그것을, 아니면 기본 규칙을 사용한다."""
+    if path:
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        return RuleSet.from_dict(raw)
+    return RuleSet.from_dict(DEFAULT_RULES)
+
+
+def find_risk_candidates(
+    clauses: List[Clause],
+    rules: RuleSet,
+    max_candidates: int,
+    char_budget: int,
+    min_score: float = 0.8,
+) -> List[Clause]:
+    """
+    점수가 min_score 이상인 조항 중 상위 후보를 char_budget 안에서 골라 원문 순서로 반환한다.
+    """
+    for clause in clauses:
+        rules.score(clause)
+    ranked = sorted((c for c in clauses if c.score >= min_score), key=lambda c: (-c.score, c.index))
+
+    chosen: List[Clause] = []
+    used = 0
+    for clause in ranked:
+        if len(chosen) >= max_candidates:
+            break
+        if used + len(clause.text) > char_budget:
+            continue
+        chosen.append(clause)
+        used += len(clause.text)
+    return sorted(chosen, key=lambda c: c.index)
@@ -0,0 +1,111 @@
+"""
+업로드 문서 텍스트 추출 결과 캐시.
+
+같은 PDF가 반복 업로드될 때 pypdf 파싱을 건너뛰기 위해,
+파일 바이트의 SHA-256 + 추출기 버전을 키로 추출 결과를 보관한다.
+
+- 메모리 계층: 프로세스 내 LRU (크기 상한)
+- 공유 계층: CACHE_BACKEND가 sqlite/redis면 get_cache("extraction")에 zlib 압축 텍스트를 보관 (워커 간 공유)
+"""
+
+import threading
+import zlib
+from importlib import metadata
+from typing import Optional, Tuple
+
+from ..cache import CacheBackend, MemoryCache, get_cache, make_key
+from ..config import settings
+
+
+# 추출/정규화 로직이 바뀌면 올려서 기존 캐시를 무효화한다
+EXTRACTOR_VERSION = "3"
+
+
+def _pypdf_version() -> str:
+    try:
+        return metadata.version("pypdf")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ExtractionCache:
+    """메모리 → 공유 캐시 순으로 조회하는 2계층 추출 결과 캐시."""
+
+    def __init__(self, memory_bytes: int, shared: Optional[CacheBackend] = None) -> None:
+        self.memory = MemoryCache("extraction", memory_bytes)
+        self.shared = shared
+        self.version = f"{EXTRACTOR_VERSION}/pypdf-{_pypdf_version()}"
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_shared = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def key(self, content_hash: str, ext: str) -> str:
+        return make_key("extraction", self.version, ext, content_hash)
+
+    def get(self, key: str) -> Optional[Tuple[str, float, str, int]]:
+        """(text, 원래 추출에 걸린 초, 적중 계층, 정규화 전 글자 수) 반환. 없으면 None."""
+        entry = self.memory.get(key)
+        tier = "memory"
+        if entry is None and self.shared is not None:
+            stored = self.shared.get(key)
+            if stored is not None:
+                entry = {
+                    "text": zlib.decompress(stored["text_z"]).decode("utf-8"),
+                    "seconds": stored["seconds"],
+                    "raw_chars": stored["raw_chars"],
+                }
+                self.memory.set(key, entry)
+                tier = "shared"
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            if tier == "memory":
+                self.hits_memory += 1
+            else:
+                self.hits_shared += 1
+            self.saved_seconds += entry["seconds"]
+        return entry["text"], entry["seconds"], tier, entry["raw_chars"]
+
+    def put(self, key: str, text: str, seconds: float, raw_chars: int) -> None:
+        self.memory.set(key, {"text": text, "seconds": seconds, "raw_chars": raw_chars})
+        if self.shared is not None:
+            self.shared.set(key, {
+                "text_z": zlib.compress(text.encode("utf-8"), 6),
+                "seconds": seconds,
+                "raw_chars": raw_chars,
+            })
+
+    def stats_dict(self) -> dict:
+        hits = self.hits_memory + self.hits_shared
+        lookups = hits + self.misses
+        return {
+            "version": self.version,
+            "hits_memory": self.hits_memory,
+            "hits_shared": self.hits_shared,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_extraction_seconds": round(self.saved_seconds, 3),
+            "memory": self.memory.stats_dict(),
+            "shared": self.shared.stats_dict() if self.shared is not None else None,
+        }
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """설정값으로 생성한 ExtractionCache 싱글톤 반환"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            shared = None
+            # memory 백엔드면 프로세스 내 LRU를 하나 더 두는 셈이라 공유 계층을 만들지 않음
+            if settings.CACHE_BACKEND != "memory":
+                shared = get_cache("extraction", settings.EXTRACTION_CACHE_SHARED_BYTES)
+            _extraction_cache = ExtractionCache(settings.EXTRACTION_CACHE_MEMORY_BYTES, shared)
+    return _extraction_cache
@@ -0,0 +1,113 @@
+"""
+문자 체계(script) 통계 기반 로컬 언어 판별.
+
+모델 다운로드 없이 글자의 유니코드 범위만 세어 구간별 언어를 추정한다.
+한국어/일본어/중국어/라틴 문자/키릴 문자 정도만 구분하면 되는 번역 범위 산정용이며,
+라틴 문자 언어(영어, 프랑스어 등)끼리는 구분하지 않는다.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+# 글자 수 중 한글 비율이 이 이상이면 한국어 구간으로 본다 (영문 제품명이 섞인 한국어 문장 허용)
+KOREAN_RATIO = 0.6
+
+# 언어별 토큰당 평균 글자 수 (GPT-4o 계열 토크나이저 기준 대략값)
+CHARS_PER_TOKEN = {
+    "ko": 1.6,
+    "ja": 1.3,
+    "zh": 1.3,
+    "latin": 4.0,
+    "cyrillic": 3.5,
+    "other": 3.0,
+    "none": 4.0,
+}
+
+
+def _script(ch: str) -> str | None:
+    code = ord(ch)
+    if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return "ko"
+    if 0x3040 <= code <= 0x30FF:
+        return "kana"
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF:
+        return "han"
+    if ch.isascii():
+        return "latin" if ch.isalpha() else None
+    if 0x00C0 <= code <= 0x024F:
+        return "latin"
+    if 0x0400 <= code <= 0x04FF:
+        return "cyrillic"
+    return "other" if ch.isalpha() else None
+
+
+def script_counts(text: str) -> Counter:
+    """문자 체계별 글자 수 (숫자, 공백, 문장부호 제외)"""
+    return Counter(s for s in map(_script, text) if s is not None)
+
+
+def detect_language(text: str) -> str:
+    """
+    구간의 언어를 "ko", "ja", "zh", "latin", "cyrillic", "other", "none"(글자 없음) 중 하나로 추정한다.
+    가나가 섞여 있으면 한자가 많아도 일본어로 본다.
+    """
+    counts = script_counts(text)
+    total = sum(counts.values())
+    if not total:
+        return "none"
+    if counts["ko"] / total >= KOREAN_RATIO:
+        return "ko"
+    if counts["kana"]:
+        return "ja"
+    counts.pop("ko", None)
+    script, _ = counts.most_common(1)[0]
+    return {"han": "zh"}.get(script, script)
+
+
+def estimate_tokens(text: str, language: str | None = None) -> int:
+    """언어별 평균 글자 수로 토큰 수를 대략 추정한다."""
+    language = language or detect_language(text)
+    return int(len(text) / CHARS_PER_TOKEN.get(language, 3.0)) + 1
+
+
+@dataclass
+class Segment:
+    """같은 언어로 이어지는 줄들의 묶음."""
+
+    index: int
+    text: str
+    language: str
+
+
+def segment_by_language(text: str) -> List[Segment]:
+    """
+    줄 단위로 언어를 판별하고 같은 언어의 연속된 줄을 한 구간으로 묶는다.
+    숫자/기호뿐인 줄("none")은 앞 구간에 붙인다.
+    """
+    segments: List[Segment] = []
+    # 구간 텍스트를 줄마다 이어 붙이면 긴 구간에서 제곱 시간이 되므로 줄 목록으로 모았다가 닫을 때 한 번 합친다
+    lines: List[str] = []
+    current = ""
+
+    def close() -> None:
+        if lines:
+            segments.append(Segment(index=len(segments), text="\n".join(lines), language=current))
+            lines.clear()
+
+    for line in text.splitlines():
+        language = detect_language(line)
+        if lines and (language == "none" or language == current):
+            lines.append(line)
+            continue
+        close()
+        lines.append(line)
+        current = language
+    close()
+    return segments
+
+
+def language_counts(segments: List[Segment]) -> Dict[str, int]:
+    """언어별 구간 수"""
+    return dict(Counter(s.language for s in segments))
@@ -1,14 +1,27 @@
+import asyncio
+import hashlib
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Literal
+from typing import Literal, Optional
 
 from fastapi import UploadFile
-from pypdf import PdfReader
+
+from ..config import settings
+from ..memprofile import memory_section
+from .extraction_cache import get_extraction_cache
+from .normalize import normalize_pages
+from .textstream import READ_CHUNK, Gunzip, TextBudgetReader
 
 
 SupportedExt = Literal["pdf", "txt"]
 
 
 MAX_TEXT_LENGTH = 15_000
+MAX_DECOMPRESSED_BYTES = 200 * 1024 * 1024  # gzip 업로드 해제 후 최대 크기 (프론트엔드 업로드 제한과 동일)
 
 
 def _truncate(text: str, max_length: int = MAX_TEXT_LENGTH) -> str:
@@ -17,7 +30,11 @@ def _truncate(text: str, max_length: int = MAX_TEXT_LENGTH) -> str:
     return text[:max_length]
 
 
-def _extract_from_pdf(data: bytes) -> str:
+def _extract_from_pdf(data: bytes) -> tuple[str, int]:
+    """PDF 페이지별 텍스트를 추출해 정규화한다. (정규화된 텍스트, 정규화 전 글자 수) 반환."""
+    # pypdf는 import 비용이 커서 PDF 업로드가 처음 들어올 때 불러온다 (콜드 스타트 단축)
+    from pypdf import PdfReader
+
     reader = PdfReader(BytesIO(data))
     chunks: list[str] = []
     for page in reader.pages:
@@ -27,12 +44,47 @@ def _extract_from_pdf(data: bytes) -> str:
             page_text = ""
         if page_text:
             chunks.append(page_text)
-    return _truncate("\n".join(chunks))
+    # 잘라내기는 캐시 조회 후 요청별 한도로 적용 (같은 파일을 한도가 다른 경로에서 재사용)
+    raw_chars = sum(len(c) for c in chunks) + max(0, len(chunks) - 1)
+    return normalize_pages(chunks), raw_chars
+
+
+def _decompress_gzip(data: bytes, max_size: int | None = None) -> bytes:
+    """gzip으로 압축 전송된 파일 파트를 해제한다. 압축 폭탄 방지를 위해 크기를 제한한다."""
+    if max_size is None:
+        max_size = MAX_DECOMPRESSED_BYTES
+    decompressor = zlib.decompressobj(wbits=31)
+    try:
+        out = decompressor.decompress(data, max_size + 1)
+    except zlib.error as e:
+        raise ValueError(f"압축된 파일을 해제할 수 없습니다: {e}") from e
+    if len(out) > max_size or decompressor.unconsumed_tail:
+        raise ValueError("압축 해제된 파일이 너무 큽니다.")
+    return out
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    PDF 파싱용 프로세스 풀 (지연 생성).
+    pypdf 파싱은 순수 파이썬 CPU 작업이라 스레드로는 GIL 때문에 병렬화되지 않는다.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.EXTRACTION_WORKERS)
+    return _pool
 
 
-def _extract_from_txt(data: bytes) -> str:
-    text = data.decode("utf-8", errors="ignore")
-    return _truncate(text)
+def shutdown_extraction_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
 
 
 def detect_extension(filename: str | None) -> SupportedExt | None:
@@ -46,36 +98,190 @@ def detect_extension(filename: str | None) -> SupportedExt | None:
     return None
 
 
-async def extract_text_from_upload(file: UploadFile) -> str:
+@dataclass
+class ExtractedDocument:
+    """업로드 문서 추출 결과와 처리 메타데이터."""
+
+    filename: str | None
+    text: str
+    content_hash: str  # 원본(압축 해제 후) 바이트의 SHA-256 (TXT는 실제로 읽은 앞부분까지)
+    cache_hit: Optional[str] = None  # "memory" | "shared" | None(캐시 미스/미사용)
+    extract_ms: float = 0.0  # 이번 요청에서 실제로 걸린 추출 시간
+    saved_ms: float = 0.0  # 캐시 적중으로 건너뛴 원래 추출 시간
+    chars_before: int = 0  # 정규화 전 추출 글자 수
+    chars_after: int = 0  # 정규화 후 글자 수 (길이 제한 적용 전)
+    encoding: Optional[str] = None  # TXT에서 판별한 인코딩 (PDF는 None)
+    bytes_read: int = 0  # TXT에서 실제로 읽은 바이트 수 (압축 해제 후)
+    truncated: bool = False  # 길이 제한을 채워 나머지를 읽지 않았거나 잘라냈는지
+
+    def report(self) -> dict:
+        """응답에 포함할 추출 처리 정보"""
+        return {
+            "cache": self.cache_hit,
+            "extract_ms": round(self.extract_ms, 1),
+            "saved_ms": round(self.saved_ms, 1),
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            "encoding": self.encoding,
+            "bytes_read": self.bytes_read,
+            "truncated": self.truncated,
+        }
+
+
+async def extract_document(file: UploadFile, max_length: int = MAX_TEXT_LENGTH) -> ExtractedDocument:
     """
     업로드된 파일(메모리 상)의 내용을 텍스트로 추출한다.
 
-    - PDF: pypdf로 텍스트 추출
-    - TXT: UTF-8로 디코딩
-    - 최대 길이: 15,000자
+    - PDF: pypdf로 텍스트 추출 (내용 해시 기반 캐시 적중 시 파싱 생략)
+    - TXT: 인코딩(BOM/UTF-8/CP949)을 판별해 조각 단위로 디코딩하고, 길이 제한을 채우면 나머지는 읽지 않음
+    - 반복 머리글/바닥글, 쪽 번호, 불필요한 공백 제거 (normalize 모듈)
+    - 최대 길이: max_length자 (기본 15,000자)
+    - 파트 헤더에 Content-Encoding: gzip이 있으면 먼저 압축 해제
     """
     ext = detect_extension(file.filename)
     if ext is None:
         raise ValueError("지원하지 않는 파일 형식입니다. pdf 또는 txt만 업로드해 주세요.")
+    content_encoding = file.headers.get("content-encoding")
+    if ext == "txt":
+        # 업로드 임시 파일에서 필요한 만큼만 읽으므로 읽기와 추출을 한 구간으로 잡는다
+        with memory_section("upload:extract"):
+            return await _extract_txt_stream(file, content_encoding, max_length)
+    with memory_section("upload:read"):
+        data = await file.read()
+    return await extract_bytes(file.filename, data, content_encoding, max_length)
+
+
+async def extract_bytes(
+    filename: str | None,
+    data: bytes,
+    content_encoding: str | None = None,
+    max_length: int = MAX_TEXT_LENGTH,
+) -> ExtractedDocument:
+    """
+    이미 메모리에 있는 파일 바이트에서 텍스트를 추출한다 (WebSocket 업로드 등).
+    동작은 extract_document와 같다.
+    """
+    ext = detect_extension(filename)
+    if ext is None:
+        raise ValueError("지원하지 않는 파일 형식입니다. pdf 또는 txt만 업로드해 주세요.")
+
+    # PDF 파싱(PdfReader)은 프로세스 풀에서 실행되므로 여기서는 압축 해제/디코딩/정규화 결과만 잡힌다
+    with memory_section("upload:extract"):
+        if ext == "txt":
+            return _extract_txt_bytes(filename, data, content_encoding, max_length)
+        return await _extract(filename, ext, data, content_encoding, max_length)
+
+
+def _is_gzip(content_encoding: str | None) -> bool:
+    return (content_encoding or "").lower() == "gzip"
+
+
+def _txt_document(filename: str | None, reader: TextBudgetReader, started: float) -> ExtractedDocument:
+    if reader.bytes_read == 0:
+        raise ValueError("빈 파일이거나 내용을 읽을 수 없습니다.")
+    text, normalized_chars = reader.finish()
+    doc = ExtractedDocument(
+        filename=filename,
+        text=text,
+        content_hash=reader.content_hash,
+        extract_ms=(time.perf_counter() - started) * 1000,
+        chars_before=reader.raw_chars,
+        chars_after=normalized_chars,
+        encoding=reader.encoding,
+        bytes_read=reader.bytes_read,
+        truncated=reader.done or normalized_chars > len(text),
+    )
+    if not doc.text.strip():
+        raise ValueError("파일에서 텍스트를 추출할 수 없습니다.")
+    return doc
+
 
-    data = await file.read()
+async def _extract_txt_stream(file: UploadFile, content_encoding: str | None, max_length: int) -> ExtractedDocument:
+    """업로드 파일을 READ_CHUNK씩 읽어 디코딩하고, 길이 제한을 채우면 읽기를 멈춘다."""
+    started = time.perf_counter()
+    reader = TextBudgetReader(max_length)
+    gunzip = Gunzip(MAX_DECOMPRESSED_BYTES) if _is_gzip(content_encoding) else None
+    while not reader.done:
+        chunk = await file.read(READ_CHUNK)
+        if not chunk:
+            break
+        for part in gunzip.feed(chunk) if gunzip else (chunk,):
+            if not reader.feed(part):
+                break
+    return _txt_document(file.filename, reader, started)
+
+
+def _extract_txt_bytes(
+    filename: str | None,
+    data: bytes,
+    content_encoding: str | None,
+    max_length: int,
+) -> ExtractedDocument:
+    """메모리에 있는 TXT 바이트를 같은 방식으로 앞에서부터 필요한 만큼만 디코딩한다."""
+    started = time.perf_counter()
+    reader = TextBudgetReader(max_length)
+    gunzip = Gunzip(MAX_DECOMPRESSED_BYTES) if _is_gzip(content_encoding) else None
+    view = memoryview(data)
+    for offset in range(0, len(view), READ_CHUNK):
+        chunk = view[offset:offset + READ_CHUNK]
+        for part in gunzip.feed(chunk) if gunzip else (bytes(chunk),):
+            if not reader.feed(part):
+                break
+        if reader.done:
+            break
+    return _txt_document(filename, reader, started)
+
+
+async def _extract(
+    filename: str | None,
+    ext: SupportedExt,
+    data: bytes,
+    content_encoding: str | None,
+    max_length: int,
+) -> ExtractedDocument:
+    if data and _is_gzip(content_encoding):
+        data = _decompress_gzip(data)
     if not data:
         raise ValueError("빈 파일이거나 내용을 읽을 수 없습니다.")
 
+    content_hash = hashlib.sha256(data).hexdigest()
+    doc = ExtractedDocument(filename=filename, text="", content_hash=content_hash)
+
+    started = time.perf_counter()
     if ext == "pdf":
-        text = _extract_from_pdf(data)
-    elif ext == "txt":
-        text = _extract_from_txt(data)
+        cache = get_extraction_cache()
+        key = cache.key(content_hash, ext)
+        cached = cache.get(key)
+        if cached is not None:
+            doc.text, seconds, doc.cache_hit, doc.chars_before = cached
+            doc.saved_ms = seconds * 1000
+        else:
+            # PDF 파싱은 CPU 작업이므로 이벤트 루프를 막지 않도록 프로세스 풀에서 실행
+            loop = asyncio.get_running_loop()
+            doc.text, doc.chars_before = await loop.run_in_executor(get_extraction_pool(), _extract_from_pdf, data)
+            cache.put(key, doc.text, time.perf_counter() - started, doc.chars_before)
     else:
         # 타입 가드용, 실제로는 도달하지 않음
         raise ValueError("지원하지 않는 파일 형식입니다.")
+    doc.extract_ms = (time.perf_counter() - started) * 1000
+    doc.chars_after = len(doc.text)
+    doc.truncated = doc.chars_after > max_length
+    doc.text = _truncate(doc.text, max_length)
 
-    if not text.strip():
+    if not doc.text.strip():
         raise ValueError("파일에서 텍스트를 추출할 수 없습니다.")
 
-    return text
-
+    return doc
 
 
+async def extract_documents(files: list[UploadFile], max_length: int = MAX_TEXT_LENGTH) -> list[ExtractedDocument]:
+    """
+    여러 업로드 파일을 동시에 추출한다.
+    캐시 미스인 PDF는 프로세스 풀에서 병렬로 파싱되므로 전체 시간은 가장 큰 문서에 가깝다.
+    """
+    return list(await asyncio.gather(*(extract_document(f, max_length) for f in files)))
 
 
+async def extract_text_from_upload(file: UploadFile) -> str:
+    """업로드 파일에서 텍스트만 추출해 반환한다 (extract_document의 간단한 버전)."""
+    return (await extract_document(file)).text
@@ -0,0 +1,111 @@
+"""
+추출 텍스트 정규화.
+
+브로슈어나 계약서 PDF는 페이지마다 같은 머리글/바닥글, 쪽 번호, 법적 고지문이 반복되고
+추출 과정에서 생긴 공백이 많아 15,000자 예산과 프롬프트 토큰을 낭비한다.
+페이지 단위 텍스트를 받아 다음을 순서대로 적용한다.
+
+1. 줄 끝 하이픈으로 나뉜 영단어 복원 ("docu-\\nment" -> "document"), 줄 안의 연속 공백 정리
+2. 페이지 위/아래 가장자리의 쪽 번호 줄 제거 ("3", "- 3 -", "Page 3 of 10", "3 / 10", "3페이지", 2쪽 이상일 때만)
+3. 여러 페이지에 반복되는 줄 제거 (첫 등장만 유지)
+4. 연속된 빈 줄 정리
+"""
+
+import re
+from collections import Counter
+from typing import List
+
+
+# 반복 줄로 판단하려면 최소 이 비율 이상의 페이지에 나와야 함
+REPEAT_PAGE_RATIO = 0.5
+# 페이지가 이보다 적으면 반복 줄 판단을 하지 않음 (2쪽짜리 문서의 우연한 일치 방지)
+REPEAT_MIN_PAGES = 3
+# 이보다 긴 줄은 본문일 가능성이 높아 반복 판단에서 제외
+REPEAT_MAX_LINE = 200
+# 쪽 번호는 페이지 위/아래 몇 줄 안에서만 찾는다 (본문 표의 숫자 보호)
+PAGE_NUMBER_EDGE_LINES = 2
+# 페이지가 이보다 적으면 쪽 번호를 지우지 않음 (페이지 구분 없는 TXT 첫/끝 줄의 "2024", "1" 보호)
+PAGE_NUMBER_MIN_PAGES = 2
+# 머리글/바닥글로 보고 숫자를 무시하고 비교할 페이지 위/아래 줄 수
+HEADER_FOOTER_LINES = 2
+
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:"
+    r"(?:page|p\.)?\s*\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?"
+    r"|-\s*\d{1,4}\s*-"
+    r"|\d{1,4}\s*(?:페이지|쪽)"
+    r")$",
+    re.IGNORECASE,
+)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile(r"[ \t 　]+")
+_HYPHEN_BREAK_RE = re.compile(r"([A-Za-z])-[ \t]*\n[ \t]*([a-z])")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _edge_indexes(lines: List[str], count: int) -> set:
+    """페이지 위/아래 가장자리(비어 있지 않은 줄 기준 count줄씩)의 줄 번호"""
+    filled = [i for i, line in enumerate(lines) if line]
+    return set(filled[:count] + filled[-count:])
+
+
+def _line_signatures(lines: List[str]) -> List[str]:
+    """
+    반복 판단용 줄 서명.
+    머리글/바닥글 위치의 줄은 숫자를 가려 "2024.03 기밀 - 3"처럼 숫자만 다른 줄도 같은 줄로 보고,
+    본문 줄은 그대로 비교한다 (숫자만 다른 표 행 등을 지우지 않도록).
+    """
+    edges = _edge_indexes(lines, HEADER_FOOTER_LINES)
+    return [
+        ("e:" + _DIGITS_RE.sub("#", line.lower())) if i in edges else ("b:" + line)
+        for i, line in enumerate(lines)
+    ]
+
+
+def _strip_page_numbers(lines: List[str]) -> List[str]:
+    edges = _edge_indexes(lines, PAGE_NUMBER_EDGE_LINES)
+    return [line for i, line in enumerate(lines) if i not in edges or not _PAGE_NUMBER_RE.match(line)]
+
+
+def normalize_pages(pages: List[str]) -> str:
+    """페이지별 추출 텍스트를 정규화해 하나의 텍스트로 합친다."""
+    split_pages = []
+    strip_numbers = len(pages) >= PAGE_NUMBER_MIN_PAGES
+    for page in pages:
+        # 하이픈 복원은 반복 줄 판단 전에 해야 나뉜 단어 뒷부분이 반복 줄로 지워지지 않는다
+        page = _HYPHEN_BREAK_RE.sub(r"\1\2", page)
+        lines = [_SPACES_RE.sub(" ", line).strip() for line in page.splitlines()]
+        if strip_numbers:
+            lines = _strip_page_numbers(lines)
+        split_pages.append(list(zip(lines, _line_signatures(lines))))
+
+    repeated: set = set()
+    if len(split_pages) >= REPEAT_MIN_PAGES:
+        # 한 페이지 안에서 여러 번 나온 줄은 한 번으로 센다
+        page_counts = Counter(
+            sig
+            for page in split_pages
+            for sig in {sig for line, sig in page if line and len(line) <= REPEAT_MAX_LINE}
+        )
+        threshold = max(2, int(len(split_pages) * REPEAT_PAGE_RATIO))
+        repeated = {sig for sig, count in page_counts.items() if count >= threshold}
+
+    seen: set = set()
+    kept_pages = []
+    for page in split_pages:
+        kept = []
+        for line, sig in page:
+            if line and sig in repeated:
+                if sig in seen:
+                    continue
+                seen.add(sig)
+            kept.append(line)
+        kept_pages.append("\n".join(kept))
+
+    text = "\n".join(kept_pages)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def normalize_text(text: str) -> str:
+    """페이지 구분이 없는 텍스트(TXT). 폼 피드(\\f)가 있으면 페이지로 나눠 처리한다."""
+    return normalize_pages(text.split("\f"))
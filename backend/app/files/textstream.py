@@ -0,0 +1,165 @@
+"""
+TXT 업로드의 점진적 디코딩.
+
+큰 로그/내보내기 파일을 전부 디코딩한 뒤 잘라내는 대신, 업로드 파일에서 조각 단위로 읽어
+증분 디코더로 바꾸고 정규화 후 글자 수가 예산(max_length)을 채우면 바로 읽기를 멈춘다.
+메모리와 시간은 파일 크기가 아니라 실제로 쓰는 텍스트 양에 비례한다.
+
+인코딩은 앞부분 표본(SAMPLE_BYTES)으로 판별한다.
+
+1. BOM: UTF-8, UTF-16 LE/BE, UTF-32 LE/BE
+2. BOM 없는 UTF-16 (ASCII 위주 텍스트의 한쪽 바이트가 대부분 0)
+3. UTF-8로 엄격하게 디코딩되면 UTF-8
+4. CP949(EUC-KR 상위 호환)로 엄격하게 디코딩되면 CP949
+5. 그 외에는 UTF-8 (잘못된 바이트는 버리지 않고 U+FFFD로 표시)
+"""
+
+import codecs
+import hashlib
+import zlib
+from typing import Iterator, Optional
+
+from .normalize import normalize_text
+
+
+SAMPLE_BYTES = 64 * 1024  # 인코딩 판별에 쓰는 앞부분 크기
+READ_CHUNK = 64 * 1024  # 업로드 파일/압축 해제 조각 크기
+
+_BOMS = (
+    # UTF-32 LE BOM은 UTF-16 LE BOM으로 시작하므로 먼저 확인
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# BOM 없는 UTF-16으로 볼 0 바이트 비율 (짝수/홀수 위치 중 한쪽)
+_UTF16_ZERO_RATIO = 0.3
+
+
+def _decodes(sample: bytes, encoding: str) -> bool:
+    """표본이 encoding으로 오류 없이 디코딩되는지 (끝에서 잘린 멀티바이트 문자는 허용)."""
+    try:
+        codecs.getincrementaldecoder(encoding)("strict").decode(sample, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detect_encoding(sample: bytes) -> str:
+    """앞부분 바이트로 TXT 인코딩을 판별한다."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if len(sample) >= 4:
+        even, odd = sample[0::2], sample[1::2]
+        if odd.count(0) >= len(odd) * _UTF16_ZERO_RATIO and even.count(0) < len(even) * 0.05:
+            return "utf-16-le"
+        if even.count(0) >= len(even) * _UTF16_ZERO_RATIO and odd.count(0) < len(odd) * 0.05:
+            return "utf-16-be"
+    if _decodes(sample, "utf-8"):
+        return "utf-8"
+    if _decodes(sample, "cp949"):
+        return "cp949"
+    return "utf-8"
+
+
+class Gunzip:
+    """gzip 조각을 READ_CHUNK 단위로 풀어 주는 해제기 (압축 폭탄 방지를 위해 총량 제한)."""
+
+    def __init__(self, max_size: int) -> None:
+        self._decompressor = zlib.decompressobj(wbits=31)
+        self._max_size = max_size
+        self.total = 0
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        try:
+            out = self._decompressor.decompress(data, READ_CHUNK)
+            while True:
+                self.total += len(out)
+                if self.total > self._max_size:
+                    raise ValueError("압축 해제된 파일이 너무 큽니다.")
+                if out:
+                    yield out
+                if not self._decompressor.unconsumed_tail:
+                    return
+                out = self._decompressor.decompress(self._decompressor.unconsumed_tail, READ_CHUNK)
+        except zlib.error as e:
+            raise ValueError(f"압축된 파일을 해제할 수 없습니다: {e}") from e
+
+
+class TextBudgetReader:
+    """
+    바이트 조각을 받아 점진적으로 디코딩하고, 정규화한 텍스트가 max_length자를 채우면 멈추는 리더.
+
+    정규화(반복 줄 제거 등)는 문서 전체를 봐야 하므로, 디코딩한 글자 수가 예산에 닿을 때마다
+    지금까지 읽은 부분을 정규화해 보고 모자라면 두 배 분량이 될 때까지 더 읽는다 (총 비용은 선형).
+    """
+
+    def __init__(self, max_length: int) -> None:
+        self.max_length = max_length
+        self.encoding: Optional[str] = None
+        self.bytes_read = 0
+        self.raw_chars = 0  # 디코딩한(정규화 전) 글자 수
+        self.done = False  # 예산을 채워 더 읽지 않음
+        self._sha = hashlib.sha256()
+        self._pending = bytearray()  # 인코딩 판별 전까지 모아 두는 앞부분
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._parts: list[str] = []
+        self._check_at = max_length
+        self._normalized: Optional[str] = None
+
+    @property
+    def content_hash(self) -> str:
+        """읽은 바이트(압축 해제 후)의 SHA-256. 예산을 채워 멈췄으면 앞부분만의 해시."""
+        return self._sha.hexdigest()
+
+    def feed(self, data: bytes) -> bool:
+        """조각 하나를 넣는다. 더 읽어야 하면 True."""
+        if self.done or not data:
+            return not self.done
+        self.bytes_read += len(data)
+        self._sha.update(data)
+        if self._decoder is None:
+            self._pending += data
+            if len(self._pending) < SAMPLE_BYTES:
+                return True
+            self._start()
+        else:
+            self._append(self._decoder.decode(data))
+        return not self.done
+
+    def _start(self) -> None:
+        sample = bytes(self._pending)
+        self._pending = bytearray()
+        self.encoding = detect_encoding(sample[:SAMPLE_BYTES])
+        # 판별 이후 잘못된 바이트가 나와도 조용히 버리지 않고 U+FFFD로 남긴다
+        self._decoder = codecs.getincrementaldecoder(self.encoding)("replace")
+        self._append(self._decoder.decode(sample))
+
+    def _append(self, text: str) -> None:
+        if not text:
+            return
+        self._parts.append(text)
+        self.raw_chars += len(text)
+        if self.raw_chars < self._check_at:
+            return
+        joined = "".join(self._parts)
+        self._parts = [joined]
+        normalized = normalize_text(joined)
+        if len(normalized) >= self.max_length:
+            self.done = True
+            self._normalized = normalized
+        else:
+            self._check_at = self.raw_chars * 2
+
+    def finish(self) -> tuple[str, int]:
+        """(예산으로 자른 정규화 텍스트, 자르기 전 정규화 글자 수)"""
+        if self._decoder is None:
+            self._start()
+        if self._normalized is None:
+            self._parts.append(self._decoder.decode(b"", final=True))
+            self.raw_chars = sum(len(p) for p in self._parts)
+            self._normalized = normalize_text("".join(self._parts))
+        self._parts = []
+        return self._normalized[: self.max_length], len(self._normalized)
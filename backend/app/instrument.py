@@ -0,0 +1,135 @@
+"""
+에이전트 그래프 노드별 실행 계측.
+
+profile_nodes() 블록 안에서 실행된 그래프 노드마다 다음을 모은다.
+
+- wall: 노드 전체 경과 시간
+- cpu: 노드를 실행한 스레드의 CPU 시간 (외부 응답을 기다리는 동안은 늘지 않음)
+- external: LLM 응답/웹 검색을 기다린 시간 (external_wait() 블록 합계)
+- app: wall - external, 즉 파이프라인 자체 처리 시간
+- alloc_peak: tracemalloc이 켜져 있으면 노드 실행 중 최대 추가 할당량
+
+카세트 재생(app.cassette)과 함께 쓰면 외부 지연과 무관하게 코드 변경 전후의 노드별 오버헤드를 비교할 수 있다.
+블록 밖에서는 노드마다 ContextVar 조회 한 번만 추가된다.
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class NodeStats:
+    """노드 하나의 누적 측정값 (초/바이트)."""
+
+    __slots__ = ("calls", "wall", "cpu", "external", "alloc_peak")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.external = 0.0
+        self.alloc_peak = 0
+
+    def to_dict(self) -> dict:
+        calls = max(1, self.calls)
+        return {
+            "calls": self.calls,
+            "wall_ms": round(self.wall * 1000 / calls, 3),
+            "cpu_ms": round(self.cpu * 1000 / calls, 3),
+            "external_ms": round(self.external * 1000 / calls, 3),
+            "app_ms": round(max(0.0, self.wall - self.external) * 1000 / calls, 3),
+            "alloc_peak_kb": round(self.alloc_peak / 1024, 1),
+        }
+
+
+class NodeProfile:
+    """profile_nodes() 블록 하나에서 모은 노드별 측정값 (노드당 호출 평균으로 보고)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.nodes: Dict[str, NodeStats] = {}
+
+    def add(self, name: str, wall: float, cpu: float, external: float, alloc_peak: int) -> None:
+        with self._lock:
+            stats = self.nodes.setdefault(name, NodeStats())
+            stats.calls += 1
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.external += external
+            stats.alloc_peak = max(stats.alloc_peak, alloc_peak)
+
+    def to_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self.nodes.items()}
+
+
+class _Running:
+    __slots__ = ("external",)
+
+    def __init__(self) -> None:
+        self.external = 0.0
+
+
+_profile: ContextVar[Optional[NodeProfile]] = ContextVar("node_profile", default=None)
+_running: ContextVar[Optional[_Running]] = ContextVar("running_node", default=None)
+
+
+@contextmanager
+def profile_nodes(profile: Optional[NodeProfile] = None) -> Iterator[NodeProfile]:
+    """이 블록에서(같은 컨텍스트로) 실행되는 그래프 노드를 계측한다."""
+    profile = profile or NodeProfile()
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+@contextmanager
+def external_wait() -> Iterator[None]:
+    """외부 서비스 응답을 기다리는 구간. 실행 중인 노드의 external 시간에 더한다."""
+    running = _running.get()
+    if running is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        running.external += time.perf_counter() - started
+
+
+def instrument_node(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    그래프 노드 함수를 계측 래퍼로 감싼다.
+    functools.wraps로 원래 시그니처를 노출하므로 LangGraph가 config 인자를 그대로 넘긴다.
+    """
+
+    @wraps(fn)
+    def wrapped(state: Any, **kwargs: Any) -> Any:
+        profile = _profile.get()
+        if profile is None:
+            return fn(state, **kwargs)
+
+        running = _Running()
+        token = _running.set(running)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            return fn(state, **kwargs)
+        finally:
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            peak = tracemalloc.get_traced_memory()[1] - base if tracing else 0
+            _running.reset(token)
+            profile.add(name, wall, cpu, running.external, max(0, peak))
+
+    return wrapped
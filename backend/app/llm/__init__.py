@@ -0,0 +1,76 @@
+"""
+LLM 호출 계층.
+
+모든 채팅 완성 호출(에이전트 노드, 조항 검토, 문서 번역)은 get_llm()이 반환하는 라우터를 거친다.
+LLM_PROVIDERS 설정에 따라 OpenAI, OpenAI 호환 엔드포인트, 프로세스 내 스텁 공급자를 만들고
+최근 지연 시간이 가장 짧은 정상 공급자로 호출을 보낸다.
+CASSETTE_MODE가 record면 공급자 호출을 녹화하고, replay면 녹화된 응답만으로 동작한다.
+"""
+
+import threading
+from typing import List, Optional
+
+from ..cassette import get_cassette
+from ..config import settings
+from .base import ChunkStream, LLMProvider
+from .openai_compat import OpenAIProvider
+from .replay import RecordingProvider, ReplayProvider
+from .router import LLMRouter, is_retryable
+from .stub import StubProvider
+
+
+def create_provider(config: dict) -> LLMProvider:
+    """설정 dict(config.LLM_PROVIDERS 항목)로 공급자를 만든다."""
+    if config["kind"] == "stub":
+        return StubProvider(config["name"], config["model"], delay=config["delay"])
+    return OpenAIProvider(
+        config["name"],
+        config["model"],
+        api_key=config["api_key"],
+        base_url=config["base_url"],
+        timeout=config["timeout"],
+        connect_timeout=config["connect_timeout"],
+        max_connections=config["max_connections"],
+        max_retries=config["max_retries"],
+        kind=config["kind"],
+    )
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm() -> LLMRouter:
+    """공급자 라우터 싱글톤 (처음 호출 시 생성)"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            cassette = get_cassette()
+            if cassette is not None and cassette.mode == "replay":
+                # 재생 모드에서는 설정된 공급자 대신 카세트만 사용 (네트워크 호출 없음)
+                providers: List[LLMProvider] = [ReplayProvider(cassette, settings.OPENAI_MODEL)]
+            else:
+                providers = [create_provider(c) for c in settings.LLM_PROVIDERS]
+                if cassette is not None:
+                    providers = [RecordingProvider(p, cassette) for p in providers]
+            _router = LLMRouter(
+                providers,
+                window=settings.LLM_LATENCY_WINDOW,
+                cooldown=settings.LLM_FAILURE_COOLDOWN,
+                probe_interval=settings.LLM_PROBE_INTERVAL,
+            )
+    return _router
+
+
+__all__ = [
+    "ChunkStream",
+    "LLMProvider",
+    "LLMRouter",
+    "OpenAIProvider",
+    "RecordingProvider",
+    "ReplayProvider",
+    "StubProvider",
+    "create_provider",
+    "get_llm",
+    "is_retryable",
+]
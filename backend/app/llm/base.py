@@ -0,0 +1,54 @@
+"""
+LLM 공급자 공통 인터페이스.
+
+모든 공급자는 OpenAI SDK의 응답 타입(ChatCompletion, ChatCompletionChunk 스트림)을 그대로 반환한다.
+호출하는 쪽(에이전트 노드, 조항 검토, 번역)은 공급자 종류와 무관하게 같은 코드로 응답을 다룬다.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Protocol
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+class ChunkStream(Protocol):
+    """청크를 순회하며 with 블록을 벗어나면 연결을 닫는 스트림 (openai.Stream과 같은 모양)."""
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]: ...
+
+    def __enter__(self) -> "ChunkStream": ...
+
+    def __exit__(self, *exc: Any) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class LLMProvider(ABC):
+    """
+    채팅 완성 API 공급자.
+
+    공급자마다 자체 커넥션 풀과 타임아웃을 가지며, model은 공급자 설정에서 정해진다.
+    """
+
+    kind = "base"
+
+    def __init__(self, name: str, model: str) -> None:
+        self.name = name
+        self.model = model
+
+    @abstractmethod
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        """비스트리밍 호출. kwargs는 chat.completions.create 인자(response_format 등)."""
+
+    @abstractmethod
+    def stream(self, messages: List[Dict], **kwargs: Any) -> ChunkStream:
+        """스트리밍 호출. 응답 헤더를 받은 뒤(첫 청크 전) 반환한다."""
+
+    def warmup(self, timeout: float) -> None:
+        """커넥션을 미리 열어 둔다 (선택)."""
+
+    def close(self) -> None:
+        """커넥션 풀 정리 (선택)."""
+
+    def describe(self) -> dict:
+        return {"kind": self.kind, "model": self.model}
@@ -0,0 +1,64 @@
+"""
+OpenAI API 및 OpenAI 호환 엔드포인트(vLLM, Ollama, LiteLLM 등) 공급자.
+
+공급자마다 별도의 httpx 커넥션 풀과 타임아웃을 쓰므로,
+한 엔드포인트가 느려져 커넥션을 붙잡고 있어도 다른 공급자의 호출은 영향을 받지 않는다.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from .base import ChunkStream, LLMProvider
+
+
+class OpenAIProvider(LLMProvider):
+    """openai SDK 클라이언트 하나를 감싼 공급자."""
+
+    kind = "openai"
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 20,
+        max_retries: int = 2,
+        kind: str = "openai",
+    ) -> None:
+        super().__init__(name, model)
+        self.kind = kind
+        self.base_url = base_url
+        self._http = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+        # base_url이 None이면 SDK가 OPENAI_BASE_URL 환경 변수 또는 기본 주소를 사용
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            max_retries=max_retries,
+            http_client=self._http,
+        )
+
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        return self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+
+    def stream(self, messages: List[Dict], **kwargs: Any) -> ChunkStream:
+        return self.client.chat.completions.create(model=self.model, messages=messages, stream=True, **kwargs)
+
+    def warmup(self, timeout: float) -> None:
+        """가벼운 API 호출로 TLS 커넥션 풀을 미리 열어 둔다."""
+        self.client.with_options(timeout=timeout, max_retries=0).models.list()
+
+    def close(self) -> None:
+        self._http.close()
+
+    def describe(self) -> dict:
+        return {**super().describe(), "base_url": str(self.client.base_url)}
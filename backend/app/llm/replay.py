@@ -0,0 +1,137 @@
+"""
+카세트(app.cassette)를 쓰는 LLM 공급자.
+
+- RecordingProvider: 실제 공급자를 감싸 응답과 소요 시간을 녹화한다
+- ReplayProvider: 네트워크 없이 녹화된 응답을 돌려준다 (녹화된 지연 또는 지연 없음)
+"""
+
+import time
+from typing import Any, Dict, Iterator, List
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from ..cassette import Cassette
+from .base import ChunkStream, LLMProvider
+
+
+def completion_key(cassette: Cassette, kind: str, messages: List[Dict], kwargs: Dict) -> str:
+    """모델/공급자와 무관한 요청 키 (메시지 + 호출 인자)"""
+    return cassette.key(kind, messages, kwargs)
+
+
+class _RecordingStream:
+    """청크를 그대로 넘기면서 모아 두었다가 스트림을 끝까지 읽으면 녹화한다."""
+
+    def __init__(self, stream: ChunkStream, cassette: Cassette, key: str, started: float) -> None:
+        self._stream = stream
+        self._cassette = cassette
+        self._key = key
+        self._started = started
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        chunks: List[dict] = []
+        first_at = None
+        for chunk in self._stream:
+            if first_at is None:
+                first_at = time.perf_counter()
+            chunks.append(chunk.model_dump(exclude_none=True))
+            yield chunk
+        # 중간에 닫힌(취소된) 스트림은 재생해도 같은 결과가 아니므로 녹화하지 않음
+        ended = time.perf_counter()
+        self._cassette.record(
+            "stream", self._key, chunks,
+            latency=(first_at or ended) - self._started,
+            duration=ended - self._started,
+        )
+
+    def __enter__(self) -> "_RecordingStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class RecordingProvider(LLMProvider):
+    """실제 공급자 호출을 카세트에 녹화하는 래퍼."""
+
+    def __init__(self, inner: LLMProvider, cassette: Cassette) -> None:
+        super().__init__(inner.name, inner.model)
+        self.kind = inner.kind
+        self.inner = inner
+        self.cassette = cassette
+
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        started = time.perf_counter()
+        response = self.inner.complete(messages, **kwargs)
+        self.cassette.record(
+            "complete", completion_key(self.cassette, "complete", messages, kwargs),
+            response.model_dump(exclude_none=True), time.perf_counter() - started,
+        )
+        return response
+
+    def stream(self, messages: List[Dict], **kwargs: Any) -> ChunkStream:
+        started = time.perf_counter()
+        stream = self.inner.stream(messages, **kwargs)
+        return _RecordingStream(stream, self.cassette, completion_key(self.cassette, "stream", messages, kwargs), started)
+
+    def warmup(self, timeout: float) -> None:
+        self.inner.warmup(timeout)
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def describe(self) -> dict:
+        return {**self.inner.describe(), "cassette": "record"}
+
+
+class _ReplayStream:
+    """녹화된 청크를 녹화 당시 간격(첫 청크 지연 + 나머지 균등 분배)으로 돌려준다."""
+
+    def __init__(self, cassette: Cassette, entry: dict) -> None:
+        self._cassette = cassette
+        self._entry = entry
+        self.closed = False
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        chunks = self._entry["response"]
+        first = self._entry["latency"]
+        gap = max(0.0, self._entry.get("duration", first) - first) / max(1, len(chunks) - 1)
+        for index, data in enumerate(chunks):
+            if self.closed:
+                return
+            self._cassette.wait(first if index == 0 else gap)
+            yield ChatCompletionChunk.model_validate(data)
+
+    def __enter__(self) -> "_ReplayStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ReplayProvider(LLMProvider):
+    """카세트에서 응답을 재생하는 공급자. 녹화되지 않은 요청은 CassetteMiss를 발생시킨다."""
+
+    kind = "replay"
+
+    def __init__(self, cassette: Cassette, model: str) -> None:
+        super().__init__("replay", model)
+        self.cassette = cassette
+
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        entry = self.cassette.replay("complete", completion_key(self.cassette, "complete", messages, kwargs))
+        self.cassette.wait(entry["latency"])
+        return ChatCompletion.model_validate(entry["response"])
+
+    def stream(self, messages: List[Dict], **kwargs: Any) -> ChunkStream:
+        entry = self.cassette.replay("stream", completion_key(self.cassette, "stream", messages, kwargs))
+        return _ReplayStream(self.cassette, entry)
+
+    def describe(self) -> dict:
+        return {**super().describe(), "cassette": str(self.cassette.path)}
@@ -0,0 +1,256 @@
+"""
+지연 시간 기반 LLM 공급자 선택과 장애 전환(failover).
+
+공급자별로 최근 LLM_LATENCY_WINDOW번의 호출 지연 시간을 호출 종류별로 따로 보관하고
+(비스트리밍은 응답까지, 스트리밍은 첫 청크까지), 매 호출마다 정상 공급자 중 같은 종류의
+지연 시간 중앙값이 가장 작은 공급자를 먼저 시도한다. 두 값을 한 창에 섞으면 주로 스트리밍에 쓰인
+공급자가 짧은 첫 청크 시간 덕에 비스트리밍 호출에서도 빠른 것처럼 보인다.
+
+- 호출이 실패(연결 오류, 타임아웃, 5xx/408/409/429)하면 그 공급자는 LLM_FAILURE_COOLDOWN초 동안 후순위로 밀리고
+  같은 요청은 다음 공급자로 다시 시도한다. 스트리밍은 스트림을 여는 단계(응답 헤더 수신 전)의 실패만 전환한다.
+- 그 밖의 오류(잘못된 요청의 4xx, 카세트 누락, 코드 오류 등)는 공급자를 바꿔도 같으므로 전환하지 않고 그대로 전달한다.
+- 아직 그 종류의 측정값이 없거나 LLM_PROBE_INTERVAL초 동안 선택되지 않은 공급자는 한 번 먼저 시도해 지연 시간을 다시 잰다.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Literal, Optional, Tuple
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from ..cassette import CassetteMiss
+from ..instrument import external_wait
+from ..usage import current_usage
+from .base import ChunkStream, LLMProvider
+
+
+logger = logging.getLogger(__name__)
+
+Call = Literal["complete", "stream"]
+CALLS: Tuple[Call, ...] = ("complete", "stream")
+
+_RETRYABLE_STATUS = (408, 409, 429)
+# SDK를 거치지 않는 공급자가 낼 수 있는 네트워크 오류
+_RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, ConnectionError, TimeoutError)
+_DONE = object()
+
+
+def is_retryable(error: Exception) -> bool:
+    """다른 공급자로 다시 시도할 만한 오류인지. 여기 나열한 오류만 전환하고 나머지는 그대로 전달한다."""
+    if isinstance(error, CassetteMiss):
+        return False
+    if isinstance(error, _RETRYABLE_ERRORS):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code in _RETRYABLE_STATUS
+    return False
+
+
+class _ProviderState:
+    """공급자 하나의 호출 종류별 최근 지연 시간과 상태 (라우터 락 아래에서만 변경)."""
+
+    def __init__(self, provider: LLMProvider, window: int) -> None:
+        self.provider = provider
+        self.latencies: Dict[Call, Deque[float]] = {call: deque(maxlen=max(1, window)) for call in CALLS}
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.last_error: Optional[str] = None
+
+    def median(self, call: Call) -> float:
+        ordered = sorted(self.latencies[call])
+        return ordered[len(ordered) // 2] if ordered else 0.0
+
+
+def _percentiles(latencies: Deque[float]) -> Tuple[Optional[float], Optional[float]]:
+    """(p50, p95) 밀리초. 측정값이 없으면 None"""
+    ordered = sorted(latencies)
+    if not ordered:
+        return None, None
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return round(p50 * 1000, 1), round(p95 * 1000, 1)
+
+
+class _RoutedStream:
+    """공급자 스트림을 감싸 첫 청크 지연 시간과 도중 실패를 라우터에 기록한다."""
+
+    def __init__(self, router: "LLMRouter", state: _ProviderState, stream: ChunkStream, started: float) -> None:
+        self._router = router
+        self._state = state
+        self._stream = stream
+        self._started = started
+        self.provider = state.provider.name
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        first = True
+        chunks = iter(self._stream)
+        usage, model = None, self._state.provider.model
+        try:
+            while True:
+                # 청크를 기다리는 시간은 노드 계측에서 외부 대기로 집계
+                with external_wait():
+                    chunk = next(chunks, _DONE)
+                if chunk is _DONE:
+                    break
+                if first:
+                    first = False
+                    self._router._record_success(self._state, "stream", time.monotonic() - self._started)
+                if chunk.usage is not None:
+                    # stream_options.include_usage를 요청하면 마지막 청크에 사용량이 온다
+                    usage, model = chunk.usage, chunk.model or model
+                yield chunk
+        except Exception as e:
+            # 이미 보낸 토큰이 있으므로 전환하지 않고 실패만 기록
+            self._router._record_failure(self._state, e)
+            raise
+        finally:
+            # 중간에 닫힌(취소된) 스트림은 사용량을 모르므로 호출 수만 센다
+            record = current_usage()
+            if record is not None:
+                record.add_llm(model, usage)
+        if first:
+            # 청크 없이 끝난 스트림도 응답은 받은 것으로 본다
+            self._router._record_success(self._state, "stream", time.monotonic() - self._started)
+
+    def __enter__(self) -> "_RoutedStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class LLMRouter:
+    """설정된 공급자 중 가장 빠른 정상 공급자로 호출을 보내는 라우터."""
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        window: int = 50,
+        cooldown: float = 30.0,
+        probe_interval: float = 60.0,
+    ) -> None:
+        if not providers:
+            raise ValueError("LLM 공급자가 하나 이상 필요합니다.")
+        self._states = [_ProviderState(p, window) for p in providers]
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.failovers = 0
+        self._lock = threading.Lock()
+
+    @property
+    def providers(self) -> List[LLMProvider]:
+        return [s.provider for s in self._states]
+
+    def _ranked(self, call: Call) -> List[_ProviderState]:
+        """이번 호출에서 시도할 순서: 재측정 대상 → 정상(같은 종류 지연 중앙값 순) → 냉각 중(회복 빠른 순)."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [s for s in self._states if s.cooldown_until <= now]
+            cooling = sorted((s for s in self._states if s.cooldown_until > now), key=lambda s: s.cooldown_until)
+            stale = [
+                s for s in healthy
+                if not s.latencies[call] or (len(self._states) > 1 and now - s.last_used >= self.probe_interval)
+            ]
+            probe = min(stale, key=lambda s: s.last_used) if stale else None
+            ordered = sorted((s for s in healthy if s is not probe), key=lambda s: s.median(call))
+            if probe is not None:
+                ordered.insert(0, probe)
+            for state in ordered[:1] or cooling[:1]:
+                state.last_used = now
+        return ordered + cooling
+
+    def _record_success(self, state: _ProviderState, call: Call, latency: float) -> None:
+        with self._lock:
+            state.calls += 1
+            state.latencies[call].append(latency)
+            state.consecutive_failures = 0
+            state.cooldown_until = 0.0
+
+    def _record_failure(self, state: _ProviderState, error: Exception) -> None:
+        with self._lock:
+            state.calls += 1
+            state.failures += 1
+            state.consecutive_failures += 1
+            state.cooldown_until = time.monotonic() + self.cooldown
+            state.last_error = f"{type(error).__name__}: {error}"[:200]
+
+    def _attempt(self, call: Call, messages: List[Dict], kwargs: Dict) -> Any:
+        last_error: Optional[Exception] = None
+        failed: Optional[_ProviderState] = None
+        for state in self._ranked(call):
+            if failed is not None:
+                with self._lock:
+                    self.failovers += 1
+                logger.warning(
+                    "llm: %s 공급자 호출 실패(%s), %s 공급자로 전환",
+                    failed.provider.name, last_error, state.provider.name,
+                )
+            started = time.monotonic()
+            try:
+                with external_wait():
+                    if call == "stream":
+                        stream = state.provider.stream(messages, **kwargs)
+                    else:
+                        response = state.provider.complete(messages, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self._record_failure(state, e)
+                last_error, failed = e, state
+                continue
+            if call == "stream":
+                return _RoutedStream(self, state, stream, started)
+            self._record_success(state, "complete", time.monotonic() - started)
+            record = current_usage()
+            if record is not None:
+                record.add_llm(response.model or state.provider.model, response.usage)
+            return response
+        assert last_error is not None
+        raise last_error
+
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        """비스트리밍 채팅 완성. 실패하면 다음 공급자로 전환한다."""
+        return self._attempt("complete", messages, kwargs)
+
+    def stream(self, messages: List[Dict], **kwargs: Any) -> _RoutedStream:
+        """스트리밍 채팅 완성. 스트림을 열지 못하면 다음 공급자로 전환하고, 연 뒤의 실패는 그대로 전달한다."""
+        return self._attempt("stream", messages, kwargs)
+
+    def close(self) -> None:
+        for state in self._states:
+            state.provider.close()
+
+    def stats_dict(self) -> dict:
+        now = time.monotonic()
+        providers = {}
+        with self._lock:
+            for state in self._states:
+                complete = _percentiles(state.latencies["complete"])
+                ttft = _percentiles(state.latencies["stream"])
+                providers[state.provider.name] = {
+                    **state.provider.describe(),
+                    "calls": state.calls,
+                    "failures": state.failures,
+                    "consecutive_failures": state.consecutive_failures,
+                    "healthy": state.cooldown_until <= now,
+                    "cooldown_s": round(max(0.0, state.cooldown_until - now), 1),
+                    # 비스트리밍 응답 시간
+                    "latency_p50_ms": complete[0],
+                    "latency_p95_ms": complete[1],
+                    "samples": len(state.latencies["complete"]),
+                    # 스트리밍 첫 청크까지 시간
+                    "ttft_p50_ms": ttft[0],
+                    "ttft_p95_ms": ttft[1],
+                    "ttft_samples": len(state.latencies["stream"]),
+                    "last_error": state.last_error,
+                }
+            return {"failovers": self.failovers, "providers": providers}
@@ -0,0 +1,120 @@
+"""
+프로세스 내 결정적 스텁 공급자.
+
+네트워크 없이 즉시(또는 설정한 지연 후) 응답하므로 테스트, 벤치마크, 로컬 개발에 쓴다.
+응답은 입력만으로 정해진다.
+
+- 일반 호출: 마지막 user 메시지를 그대로 돌려준다 (번역 구간 표시 <<n>>도 보존됨)
+- JSON 모드(response_format=json_object): {"items": []}
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, Iterator, List
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_chunk import Choice as ChunkChoice, ChoiceDelta
+from openai.types.chat.chat_completion_message import ChatCompletionMessage
+from openai.types.completion_usage import CompletionUsage
+
+from .base import LLMProvider
+
+
+# 스트리밍 청크 하나에 담는 글자 수
+STUB_CHUNK_CHARS = 16
+
+
+def _reply(messages: List[Dict], kwargs: Dict) -> str:
+    if (kwargs.get("response_format") or {}).get("type") == "json_object":
+        return '{"items": []}'
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return str(message.get("content") or "")
+    return ""
+
+
+def _usage(messages: List[Dict], answer: str) -> CompletionUsage:
+    # 글자 수 / 4로 토큰 수를 흉내 낸다
+    prompt = sum(len(str(m.get("content") or "")) for m in messages) // 4 + 1
+    completion = len(answer) // 4 + 1
+    return CompletionUsage(prompt_tokens=prompt, completion_tokens=completion, total_tokens=prompt + completion)
+
+
+class _StubStream:
+    """openai.Stream처럼 with/순회/close를 지원하는 청크 스트림."""
+
+    def __init__(self, chunks: Iterator[ChatCompletionChunk]) -> None:
+        self._chunks = chunks
+        self.closed = False
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        for chunk in self._chunks:
+            if self.closed:
+                return
+            yield chunk
+
+    def __enter__(self) -> "_StubStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class StubProvider(LLMProvider):
+    kind = "stub"
+
+    def __init__(self, name: str, model: str, delay: float = 0.0) -> None:
+        super().__init__(name, model)
+        self.delay = delay
+
+    def _id(self, messages: List[Dict]) -> str:
+        digest = hashlib.sha256(repr(messages).encode("utf-8")).hexdigest()[:24]
+        return f"chatcmpl-stub-{digest}"
+
+    def complete(self, messages: List[Dict], **kwargs: Any) -> ChatCompletion:
+        if self.delay > 0:
+            time.sleep(self.delay)
+        answer = _reply(messages, kwargs)
+        return ChatCompletion(
+            id=self._id(messages),
+            object="chat.completion",
+            created=0,
+            model=self.model,
+            choices=[Choice(
+                index=0,
+                finish_reason="stop",
+                message=ChatCompletionMessage(role="assistant", content=answer),
+            )],
+            usage=_usage(messages, answer),
+        )
+
+    def stream(self, messages: List[Dict], **kwargs: Any) -> _StubStream:
+        if self.delay > 0:
+            time.sleep(self.delay)
+        answer = _reply(messages, kwargs)
+        include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+        return _StubStream(self._chunks(messages, answer, include_usage))
+
+    def _chunks(self, messages: List[Dict], answer: str, include_usage: bool) -> Iterator[ChatCompletionChunk]:
+        chunk_id = self._id(messages)
+
+        def chunk(choices: list, usage: CompletionUsage | None = None) -> ChatCompletionChunk:
+            return ChatCompletionChunk(
+                id=chunk_id,
+                object="chat.completion.chunk",
+                created=0,
+                model=self.model,
+                choices=choices,
+                usage=usage,
+            )
+
+        for start in range(0, len(answer), STUB_CHUNK_CHARS):
+            piece = answer[start:start + STUB_CHUNK_CHARS]
+            yield chunk([ChunkChoice(index=0, delta=ChoiceDelta(content=piece), finish_reason=None)])
+        yield chunk([ChunkChoice(index=0, delta=ChoiceDelta(), finish_reason="stop")])
+        if include_usage:
+            yield chunk([], _usage(messages, answer))
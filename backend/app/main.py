@@ -1,11 +1,202 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+import asyncio
+import base64
+import dataclasses
+import hmac
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from .agent.agent import run_agent
+from .agent.agent import (
+    RESEARCH_KEYWORDS,
+    TRANSLATION_KEYWORDS,
+    classify_mode,
+    get_agent_graph,
+    GenerationCancelled,
+    run_agent,
+)
+from .agent.clauses import review_clauses
+from .agent.compare import build_compare_question
+from .agent.prefetch import PrefetchHandle, get_prefetcher
+from .agent.scheduler import Lane, PriorityScheduler, classify_lane
+from .agent.session import ChatSession
+from .agent.singleflight import SingleFlight, flight_key
+from .agent.translate import plan_translation, translate_document
 from .agent.schemas import AgentRequest, AgentResponse
-from .files.loader import extract_text_from_upload
+from .cache import all_cache_stats
+from .cassette import get_cassette
+from .config import settings
+from .files.artifacts import ARTIFACT_FORMATS, get_artifact_store
+from .files.clauses import is_clause_extraction_request
+from .files.extraction_cache import get_extraction_cache
+from .files.loader import (
+    MAX_TEXT_LENGTH,
+    ExtractedDocument,
+    extract_bytes,
+    extract_document,
+    extract_documents,
+    shutdown_extraction_pool,
+)
+from .llm import get_llm
+from .memprofile import RequestMemoryMiddleware, current_rss, get_memory_profiler, memory_section, peak_rss
+from .usage import SUMMARY_GROUPS, UsageRecord, current_usage, get_usage_ledger, track_usage
+
+
+logger = logging.getLogger(__name__)
+
+_semantic_cache = None
+# 짧은 대화형 질문이 번역/연구 같은 대량 작업 뒤에 줄 서지 않도록 레인별로 실행 슬롯을 배분
+_scheduler = PriorityScheduler(
+    settings.SCHEDULER_SLOTS,
+    settings.SCHEDULER_BULK_SHARE,
+    settings.SCHEDULER_MAX_WAIT,
+)
+# 같은 질문(+문서)을 동시에 보낸 요청들을 하나의 실행으로 병합
+_flights = SingleFlight(_scheduler)
+
+
+def _lane(mode: str, text_chars: int) -> Lane:
+    """모드와 입력 길이(질문 + 문서)로 스케줄러 레인을 정한다."""
+    return classify_lane(mode, text_chars, settings.SCHEDULER_INTERACTIVE_MAX_TOKENS)
+
+
+def _metered(endpoint: str, mode: str, runner, lane: Lane | None = None, docs: tuple = ()):
+    """
+    runner(emit) 실행 한 번의 토큰 사용량, 검색 횟수, 노드별 시간을 사용량 원장에 남기도록 감싼다.
+    기록은 요청 시점에 만들어 두므로 슬롯 대기 시간도 함께 잰다.
+    """
+    ledger = get_usage_ledger()
+    if ledger is None:
+        return runner
+    record = UsageRecord(endpoint, mode, lane, sum(len(doc.text) for doc in docs))
+    for doc in docs:
+        if doc.cache_hit:
+            record.add_cache_hit(f"extraction:{doc.cache_hit}")
+
+    def metered(emit):
+        with track_usage(record, ledger):
+            try:
+                return runner(emit)
+            except GenerationCancelled:
+                record.status = "cancelled"
+                raise
+
+    return metered
+
+
+def _parse_duration(value: str) -> float:
+    """기간 문자열(90, 15m, 24h, 7d)을 초로 바꾼다. 단위가 없으면 초."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    value = value.strip().lower()
+    scale = units.get(value[-1:])
+    seconds = float(value[:-1] if scale else value) * (scale or 1)
+    if seconds <= 0:
+        raise ValueError(value)
+    return seconds
+
+
+def _get_semantic_cache():
+    """SEMANTIC_CACHE_ENABLED일 때만 의미 기반 캐시를 생성한다 (numpy 지연 import)."""
+    global _semantic_cache
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    if _semantic_cache is None:
+        from .cache.semantic import SemanticCache
+
+        _semantic_cache = SemanticCache(
+            capacity=settings.SEMANTIC_CACHE_CAPACITY,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            freshness=settings.SEMANTIC_CACHE_TTL,
+            strip_phrases=TRANSLATION_KEYWORDS + RESEARCH_KEYWORDS,
+        )
+    return _semantic_cache
+
+
+def _start_prefetch(question: str) -> Optional[PrefetchHandle]:
+    """연구 요청으로 보이면 첫 검색을 지금 시작한다 (요청이 끝나면 반드시 release)."""
+    prefetcher = get_prefetcher()
+    return prefetcher.start(question) if prefetcher is not None else None
+
+
+def _run_agent_cached(question: str, emit=None, prefetch: Optional[PrefetchHandle] = None):
+    """
+    의미 기반 캐시를 거쳐 run_agent를 실행한다.
+    문서가 포함되지 않은 일반 질문 경로(/agent, /agent/stream)에서만 사용한다.
+    캐시에 적중하면 추측 검색(prefetch) 결과는 쓰이지 않고 버려진다.
+    """
+    cache = _get_semantic_cache()
+    if cache is None:
+        return run_agent(question, emit, prefetch=prefetch)
+
+    mode = classify_mode(question)
+    hit = cache.lookup(question, mode)
+    if hit is not None:
+        result, _score = hit
+        usage = current_usage()
+        if usage is not None:
+            usage.add_cache_hit("semantic")
+        if emit is not None:
+            emit({"type": "token", "content": result[0]})
+        return result
+
+    result = run_agent(question, emit, prefetch=prefetch)
+    # raw 응답이 비어 있으면 LLM 호출이 실패한 것이므로 캐시하지 않음
+    if result[2]:
+        cache.store(question, mode, result)
+    return result
+
+
+async def _warm_llm_connections() -> str:
+    """모든 LLM 공급자의 커넥션 풀을 동시에 미리 열어 두고 공급자별 결과를 요약한다."""
+    providers = get_llm().providers
+    results = await asyncio.gather(
+        *(asyncio.to_thread(p.warmup, settings.WARMUP_TIMEOUT) for p in providers),
+        return_exceptions=True,
+    )
+    return ", ".join(
+        f"{p.name} " + (f"failed ({type(r).__name__})" if isinstance(r, BaseException) else "ok")
+        for p, r in zip(providers, results)
+    )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    기동 시 예열: 첫 요청이 그래프 컴파일과 커넥션 수립 비용을 떠안지 않도록 한다.
+    예열 실패는 서비스 기동을 막지 않는다.
+    """
+    profiler = get_memory_profiler()
+    if profiler is not None:
+        profiler.start()
+        logger.info("memory profiling enabled (tracemalloc %d frames)", profiler.frames)
+    if settings.WARMUP_ON_STARTUP:
+        started = time.perf_counter()
+        get_agent_graph()
+        graph_ms = (time.perf_counter() - started) * 1000
+        try:
+            connection = await asyncio.wait_for(_warm_llm_connections(), timeout=settings.WARMUP_TIMEOUT + 1)
+        except Exception as e:
+            connection = f"failed ({type(e).__name__})"
+        logger.info(
+            "warmup: graph compiled in %.1fms, llm connections: %s (total %.1fms)",
+            graph_ms, connection, (time.perf_counter() - started) * 1000,
+        )
+    yield
+    shutdown_extraction_pool()
+    get_llm().close()
+    ledger = get_usage_ledger()
+    if ledger is not None:
+        # 큐에 남은 사용량 기록을 마저 쓴다
+        await asyncio.to_thread(ledger.close)
+    if profiler is not None:
+        profiler.stop()
 
 
 app = FastAPI(
@@ -14,6 +205,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url=None,
+    lifespan=lifespan,
 )
 
 # 정적 파일 서빙 (UI)
@@ -22,6 +214,8 @@ if static_dir.exists():
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
 # CORS 설정: 로컬에서 열어 둔 test.html 등이 백엔드에 요청할 수 있도록 허용
+# MEMORY_PROFILING이 꺼져 있으면 요청을 그대로 통과시킨다
+app.add_middleware(RequestMemoryMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost", "http://localhost:8000", "null"],  # file://에서 여는 경우 Origin이 "null"일 수 있음
@@ -40,10 +234,21 @@ async def call_agent(request: AgentRequest) -> AgentResponse:
     if not question:
         raise HTTPException(status_code=400, detail="question 필드는 비어 있을 수 없습니다.")
 
+    mode = classify_mode(question)
+    lane = _lane(mode, len(question))
+    # 검색은 캐시 조회/슬롯 대기/모드 판별과 겹쳐 미리 시작
+    prefetch = _start_prefetch(question)
     try:
-        answer, used_search, raw, sources = run_agent(question)
+        answer, used_search, raw, sources = await _flights.run(
+            flight_key(mode, question),
+            _metered("/agent", mode, lambda emit: _run_agent_cached(question, emit, prefetch), lane),
+            lane,
+        )
     except Exception as e:  # 최소한의 에러 핸들링
         raise HTTPException(status_code=500, detail=f"에이전트 실행 중 오류가 발생했습니다: {e}")
+    finally:
+        if prefetch is not None:
+            prefetch.release()
 
     return AgentResponse(answer=answer, used_search=used_search, raw_model=raw, sources=sources)
 
@@ -67,17 +272,199 @@ async def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    """namespace별 캐시 적중률, 크기, 축출 횟수 등 통계"""
+    semantic = _get_semantic_cache()
+    return {
+        "backend": settings.CACHE_BACKEND,
+        "caches": all_cache_stats(),
+        "semantic": semantic.stats_dict() if semantic is not None else None,
+        "extraction": get_extraction_cache().stats_dict(),
+    }
+
+
+@app.get("/agent/stats")
+async def agent_stats() -> dict:
+    """요청 병합(single-flight) 등 에이전트 실행 통계"""
+    prefetcher = get_prefetcher()
+    cassette = get_cassette()
+    ledger = get_usage_ledger()
+    return {
+        "singleflight": _flights.stats_dict(),
+        "scheduler": _scheduler.stats_dict(),
+        "prefetch": prefetcher.stats_dict() if prefetcher is not None else {"enabled": False},
+        "llm": get_llm().stats_dict(),
+        "cassette": cassette.stats_dict() if cassette is not None else None,
+        "usage_ledger": ledger.stats_dict() if ledger is not None else None,
+    }
+
+
+@app.get("/usage/summary")
+async def usage_summary(window: str = "24h", group_by: str = "mode", bucket: Optional[str] = None) -> dict:
+    """
+    사용량 원장 집계: 최근 window 동안 group_by(mode | endpoint | model | status)별
+    요청 수, 토큰, 예상 비용, 지연 시간 백분위(p50/p90/p99), 노드별 평균 시간 (비용 큰 순).
+    bucket(예: 1h)을 주면 시간 구간별 집계도 함께 반환한다.
+    """
+    ledger = get_usage_ledger()
+    if ledger is None:
+        raise HTTPException(status_code=404, detail="사용량 원장이 비활성화되어 있습니다 (USAGE_LEDGER).")
+    if group_by not in SUMMARY_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by는 {', '.join(SUMMARY_GROUPS)} 중 하나여야 합니다.")
+    try:
+        window_s = _parse_duration(window)
+        bucket_s = _parse_duration(bucket) if bucket else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="window/bucket은 90, 15m, 24h, 7d 형식이어야 합니다.")
+    # SQLite 조회와 백분위 계산은 이벤트 루프 밖에서 실행
+    return await asyncio.to_thread(ledger.summary, window_s, group_by, bucket_s)
+
+
+@app.get("/debug/memory")
+async def debug_memory(request: Request, limit: int = 20, group_by: str = "lineno") -> dict:
+    """
+    메모리 프로파일링 결과 (X-Debug-Token 헤더 필요, DEBUG_TOKEN 미설정 시 404).
+
+    현재 살아 있는 메모리의 상위 할당 위치(group_by: lineno | filename | traceback),
+    업로드/노드 구간별 증가량, 요청별 RSS 최대치를 반환한다.
+    """
+    if not settings.DEBUG_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-debug-token", ""), settings.DEBUG_TOKEN):
+        raise HTTPException(status_code=403, detail="디버그 토큰이 올바르지 않습니다.")
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status_code=400, detail="group_by는 lineno, filename, traceback 중 하나여야 합니다.")
+
+    profiler = get_memory_profiler()
+    if profiler is None:
+        return {
+            "enabled": False,
+            "rss_mb": round((current_rss() or 0) / 2**20, 1),
+            "rss_peak_mb": round((peak_rss() or 0) / 2**20, 1),
+        }
+    # 스냅샷 집계는 CPU 작업이므로 이벤트 루프 밖에서 실행
+    return await asyncio.to_thread(profiler.report, max(1, min(limit, 200)), group_by)
+
+
+def _build_file_question(doc_text: str, question: str) -> str:
+    """업로드 문서 내용과 질문을 에이전트 입력 하나로 합친다."""
+    return (
+        "다음은 사용자가 업로드한 문서의 내용이다.\n"
+        "이 문서를 기반으로 질문에 답하라.\n\n"
+        "[문서 내용]\n"
+        f"{doc_text}\n\n"
+        f"질문: {question}"
+    )
+
+
+def _file_task(question: str) -> tuple[str, int]:
+    """
+    파일 질문의 처리 방식(flight 모드)과 추출 한도를 정한다.
+    위험 조항 추출 요청은 로컬에서 후보를 고르므로 긴 문서도 전체를 읽는다.
+    """
+    if is_clause_extraction_request(question):
+        return "clauses", settings.CLAUSE_MAX_TEXT_LENGTH
+    return classify_mode(question), MAX_TEXT_LENGTH
+
+
+def _file_runner(
+    endpoint: str,
+    mode: str,
+    question: str,
+    doc: ExtractedDocument,
+    output_format: str = "md",
+    lane: Lane | None = None,
+):
+    """single-flight로 실행할 파일 질문 처리 함수를 만든다 (사용량 원장 기록 포함)."""
+    doc_text = doc.text
+    if mode == "clauses":
+        runner = lambda emit: review_clauses(question, doc_text, emit)
+    elif mode == "translate":
+        # 언어 판별로 이미 한국어인 구간은 건너뛰고 나머지만 묶음 번역해 결과 파일에 기록
+        runner = lambda emit: translate_document(question, doc_text, emit, output_format, doc.filename)
+    else:
+        with memory_section("file:combined_question"):
+            combined_question = _build_file_question(doc_text, question)
+        runner = lambda emit: run_agent(combined_question, emit)
+    return _metered(endpoint, mode, runner, lane, (doc,))
+
+
+async def _stream_agent_events(
+    key: str,
+    runner,
+    extra: dict | None = None,
+    lane: Lane | None = None,
+    prefetch: PrefetchHandle | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    runner(emit)를 single-flight로 실행하며 이벤트를 NDJSON 한 줄씩 내보낸다.
+    같은 키의 실행이 이미 진행 중이면 그 실행의 이벤트를 이어 받는다.
+
+    이벤트: token(답변 조각), reset(재생성 시작, 이전 토큰 폐기),
+    plan(번역 작업 범위, 번역 요청일 때만), done(최종 답변/메타데이터), error(실패)
+    """
+    try:
+        async for event in _flights.stream(key, runner, lane):
+            if event["type"] == "result":
+                # 조항 추출처럼 5번째 요소로 추가 메타데이터를 돌려주는 실행도 있음
+                answer, used_search, _raw, sources, *rest = event["result"]
+                event = {
+                    "type": "done",
+                    "answer": answer,
+                    "used_search": used_search,
+                    "sources": sources,
+                    **(rest[0] if rest else {}),
+                    **(extra or {}),
+                }
+            yield (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    except Exception as e:
+        error = {"type": "error", "detail": f"에이전트 실행 중 오류가 발생했습니다: {e}"}
+        yield (json.dumps(error, ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        if prefetch is not None:
+            prefetch.release()
+
+
+@app.post("/agent/stream")
+async def call_agent_stream(request: AgentRequest) -> StreamingResponse:
+    """
+    /agent와 같지만 답변을 토큰 단위 NDJSON 이벤트로 스트리밍한다.
+    """
+    question = request.question.strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="question 필드는 비어 있을 수 없습니다.")
+    mode = classify_mode(question)
+    lane = _lane(mode, len(question))
+    prefetch = _start_prefetch(question)
+    return StreamingResponse(
+        _stream_agent_events(
+            flight_key(mode, question),
+            _metered("/agent/stream", mode, lambda emit: _run_agent_cached(question, emit, prefetch), lane),
+            lane=lane,
+            prefetch=prefetch,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 @app.post("/agent/file")
 async def call_agent_with_file(
     file: UploadFile = File(...),
     question: str = Form("이 파일을 요약해줘"),
+    output_format: str = Form("md"),
 ) -> dict:
     """
     업로드된 파일(PDF, TXT)을 기반으로 요약/분석/질문응답을 수행한다.
+    "위험한 조항만 뽑아줘" 같은 요청은 로컬 규칙으로 후보 조항을 고른 뒤 LLM으로 검증한다.
+    번역 요청은 결과를 파일(output_format: md/txt)로 기록하고 answer에는 미리보기만 담는다.
     """
+    if output_format not in ARTIFACT_FORMATS:
+        raise HTTPException(status_code=400, detail="output_format은 md 또는 txt만 가능합니다.")
+    mode, max_length = _file_task(question)
     try:
-        # 파일은 디스크에 저장하지 않고 메모리에서만 처리
-        doc_text = await extract_text_from_upload(file)
+        # 파일은 디스크에 저장하지 않고 메모리에서만 처리 (추출 결과만 내용 해시로 캐시)
+        doc = await extract_document(file, max_length)
     except ValueError as e:
         # 파일 형식/내용 관련 에러는 400으로 반환
         raise HTTPException(status_code=400, detail=str(e))
@@ -85,16 +472,14 @@ async def call_agent_with_file(
         # 내부 오류는 500
         raise HTTPException(status_code=500, detail=f"파일 처리 중 오류가 발생했습니다: {e}")
 
-    combined_question = (
-        "다음은 사용자가 업로드한 문서의 내용이다.\n"
-        "이 문서를 기반으로 질문에 답하라.\n\n"
-        "[문서 내용]\n"
-        f"{doc_text}\n\n"
-        f"질문: {question}"
-    )
-
+    lane = _lane(mode, len(question) + len(doc.text))
     try:
-        answer, used_search, _raw, sources = run_agent(combined_question)
+        answer, used_search, _raw, sources, *rest = await _flights.run(
+            # 번역 결과 형식이 다르면 별도 실행 (결과 파일이 다름)
+            flight_key(mode, question, f"{doc.content_hash}:{output_format}"),
+            _file_runner("/agent/file", mode, question, doc, output_format, lane),
+            lane,
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -106,5 +491,338 @@ async def call_agent_with_file(
         "answer": answer,
         "used_search": used_search,
         "sources": sources,
+        **(rest[0] if rest else {}),
+        "extraction": doc.report(),
+    }
+
+
+@app.post("/agent/file/stream")
+async def call_agent_with_file_stream(
+    file: UploadFile = File(...),
+    question: str = Form("이 파일을 요약해줘"),
+    output_format: str = Form("md"),
+) -> StreamingResponse:
+    """
+    /agent/file과 같지만 답변을 토큰 단위 NDJSON 이벤트로 스트리밍한다.
+    번역 요청은 구간을 결과 파일에 쓸 때마다 progress 이벤트를 보낸다.
+    """
+    if output_format not in ARTIFACT_FORMATS:
+        raise HTTPException(status_code=400, detail="output_format은 md 또는 txt만 가능합니다.")
+    mode, max_length = _file_task(question)
+    try:
+        doc = await extract_document(file, max_length)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류가 발생했습니다: {e}")
+
+    lane = _lane(mode, len(question) + len(doc.text))
+    return StreamingResponse(
+        _stream_agent_events(
+            # 번역 결과 형식이 다르면 별도 실행 (결과 파일이 다름)
+            flight_key(mode, question, f"{doc.content_hash}:{output_format}"),
+            _file_runner("/agent/file/stream", mode, question, doc, output_format, lane),
+            {"filename": file.filename, "extraction": doc.report()},
+            lane,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.post("/agent/file/estimate")
+async def estimate_file_translation(file: UploadFile = File(...)) -> dict:
+    """
+    LLM을 호출하지 않고 업로드 문서의 언어별 구간 수와 번역 예상 토큰 수를 반환한다.
+    """
+    try:
+        doc = await extract_document(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류가 발생했습니다: {e}")
+
+    return {
+        "filename": file.filename,
+        "translation": plan_translation(doc.text).to_dict(),
+        "extraction": doc.report(),
+    }
+
+
+_DOWNLOAD_CHUNK = 64 * 1024
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int]:
+    """단일 "bytes=start-end" 범위를 (start, end 포함) 로 해석한다. 잘못된 범위면 416."""
+    unit, _, spec = header.partition("=")
+    start_s, sep, end_s = spec.strip().partition("-")
+    try:
+        if unit.strip() != "bytes" or not sep or "," in spec:
+            raise ValueError
+        if start_s:
+            start, end = int(start_s), (int(end_s) if end_s else size - 1)
+        else:
+            # "bytes=-N": 마지막 N바이트
+            start, end = max(0, size - int(end_s)), size - 1
+    except ValueError:
+        start, end = size, size - 1
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="요청한 범위를 만족할 수 없습니다.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(_DOWNLOAD_CHUNK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+@app.get("/artifacts/{artifact_id}/status")
+async def artifact_status(artifact_id: str) -> dict:
+    """결과 파일 작성 진행 상황 (구간 진행률, 현재 크기)"""
+    status = get_artifact_store().status(artifact_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="결과 파일을 찾을 수 없습니다.")
+    return status
+
+
+@app.get("/artifacts/{artifact_id}")
+async def download_artifact(artifact_id: str, request: Request) -> StreamingResponse:
+    """
+    완료된 결과 파일을 내려받는다. Range 헤더(bytes=start-end)로 일부만 받을 수 있다.
+    """
+    store = get_artifact_store()
+    path = store.find(artifact_id)
+    if path is None:
+        status = store.status(artifact_id)
+        if status is not None and status["status"] == "writing":
+            raise HTTPException(status_code=409, detail="결과 파일을 아직 작성 중입니다.")
+        raise HTTPException(status_code=404, detail="결과 파일을 찾을 수 없습니다.")
+
+    size = path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{path.name}"',
+    }
+    range_header = request.headers.get("range")
+    if range_header:
+        start, end = _parse_range(range_header, size)
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        start, end, status_code = 0, size - 1, 200
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=status_code,
+        media_type=ARTIFACT_FORMATS[path.suffix.lstrip(".")],
+        headers=headers,
+    )
+
+
+@app.post("/agent/files")
+async def call_agent_with_files(
+    files: list[UploadFile] = File(...),
+    question: str = Form("이 문서들을 비교해줘"),
+) -> dict:
+    """
+    여러 파일(PDF, TXT)을 동시에 추출해 문서별 인용이 포함된 비교 분석 답변을 반환한다.
+    """
+    if len(files) < 2:
+        raise HTTPException(status_code=400, detail="비교하려면 파일을 2개 이상 업로드해 주세요.")
+    if len(files) > settings.COMPARE_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {settings.COMPARE_MAX_FILES}개 파일까지 비교할 수 있습니다.",
+        )
+
+    try:
+        # 문서 전체를 색인하고 프롬프트 크기는 select_passages의 발췌 예산으로 제한
+        docs = await extract_documents(files, settings.COMPARE_MAX_TEXT_LENGTH)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류가 발생했습니다: {e}")
+
+    compare_question, documents = build_compare_question(docs, question, settings.COMPARE_CONTEXT_BUDGET)
+    doc_hashes = ",".join(doc.content_hash for doc in docs)
+
+    try:
+        answer, used_search, _raw, sources = await _flights.run(
+            flight_key("compare", question, doc_hashes),
+            # 비교 질문에는 문서 발췌가 들어 있으므로 본문 단어로 연구/번역 모드가 되지 않게 일반 모드로 고정
+            _metered(
+                "/agent/files",
+                "compare",
+                lambda emit: run_agent(compare_question, emit, mode="general"),
+                "bulk",
+                tuple(docs),
+            ),
+            "bulk",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"비교 분석 실행 중 오류가 발생했습니다: {e}",
+        )
+
+    return {
+        "filenames": [doc.filename for doc in docs],
+        "answer": answer,
+        "used_search": used_search,
+        "sources": sources,
+        "documents": documents,
     }
 
+
+def _ws_runner(session: ChatSession, question: str, prefetch: Optional[PrefetchHandle] = None) -> tuple:
+    """세션의 문서/대화 기록을 반영해 이번 턴에 실행할 함수와 스케줄러 레인을 정한다."""
+    history = session.history_messages()
+    history_chars = sum(len(m["content"]) for m in history)
+    if session.doc is None:
+        mode = classify_mode(question)
+        lane = _lane(mode, len(question) + history_chars)
+        return _metered("/ws/agent", mode, lambda emit: run_agent(question, emit, history, prefetch), lane), lane
+
+    mode, max_length = _file_task(question)
+    # 세션 문서는 조항 추출 한도로 보관하므로 일반 질문은 기본 한도로 잘라 쓴다
+    # (추출 캐시 적중은 문서 등록 시점의 일이므로 턴마다 사용량 원장에 세지 않음)
+    doc = dataclasses.replace(session.doc, text=session.doc.text[:max_length], cache_hit=None)
+    lane = _lane(mode, len(question) + len(doc.text) + history_chars)
+    if mode in ("clauses", "translate"):
+        return _file_runner("/ws/agent", mode, question, doc, lane=lane), lane
+    combined_question = _build_file_question(doc.text, question)
+    return _metered("/ws/agent", mode, lambda emit: run_agent(combined_question, emit, history), lane, (doc,)), lane
+
+
+async def _ws_generate(session: ChatSession, request_id, question: str, send) -> None:
+    """한 턴의 답변을 생성하며 이벤트를 WebSocket으로 보낸다."""
+    loop = asyncio.get_running_loop()
+
+    def emit(event: dict) -> None:
+        loop.call_soon_threadsafe(asyncio.ensure_future, send({**event, "id": request_id}))
+
+    session.new_generation()
+    # 문서가 없는 턴만 검색 쿼리(질문 원문)를 미리 알 수 있음
+    prefetch = _start_prefetch(question) if session.doc is None else None
+    runner, lane = _ws_runner(session, question, prefetch)
+    try:
+        async with _scheduler.slot(lane):
+            answer, used_search, _raw, sources, *rest = await asyncio.to_thread(runner, session.wrap_emit(emit))
+    except GenerationCancelled:
+        await send({"type": "cancelled", "id": request_id})
+        return
+    except Exception as e:
+        await send({"type": "error", "id": request_id, "detail": f"에이전트 실행 중 오류가 발생했습니다: {e}"})
+        return
+    finally:
+        if prefetch is not None:
+            prefetch.release()
+
+    session.add_turn(question, answer)
+    await send({
+        "type": "done",
+        "id": request_id,
+        "answer": answer,
+        "used_search": used_search,
+        "sources": sources,
+        **(rest[0] if rest else {}),
+    })
+
+
+@app.websocket("/ws/agent")
+async def agent_websocket(websocket: WebSocket) -> None:
+    """
+    채팅 하나를 연결 하나로 유지하는 WebSocket 엔드포인트.
+
+    클라이언트 메시지(JSON):
+    - {"type": "question", "question": "...", "id": 선택}: 질문 (세션 문서/대화 기록 자동 반영)
+    - {"type": "document", "filename": "a.pdf", "data": base64, "encoding": "gzip"(선택)}:
+      문서 등록. data를 생략하면 다음 바이너리 프레임을 파일 내용으로 받는다.
+    - {"type": "cancel"}: 진행 중인 생성 취소
+    - {"type": "clear"}: 문서와 대화 기록 초기화
+
+    서버 이벤트: ready, document, token/reset/plan/progress, done, cancelled, error
+    (답변 관련 이벤트에는 질문의 id가 붙는다)
+    """
+    await websocket.accept()
+    session = ChatSession()
+    send_lock = asyncio.Lock()
+
+    async def send(event: dict) -> None:
+        async with send_lock:
+            try:
+                await websocket.send_json(event)
+            except (WebSocketDisconnect, RuntimeError):
+                # 연결이 이미 닫힌 뒤 도착한 이벤트는 버림
+                pass
+
+    await send({"type": "ready"})
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                kind = message.get("type")
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # 바이너리 프레임이나 JSON 객체가 아닌 메시지
+                await send({"type": "error", "detail": "메시지는 JSON 객체여야 합니다."})
+                continue
+
+            if kind == "question":
+                question = str(message.get("question", "")).strip()
+                if not question:
+                    await send({"type": "error", "detail": "question 필드는 비어 있을 수 없습니다."})
+                elif session.busy:
+                    await send({"type": "error", "detail": "이전 답변을 생성 중입니다. 취소하거나 완료 후 다시 보내 주세요."})
+                else:
+                    request_id = message.get("id", session.turns + 1)
+                    session.task = asyncio.create_task(_ws_generate(session, request_id, question, send))
+
+            elif kind == "document":
+                if session.busy:
+                    await send({"type": "error", "detail": "답변 생성 중에는 문서를 바꿀 수 없습니다."})
+                    continue
+                try:
+                    if message.get("data") is not None:
+                        data = base64.b64decode(message["data"])
+                    else:
+                        data = await websocket.receive_bytes()
+                    # 이후 질문 유형(조항 추출 등)에 맞춰 잘라 쓰도록 가장 긴 한도로 보관
+                    session.doc = await extract_bytes(
+                        message.get("filename"), data, message.get("encoding"), settings.CLAUSE_MAX_TEXT_LENGTH
+                    )
+                except Exception as e:
+                    await send({"type": "error", "detail": f"파일 처리 중 오류가 발생했습니다: {e}"})
+                    continue
+                await send({
+                    "type": "document",
+                    "filename": session.doc.filename,
+                    "chars": len(session.doc.text),
+                    "extraction": session.doc.report(),
+                })
+
+            elif kind == "cancel":
+                if not session.cancel():
+                    await send({"type": "error", "detail": "취소할 생성 작업이 없습니다."})
+
+            elif kind == "clear":
+                session.cancel()
+                session.clear()
+                await send({"type": "cleared"})
+
+            else:
+                await send({"type": "error", "detail": f"알 수 없는 메시지 유형입니다: {kind}"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # 연결이 끊기면 진행 중인 생성을 멈춰 토큰을 더 쓰지 않도록 함
+        session.cancel()
@@ -0,0 +1,307 @@
+"""
+선택적 메모리 프로파일링 (MEMORY_PROFILING=true일 때만 동작).
+
+작은 인스턴스에서 원인을 알 수 없는 메모리 급증을 추적하기 위한 계측이다.
+
+- 구간 계측(section): 업로드 읽기/텍스트 추출, 파일 질문 조립, 그래프 노드마다
+  tracemalloc 기준 순증가량과 구간 중 최대 증가량(peak)을 누적한다.
+  MEMORY_SNAPSHOT_SAMPLE 비율만큼은 구간 전후 스냅샷을 비교해 가장 많이 늘어난 할당 위치도 남긴다.
+- 요청별 RSS: HTTP 요청이 진행되는 동안 백그라운드 스레드가 RSS를 주기적으로 읽어
+  요청 중 최대 RSS와 시작 대비 증가량을 기록한다.
+- /debug/memory(토큰 보호)에서 현재 살아 있는 메모리의 상위 할당 위치와 위 통계를 보여 준다.
+
+tracemalloc의 peak는 프로세스 전역 값이므로 동시에 실행되는 구간끼리는 peak가 섞일 수 있다.
+정확한 구간별 값이 필요하면 요청을 하나씩 보내 측정한다.
+"""
+
+import linecache
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from .config import settings
+
+
+# 스냅샷 비교 결과에서 구간별로 보관할 상위 할당 위치 수
+SECTION_TOP_SITES = 5
+_RECENT_REQUESTS = 200
+# 프로파일러 자신(스냅샷, 소스 줄 읽기)과 import 시스템의 할당은 보고에서 제외
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss() -> Optional[int]:
+    """현재 RSS(바이트). /proc이 없는 플랫폼에서는 None."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """프로세스 시작 이후 최대 RSS(바이트)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # 리눅스는 KB, macOS는 바이트 단위
+    value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return value if os.uname().sysname == "Darwin" else value * 1024
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def _site(frame: tracemalloc.Frame) -> str:
+    line = linecache.getline(frame.filename, frame.lineno).strip()
+    return f"{frame.filename}:{frame.lineno}" + (f"  {line}" if line else "")
+
+
+class SectionStats:
+    __slots__ = ("calls", "net", "peak", "max_peak", "top_sites")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.net = 0  # 구간 종료 시 남은 순증가량 합계
+        self.peak = 0  # 구간 중 최대 증가량 합계 (평균 계산용)
+        self.max_peak = 0
+        self.top_sites: List[dict] = []  # 가장 최근 스냅샷 비교 결과
+
+    def to_dict(self) -> dict:
+        calls = max(1, self.calls)
+        return {
+            "calls": self.calls,
+            "net_kb_avg": round(self.net / calls / 1024, 1),
+            "peak_kb_avg": round(self.peak / calls / 1024, 1),
+            "peak_kb_max": round(self.max_peak / 1024, 1),
+            "top_sites": self.top_sites,
+        }
+
+
+class _RequestSample:
+    __slots__ = ("path", "started", "rss_start", "rss_peak")
+
+    def __init__(self, path: str, rss: int) -> None:
+        self.path = path
+        self.started = time.monotonic()
+        self.rss_start = rss
+        self.rss_peak = rss
+
+
+class MemoryProfiler:
+    """구간별 tracemalloc 통계와 요청별 RSS 최대치를 모으는 프로파일러."""
+
+    def __init__(self, frames: int, snapshot_sample: float, rss_interval: float) -> None:
+        self.frames = max(1, frames)
+        self.snapshot_sample = snapshot_sample
+        self.rss_interval = rss_interval
+        self._lock = threading.Lock()
+        self._sections: Dict[str, SectionStats] = {}
+        self._active: Dict[int, _RequestSample] = {}
+        self._recent: Deque[dict] = deque(maxlen=_RECENT_REQUESTS)
+        self._by_path: Dict[str, dict] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._next_id = 0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if self._sampler is None and current_rss() is not None:
+            self._sampler = threading.Thread(target=self._sample_rss, name="rss-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # --- 구간 계측 ---
+
+    @contextmanager
+    def section(self, label: str) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = _snapshot() if random.random() < self.snapshot_sample else None
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            top = self._top_sites(before) if before is not None else None
+            with self._lock:
+                stats = self._sections.setdefault(label, SectionStats())
+                stats.calls += 1
+                stats.net += current - base
+                stats.peak += max(0, peak - base)
+                stats.max_peak = max(stats.max_peak, peak - base)
+                if top is not None:
+                    stats.top_sites = top
+
+    @staticmethod
+    def _top_sites(before: tracemalloc.Snapshot) -> List[dict]:
+        after = _snapshot()
+        diff = after.compare_to(before, "lineno")
+        return [
+            {"site": _site(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+            for stat in diff[:SECTION_TOP_SITES]
+            if stat.size_diff > 0
+        ]
+
+    # --- 요청별 RSS ---
+
+    def request_started(self, path: str) -> Optional[int]:
+        rss = current_rss()
+        if rss is None:
+            return None
+        with self._lock:
+            self._next_id += 1
+            self._active[self._next_id] = _RequestSample(path, rss)
+            return self._next_id
+
+    def request_finished(self, request_id: Optional[int], path: Optional[str] = None) -> None:
+        if request_id is None:
+            return
+        rss = current_rss() or 0
+        with self._lock:
+            sample = self._active.pop(request_id, None)
+            if sample is None:
+                return
+            if path:
+                sample.path = path
+            sample.rss_peak = max(sample.rss_peak, rss)
+            growth = sample.rss_peak - sample.rss_start
+            self._recent.append({
+                "path": sample.path,
+                "seconds": round(time.monotonic() - sample.started, 3),
+                "rss_peak_mb": round(sample.rss_peak / 2**20, 1),
+                "rss_growth_mb": round(growth / 2**20, 1),
+            })
+            totals = self._by_path.setdefault(sample.path, {"requests": 0, "rss_growth_mb_max": 0.0, "rss_peak_mb_max": 0.0})
+            totals["requests"] += 1
+            totals["rss_growth_mb_max"] = max(totals["rss_growth_mb_max"], round(growth / 2**20, 1))
+            totals["rss_peak_mb_max"] = max(totals["rss_peak_mb_max"], round(sample.rss_peak / 2**20, 1))
+
+    def _sample_rss(self) -> None:
+        while not self._stop.wait(self.rss_interval):
+            with self._lock:
+                if not self._active:
+                    continue
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for sample in self._active.values():
+                    if rss > sample.rss_peak:
+                        sample.rss_peak = rss
+
+    # --- 보고 ---
+
+    def report(self, limit: int = 20, group_by: str = "lineno") -> dict:
+        """현재 살아 있는 메모리의 상위 할당 위치와 구간/요청 통계"""
+        top: List[dict] = []
+        traced = {}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            traced = {"current_mb": round(current / 2**20, 2), "peak_mb": round(peak / 2**20, 2)}
+            for stat in _snapshot().statistics(group_by)[:limit]:
+                entry = {"size_kb": round(stat.size / 1024, 1), "count": stat.count, "site": _site(stat.traceback[0])}
+                if group_by == "traceback":
+                    entry["traceback"] = [_site(frame) for frame in stat.traceback]
+                top.append(entry)
+        with self._lock:
+            sections = {label: stats.to_dict() for label, stats in self._sections.items()}
+            recent = list(self._recent)[-limit:]
+            by_path = {path: dict(values) for path, values in self._by_path.items()}
+        return {
+            "enabled": True,
+            "rss_mb": round((current_rss() or 0) / 2**20, 1),
+            "rss_peak_mb": round((peak_rss() or 0) / 2**20, 1),
+            "traced": traced,
+            "top_allocations": top,
+            "sections": sections,
+            "requests": {"by_path": by_path, "recent": recent},
+        }
+
+
+_profiler: Optional[MemoryProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_memory_profiler() -> Optional[MemoryProfiler]:
+    """MEMORY_PROFILING이 켜져 있으면 프로파일러 싱글톤, 아니면 None."""
+    global _profiler
+    if not settings.MEMORY_PROFILING:
+        return None
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = MemoryProfiler(
+                settings.MEMORY_TRACE_FRAMES,
+                settings.MEMORY_SNAPSHOT_SAMPLE,
+                settings.MEMORY_RSS_INTERVAL,
+            )
+    return _profiler
+
+
+@contextmanager
+def memory_section(label: str) -> Iterator[None]:
+    """프로파일링이 켜져 있으면 이 구간의 메모리 증가를 label로 집계한다."""
+    profiler = get_memory_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(label):
+        yield
+
+
+def track_memory(label: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """함수 실행 전체를 memory_section으로 감싼다 (그래프 노드용, 원래 시그니처 유지)."""
+
+    @wraps(fn)
+    def wrapped(*args: Any, **kwargs: Any) -> Any:
+        with memory_section(label):
+            return fn(*args, **kwargs)
+
+    return wrapped
+
+
+class RequestMemoryMiddleware:
+    """
+    HTTP 요청마다 RSS 최대치를 기록하는 ASGI 미들웨어.
+    스트리밍 응답도 본문 전송이 끝날 때까지를 한 요청으로 본다.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        profiler = get_memory_profiler()
+        if profiler is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = profiler.request_started(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # 라우팅이 끝나면 경로 템플릿(/artifacts/{artifact_id})으로 묶어 집계
+            route = scope.get("route")
+            profiler.request_finished(request_id, getattr(route, "path", None))
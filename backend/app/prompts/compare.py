@@ -0,0 +1,16 @@
+COMPARE_PROMPT = """
+여러 문서를 비교 분석할 때는 다음 규칙을 따른다.
+
+1. **문서별 근거 제시**
+   - 아래에 문서별로 발췌된 구절이 [D1-3]처럼 "문서 번호-구절 번호" 태그와 함께 주어진다.
+   - 비교 결과의 각 주장 뒤에는 근거가 된 구절 태그를 반드시 표기한다. (예: "D1은 자동 갱신을 명시한다 [D1-2]")
+   - 발췌에 없는 내용은 추측하지 않고 "발췌된 구절에서 확인되지 않음"이라고 밝힌다.
+
+2. **비교 구성**
+   - 먼저 문서별 핵심을 한두 줄로 요약한 뒤, 공통점과 차이점을 항목별로 정리한다.
+   - 조건, 금액, 기간, 의무, 예외처럼 의사결정에 영향을 주는 차이를 우선 다룬다.
+   - 가능하면 항목 × 문서 형태의 표로 정리한다.
+
+3. **출력 형식**
+   - 답변은 한국어로 제공하며, 마지막에 "문서 목록" 섹션으로 문서 번호와 파일명을 나열한다.
+""".strip()
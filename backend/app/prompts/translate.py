@@ -49,3 +49,12 @@ TRANSLATE_PROMPT = """
    - 번역 결과는 “바로 웹사이트, 브로셔, PDF에 사용 가능한 수준”을 목표로 한다.
    - 설명체/요약체가 아닌, 완성된 한국어 번역문을 제공한다.
 """.strip()
+
+
+# 구간 단위 번역(문서 번역 파이프라인)에서 원문 위치를 되찾기 위한 출력 형식 규칙
+SEGMENT_FORMAT_PROMPT = """
+8. **구간 표시 유지**
+   - 입력은 <<1>>, <<2>>처럼 번호가 붙은 구간으로 나뉘어 있다.
+   - 각 구간의 번역문 앞에 같은 표시를 그대로 붙여, 입력과 같은 순서·개수로 출력한다.
+   - 구간을 합치거나 나누지 말고, 표시 외의 설명이나 머리말은 덧붙이지 않는다.
+""".strip()
@@ -0,0 +1,364 @@
+"""
+요청별 토큰 사용량/비용 원장 (SQLite).
+
+에이전트 실행 한 번(single-flight로 병합된 요청은 한 번)마다 다음을 한 행으로 남긴다.
+
+- 엔드포인트, 모드(general/research/translate/clauses/compare), 스케줄러 레인, 결과(ok/error/cancelled)
+- 모델, LLM 호출 수, 입력/출력/캐시된 입력 토큰, 가격표(USAGE_PRICES) 기준 예상 비용
+- 웹 검색 횟수와 실패 횟수, 문서 크기(글자 수), 캐시 적중(semantic, extraction:memory|disk, search)
+- 슬롯 대기 시간, 실행 시간, 그래프 노드별 wall 시간
+
+LLM 사용량은 라우터(app.llm.router)가, 검색 횟수는 perform_search가 현재 컨텍스트의
+UsageRecord(track_usage 블록)에 더한다 (검색 실패는 web_search가 기록). 기록은 큐에 넣기만 하고 백그라운드 스레드가
+묶어서 쓰므로 요청 경로에서 디스크 I/O를 기다리지 않는다.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+from .instrument import NodeProfile, profile_nodes
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    lane TEXT,
+    status TEXT NOT NULL,
+    model TEXT,
+    llm_calls INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    cost_usd REAL,
+    search_calls INTEGER NOT NULL,
+    doc_chars INTEGER NOT NULL,
+    cache_hits TEXT NOT NULL,
+    queue_ms REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    node_ms TEXT NOT NULL,
+    search_errors INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_usage_log_ts ON usage_log (ts);
+"""
+
+_COLUMNS = (
+    "ts", "endpoint", "mode", "lane", "status", "model", "llm_calls", "prompt_tokens", "completion_tokens",
+    "cached_tokens", "cost_usd", "search_calls", "doc_chars", "cache_hits", "queue_ms", "latency_ms", "node_ms",
+    "search_errors",
+)
+# 이전 버전 원장 파일에 없는 열 (열 이름, 정의)
+_ADDED_COLUMNS = (("search_errors", "INTEGER NOT NULL DEFAULT 0"),)
+SUMMARY_GROUPS = ("mode", "endpoint", "model", "status")
+
+_BATCH = 500
+_QUEUE_SIZE = 10_000
+_PRUNE_INTERVAL = 3600.0
+
+
+def price_for(model: str, prices: Dict[str, List[float]]) -> Optional[List[float]]:
+    """모델 이름(버전 접미사 포함, 예: gpt-4o-mini-2024-07-18)에 가장 길게 일치하는 가격표 항목."""
+    matches = [name for name in prices if model == name or model.startswith(name + "-")]
+    return prices[max(matches, key=len)] if matches else None
+
+
+class UsageRecord:
+    """실행 한 번의 사용량. LLM/검색 호출이 여러 스레드에서 올 수 있어 락으로 보호한다."""
+
+    def __init__(self, endpoint: str, mode: str, lane: Optional[str] = None, doc_chars: int = 0) -> None:
+        self.ts = time.time()
+        self.endpoint = endpoint
+        self.mode = mode
+        self.lane = lane
+        self.doc_chars = doc_chars
+        self.status = "ok"
+        self.llm_calls = 0
+        self.tokens: Dict[str, List[int]] = {}  # model -> [입력, 출력, 캐시된 입력]
+        self.search_calls = 0
+        self.search_errors = 0
+        self.cache_hits: List[str] = []
+        self.node_ms: Dict[str, float] = {}
+        self.queue_ms = 0.0
+        self.latency_ms = 0.0
+        self._created = time.perf_counter()
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add_llm(self, model: str, usage: Any) -> None:
+        """LLM 호출 한 번 (usage: CompletionUsage 또는 None)."""
+        with self._lock:
+            self.llm_calls += 1
+            if usage is None:
+                return
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", None) or 0
+            totals = self.tokens.setdefault(model, [0, 0, 0])
+            totals[0] += usage.prompt_tokens or 0
+            totals[1] += usage.completion_tokens or 0
+            totals[2] += cached
+
+    def add_search(self) -> None:
+        with self._lock:
+            self.search_calls += 1
+
+    def add_search_error(self) -> None:
+        with self._lock:
+            self.search_errors += 1
+
+    def add_cache_hit(self, name: str) -> None:
+        with self._lock:
+            self.cache_hits.append(name)
+
+    def start(self) -> None:
+        """실행 시작 (생성부터 여기까지가 슬롯 대기 시간)."""
+        self._started = time.perf_counter()
+        self.queue_ms = (self._started - self._created) * 1000
+
+    def finish(self, nodes: Dict[str, dict]) -> None:
+        started = self._started if self._started is not None else self._created
+        self.latency_ms = (time.perf_counter() - started) * 1000
+        # 같은 노드가 여러 번 실행되면(연구 모드 재검색) 합계
+        self.node_ms = {name: round(stats["wall_ms"] * stats["calls"], 3) for name, stats in nodes.items()}
+
+    def cost(self, prices: Dict[str, List[float]]) -> Optional[float]:
+        """가격표 기준 예상 비용(USD). 가격을 모르는 모델이 있으면 None."""
+        total = 0.0
+        for model, (prompt, completion, cached) in self.tokens.items():
+            price = price_for(model, prices)
+            if price is None:
+                return None
+            total += ((prompt - cached) * price[0] + completion * price[1] + cached * price[2]) / 1_000_000
+        return total
+
+    def row(self, prices: Dict[str, List[float]]) -> tuple:
+        with self._lock:
+            # 여러 모델을 썼으면(장애 전환 등) 토큰을 가장 많이 쓴 모델을 앞에
+            models = sorted(self.tokens, key=lambda m: -sum(self.tokens[m][:2]))
+            prompt = sum(t[0] for t in self.tokens.values())
+            completion = sum(t[1] for t in self.tokens.values())
+            cached = sum(t[2] for t in self.tokens.values())
+            return (
+                self.ts, self.endpoint, self.mode, self.lane, self.status, ",".join(models) or None,
+                self.llm_calls, prompt, completion, cached, self.cost(prices), self.search_calls,
+                self.doc_chars, ",".join(self.cache_hits), round(self.queue_ms, 3), round(self.latency_ms, 3),
+                json.dumps(self.node_ms, separators=(",", ":")), self.search_errors,
+            )
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1)
+
+
+def _aggregate(rows: List[sqlite3.Row]) -> dict:
+    latencies = sorted(r["latency_ms"] for r in rows)
+    queued = sorted(r["queue_ms"] for r in rows)
+    costs = [r["cost_usd"] for r in rows if r["cost_usd"] is not None]
+    nodes: Dict[str, List[float]] = {}
+    for r in rows:
+        for name, ms in json.loads(r["node_ms"]).items():
+            nodes.setdefault(name, []).append(ms)
+    count = len(rows)
+    prompt = sum(r["prompt_tokens"] for r in rows)
+    completion = sum(r["completion_tokens"] for r in rows)
+    return {
+        "requests": count,
+        "errors": sum(1 for r in rows if r["status"] == "error"),
+        "cancelled": sum(1 for r in rows if r["status"] == "cancelled"),
+        "llm_calls": sum(r["llm_calls"] for r in rows),
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "cached_tokens": sum(r["cached_tokens"] for r in rows),
+        "tokens_per_request": round((prompt + completion) / count, 1),
+        "cost_usd": round(sum(costs), 6),
+        "cost_per_request_usd": round(sum(costs) / len(costs), 6) if costs else None,
+        "unpriced_requests": count - len(costs),
+        "search_calls": sum(r["search_calls"] for r in rows),
+        "search_errors": sum(r["search_errors"] for r in rows),
+        "doc_chars_avg": round(sum(r["doc_chars"] for r in rows) / count, 1),
+        "cache_hit_requests": sum(1 for r in rows if r["cache_hits"]),
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p90": _percentile(latencies, 0.9),
+            "p99": _percentile(latencies, 0.99),
+            "max": round(latencies[-1], 1),
+        },
+        "queue_ms_p95": _percentile(queued, 0.95),
+        # 노드가 실행된 요청 기준 평균
+        "node_ms_avg": {name: round(sum(values) / len(values), 1) for name, values in nodes.items()},
+    }
+
+
+class UsageLedger:
+    """UsageRecord를 큐에 받아 백그라운드 스레드에서 SQLite에 묶어서 쓰는 원장."""
+
+    def __init__(self, path: Path, prices: Dict[str, List[float]], retention_days: float = 30.0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.prices = prices
+        self.retention = retention_days * 86400
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[UsageRecord]]" = queue.Queue(maxsize=_QUEUE_SIZE)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(usage_log)")}
+            for name, definition in _ADDED_COLUMNS:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE usage_log ADD COLUMN {name} {definition}")
+        self._writer = threading.Thread(target=self._write_loop, name="usage-ledger", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def submit(self, record: UsageRecord) -> None:
+        """기록을 큐에 넣는다. 큐가 가득 차면(디스크가 밀리는 경우) 요청을 막지 않고 버린다."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        insert = f"INSERT INTO usage_log ({', '.join(_COLUMNS)}) VALUES ({placeholders})"
+        pruned_at = 0.0
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # 쌓여 있는 기록을 한 트랜잭션으로 묶어서 씀
+            while len(batch) < _BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            records = [r for r in batch if r is not None]
+            try:
+                with conn:
+                    conn.executemany(insert, [r.row(self.prices) for r in records])
+                    if self.retention > 0 and time.time() - pruned_at > _PRUNE_INTERVAL:
+                        conn.execute("DELETE FROM usage_log WHERE ts < ?", (time.time() - self.retention,))
+                        pruned_at = time.time()
+                self.written += len(records)
+            except sqlite3.Error as e:
+                self.failed += len(records)
+                logger.warning("usage ledger: %d개 기록 저장 실패: %s", len(records), e)
+        conn.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """남은 기록을 쓰고 writer 스레드를 멈춘다."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout)
+
+    def summary(self, window: float, group_by: str = "mode", bucket: Optional[float] = None) -> dict:
+        """
+        최근 window초 동안의 기록을 group_by별로 집계한다 (비용이 큰 그룹부터).
+        bucket(초)을 주면 같은 집계를 시간 구간별로도 나눠 반환한다.
+        """
+        if group_by not in SUMMARY_GROUPS:
+            raise ValueError(f"group_by는 {', '.join(SUMMARY_GROUPS)} 중 하나여야 합니다.")
+        since = time.time() - window
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute("SELECT * FROM usage_log WHERE ts >= ? ORDER BY ts", (since,)).fetchall()
+        finally:
+            conn.close()
+
+        def grouped(subset: List[sqlite3.Row]) -> Dict[str, dict]:
+            groups: Dict[str, List[sqlite3.Row]] = {}
+            for r in subset:
+                groups.setdefault(r[group_by] or "-", []).append(r)
+            stats = {key: _aggregate(values) for key, values in groups.items()}
+            return dict(sorted(stats.items(), key=lambda item: -item[1]["cost_usd"]))
+
+        result = {
+            "window_s": window,
+            "since": since,
+            "group_by": group_by,
+            "total": _aggregate(rows) if rows else {"requests": 0},
+            "groups": grouped(rows),
+        }
+        if bucket:
+            buckets: Dict[int, List[sqlite3.Row]] = {}
+            for r in rows:
+                buckets.setdefault(int((r["ts"] - since) // bucket), []).append(r)
+            result["buckets"] = [
+                {"start": since + index * bucket, "groups": grouped(values)}
+                for index, values in sorted(buckets.items())
+            ]
+        return result
+
+    def stats_dict(self) -> dict:
+        return {
+            "path": str(self.path),
+            "written": self.written,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+_current: ContextVar[Optional[UsageRecord]] = ContextVar("usage_record", default=None)
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """USAGE_LEDGER가 켜져 있으면 원장 싱글톤, 아니면 None."""
+    global _ledger
+    if not settings.USAGE_LEDGER:
+        return None
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = UsageLedger(settings.USAGE_LEDGER_PATH, settings.USAGE_PRICES, settings.USAGE_LEDGER_RETENTION_DAYS)
+    return _ledger
+
+
+def current_usage() -> Optional[UsageRecord]:
+    """현재 실행 중인 요청의 UsageRecord (track_usage 블록 밖이면 None)."""
+    return _current.get()
+
+
+@contextmanager
+def track_usage(record: UsageRecord, ledger: UsageLedger) -> Iterator[UsageRecord]:
+    """
+    이 블록의 LLM/검색 호출과 그래프 노드 시간을 record에 모으고, 끝나면 원장에 넘긴다.
+    예외가 나면 status를 error로 표시한다 (취소 등 다른 상태는 호출자가 먼저 지정).
+    """
+    profile = NodeProfile()
+    token = _current.set(record)
+    record.start()
+    try:
+        with profile_nodes(profile):
+            yield record
+    except BaseException:
+        if record.status == "ok":
+            record.status = "error"
+        raise
+    finally:
+        _current.reset(token)
+        record.finish(profile.to_dict())
+        ledger.submit(record)
@@ -0,0 +1,152 @@
+"""
+에이전트 그래프 노드별 오버헤드/할당량 마이크로벤치마크.
+
+검색 결과가 N개 쌓인 연구 모드 상태를 만들어 두고
+1) 노드 함수를 직접 호출해 호출당 시간(중앙값), tracemalloc 최대 할당량, 반환한 부분 업데이트 크기를 재고
+2) 같은 상태로 그래프 전체를 실행해 노드별 wall 시간과 노드 밖(채널 병합/reducer) 오버헤드를 잰다.
+
+LLM은 프로세스 내 stub 공급자(지연 0)를, 검색은 고정 결과를 쓰므로 네트워크를 쓰지 않는다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/agent_state.py
+    python benchmarks/agent_state.py --results 10 100 1000 --runs 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# app 패키지 import 시 설정 검증을 통과하도록 더미 키 사용 (API 호출 없음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+os.environ["LLM_PROVIDERS"] = "stub"
+os.environ["LLM_STUB_DELAY"] = "0"
+os.environ["CASSETTE_MODE"] = "off"
+os.environ["MEMORY_PROFILING"] = "false"
+
+from app.agent.agent import (  # noqa: E402
+    call_llm,
+    detect_mode,
+    detect_search_usage,
+    get_agent_graph,
+    initial_state,
+    perform_search,
+)
+from app.agent.tools import SearchResult  # noqa: E402
+from app.instrument import profile_nodes  # noqa: E402
+
+
+QUESTION = "2024년 국내 전기차 배터리 시장 동향을 리서치 해줘"
+PAGE = "국내 전기차 배터리 시장은 2024년에도 성장세를 이어갔다. " * 40
+
+
+class _FixedSearch:
+    """perform_search가 config에서 꺼내 쓰는 추측 검색 핸들 대용 (항상 같은 결과)."""
+
+    def __init__(self, results: list[SearchResult]) -> None:
+        self.results = results
+
+    def take(self, query: str) -> list[SearchResult]:
+        return list(self.results)
+
+
+def _results(count: int, offset: int = 0) -> list[SearchResult]:
+    return [
+        SearchResult(
+            title=f"전기차 배터리 시장 보고서 {offset + i}",
+            url=f"https://source{(offset + i) % 7}.example.com/report/{offset + i}",
+            content=f"{offset + i}번째 결과: 국내 배터리 시장 동향과 전기차 판매량 분석 " * 4,
+            score=0.5 + (i % 5) / 10,
+            # 회차마다 상위 3개 정도만 원문을 가져오는 것과 비슷하게
+            page_content=PAGE if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def _research_state(count: int) -> dict:
+    state = initial_state(QUESTION)
+    state.update(detect_mode(state))
+    state["search_results"] = _results(count)
+    state["answer"] = "## 요약\n" + "배터리 시장 " * 200
+    return state
+
+
+def _size(value, seen=None) -> int:
+    """반환값이 새로 잡는 대략적인 크기 (공유 문자열 포함, 바이트)."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_size(k, seen) + _size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_size(v, seen) for v in value)
+    elif isinstance(value, SearchResult):
+        size += sum(_size(getattr(value, f), seen) for f in value.__slots__)
+    return size
+
+
+def _bench_node(fn, state: dict, config: dict, runs: int) -> tuple[float, float, float]:
+    """(호출당 중앙값 μs, 최대 할당 KB, 반환 업데이트 KB)"""
+    call = (lambda: fn(state, config=config)) if config is not None else (lambda: fn(state))
+    call()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    update = call()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return statistics.median(timings) * 1e6, peak / 1024, _size(update) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=int, nargs="+", default=[10, 100, 1000], help="상태에 쌓인 검색 결과 수")
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+
+    search = {"configurable": {"prefetch": _FixedSearch(_results(3, offset=10_000))}}
+    nodes = [
+        ("detect_mode", detect_mode, None),
+        ("perform_search", perform_search, search),
+        ("call_llm", call_llm, {}),
+        ("detect_search", detect_search_usage, None),
+    ]
+    graph = get_agent_graph()
+
+    for count in args.results:
+        state = _research_state(count)
+        print(f"\n검색 결과 {count}개 상태")
+        print(f"{'node':<16}{'μs/call':>12}{'peak KB':>10}{'update KB':>11}")
+        for name, fn, config in nodes:
+            micros, peak_kb, update_kb = _bench_node(fn, state, config, args.runs)
+            print(f"{name:<16}{micros:>12.1f}{peak_kb:>10.1f}{update_kb:>11.1f}")
+
+        # 그래프 전체: 검색 1회(고정 결과 3개) → 충분성 평가 → LLM 1회
+        start = initial_state(QUESTION)
+        start["search_results"] = _results(count)
+        totals = []
+        with profile_nodes() as profile:
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                graph.invoke(start, config=search)
+                totals.append(time.perf_counter() - started)
+        node_ms = sum(s["wall_ms"] * s["calls"] for s in profile.to_dict().values()) / args.runs
+        total_ms = statistics.median(totals) * 1000
+        print(f"graph.invoke: 중앙값 {total_ms:.3f} ms (노드 {node_ms:.3f} ms, 노드 밖 채널 병합 등 {total_ms - node_ms:.3f} ms)")
+
+
+if __name__ == "__main__":
+    main()
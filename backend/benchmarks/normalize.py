@@ -0,0 +1,118 @@
+"""
+문서 텍스트 정규화 벤치마크.
+
+PDF마다 정규화 전/후 글자 수, 절감률, 15,000자 예산 안에 들어가는 원문 비율,
+정규화에 걸린 시간을 출력한다. PDF를 지정하지 않으면 머리글/바닥글·쪽 번호·하이픈 줄바꿈이
+반복되는 합성 브로슈어/계약서 PDF를 만들어 사용한다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/normalize.py
+    python benchmarks/normalize.py brochure.pdf contract.pdf
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# app 패키지 import 시 설정 검증을 통과하도록 더미 키 사용 (API 호출 없음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+
+from app.files.loader import MAX_TEXT_LENGTH  # noqa: E402
+from app.files.normalize import normalize_pages  # noqa: E402
+
+
+def _write_pdf(pages: list[list[str]], path: Path) -> None:
+    """Helvetica 텍스트 줄만 있는 최소 PDF를 만든다 (ASCII 전용)."""
+    font_id = 3 + len(pages) * 2
+    kids = " ".join(f"{3 + i * 2} 0 R" for i in range(len(pages)))
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>"]
+    for i, lines in enumerate(pages):
+        shown = " ".join(f"({line.replace('(', '').replace(')', '')}) '" for line in lines)
+        content = f"BT /F1 9 Tf 40 800 Td 11 TL {shown} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {4 + i * 2} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = "%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    path.write_bytes(out.encode("latin-1"))
+
+
+def _sample_pdfs(directory: Path) -> list[Path]:
+    body = (
+        "The supplier shall deliver the products described in the order form within thirty days "
+        "and is liable for any damage caused during transport, except where the customer has "
+        "failed to provide accurate delivery information in a timely man-"
+    )
+    brochure, contract = [], []
+    for n in range(1, 21):
+        brochure.append([
+            "ACME Corp    Product Brochure    2024 Edition",
+            "www.acme.example    |    sales@acme.example",
+            *[line for k in range(4) for line in (f"Feature {n}.{k}:   {body}", f"ner, option {k} applies.")],
+            "This document is confidential. Do not distribute without written permission.",
+            f"Page {n} of 20",
+        ])
+        contract.append([
+            f"Master Services Agreement - Revision {n % 3}",
+            *[line for k in range(3) for line in (f"Article {n * 3 + k}.  {body}", f"ner, subject to clause {k}.")],
+            "",
+            f"- {n} -",
+        ])
+    paths = [directory / "brochure.pdf", directory / "contract.pdf"]
+    _write_pdf(brochure, paths[0])
+    _write_pdf(contract, paths[1])
+    return paths
+
+
+def _page_texts(path: Path) -> list[str]:
+    from pypdf import PdfReader
+
+    reader = PdfReader(BytesIO(path.read_bytes()))
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=20, help="정규화 시간 측정 반복 횟수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.pdfs or _sample_pdfs(Path(tmp))
+        print(f"{'file':24s} {'pages':>5s} {'before':>8s} {'after':>8s} {'saved':>7s} {'in-budget':>10s} {'normalize':>10s}")
+        for path in paths:
+            pages = _page_texts(path)
+            raw = "\n".join(pages)
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                normalized = normalize_pages(pages)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+            saved = 1 - len(normalized) / len(raw) if raw else 0.0
+            # 15,000자 예산 안에 원문(정규화 전 기준)의 몇 %가 들어가는지
+            before_cover = min(1.0, MAX_TEXT_LENGTH / len(raw)) if raw else 1.0
+            after_cover = min(1.0, MAX_TEXT_LENGTH / len(normalized)) if normalized else 1.0
+            print(
+                f"{path.name[:24]:24s} {len(pages):5d} {len(raw):8d} {len(normalized):8d} {saved:7.1%} "
+                f"{before_cover:4.0%}->{after_cover:4.0%} {elapsed_ms:8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
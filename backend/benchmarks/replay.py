@@ -0,0 +1,136 @@
+"""
+카세트 녹화/재생 기반 run_agent 성능 회귀 벤치마크.
+
+record: 시나리오 질문을 실제 공급자(LLM_PROVIDERS)와 Tavily로 한 번 실행하며 모든 교환을 카세트에 녹화한다.
+replay: 같은 시나리오를 카세트로 여러 번 재생하며 그래프 노드별 wall/CPU/외부 대기/앱 처리 시간을 출력한다.
+        --latency zero로 재생하면 외부 지연이 0이 되어 코드 자체의 오버헤드만 남는다.
+        --json으로 결과를 저장해 두고 변경 후 --baseline으로 비교한다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/replay.py record --cassette /tmp/agent.jsonl.gz
+    python benchmarks/replay.py replay --cassette /tmp/agent.jsonl.gz --latency zero --runs 50 --json before.json
+    python benchmarks/replay.py replay --cassette /tmp/agent.jsonl.gz --latency zero --runs 50 --baseline before.json
+    python benchmarks/replay.py replay --cassette /tmp/agent.jsonl.gz --alloc   # tracemalloc으로 노드별 할당량 측정
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+SCENARIOS = [
+    # (질문, 스트리밍 여부)
+    ("사내 보안 정책 문서를 작성할 때 꼭 들어가야 할 항목을 5개만 알려줘", False),
+    ("사내 보안 정책 문서를 작성할 때 꼭 들어가야 할 항목을 5개만 알려줘", True),
+    ("2024년 국내 전기차 배터리 시장 동향을 리서치 해줘", True),
+    ("다음 문장을 영어로 번역해줘: 오늘 회의는 오후 3시에 시작합니다.", False),
+]
+
+
+def _load_scenarios(path: str | None) -> list[tuple[str, bool]]:
+    if not path:
+        return SCENARIOS
+    # 한 줄에 질문 하나, "stream:" 접두사가 있으면 스트리밍으로 실행
+    scenarios = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line:
+            stream = line.startswith("stream:")
+            scenarios.append((line.removeprefix("stream:").strip(), stream))
+    return scenarios
+
+
+def _run_once(scenarios: list[tuple[str, bool]]) -> float:
+    from app.agent.agent import run_agent
+
+    started = time.perf_counter()
+    for question, stream in scenarios:
+        run_agent(question, (lambda event: None) if stream else None)
+    return time.perf_counter() - started
+
+
+def _print_nodes(nodes: dict, baseline: dict | None) -> None:
+    header = f"{'node':<16}{'calls':>7}{'wall ms':>10}{'cpu ms':>10}{'ext ms':>10}{'app ms':>10}{'alloc KB':>10}"
+    if baseline:
+        header += f"{'Δapp ms':>10}{'Δcpu ms':>10}"
+    print(header)
+    for name, stats in nodes.items():
+        line = (
+            f"{name:<16}{stats['calls']:>7}{stats['wall_ms']:>10.3f}{stats['cpu_ms']:>10.3f}"
+            f"{stats['external_ms']:>10.3f}{stats['app_ms']:>10.3f}{stats['alloc_peak_kb']:>10.1f}"
+        )
+        before = (baseline or {}).get(name)
+        if before:
+            line += f"{stats['app_ms'] - before['app_ms']:>+10.3f}{stats['cpu_ms'] - before['cpu_ms']:>+10.3f}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--cassette", required=True, help="카세트 파일 경로 (.jsonl.gz)")
+    parser.add_argument("--scenarios", help="질문 목록 파일 (한 줄에 하나, 'stream:' 접두사로 스트리밍)")
+    parser.add_argument("--runs", type=int, default=20, help="replay 반복 횟수")
+    parser.add_argument("--latency", choices=["recorded", "zero"], default="zero")
+    parser.add_argument("--alloc", action="store_true", help="tracemalloc으로 노드별 최대 할당량 측정 (느려짐)")
+    parser.add_argument("--json", help="노드별 결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 --json 결과")
+    args = parser.parse_args()
+
+    # 설정은 app import 시점에 읽히므로 먼저 환경 변수를 맞춘다
+    os.environ["CASSETTE_MODE"] = args.mode
+    os.environ["CASSETTE_PATH"] = args.cassette
+    os.environ["CASSETTE_LATENCY"] = args.latency
+    os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+    if args.mode == "replay":
+        # 재생은 네트워크를 쓰지 않으므로 키가 없어도 된다
+        os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+
+    from app.agent.agent import get_agent_graph
+    from app.cassette import get_cassette
+    from app.instrument import profile_nodes
+
+    scenarios = _load_scenarios(args.scenarios)
+    get_agent_graph()
+    cassette = get_cassette()
+
+    if args.mode == "record":
+        seconds = _run_once(scenarios)
+        cassette.save()
+        size = Path(args.cassette).stat().st_size
+        print(f"녹화: 시나리오 {len(scenarios)}개, 교환 {cassette.recorded}개, {seconds:.2f}s, 파일 {size / 1024:.1f} KB")
+        return
+
+    # 첫 실행은 import/캐시 예열이 섞이므로 측정에서 제외
+    _run_once(scenarios)
+    if args.alloc:
+        import tracemalloc
+        tracemalloc.start()
+
+    totals = []
+    with profile_nodes() as profile:
+        for _ in range(args.runs):
+            totals.append(_run_once(scenarios))
+    nodes = profile.to_dict()
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["nodes"] if args.baseline else None
+    print(f"재생: 시나리오 {len(scenarios)}개 × {args.runs}회, 지연={args.latency}, 카세트 미스 {cassette.misses}개")
+    node_ms = sum(stats["wall_ms"] * stats["calls"] for stats in nodes.values()) / args.runs
+    print(f"실행당 전체: 중앙값 {statistics.median(totals) * 1000:.2f} ms, 최소 {min(totals) * 1000:.2f} ms "
+          f"(노드 밖 그래프 실행 오버헤드 약 {statistics.median(totals) * 1000 - node_ms:.2f} ms)")
+    print("노드별 값은 호출 1회 평균 (app = wall - 외부 대기)")
+    _print_nodes(nodes, baseline)
+
+    if args.json:
+        result = {"runs": args.runs, "latency": args.latency, "total_ms_median": statistics.median(totals) * 1000, "nodes": nodes}
+        Path(args.json).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
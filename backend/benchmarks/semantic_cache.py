@@ -0,0 +1,86 @@
+"""
+의미 기반 질문 캐시 조회 지연 벤치마크.
+
+합성 질문으로 인덱스를 채운 뒤, 적중/미스 질의의 top-1 조회 지연 분포와
+인덱스 메모리 사용량을 출력한다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/semantic_cache.py
+    python benchmarks/semantic_cache.py --entries 100000 --queries 2000 --dim 256
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# app 패키지 import 시 설정 검증을 통과하도록 더미 키 사용 (API 호출 없음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+
+from app.cache.semantic import SemanticCache  # noqa: E402
+
+
+_TOPICS = [
+    "LangGraph", "FastAPI", "Streamlit", "의료 AI", "벡터 데이터베이스", "Python 비동기",
+    "쿠버네티스", "반도체 시장", "전기차 배터리", "임상시험", "개인정보보호법", "RAG",
+]
+_TEMPLATES = [
+    "{t} {n}번 사례에 대해 조사해줘",
+    "{t} {n} 리서치",
+    "{t}와 {n}번째 대안 비교",
+    "{t} {n} 버전의 주요 변경사항은?",
+    "{n}년 {t} 동향 알려줘",
+]
+
+
+def _question(rng: random.Random, i: int) -> str:
+    return rng.choice(_TEMPLATES).format(t=rng.choice(_TOPICS), n=i)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache = SemanticCache(capacity=args.entries, dim=args.dim, threshold=0.9)
+    questions = [_question(rng, i) for i in range(args.entries)]
+
+    started = time.perf_counter()
+    for i, q in enumerate(questions):
+        cache.store(q, "research" if i % 3 == 0 else "general", i)
+    fill_s = time.perf_counter() - started
+
+    def run(samples: list[str], label: str) -> None:
+        latencies = []
+        hits = 0
+        for q in samples:
+            t0 = time.perf_counter()
+            hits += cache.lookup(q, "general") is not None
+            latencies.append((time.perf_counter() - t0) * 1000)
+        print(
+            f"{label:6s} n={len(samples):5d} hit={hits / len(samples):6.1%} "
+            f"p50={statistics.median(latencies):.3f}ms p95={_percentile(latencies, 0.95):.3f}ms "
+            f"max={max(latencies):.3f}ms"
+        )
+
+    print(f"entries={args.entries} dim={args.dim} index={cache.stats_dict()['index_bytes'] / 1e6:.1f}MB "
+          f"fill={fill_s:.1f}s ({args.entries / fill_s:.0f} inserts/s)")
+    run([q for i, q in enumerate(questions) if i % 3][: args.queries], "hit")
+    run([f"완전히 다른 질문 {rng.random()}" for _ in range(args.queries)], "miss")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+콜드 스타트 벤치마크.
+
+1) `python -X importtime -c "import app.main"`으로 모듈 import 비용을 측정하고
+   누적 시간이 큰 최상위 모듈을 출력한다.
+2) uvicorn 프로세스를 새로 띄워 첫 `/health` 응답까지 걸린 시간
+   (time-to-first-response)을 측정한다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --no-warmup
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _env(warmup: bool) -> dict:
+    env = dict(os.environ)
+    # 벤치마크는 실제 키가 없어도 동작해야 하므로 더미 키를 넣는다
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+    env["WARMUP_ON_STARTUP"] = "true" if warmup else "false"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_import_time(top: int) -> float:
+    """importtime 출력을 파싱해 app.main 누적 import 시간(ms)을 반환한다."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=_env(warmup=False),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # 형식: "import time:   self_us |   cumulative_us | <들여쓰기>module"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+
+    total = next((cum for name, _, cum, _ in rows if name == "app.main"), 0)
+    top_level = sorted((r for r in rows if r[3] <= 1), key=lambda r: r[2], reverse=True)
+    print(f"import app.main: {total / 1000:.1f} ms")
+    print(f"{'module':40s} {'cumulative(ms)':>15s} {'self(ms)':>10s}")
+    for name, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"{name:40s} {cumulative_us / 1000:15.1f} {self_us / 1000:10.1f}")
+    return total / 1000
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_response(warmup: bool, timeout: float = 60.0) -> float:
+    """uvicorn 기동부터 첫 /health 200 응답까지의 시간(ms)."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=_env(warmup),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("서버가 제한 시간 안에 응답하지 않았습니다.")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="time-to-first-response 반복 횟수")
+    parser.add_argument("--top", type=int, default=15, help="출력할 import 상위 모듈 수")
+    parser.add_argument("--no-warmup", action="store_true", help="기동 시 예열(lifespan) 비활성화")
+    args = parser.parse_args()
+
+    measure_import_time(args.top)
+
+    samples = [measure_first_response(warmup=not args.no_warmup) for _ in range(args.runs)]
+    print()
+    print(
+        f"time-to-first-response (warmup={'off' if args.no_warmup else 'on'}, n={len(samples)}): "
+        f"median {statistics.median(samples):.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
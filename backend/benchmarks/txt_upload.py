@@ -0,0 +1,82 @@
+"""
+대용량 TXT 업로드 추출 벤치마크.
+
+반복되지 않는 로그 줄로 크기별 TXT를 만들어
+1) 예전 방식 (전체를 한 번에 디코딩 → 전체 정규화 → 자르기)
+2) 점진적 디코딩 (앞부분 표본으로 인코딩 판별 → 조각 단위 디코딩 → 예산을 채우면 중단)
+의 시간과 tracemalloc 최대 할당량을 비교한다. 파일 바이트 자체는 두 방식 모두 측정 전에 만들어 둔다.
+
+사용법 (backend 디렉터리에서):
+    python benchmarks/txt_upload.py
+    python benchmarks/txt_upload.py --sizes-mb 1 10 100 --encoding cp949 --max-length 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# app 패키지 import 시 설정 검증을 통과하도록 더미 키 사용 (API 호출 없음)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-dummy")
+os.environ["MEMORY_PROFILING"] = "false"
+
+from app.files.loader import MAX_TEXT_LENGTH, extract_bytes  # noqa: E402
+from app.files.normalize import normalize_text  # noqa: E402
+
+
+def _log_bytes(size_mb: int, encoding: str) -> bytes:
+    target = size_mb * 2**20
+    parts, total, i = [], 0, 0
+    while total < target:
+        line = f"2024-03-{i % 28 + 1:02d} 12:{i % 60:02d}:00 INFO 결제 요청 {i} 처리 완료 (사용자 {i * 7 % 9973})\n"
+        encoded = line.encode(encoding)
+        parts.append(encoded)
+        total += len(encoded)
+        i += 1
+    return b"".join(parts)
+
+
+def _full_decode(data: bytes, encoding: str, max_length: int) -> str:
+    """이전 구현과 같은 처리: 전체 디코딩 후 전체 정규화, 마지막에 자르기."""
+    return normalize_text(data.decode(encoding, errors="ignore"))[:max_length]
+
+
+def _measure(fn) -> tuple[float, float, object]:
+    """(ms, 최대 할당 MB, 반환값)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--encoding", default="utf-8", help="생성할 파일 인코딩 (utf-8, cp949, utf-16 등)")
+    parser.add_argument("--max-length", type=int, default=MAX_TEXT_LENGTH, help="텍스트 예산(글자)")
+    args = parser.parse_args()
+
+    print(f"인코딩 {args.encoding}, 예산 {args.max_length:,}자")
+    print(f"{'size':>7}{'full ms':>10}{'full MB':>10}{'stream ms':>11}{'stream MB':>11}{'read KB':>10}  same")
+    for size_mb in args.sizes_mb:
+        data = _log_bytes(size_mb, args.encoding)
+        full_ms, full_mb, full_text = _measure(lambda: _full_decode(data, args.encoding, args.max_length))
+        stream_ms, stream_mb, doc = _measure(
+            lambda: asyncio.run(extract_bytes("bench.txt", data, None, args.max_length))
+        )
+        same = "yes" if doc.text == full_text else "no"
+        print(
+            f"{size_mb:>5}MB{full_ms:>10.1f}{full_mb:>10.1f}{stream_ms:>11.1f}{stream_mb:>11.2f}"
+            f"{doc.bytes_read / 1024:>10.0f}  {same} ({doc.encoding})"
+        )
+
+
+if __name__ == "__main__":
+    main()
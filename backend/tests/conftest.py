@@ -0,0 +1,24 @@
+"""
+테스트 공통 설정.
+
+app 패키지는 import 시점에 환경 변수로 설정을 읽으므로, 외부 서비스(OpenAI/Tavily/Redis)와
+디스크 원장을 쓰지 않도록 여기서 먼저 지정한다. 개별 테스트는 monkeypatch로 settings 값을 바꾼다.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-dummy")
+os.environ.pop("TAVILY_API_KEY", None)
+os.environ["LLM_PROVIDERS"] = "stub"
+os.environ["LLM_STUB_DELAY"] = "0"
+os.environ["CASSETTE_MODE"] = "off"
+os.environ["MEMORY_PROFILING"] = "false"
+os.environ["USAGE_LEDGER"] = "false"
+os.environ["CACHE_BACKEND"] = "memory"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+os.environ["SEARCH_PREFETCH"] = "false"
+os.environ["WARMUP_ON_STARTUP"] = "false"
@@ -0,0 +1,189 @@
+"""
+테스트용 프로세스 내 Redis 대역 서버 (RESP2).
+
+RedisCache가 쓰는 명령만 구현한다: AUTH, SELECT, PING, GET, SET(PX), DEL, INCRBY, DECRBY,
+HGET, HSET, HDEL, ZADD(XX), ZREM, ZRANGE, ZCARD, ZPOPMIN.
+만료는 조회 시점에 확인하며, fail_commands에 넣은 명령은 -ERR로 응답하고
+drop_next_connection()을 호출하면 다음 명령을 받은 연결을 응답 없이 끊는다.
+"""
+
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional, Set
+
+
+class _Store:
+    def __init__(self, password: Optional[str]) -> None:
+        self.lock = threading.Lock()
+        self.password = password
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.fail_commands: Set[str] = set()
+        self.drop_connections = 0
+        self.commands: list[str] = []
+
+    def _live(self, key: bytes) -> Any:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, args: list[bytes], session: dict) -> Any:
+        name = args[0].decode().upper()
+        self.commands.append(name)
+        if name in self.fail_commands:
+            return RuntimeError(f"ERR injected failure for {name}")
+        if name == "AUTH":
+            if args[1].decode() != self.password:
+                return RuntimeError("WRONGPASS invalid password")
+            session["authed"] = True
+            return "OK"
+        if self.password and not session.get("authed"):
+            return RuntimeError("NOAUTH Authentication required.")
+        if name == "SELECT":
+            return "OK"
+        if name == "PING":
+            return "PONG"
+        if name == "GET":
+            value = self._live(args[1])
+            if value is not None and not isinstance(value, bytes):
+                return RuntimeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if name == "SET":
+            self.data[args[1]] = args[2]
+            self.expires.pop(args[1], None)
+            options = [a.decode().upper() for a in args[3:]]
+            if "PX" in options:
+                self.expires[args[1]] = time.time() + int(options[options.index("PX") + 1]) / 1000
+            return "OK"
+        if name == "DEL":
+            removed = 0
+            for key in args[1:]:
+                if self._live(key) is not None:
+                    removed += 1
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name in ("INCRBY", "DECRBY"):
+            delta = int(args[2]) * (1 if name == "INCRBY" else -1)
+            value = int(self._live(args[1]) or 0) + delta
+            self.data[args[1]] = str(value).encode()
+            return value
+        if name in ("HGET", "HSET", "HDEL"):
+            table = self._live(args[1])
+            if table is None:
+                table = {}
+            if name == "HGET":
+                return table.get(args[2])
+            if name == "HSET":
+                added = int(args[2] not in table)
+                table[args[2]] = args[3]
+                self.data[args[1]] = table
+                return added
+            removed = int(table.pop(args[2], None) is not None)
+            return removed
+        if name in ("ZADD", "ZREM", "ZRANGE", "ZCARD", "ZPOPMIN"):
+            zset = self._live(args[1])
+            if zset is None:
+                zset = {}
+                self.data[args[1]] = zset
+            if name == "ZADD":
+                rest = args[2:]
+                only_existing = rest[0].upper() == b"XX"
+                if only_existing:
+                    rest = rest[1:]
+                added = 0
+                for score, member in zip(rest[0::2], rest[1::2]):
+                    if only_existing and member not in zset:
+                        continue
+                    added += int(member not in zset)
+                    zset[member] = float(score)
+                return added
+            ordered = sorted(zset, key=lambda m: (zset[m], m))
+            if name == "ZREM":
+                return sum(int(zset.pop(m, None) is not None) for m in args[2:])
+            if name == "ZCARD":
+                return len(zset)
+            if name == "ZRANGE":
+                start, stop = int(args[2]), int(args[3])
+                return ordered[start:None if stop == -1 else stop + 1]
+            if not ordered:
+                return []
+            member = ordered[0]
+            score = zset.pop(member)
+            return [member, repr(score).encode()]
+        return RuntimeError(f"ERR unknown command '{name}'")
+
+
+def _encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RuntimeError):
+        return b"-%s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    raise TypeError(type(value))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        store: _Store = self.server.store
+        session: dict = {}
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if not line.startswith(b"*"):
+                self.wfile.write(b"-ERR Protocol error\r\n")
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            with store.lock:
+                if store.drop_connections:
+                    store.drop_connections -= 1
+                    return
+                reply = store.execute(args, session)
+            self.wfile.write(_encode(reply))
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """127.0.0.1 임의 포트에서 도는 Redis 대역 서버. url 속성으로 RedisCache에 연결한다."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password: Optional[str] = None) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.store = _Store(password)
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def url(self) -> str:
+        auth = f":{self.store.password}@" if self.store.password else ""
+        return f"redis://{auth}127.0.0.1:{self.server_address[1]}/0"
+
+    def start(self) -> "RespStandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def fail(self, *commands: str) -> None:
+        with self.store.lock:
+            self.store.fail_commands = {c.upper() for c in commands}
+
+    def drop_next_connection(self) -> None:
+        with self.store.lock:
+            self.store.drop_connections += 1
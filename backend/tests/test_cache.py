@@ -0,0 +1,266 @@
+"""캐시 백엔드(app.cache) 테스트. Redis는 tests/resp_server.py의 대역 서버로 확인한다."""
+
+import socket
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+from app.agent.tools import SearchResult
+from app.cache import MemoryCache, RedisCache, SQLiteCache, make_key
+from app.cache.base import deserialize, serialize
+from app.cache.redis import RedisError, RespConnection
+
+from .resp_server import RespStandIn
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def resp():
+    server = RespStandIn().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def make_cache(request, tmp_path):
+    """같은 테스트를 세 백엔드에서 실행한다. make_cache(max_bytes=..., default_ttl=...)"""
+    server = RespStandIn().start() if request.param == "redis" else None
+
+    def make(max_bytes: int = 1_000_000, default_ttl=None, namespace: str = "test"):
+        if request.param == "memory":
+            return MemoryCache(namespace, max_bytes, default_ttl)
+        if request.param == "sqlite":
+            return SQLiteCache(namespace, max_bytes, tmp_path / "cache.sqlite3", default_ttl)
+        return RedisCache(namespace, max_bytes, server.url, default_ttl)
+
+    make.backend = request.param
+    make.server = server
+    yield make
+    if server is not None:
+        server.stop()
+
+
+# --- 공통 동작 ---
+
+
+def test_get_set_delete(make_cache):
+    cache = make_cache()
+    assert cache.get("missing") is None
+    cache.set("k", {"answer": "캔버라", "sources": [1, 2]})
+    assert cache.get("k") == {"answer": "캔버라", "sources": [1, 2]}
+    cache.set("k", "덮어씀")
+    assert cache.get("k") == "덮어씀"
+    cache.delete("k")
+    assert cache.get("k") is None
+    cache.delete("k")  # 없는 키 삭제는 조용히 무시
+
+    stats = cache.stats_dict()
+    assert stats["backend"] == make_cache.backend
+    assert (stats["hits"], stats["misses"], stats["sets"]) == (2, 2, 2)
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_ttl_expiry(make_cache):
+    cache = make_cache(default_ttl=0.05)
+    cache.set("default", 1)
+    cache.set("explicit", 2, ttl=0.05)
+    cache.set("long", 3, ttl=60)
+    time.sleep(0.12)
+    assert cache.get("default") is None
+    assert cache.get("explicit") is None
+    assert cache.get("long") == 3
+    # 세 백엔드 모두 같은 방식으로 만료를 세고 크기 장부에서 뺀다
+    stats = cache.stats_dict()
+    assert stats["expired"] == 2 and stats["misses"] == 2
+    assert stats["entries"] == 1 and stats["bytes"] == len(serialize(3))
+    # 이미 정리된 키를 다시 조회해도 만료를 두 번 세지 않음
+    assert cache.get("default") is None
+    assert cache.stats_dict()["expired"] == 2
+
+
+def test_clear_only_own_namespace(make_cache):
+    cache = make_cache(namespace="a")
+    other = make_cache(namespace="b")
+    cache.set("k", 1)
+    other.set("k", 2)
+    cache.clear()
+    assert cache.get("k") is None
+    assert other.get("k") == 2
+
+
+def test_evicts_least_recently_written_over_max_bytes(make_cache):
+    size = len(serialize("x" * 100))
+    cache = make_cache(max_bytes=size * 2)
+    cache.set("a", "x" * 100)
+    cache.set("b", "y" * 100)
+    cache.set("c", "z" * 100)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 100 and cache.get("c") == "z" * 100
+    assert cache.stats_dict()["bytes"] <= size * 2
+    assert cache.stats.evictions == 1
+
+
+def test_value_larger_than_max_bytes_is_not_stored(make_cache):
+    cache = make_cache(max_bytes=50)
+    cache.set("big", "x" * 1_000)
+    assert cache.get("big") is None
+
+
+def test_unserializable_value_raises(make_cache):
+    cache = make_cache()
+    with pytest.raises(Exception):
+        cache.set("bad", lambda: None)
+    assert cache.get("bad") is None
+
+
+def test_search_results_round_trip(make_cache):
+    cache = make_cache()
+    results = [SearchResult(title="제목", url="https://example.com", content="본문", score=0.5, page_content=None)]
+    cache.set("results", results)
+    assert cache.get("results") == results
+
+
+# --- 저장소 오류 처리 ---
+
+
+def test_sqlite_errors_are_cache_misses(tmp_path, monkeypatch):
+    cache = SQLiteCache("test", 1_000_000, tmp_path / "cache.sqlite3")
+    cache.set("k", 1)
+
+    class _Broken:
+        def execute(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "_conn", lambda: _Broken())
+    assert cache.get("k") is None
+    cache.set("k", 2)
+    cache.delete("k")
+    cache.clear()
+    assert cache.stats.misses == 1
+
+
+def test_sqlite_corrupt_value_is_dropped(tmp_path):
+    cache = SQLiteCache("test", 1_000_000, tmp_path / "cache.sqlite3")
+    cache.set("k", 1)
+    cache._conn().execute("UPDATE cache_entries SET value = ? WHERE key = ?", (b"not a pickle", "k"))
+    assert cache.get("k") is None
+    assert cache.stats_dict()["entries"] == 0
+
+
+def test_redis_error_replies_are_cache_misses(resp):
+    cache = RedisCache("test", 1_000_000, resp.url)
+    cache.set("k", 1)
+    resp.fail("GET", "SET", "DEL")
+    assert cache.get("k") is None
+    cache.set("k", 2)
+    cache.delete("k")
+    cache.clear()
+    resp.fail()
+    assert cache.get("k") == 1
+
+
+def test_redis_corrupt_value_is_dropped(resp):
+    cache = RedisCache("test", 1_000_000, resp.url)
+    cache.set("k", 1)
+    RespConnection("127.0.0.1", resp.server_address[1]).execute("SET", "cache:test:v:k", b"not a pickle")
+    assert cache.get("k") is None
+    assert cache.stats_dict()["entries"] == 0
+
+
+def test_redis_reconnects_once_after_dropped_connection(resp):
+    cache = RedisCache("test", 1_000_000, resp.url)
+    cache.set("k", "값")
+    resp.drop_next_connection()
+    assert cache.get("k") == "값"
+
+
+def test_redis_unreachable_server_is_cache_miss():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    cache = RedisCache("test", 1_000_000, f"redis://127.0.0.1:{port}/0")
+    assert cache.get("k") is None
+    cache.set("k", 1)
+    cache.delete("k")
+    cache.clear()
+
+
+def test_redis_password():
+    server = RespStandIn(password="secret").start()
+    try:
+        cache = RedisCache("test", 1_000_000, server.url)
+        cache.set("k", 1)
+        assert cache.get("k") == 1
+        with pytest.raises(RedisError):
+            RespConnection("127.0.0.1", server.server_address[1]).execute("GET", "k")
+    finally:
+        server.stop()
+
+
+def test_resp_client_binary_values_and_pipeline(resp):
+    conn = RespConnection("127.0.0.1", resp.server_address[1])
+    payload = b"\x00\r\n$3\r\n\xff"
+    assert conn.pipeline([("SET", "bin", payload), ("GET", "bin"), ("GET", "nope"), ("INCRBY", "n", 5)]) == [
+        "OK", payload, None, 5,
+    ]
+    with pytest.raises(RedisError, match="unknown command"):
+        conn.execute("NOSUCHCOMMAND")
+    # 파이프라인 중간의 에러 응답 뒤에도 응답 순서가 어긋나지 않음
+    resp.fail("HGET")
+    with pytest.raises(RedisError, match="injected"):
+        conn.pipeline([("GET", "bin"), ("HGET", "h", "f"), ("INCRBY", "n", 1)])
+    resp.fail()
+    assert conn.execute("GET", "bin") == payload
+    assert conn.execute("INCRBY", "n", 0) == 6
+    conn.close()
+
+
+# --- 워커 간 키/값 호환 ---
+
+
+def test_make_key_is_order_independent():
+    assert make_key("q", {"a": 1, "b": [1, 2]}) == make_key("q", {"b": [1, 2], "a": 1})
+    assert make_key({"x", "y", "z"}) == make_key({"z", "y", "x"})
+    assert make_key(b"abc") == make_key(bytearray(b"abc")) != make_key(b"abd")
+    assert make_key("q", 1) != make_key("q", "1")
+
+
+def _run_worker(code: str, hash_seed: str) -> str:
+    env = {"PYTHONHASHSEED": hash_seed, "OPENAI_API_KEY": "sk-test-dummy", "PATH": "/usr/bin:/bin"}
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip()
+
+
+def test_make_key_is_stable_across_processes():
+    code = """
+        from app.cache import make_key
+        print(make_key("tavily", {"b": 2, "a": {"z", "y"}}, b"body", 3))
+    """
+    keys = {_run_worker(code, seed) for seed in ("1", "2", "3")}
+    assert keys == {make_key("tavily", {"a": {"y", "z"}, "b": 2}, b"body", 3)}
+
+
+def test_values_written_by_another_worker_round_trip(tmp_path):
+    path = tmp_path / "shared.sqlite3"
+    _run_worker(
+        f"""
+        from app.agent.tools import SearchResult
+        from app.cache import SQLiteCache, make_key
+        cache = SQLiteCache("search", 1_000_000, {str(path)!r})
+        cache.set(make_key("tavily", "배터리", 3), [SearchResult("제목", "https://example.com", "본문", 0.7)])
+        """,
+        "7",
+    )
+    cache = SQLiteCache("search", 1_000_000, path)
+    assert cache.get(make_key("tavily", "배터리", 3)) == [SearchResult("제목", "https://example.com", "본문", 0.7)]
+    assert deserialize(serialize({"k": [1, "둘"]})) == {"k": [1, "둘"]}
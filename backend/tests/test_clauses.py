@@ -0,0 +1,179 @@
+"""위험 조항 추출(조항 분할, 규칙 점수, LLM 검증) 테스트."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.agent import clauses as review
+from app.agent.clauses import review_clauses
+from app.files.clauses import (
+    DEFAULT_RULES,
+    Clause,
+    RuleSet,
+    find_risk_candidates,
+    is_clause_extraction_request,
+    segment_clauses,
+)
+from app.files.loader import MAX_TEXT_LENGTH
+from app.llm import LLMRouter
+from app.llm.stub import StubProvider
+
+
+CONTRACT = """공급 계약서
+
+제1조 (목적) 이 계약은 배터리 공급 조건을 정한다.
+제2조 (위약금) 공급이 지연되면 공급자는 위약금으로 계약 금액의 20%를 지급한다.
+제3조의2 (해지) 구매자는 사전 통지 없이 즉시 계약을 해지할 수 있다.
+제4조 (기간) 계약 기간은 3년으로 한다."""
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("위험한 조항만 뽑아줘", True),
+        ("계약서에서 불리한 조건 찾아줘", True),
+        ("List the risky terms in this contract", True),
+        ("Flag any unfavorable clauses", True),
+        ("Which provision is a red flag?", True),
+        ("계약 기간 뽑아줘", False),
+        ("이 문서 위험 요소 요약해줘", False),
+        # 단어 안에 들어 있는 term은 추출 대상으로 보지 않음
+        ("Help me determine the risk here", False),
+        ("Explain the risk of intermediate results", False),
+    ],
+)
+def test_is_clause_extraction_request(question, expected):
+    assert is_clause_extraction_request(question) is expected
+
+
+def test_segment_clauses_by_korean_headings_keeps_preamble():
+    clauses = segment_clauses(CONTRACT)
+    assert [c.heading for c in clauses] == ["", "제1조", "제2조", "제3조의2", "제4조"]
+    assert clauses[0].text == "공급 계약서"
+    assert clauses[3].text.startswith("제3조의2 (해지)") and clauses[3].clause_id == "C4"
+
+
+def test_segment_clauses_by_english_and_numbered_headings():
+    text = "Article 1 Scope of supply.\nSection 2.1 Payment terms.\n3. Late fees apply.\n3.2) Notice period."
+    assert [c.heading for c in segment_clauses(text)] == ["Article 1", "Section 2.1", "3.", "3.2)"]
+
+
+def test_segment_clauses_falls_back_to_paragraphs():
+    text = "첫 문단입니다.\n\n  \n두 번째 문단입니다.\n이어지는 줄.\n\n세 번째."
+    clauses = segment_clauses(text)
+    assert [c.text for c in clauses] == ["첫 문단입니다.", "두 번째 문단입니다.\n이어지는 줄.", "세 번째."]
+    assert all(c.heading == "" for c in clauses)
+
+
+def _scored(text: str) -> Clause:
+    clause = Clause(index=1, heading="", text=text)
+    RuleSet.from_dict(DEFAULT_RULES).score(clause)
+    return clause
+
+
+def test_rule_score_caps_hits_and_applies_amplifier():
+    assert _scored("공급 조건을 정한다.").score == 0.0
+    single = _scored("위약금을 지급한다.")
+    assert single.categories == ["penalty"] and single.score == 1.0
+    # 같은 범주는 3회까지만 센다
+    assert _scored("위약금 위약금 위약금 위약금 위약금").score == 3.0
+    # 여러 범주 합산 + 수식어(즉시) 가산
+    amplified = _scored("위약금을 즉시 지급하고 계약을 해지한다.")
+    assert amplified.categories == ["penalty", "termination"]
+    assert amplified.score == round((1.0 + 0.8) * 1.3, 3)
+    # 범주 매칭이 없으면 수식어만으로는 점수가 없음
+    assert _scored("즉시 처리한다.").score == 0.0
+
+
+def test_custom_rules_replace_defaults():
+    rules = RuleSet.from_dict({"exclusivity": {"weight": 2.0, "patterns": [r"독점"]}, "empty": {"patterns": []}})
+    clause = Clause(index=1, heading="", text="독점 공급권을 부여하며 위약금은 없다.")
+    rules.score(clause)
+    assert list(rules.rules) == ["exclusivity"]
+    assert clause.categories == ["exclusivity"] and clause.score == 2.0
+
+
+def test_find_risk_candidates_respects_threshold_budget_and_order():
+    clauses = segment_clauses(CONTRACT)
+    rules = RuleSet.from_dict(DEFAULT_RULES)
+    chosen = find_risk_candidates(clauses, rules, max_candidates=10, char_budget=10_000)
+    assert [c.heading for c in chosen] == ["제2조", "제3조의2"]
+    # 예산이 모자라면 점수 높은 조항(위약금 2회)부터 채운다
+    top = max(chosen, key=lambda c: c.score)
+    assert [c.clause_id for c in find_risk_candidates(clauses, rules, 10, len(top.text))] == [top.clause_id]
+    assert len(find_risk_candidates(clauses, rules, max_candidates=1, char_budget=10_000)) == 1
+
+
+class _Reviewer(StubProvider):
+    """JSON 모드 호출에 미리 정한 검증 결과를 돌려주는 스텁 공급자."""
+
+    def __init__(self, items: list) -> None:
+        super().__init__("reviewer", "reviewer-model")
+        self.reply = json.dumps({"items": items}, ensure_ascii=False)
+        self.calls: list = []
+
+    def complete(self, messages, **kwargs):
+        self.calls.append(messages)
+        response = super().complete(messages, **kwargs)
+        response.choices[0].message.content = self.reply
+        return response
+
+
+@pytest.fixture
+def reviewer(monkeypatch):
+    def install(items: list) -> _Reviewer:
+        provider = _Reviewer(items)
+        monkeypatch.setattr(review, "get_llm", lambda: LLMRouter([provider]))
+        return provider
+
+    return install
+
+
+def test_review_clauses_keeps_only_verified_candidates(reviewer):
+    provider = reviewer([
+        {"id": "C3", "risky": True, "severity": "high", "summary": "지연 시 20% 위약금", "reason": "과도함"},
+        {"id": "C4", "risky": False},
+        {"id": "C9", "risky": True},  # 후보에 없는 id
+    ])
+    events = []
+    result = review_clauses("위험한 조항만 뽑아줘", CONTRACT, events.append)
+    assert len(result) == 5
+    answer, used_search, raw, sources, meta = result
+    assert used_search is False and sources is None and raw["model"] == "reviewer-model"
+    report = meta["clauses"]
+    assert (report["total_clauses"], report["candidates"], report["document_chars"]) == (5, 2, len(CONTRACT))
+    assert [item["id"] for item in report["verified"]] == ["C3"]
+    verified = report["verified"][0]
+    assert verified["heading"] == "제2조" and verified["category"] == "penalty" and verified["rule_score"] == 2.0
+    assert "### 제2조 — penalty (위험도: 높음)" in answer
+    assert events == [{"type": "token", "content": answer}]
+    # LLM에는 후보 조항만 전달된다
+    prompt = provider.calls[0][-1]["content"]
+    assert "[C3]" in prompt and "[C4]" in prompt and "제1조" not in prompt
+
+
+def test_review_clauses_without_candidates_skips_llm(reviewer):
+    provider = reviewer([])
+    answer, _, raw, _, meta = review_clauses("위험한 조항만 뽑아줘", "제1조 목적\n제2조 기간은 3년")
+    assert provider.calls == [] and raw == {}
+    assert meta["clauses"]["candidates"] == 0
+    assert "위험하다고 판단된 조항이 없습니다" in answer
+
+
+def test_clause_request_reads_beyond_default_text_limit(reviewer):
+    reviewer([{"id": "C1001", "risky": True, "severity": "medium"}])
+    filler = "\n".join(f"제{i}조 (일반) 이 조는 절차를 설명하는 일반 조항이다." for i in range(1, 1001))
+    text = filler + "\n제1000조의2 (손해배상) 공급자는 일체의 손해배상 책임을 진다."
+    assert len(text) > MAX_TEXT_LENGTH
+    response = TestClient(main.app).post(
+        "/agent/file",
+        data={"question": "위험한 조항만 뽑아줘"},
+        files={"file": ("contract.txt", text.encode("utf-8"), "text/plain")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["clauses"]["total_clauses"] == 1001 and body["clauses"]["document_chars"] == len(text)
+    assert [item["heading"] for item in body["clauses"]["verified"]] == ["제1000조의2"]
+    assert body["extraction"]["truncated"] is False
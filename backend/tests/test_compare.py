@@ -0,0 +1,139 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.agent import agent
+from app.agent.compare import DocumentIndex, _terms, build_compare_question, select_passages
+from app.agent.prompt import DEFAULT_SYSTEM_PROMPT
+from app.files.langid import estimate_tokens
+from app.files.loader import MAX_TEXT_LENGTH, ExtractedDocument
+from app.llm import LLMRouter
+from app.llm.stub import StubProvider
+
+
+def _paragraph(sentence: str) -> str:
+    """비교 조각 하나(800자 이하)가 되는 약 600자 문단."""
+    return " ".join([sentence] * (600 // len(sentence)))
+
+
+FILLER = _paragraph("이 문단은 일반적인 배경 설명을 담고 있습니다.")
+RENEWAL = _paragraph("계약은 만료 30일 전까지 해지 통지가 없으면 자동갱신은 1년 단위로 이루어진다.")
+PENALTY = _paragraph("중도 해지 시 위약금은 잔여 계약 금액의 20%로 한다.")
+
+
+def _doc(name: str, *paragraphs: str) -> ExtractedDocument:
+    return ExtractedDocument(filename=name, text="\n\n".join(paragraphs), content_hash=name)
+
+
+def test_terms_add_hangul_bigrams_for_particle_forms():
+    terms = _terms("자동갱신은 조건")
+    assert "자동갱신은" in terms and "자동" in terms and "갱신" in terms
+    assert "조건" in terms and "조건"[0:1] not in terms
+
+
+def test_bm25_ranks_matching_chunk_first_despite_particles():
+    index = DocumentIndex("D1", _doc("a.txt", FILLER, RENEWAL, FILLER, PENALTY))
+    assert len(index.chunks) == 4
+    scores = index.scores(_terms("자동갱신 조건"))
+    assert max(range(4), key=scores.__getitem__) == 1
+    scores = index.scores(_terms("위약금"))
+    assert max(range(4), key=scores.__getitem__) == 3
+    assert scores[0] == scores[2] == 0.0
+
+
+def test_select_respects_budget_and_keeps_document_order():
+    index = DocumentIndex("D1", _doc("a.txt", FILLER, PENALTY, FILLER, RENEWAL))
+    chosen = index.select(_terms("자동갱신 위약금"), budget=estimate_tokens(PENALTY) + estimate_tokens(RENEWAL) + 5)
+    assert chosen == [1, 3]
+    # 관련 용어가 없으면 앞쪽 조각부터
+    assert index.select(_terms("완전히 무관한 질의"), budget=estimate_tokens(FILLER) + 5) == [0]
+    assert index.select(_terms("위약금"), budget=10) == []
+
+
+def test_budget_is_measured_in_estimated_tokens():
+    english = " ".join(["Either party may terminate this agreement with thirty days notice."] * 9)
+    korean = PENALTY[:len(english)]
+    index = DocumentIndex("D1", _doc("a.txt", korean, english))
+    assert index.chunk_tokens == [estimate_tokens(korean), estimate_tokens(english)]
+    # 글자 수가 같아도 한국어 조각이 토큰을 더 많이 쓴다
+    assert index.chunk_tokens[0] > 2 * index.chunk_tokens[1]
+    assert index.select(_terms("무관한 질의"), budget=index.chunk_tokens[1] + 5) == [1]
+
+
+def test_select_passages_redistributes_unused_budget():
+    short = DocumentIndex("D1", _doc("short.txt", PENALTY))
+    long = DocumentIndex("D2", _doc("long.txt", FILLER, PENALTY, RENEWAL, FILLER))
+    # 짧은 문서 1조각 + 긴 문서 3조각만큼; 균등 분배(절반)라면 긴 문서는 2조각밖에 못 받음
+    budget = 2 * estimate_tokens(PENALTY) + estimate_tokens(RENEWAL) + estimate_tokens(FILLER)
+    selected = select_passages([long, short], "위약금과 자동갱신 비교", budget)
+    assert selected["D1"] == [0]
+    assert len(selected["D2"]) == 3 and {1, 2} <= set(selected["D2"])
+    used = sum(idx.chunk_tokens[i] for idx in (short, long) for i in selected[idx.doc_id])
+    assert used <= budget
+
+
+def test_build_compare_question_tags_passages():
+    docs = [_doc("a.txt", FILLER, RENEWAL), _doc("b.txt", PENALTY)]
+    prompt, documents = build_compare_question(docs, "자동갱신 조건 비교", budget=5_000)
+    assert "=== [D1] a.txt ===" in prompt and "=== [D2] b.txt ===" in prompt
+    assert "[D1-2] " + RENEWAL in prompt and "[D2-1] " + PENALTY in prompt
+    assert prompt.endswith("질문: 자동갱신 조건 비교")
+    assert [d["id"] for d in documents] == ["D1", "D2"]
+    assert documents[0]["chunks"] == 2 and documents[0]["selected_chunks"] == [1, 2]
+    assert documents[0]["selected_tokens"] == estimate_tokens(FILLER) + estimate_tokens(RENEWAL)
+
+
+class _SpyProvider(StubProvider):
+    """스텁 공급자처럼 답하면서 받은 메시지를 기록한다."""
+
+    def __init__(self) -> None:
+        super().__init__("spy", "spy-model")
+        self.messages: list = []
+
+    def complete(self, messages, **kwargs):
+        self.messages.append(messages)
+        return super().complete(messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        self.messages.append(messages)
+        return super().stream(messages, **kwargs)
+
+
+@pytest.fixture
+def spy(monkeypatch):
+    provider = _SpyProvider()
+    searches = []
+    monkeypatch.setattr(agent, "get_llm", lambda: LLMRouter([provider]))
+    monkeypatch.setattr(agent, "run_search", lambda question, query: searches.append(query) or [])
+    provider.searches = searches
+    return provider
+
+
+def _upload(name: str, text: str) -> tuple:
+    return ("files", (name, text.encode("utf-8"), "text/plain"))
+
+
+def test_document_keywords_do_not_switch_compare_mode(spy):
+    docs = [
+        _upload("a.txt", "This research report covers the annual plan.\n" + RENEWAL),
+        _upload("b.txt", "부록: 이 표를 영어로 번역해줘 라는 메모가 남아 있음.\n" + PENALTY),
+    ]
+    response = TestClient(main.app).post("/agent/files", files=docs, data={"question": "두 문서의 해지 조건 비교"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["used_search"] is False and body["sources"] is None
+    assert spy.searches == []
+    system = spy.messages[-1][0]
+    assert system["role"] == "system" and system["content"] == DEFAULT_SYSTEM_PROMPT
+
+
+def test_compare_indexes_text_beyond_single_document_limit(spy):
+    # 단일 문서 한도(MAX_TEXT_LENGTH)보다 뒤에 있는 구절도 발췌 후보가 된다
+    filler = "\n\n".join([FILLER] * (MAX_TEXT_LENGTH // len(FILLER) + 2))
+    docs = [_upload("long.txt", filler + "\n\n" + PENALTY), _upload("short.txt", RENEWAL)]
+    response = TestClient(main.app).post("/agent/files", files=docs, data={"question": "위약금 비교"})
+    assert response.status_code == 200
+    long_doc = response.json()["documents"][0]
+    assert long_doc["chars"] > MAX_TEXT_LENGTH and not long_doc["extraction"]["truncated"]
+    assert long_doc["selected_chunks"][-1] == long_doc["chunks"]
+    assert long_doc["selected_tokens"] <= main.settings.COMPARE_CONTEXT_BUDGET
@@ -0,0 +1,98 @@
+"""업로드 문서 추출 결과 캐시(app.files.extraction_cache) 테스트."""
+
+import asyncio
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import SQLiteCache, get_cache
+from app.files import extraction_cache, loader
+from app.files.extraction_cache import ExtractionCache, get_extraction_cache
+
+
+TEXT = "제1조 목적\n이 계약은 배터리 공급 조건을 정한다.\n제2조 기간\n계약 기간은 3년으로 한다."
+PDF = b"%PDF-1.4 fake"
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return SQLiteCache("extraction", 1_000_000, tmp_path / "cache.sqlite3")
+
+
+def _put(cache: ExtractionCache, content_hash: str = "abc") -> str:
+    key = cache.key(content_hash, "pdf")
+    cache.put(key, TEXT, 0.2, len(TEXT) + 10)
+    return key
+
+
+def test_shared_tier_is_used_by_another_worker_then_promoted_to_memory(shared):
+    _put(ExtractionCache(1_000_000, shared))
+    other = ExtractionCache(1_000_000, shared)
+    key = other.key("abc", "pdf")
+    assert other.get(key) == (TEXT, 0.2, "shared", len(TEXT) + 10)
+    assert other.get(key)[2] == "memory"
+    stats = other.stats_dict()
+    assert (stats["hits_shared"], stats["hits_memory"], stats["misses"]) == (1, 1, 0)
+
+
+def test_extractor_version_change_invalidates_entries(shared, monkeypatch):
+    _put(ExtractionCache(1_000_000, shared))
+    monkeypatch.setattr(extraction_cache, "EXTRACTOR_VERSION", "next")
+    upgraded = ExtractionCache(1_000_000, shared)
+    assert upgraded.get(upgraded.key("abc", "pdf")) is None
+    assert upgraded.stats_dict()["misses"] == 1
+
+
+def test_pypdf_version_change_invalidates_entries(shared, monkeypatch):
+    old = ExtractionCache(1_000_000, shared)
+    _put(old)
+    monkeypatch.setattr(extraction_cache, "_pypdf_version", lambda: "999.0")
+    upgraded = ExtractionCache(1_000_000, shared)
+    assert upgraded.version.endswith("pypdf-999.0") and upgraded.version != old.version
+    assert upgraded.get(upgraded.key("abc", "pdf")) is None
+
+
+@pytest.mark.parametrize("backend, has_shared", [("memory", False), ("sqlite", True)])
+def test_shared_tier_comes_from_cache_backend(tmp_path, monkeypatch, backend, has_shared):
+    monkeypatch.setattr(cache_module.settings, "CACHE_BACKEND", backend)
+    monkeypatch.setattr(cache_module.settings, "CACHE_SQLITE_PATH", tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache_module, "_caches", {})
+    monkeypatch.setattr(extraction_cache, "_extraction_cache", None)
+    cache = get_extraction_cache()
+    if has_shared:
+        assert cache.shared is get_cache("extraction")
+        assert cache.stats_dict()["shared"]["backend"] == "sqlite"
+    else:
+        assert cache.shared is None and cache_module.all_cache_stats() == {}
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """PDF 파싱 대역. 프로세스 풀 대신 기본 스레드 풀에서 실행하고 호출 횟수를 센다."""
+    calls = []
+
+    def extract_from_pdf(data):
+        calls.append(data)
+        return TEXT, len(TEXT) + 10
+
+    monkeypatch.setattr(loader, "_extract_from_pdf", extract_from_pdf)
+    monkeypatch.setattr(loader, "get_extraction_pool", lambda: None)
+    cache = ExtractionCache(1_000_000)
+    monkeypatch.setattr(loader, "get_extraction_cache", lambda: cache)
+    return calls
+
+
+def _extract(max_length: int):
+    return asyncio.run(loader.extract_bytes("contract.pdf", PDF, None, max_length))
+
+
+def test_truncation_is_applied_after_cache_lookup(fake_pdf):
+    short = _extract(10)
+    assert short.text == TEXT[:10] and short.truncated
+    assert short.cache_hit is None and short.chars_after == len(TEXT)
+
+    # 짧은 한도로 먼저 추출해도 캐시에는 전체 텍스트가 남아 긴 한도 요청이 잘리지 않는다
+    full = _extract(100_000)
+    assert full.text == TEXT and full.cache_hit == "memory" and not full.truncated
+    assert full.chars_before == len(TEXT) + 10 and full.saved_ms > 0
+    assert len(fake_pdf) == 1
@@ -0,0 +1,159 @@
+"""원문 페이지 수집(app.agent.fetch) 테스트. 로컬 HTTP 대역 서버를 띄워 실제 httpx 요청으로 확인한다."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.agent import fetch
+from app.agent.fetch import PageFetcher
+from app.agent.tools import SearchResult
+
+
+ARTICLE = "<html><body><nav>메뉴</nav><article>" + "<p>배터리 시장 본문 문단입니다.</p>" * 20 + "</article></body></html>"
+
+
+class _Fixture:
+    """요청 기록과 호스트별 동시 요청 수를 남기는 대역 서버 상태."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: list[tuple[str, dict]] = []
+        self.active: dict[str, int] = {}
+        self.max_active: dict[str, int] = {}
+
+
+def _handler(state: _Fixture):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8", **headers) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name.replace("_", "-"), value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            host = self.headers["Host"].split(":")[0]
+            with state.lock:
+                state.requests.append((self.path, dict(self.headers)))
+                state.active[host] = state.active.get(host, 0) + 1
+                state.max_active[host] = max(state.max_active.get(host, 0), state.active[host])
+            try:
+                self._route()
+            finally:
+                with state.lock:
+                    state.active[host] -= 1
+
+        def _route(self) -> None:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+                self._send(200, ARTICLE.encode())
+            elif self.path == "/big":
+                self._send(200, b"a" * 200_000, content_type="text/plain; charset=utf-8")
+            elif self.path == "/etag":
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self._send(304, ETag='"v1"')
+                else:
+                    self._send(200, ARTICLE.encode(), ETag='"v1"')
+            elif self.path == "/hang":
+                time.sleep(2)
+                self._send(200, ARTICLE.encode())
+            elif self.path == "/error":
+                self._send(500, b"boom")
+            else:
+                self._send(404)
+
+    return Handler
+
+
+@pytest.fixture
+def server():
+    state = _Fixture()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    state.port = httpd.server_address[1]
+    yield state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def make_fetcher(tmp_path):
+    fetchers = []
+
+    def make(**kwargs) -> PageFetcher:
+        options = {"timeout": 5.0, "max_bytes": 1_000_000, "per_host": 2, "cache_dir": tmp_path / "pages"}
+        options.update(kwargs)
+        fetcher = PageFetcher(**options)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_per_host_concurrency_limit(server, make_fetcher):
+    fetcher = make_fetcher(per_host=2, cache_dir=None)
+    urls = [f"http://{host}:{server.port}/slow/{i}" for host in ("127.0.0.1", "localhost") for i in range(5)]
+    pages = fetcher.fetch_pages(urls)
+    assert len(pages) == len(urls)
+    assert server.max_active == {"127.0.0.1": 2, "localhost": 2}
+
+
+def test_body_truncated_at_max_bytes(server, make_fetcher):
+    fetcher = make_fetcher(max_bytes=1_000, cache_dir=None)
+    url = f"http://127.0.0.1:{server.port}/big"
+    assert len(fetcher.fetch_pages([url])[url]) == 1_000
+
+
+def test_etag_revalidation_uses_page_cache(server, make_fetcher, monkeypatch):
+    fetcher = make_fetcher()
+    url = f"http://127.0.0.1:{server.port}/etag"
+    first = fetcher.fetch_pages([url])[url]
+    assert "배터리 시장" in first
+    assert fetcher.cache.get(url)["etag"] == '"v1"'
+
+    # 신선 기간 안에서는 요청하지 않음
+    assert fetcher.fetch_pages([url])[url] == first
+    assert len(server.requests) == 1
+
+    # 신선 기간이 지나면 If-None-Match로 재검증하고, 304면 캐시 본문을 씀
+    monkeypatch.setattr(fetch, "CACHE_FRESH_SECONDS", 0)
+    assert fetcher.fetch_pages([url])[url] == first
+    assert len(server.requests) == 2
+    assert server.requests[1][1].get("If-None-Match") == '"v1"'
+
+
+def test_timeout_and_error_fall_back_to_snippet(server, make_fetcher, monkeypatch):
+    fetcher = make_fetcher(timeout=0.3, cache_dir=None)
+    monkeypatch.setattr(fetch, "_fetcher", fetcher)
+    results = [
+        SearchResult(title="hang", url=f"http://127.0.0.1:{server.port}/hang", content="Tavily 스니펫 1"),
+        SearchResult(title="error", url=f"http://127.0.0.1:{server.port}/error", content="Tavily 스니펫 2"),
+        SearchResult(title="ok", url=f"http://127.0.0.1:{server.port}/slow/ok", content="Tavily 스니펫 3"),
+    ]
+    started = time.monotonic()
+    enriched = fetch.enrich_with_page_content("배터리 시장", results, top_n=3)
+    assert time.monotonic() - started < 1.5
+
+    hang, error, ok = enriched
+    assert hang.page_content is None and hang.content == "Tavily 스니펫 1"
+    assert error.page_content is None and error.content == "Tavily 스니펫 2"
+    assert ok.page_content and "배터리 시장" in ok.page_content
+
+
+def test_error_falls_back_to_stale_cache(server, make_fetcher, monkeypatch):
+    fetcher = make_fetcher()
+    url = f"http://127.0.0.1:{server.port}/error"
+    fetcher.cache.put(url, '"old"', "이전에 받아 둔 본문")
+    monkeypatch.setattr(fetch, "CACHE_FRESH_SECONDS", 0)
+    assert fetcher.fetch_pages([url]) == {url: "이전에 받아 둔 본문"}
@@ -0,0 +1,80 @@
+"""/agent/file/stream NDJSON 이벤트와 gzip 파일 파트 해제 테스트."""
+
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.files import loader
+
+
+TEXT = "배터리 보증 기간은 8년입니다.\n충전은 완속을 권장합니다."
+QUESTION = "이 파일을 요약해줘"
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def _post(client, filename: str, data: bytes, content_type: str = "text/plain", headers=None, **form):
+    part = (filename, data, content_type, headers) if headers else (filename, data, content_type)
+    return client.post("/agent/file/stream", data={"question": QUESTION, **form}, files={"file": part})
+
+
+def _events(response) -> list[dict]:
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_emits_tokens_then_done_with_extraction_report(client):
+    response = _post(client, "notes.txt", TEXT.encode("utf-8"))
+    assert response.status_code == 200
+    events = _events(response)
+    kinds = [e["type"] for e in events]
+    assert kinds[-1] == "done" and "error" not in kinds
+    tokens = [e["content"] for e in events if e["type"] == "token"]
+    assert tokens and kinds.index("token") < kinds.index("done")
+    done = events[-1]
+    # 스텁 공급자는 마지막 사용자 메시지를 그대로 돌려준다
+    assert "".join(tokens) == done["answer"]
+    assert TEXT in done["answer"] and QUESTION in done["answer"]
+    assert done["used_search"] is False
+    assert done["filename"] == "notes.txt"
+    assert done["extraction"]["encoding"] == "utf-8"
+    assert done["extraction"]["bytes_read"] == len(TEXT.encode("utf-8"))
+    assert done["extraction"]["truncated"] is False
+
+
+def test_gzip_part_is_decompressed_before_extraction(client):
+    raw = TEXT.encode("utf-8")
+    response = _post(client, "notes.txt", gzip.compress(raw), headers={"Content-Encoding": "gzip"})
+    done = _events(response)[-1]
+    assert done["type"] == "done"
+    assert TEXT in done["answer"]
+    assert done["extraction"]["bytes_read"] == len(raw)
+
+
+@pytest.mark.parametrize(
+    "filename, content_type",
+    [("notes.txt", "text/plain"), ("report.pdf", "application/pdf")],
+)
+def test_gzip_part_over_decompressed_limit_is_rejected(client, monkeypatch, filename, content_type):
+    monkeypatch.setattr(loader, "MAX_DECOMPRESSED_BYTES", 1_000)
+    bomb = gzip.compress(b"%PDF-1.4\n" + b"0" * 100_000)
+    response = _post(client, filename, bomb, content_type, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+    assert "너무 큽니다" in response.json()["detail"]
+
+
+def test_corrupt_gzip_part_is_rejected(client):
+    response = _post(client, "notes.txt", b"not gzip data", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400
+    assert "해제할 수 없습니다" in response.json()["detail"]
+
+
+def test_unknown_output_format_is_rejected(client):
+    response = _post(client, "notes.txt", TEXT.encode("utf-8"), output_format="docx")
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from app.files.langid import detect_language, estimate_tokens, language_counts, segment_by_language
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("안녕하세요, 반갑습니다.", "ko"),
+        ("LangGraph 설치 방법을 자세히 알려드리겠습니다", "ko"),
+        ("東京の天気は晴れです", "ja"),
+        ("北京今天天气很好", "zh"),
+        ("Bonjour à tous", "latin"),
+        ("Привет, мир", "cyrillic"),
+        ("2024-03-01 | 42%", "none"),
+    ],
+)
+def test_detect_language(text, expected):
+    assert detect_language(text) == expected
+
+
+def test_segments_group_consecutive_lines_and_attach_number_lines():
+    text = "첫 번째 문장입니다.\n두 번째 문장입니다.\n12,300\nThis is English.\nStill English.\n다시 한국어."
+    segments = segment_by_language(text)
+    assert [(s.index, s.language) for s in segments] == [(0, "ko"), (1, "latin"), (2, "ko")]
+    assert segments[0].text == "첫 번째 문장입니다.\n두 번째 문장입니다.\n12,300"
+    assert segments[1].text == "This is English.\nStill English."
+    assert "\n".join(s.text for s in segments) == text
+    assert language_counts(segments) == {"ko": 2, "latin": 1}
+
+
+def test_leading_number_lines_and_empty_text():
+    segments = segment_by_language("1.\n\n안녕하세요")
+    assert [(s.language, s.text) for s in segments] == [("none", "1.\n"), ("ko", "안녕하세요")]
+    assert segment_by_language("") == []
+
+
+def test_long_single_language_text_is_linear():
+    text = "\n".join(["한국어 문장이 길게 이어지는 줄입니다."] * 200_000)
+    started = time.perf_counter()
+    segments = segment_by_language(text)
+    assert len(segments) == 1 and segments[0].text == text
+    assert time.perf_counter() - started < 10
+
+
+def test_estimate_tokens_uses_language_ratio():
+    assert estimate_tokens("가" * 160) == 101
+    assert estimate_tokens("a" * 400, "latin") == 101
@@ -0,0 +1,123 @@
+"""선택적 메모리 프로파일링(app.memprofile)과 /debug/memory 테스트."""
+
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, memprofile
+from app.memprofile import MemoryProfiler, memory_section, track_memory
+
+
+MB = 2**20
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """MEMORY_PROFILING을 켠 상태의 시작된 프로파일러 (스냅샷 비교는 항상 수행)."""
+    monkeypatch.setattr(memprofile.settings, "MEMORY_PROFILING", True)
+    p = MemoryProfiler(frames=1, snapshot_sample=1.0, rss_interval=0.01)
+    monkeypatch.setattr(memprofile, "_profiler", p)
+    p.start()
+    yield p
+    p.stop()
+
+
+def test_section_records_net_peak_and_top_sites(profiler):
+    with memory_section("alloc"):
+        kept = bytearray(2 * MB)
+    with memory_section("temp"):
+        temp = bytearray(4 * MB)
+        del temp
+    sections = profiler.report()["sections"]
+    alloc, temp = sections["alloc"], sections["temp"]
+    assert alloc["calls"] == 1 and alloc["net_kb_avg"] >= 2 * 1024
+    # 구간 안에서 해제된 메모리는 순증가에는 없고 peak에만 남는다
+    assert temp["peak_kb_max"] >= 4 * 1024 and temp["net_kb_avg"] < 1024
+    assert any("test_memprofile.py" in site["site"] for site in alloc["top_sites"])
+    assert len(kept) == 2 * MB
+
+
+def test_track_memory_keeps_signature_and_counts_calls(profiler):
+    def node(state, config=None):
+        """노드 함수"""
+        return {"answer": state["question"]}
+
+    wrapped = track_memory("node:test", node)
+    assert wrapped.__name__ == "node" and wrapped.__doc__ == "노드 함수"
+    assert wrapped({"question": "q"}) == {"answer": "q"}
+    wrapped({"question": "q"}, config={})
+    assert profiler.report()["sections"]["node:test"]["calls"] == 2
+
+
+def test_sections_are_free_when_profiling_is_off(monkeypatch):
+    monkeypatch.setattr(memprofile.settings, "MEMORY_PROFILING", False)
+    monkeypatch.setattr(memprofile, "_profiler", None)
+    assert memprofile.get_memory_profiler() is None
+    with memory_section("off"):
+        pass
+    assert not tracemalloc.is_tracing()
+
+
+def test_section_without_tracing_is_not_recorded():
+    p = MemoryProfiler(frames=1, snapshot_sample=0.0, rss_interval=1.0)
+    with p.section("idle"):
+        pass
+    assert p.report()["sections"] == {} and p.report()["traced"] == {}
+
+
+def test_request_rss_peak_is_sampled_while_active(monkeypatch):
+    rss = {"value": 100 * MB}
+    monkeypatch.setattr(memprofile, "current_rss", lambda: rss["value"])
+    p = MemoryProfiler(frames=1, snapshot_sample=0.0, rss_interval=0.01)
+    p.start()
+    try:
+        request_id = p.request_started("/agent/file")
+        rss["value"] = 160 * MB
+        deadline = time.monotonic() + 2
+        while p._active[request_id].rss_peak < 160 * MB and time.monotonic() < deadline:
+            time.sleep(0.01)
+        rss["value"] = 120 * MB
+        p.request_finished(request_id, "/agent/file")
+        p.request_finished(request_id)  # 이미 끝난 요청은 무시
+    finally:
+        p.stop()
+    requests = p.report()["requests"]
+    assert requests["recent"][0]["rss_peak_mb"] == 160.0 and requests["recent"][0]["rss_growth_mb"] == 60.0
+    assert requests["by_path"]["/agent/file"] == {"requests": 1, "rss_growth_mb_max": 60.0, "rss_peak_mb_max": 160.0}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main.settings, "DEBUG_TOKEN", "secret")
+    return TestClient(main.app)
+
+
+def test_debug_memory_requires_token(client, monkeypatch):
+    assert client.get("/debug/memory", headers={"X-Debug-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/memory").status_code == 403
+    assert client.get("/debug/memory", params={"group_by": "module"}, headers={"X-Debug-Token": "secret"}).status_code == 400
+    monkeypatch.setattr(main.settings, "DEBUG_TOKEN", None)
+    assert client.get("/debug/memory", headers={"X-Debug-Token": "secret"}).status_code == 404
+
+
+def test_debug_memory_when_profiling_is_off(client, monkeypatch):
+    monkeypatch.setattr(memprofile.settings, "MEMORY_PROFILING", False)
+    body = client.get("/debug/memory", headers={"X-Debug-Token": "secret"}).json()
+    assert body["enabled"] is False and "sections" not in body
+
+
+def test_debug_memory_reports_sections_and_requests(client, profiler):
+    headers = {"X-Debug-Token": "secret"}
+    response = client.post(
+        "/agent/file/estimate",
+        files={"file": ("notes.txt", "메모리 측정용 문서입니다.".encode("utf-8"), "text/plain")},
+    )
+    assert response.status_code == 200
+    body = client.get("/debug/memory", params={"limit": 5, "group_by": "traceback"}, headers=headers).json()
+    assert body["enabled"] is True and body["traced"]["current_mb"] >= 0
+    assert "upload:extract" in body["sections"]
+    assert len(body["top_allocations"]) <= 5 and all("traceback" in e for e in body["top_allocations"])
+    # 미들웨어가 요청마다 경로별 RSS를 집계한다
+    assert body["requests"]["by_path"]["/agent/file/estimate"]["requests"] == 1
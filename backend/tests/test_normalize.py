@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.files.loader import extract_bytes
+from app.files.normalize import normalize_pages, normalize_text
+
+
+TOPICS = ["배터리", "충전", "보증", "안전"]
+
+
+def _page(n: int, topic: str, total: int = 4) -> str:
+    return (
+        f"ACME 제품 브로슈어 2024\n{topic} 개요\n{topic} 상세 설명입니다.\n{topic} 요약\n"
+        f"© ACME Corp. All rights reserved.\nPage {n} of {total}"
+    )
+
+
+def test_repeated_header_footer_kept_once_and_page_numbers_removed():
+    pages = [_page(i, topic) for i, topic in enumerate(TOPICS, 1)]
+    text = normalize_pages(pages)
+    assert text.count("ACME 제품 브로슈어 2024") == 1
+    assert text.count("© ACME Corp. All rights reserved.") == 1
+    assert "Page" not in text
+    for topic in TOPICS:
+        assert f"{topic} 개요\n{topic} 상세 설명입니다.\n{topic} 요약" in text
+
+
+def test_edge_lines_differing_only_by_numbers_are_repeats():
+    pages = [f"2024.03 기밀 - {i}\n본문 {chr(0xAC00 + i)}" for i in range(1, 4)]
+    text = normalize_pages(pages)
+    assert text.count("기밀") == 1
+
+
+def test_body_rows_differing_only_by_numbers_are_kept():
+    rows = "\n".join(f"항목 {i} | 가격 {i * 100}원" for i in range(1, 6))
+    pages = [f"머리글\n{topic} 시작\n{rows}\n{topic} 끝\n바닥글" for topic in TOPICS[:3]]
+    text = normalize_pages(pages)
+    # 숫자만 다른 본문 행은 서로 다른 줄로 남고, 페이지마다 똑같은 행은 반복이라 한 번만
+    for i in range(1, 6):
+        assert text.count(f"항목 {i} | 가격 {i * 100}원") == 1
+    assert all(f"{topic} 시작" in text for topic in TOPICS[:3])
+
+
+def test_few_pages_skip_repeat_detection():
+    text = normalize_pages(["공통 줄\n첫 페이지", "공통 줄\n둘째 페이지"])
+    assert text.count("공통 줄") == 2
+
+
+@pytest.mark.parametrize("marker", ["3", "- 3 -", "Page 3 of 10", "3 / 10", "3페이지", "p. 3", "3쪽"])
+def test_page_number_variants_at_edges(marker):
+    page = f"{marker}\n본문입니다.\n{marker}"
+    assert normalize_pages([page, page.replace("본문", "다음 본문")]) == "본문입니다.\n다음 본문입니다."
+
+
+@pytest.mark.parametrize("text", ["2024\n연간 실적 요약\n매출 증가\n1", "1\n항목 설명\n3 / 10"])
+def test_single_page_keeps_standalone_numbers(text):
+    # 페이지 구분이 없는 TXT는 첫/끝 줄의 숫자가 쪽 번호라는 근거가 없다
+    assert normalize_text(text) == text
+    assert normalize_pages([text]) == text
+
+
+def test_single_page_txt_upload_keeps_leading_year():
+    doc = asyncio.run(extract_bytes("report.txt", "2024\n연간 보고서\n결론\n1".encode("utf-8")))
+    assert doc.text == "2024\n연간 보고서\n결론\n1"
+
+
+def test_numbers_inside_body_are_not_page_numbers():
+    text = normalize_pages(["제목\n요약\n42\n설명\n결론\n끝", "다음\n7\n끝"])
+    assert "42" in text and "7" not in text
+
+
+def test_hyphen_break_spaces_and_blank_lines():
+    text = normalize_text("The docu-\nment   has\t\tspaces.\n\n\n\n\nNext   para-\n  graph.\nWell-Known")
+    assert text == "The document has spaces.\n\nNext paragraph.\nWell-Known"
+
+
+def test_form_feed_splits_pages():
+    text = normalize_text("\f".join(f"머리글\n{topic} 본문\n{i}" for i, topic in enumerate(TOPICS[:3], 1)))
+    assert text == "머리글\n배터리 본문\n충전 본문\n보증 본문"
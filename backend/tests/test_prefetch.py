@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from app.agent import prefetch
+from app.agent.prefetch import SearchPrefetcher
+from app.agent.tools import SearchResult
+
+
+QUESTION = "LangGraph 조사해줘"
+RESULTS = [SearchResult(title="LangGraph", url="https://example.com", content="본문", score=0.9)]
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """run_search 대역. gate가 열릴 때까지 막혀 있고 호출된 쿼리를 기록한다."""
+    state = type("State", (), {})()
+    state.gate = threading.Event()
+    state.calls = []
+    state.error = None
+
+    def fake_run_search(question, query):
+        state.calls.append(query)
+        state.gate.wait(5)
+        if state.error:
+            raise state.error
+        return RESULTS
+
+    monkeypatch.setattr(prefetch, "run_search", fake_run_search)
+    return state
+
+
+@pytest.fixture
+def prefetcher():
+    p = SearchPrefetcher(workers=2)
+    yield p
+    p._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_non_research_questions_are_not_prefetched(prefetcher, searches):
+    assert prefetcher.start("오늘 날씨 어때?") is None
+    assert prefetcher.start("   ") is None
+    assert prefetcher.stats_dict()["started"] == 0 and searches.calls == []
+
+
+def test_take_counts_one_hit_and_hidden_time(prefetcher, searches):
+    handle = prefetcher.start(QUESTION)
+    time.sleep(0.05)
+    searches.gate.set()
+    assert handle.take(QUESTION) == RESULTS
+    assert handle.take(QUESTION) == RESULTS  # 같은 핸들의 두 번째 take는 적중으로 다시 세지 않음
+    handle.release()
+    stats = prefetcher.stats_dict()
+    assert (stats["hits"], stats["wasted"], stats["failed"]) == (1, 0, 0)
+    assert stats["hit_ratio"] == 1.0 and stats["in_flight"] == 0
+    assert stats["hidden_ms_avg"] >= 40
+
+
+def test_different_query_is_not_served(prefetcher, searches):
+    searches.gate.set()
+    handle = prefetcher.start(QUESTION)
+    assert handle.take("LangGraph 다른 쿼리") is None
+    handle.release()
+    stats = prefetcher.stats_dict()
+    assert stats["hits"] == 0 and stats["wasted"] == 1 and stats["waste_ratio"] == 1.0
+
+
+def test_unused_prefetch_counts_waste_once_after_last_release(prefetcher, searches):
+    first = prefetcher.start(QUESTION)
+    second = prefetcher.start(f"  {QUESTION} ")
+    assert prefetcher.stats_dict()["joined"] == 1
+    first.release()
+    first.release()  # 두 번 release해도 한 번만 반영
+    assert prefetcher.stats_dict()["wasted"] == 0 and prefetcher.stats_dict()["in_flight"] == 1
+    second.release()
+    searches.gate.set()
+    stats = prefetcher.stats_dict()
+    assert stats["started"] == 1 and stats["wasted"] == 1 and stats["in_flight"] == 0
+    assert searches.calls == [QUESTION]
+    # 폐기된 검색은 더 이상 내주지 않음
+    assert second.take(QUESTION) is None
+
+
+def test_joined_handles_share_one_search_and_one_hit(prefetcher, searches):
+    first = prefetcher.start(QUESTION)
+    second = prefetcher.start(QUESTION)
+    searches.gate.set()
+    assert first.take(QUESTION) == RESULTS
+    assert second.take(QUESTION) == RESULTS
+    first.release()
+    second.release()
+    stats = prefetcher.stats_dict()
+    assert searches.calls == [QUESTION]
+    assert (stats["started"], stats["joined"], stats["hits"], stats["wasted"]) == (1, 1, 1, 0)
+
+
+def test_failed_search_raises_and_counts_failure(prefetcher, searches):
+    searches.error = RuntimeError("Tavily down")
+    searches.gate.set()
+    handle = prefetcher.start(QUESTION)
+    with pytest.raises(RuntimeError, match="Tavily down"):
+        handle.take(QUESTION)
+    handle.release()
+    stats = prefetcher.stats_dict()
+    assert (stats["hits"], stats["wasted"], stats["failed"]) == (0, 0, 1)
+
+
+def test_released_question_starts_a_fresh_search(prefetcher, searches):
+    searches.gate.set()
+    handle = prefetcher.start(QUESTION)
+    handle.take(QUESTION)
+    handle.release()
+    again = prefetcher.start(QUESTION)
+    again.take(QUESTION)
+    again.release()
+    assert prefetcher.stats_dict()["started"] == 2 and len(searches.calls) == 2
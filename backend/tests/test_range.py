@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+
+from app.main import _iter_file, _parse_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes=999-999", (999, 999)),
+        (" bytes = 10-20", (10, 20)),
+    ],
+)
+def test_parse_range_valid(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "bytes=1000-",
+        "bytes=500-100",
+        "bytes=-0",
+        "bytes=0-1,5-9",
+        "items=0-10",
+        "bytes=10",
+        "bytes=a-b",
+        "bytes=",
+        "bytes=5--3",
+    ],
+)
+def test_parse_range_unsatisfiable_is_416(header):
+    with pytest.raises(HTTPException) as exc:
+        _parse_range(header, 1000)
+    assert exc.value.status_code == 416
+    assert exc.value.headers == {"Content-Range": "bytes */1000"}
+
+
+def test_parse_range_empty_file_is_416():
+    with pytest.raises(HTTPException):
+        _parse_range("bytes=0-", 0)
+
+
+def test_iter_file_streams_requested_slice(tmp_path):
+    path = tmp_path / "artifact.bin"
+    data = bytes(range(256)) * 1024
+    path.write_bytes(data)
+    start, end = _parse_range("bytes=1000-200000", len(data))
+    body = b"".join(_iter_file(path, start, end - start + 1))
+    assert body == data[1000:200001]
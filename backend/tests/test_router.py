@@ -0,0 +1,130 @@
+import time
+
+import httpx
+import pytest
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+from app.cassette import CassetteMiss
+from app.llm import LLMRouter, is_retryable
+from app.llm.stub import StubProvider
+
+
+MESSAGES = [{"role": "user", "content": "안녕"}]
+_REQUEST = httpx.Request("POST", "https://llm.example.com/v1/chat/completions")
+
+
+def _status_error(code: int) -> APIStatusError:
+    return APIStatusError(f"HTTP {code}", response=httpx.Response(code, request=_REQUEST), body=None)
+
+
+class _Provider(StubProvider):
+    """호출 종류별 지연과 주입한 오류를 갖는 스텁 공급자. 호출 종류를 calls에 기록한다."""
+
+    def __init__(self, name: str, complete_delay: float = 0.0, stream_delay: float = 0.0, error=None) -> None:
+        super().__init__(name, f"{name}-model")
+        self.complete_delay = complete_delay
+        self.stream_delay = stream_delay
+        self.error = error
+        self.calls: list[str] = []
+
+    def complete(self, messages, **kwargs):
+        self.calls.append("complete")
+        if self.error:
+            raise self.error
+        time.sleep(self.complete_delay)
+        return super().complete(messages, **kwargs)
+
+    def stream(self, messages, **kwargs):
+        self.calls.append("stream")
+        if self.error:
+            raise self.error
+        time.sleep(self.stream_delay)
+        return super().stream(messages, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (APIConnectionError(request=_REQUEST), True),
+        (APITimeoutError(request=_REQUEST), True),
+        (ConnectionResetError("reset"), True),
+        (TimeoutError("read timeout"), True),
+        (_status_error(500), True),
+        (_status_error(503), True),
+        (_status_error(429), True),
+        (_status_error(408), True),
+        (_status_error(400), False),
+        (_status_error(401), False),
+        (_status_error(404), False),
+        (CassetteMiss("no recording"), False),
+        (ValueError("bad argument"), False),
+        (TypeError("unexpected kwarg"), False),
+        (KeyError("choices"), False),
+    ],
+)
+def test_is_retryable_only_for_listed_errors(error, expected):
+    assert is_retryable(error) is expected
+
+
+def _drain(stream) -> str:
+    with stream:
+        return "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+
+
+def test_complete_and_stream_are_ranked_by_their_own_latency():
+    # streamer: 첫 청크는 빠르지만 전체 응답은 느림 / completer: 그 반대
+    streamer = _Provider("streamer", complete_delay=0.06, stream_delay=0.0)
+    completer = _Provider("completer", complete_delay=0.0, stream_delay=0.06)
+    router = LLMRouter([streamer, completer], window=10, probe_interval=60)
+    for _ in range(2):
+        # 측정값이 없는 공급자부터 한 번씩 재어 본다
+        router.complete(MESSAGES)
+        _drain(router.stream(MESSAGES))
+    assert streamer.calls.count("complete") >= 1 and completer.calls.count("complete") >= 1
+    assert streamer.calls.count("stream") >= 1 and completer.calls.count("stream") >= 1
+
+    for _ in range(3):
+        assert router.complete(MESSAGES).model == "completer-model"
+        stream = router.stream(MESSAGES)
+        assert stream.provider == "streamer"
+        assert _drain(stream) == "안녕"
+
+    stats = router.stats_dict()["providers"]
+    assert stats["streamer"]["ttft_p50_ms"] < stats["streamer"]["latency_p50_ms"]
+    assert stats["completer"]["latency_p50_ms"] < stats["completer"]["ttft_p50_ms"]
+    assert stats["completer"]["samples"] >= 3 and stats["streamer"]["ttft_samples"] >= 3
+
+
+def test_retryable_failure_fails_over_and_cools_down():
+    broken = _Provider("broken", error=_status_error(503))
+    backup = _Provider("backup")
+    router = LLMRouter([broken, backup], cooldown=30)
+    assert router.complete(MESSAGES).model == "backup-model"
+    assert router.complete(MESSAGES).model == "backup-model"
+    stats = router.stats_dict()
+    assert stats["failovers"] == 1
+    assert stats["providers"]["broken"]["healthy"] is False
+    assert broken.calls == ["complete"]
+
+
+@pytest.mark.parametrize("error", [_status_error(400), ValueError("bad"), CassetteMiss("miss")])
+@pytest.mark.parametrize("call", ["complete", "stream"])
+def test_non_retryable_errors_propagate_without_failover(error, call):
+    broken = _Provider("broken", error=error)
+    backup = _Provider("backup")
+    router = LLMRouter([broken, backup])
+    with pytest.raises(type(error)):
+        getattr(router, call)(MESSAGES)
+    assert broken.calls == [call] and backup.calls == []
+    stats = router.stats_dict()
+    assert stats["failovers"] == 0 and stats["providers"]["broken"]["healthy"] is True
+
+
+def test_all_providers_failing_raises_last_error():
+    router = LLMRouter([
+        _Provider("a", error=APIConnectionError(request=_REQUEST)),
+        _Provider("b", error=_status_error(502)),
+    ])
+    with pytest.raises((APIConnectionError, APIStatusError)):
+        router.complete(MESSAGES)
+    assert router.stats_dict()["failovers"] == 1
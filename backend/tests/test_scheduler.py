@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.agent.scheduler import PriorityScheduler, classify_lane
+
+
+def test_classify_lane_by_mode_and_size():
+    assert classify_lane("general", 300, interactive_max_tokens=2_000) == "interactive"
+    assert classify_lane("general", 30_000, interactive_max_tokens=2_000) == "bulk"
+    assert classify_lane("translate", 10, interactive_max_tokens=2_000) == "bulk"
+    assert classify_lane("research", 10, interactive_max_tokens=2_000) == "bulk"
+
+
+@pytest.mark.parametrize("slots, share, limit", [(4, 0.5, 2), (4, 1.0, 3), (3, 0.1, 1), (1, 0.5, 1)])
+def test_bulk_limit_leaves_room_for_interactive(slots, share, limit):
+    assert PriorityScheduler(slots, share, max_wait=30).bulk_limit == limit
+
+
+class _Jobs:
+    """레인 슬롯을 잡고 release(name)까지 점유하는 작업들. started에 시작 순서를 기록한다."""
+
+    def __init__(self, scheduler: PriorityScheduler) -> None:
+        self.scheduler = scheduler
+        self.started: list[str] = []
+        self._gates: dict[str, asyncio.Event] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def submit(self, name: str, lane: str) -> None:
+        gate = self._gates[name] = asyncio.Event()
+
+        async def job():
+            async with self.scheduler.slot(lane):
+                self.started.append(name)
+                await gate.wait()
+
+        self.tasks[name] = asyncio.create_task(job())
+
+    async def release(self, name: str) -> None:
+        self._gates[name].set()
+        await self.tasks[name]
+        await asyncio.sleep(0)
+
+
+def test_bulk_lane_is_capped_while_interactive_still_starts():
+    async def scenario():
+        scheduler = PriorityScheduler(slots=3, bulk_share=0.5, max_wait=30)
+        jobs = _Jobs(scheduler)
+        for name in ("b1", "b2", "b3", "i1"):
+            jobs.submit(name, "bulk" if name[0] == "b" else "interactive")
+        await asyncio.sleep(0)
+        first = list(jobs.started)
+        stats = scheduler.stats_dict()["lanes"]
+        await jobs.release("b1")
+        after_release = list(jobs.started)
+        for name in ("b2", "b3", "i1"):
+            await jobs.release(name)
+        return first, stats, after_release, scheduler.stats_dict()["lanes"]
+
+    first, stats, after_release, final = asyncio.run(scenario())
+    assert first == ["b1", "b2", "i1"]
+    assert stats["bulk"]["running"] == 2 and stats["bulk"]["waiting"] == 1
+    assert after_release[-1] == "b3"
+    assert final["bulk"]["completed"] == 3 and final["interactive"]["completed"] == 1
+    assert final["bulk"]["running"] == final["bulk"]["waiting"] == 0
+
+
+def test_free_slot_goes_to_interactive_queue_first():
+    async def scenario():
+        scheduler = PriorityScheduler(slots=2, bulk_share=0.5, max_wait=30)
+        jobs = _Jobs(scheduler)
+        jobs.submit("i1", "interactive")
+        jobs.submit("i2", "interactive")
+        await asyncio.sleep(0)
+        jobs.submit("b1", "bulk")
+        await asyncio.sleep(0)
+        jobs.submit("i3", "interactive")
+        await asyncio.sleep(0)
+        await jobs.release("i1")
+        order = list(jobs.started)
+        await jobs.release("i2")
+        await jobs.release("i3")
+        await jobs.release("b1")
+        return order, scheduler.promotions
+
+    order, promotions = asyncio.run(scenario())
+    assert order == ["i1", "i2", "i3"]
+    assert promotions == 0
+
+
+def test_long_waiting_bulk_request_is_promoted():
+    async def scenario():
+        scheduler = PriorityScheduler(slots=2, bulk_share=0.5, max_wait=0.05)
+        jobs = _Jobs(scheduler)
+        jobs.submit("i1", "interactive")
+        jobs.submit("i2", "interactive")
+        await asyncio.sleep(0)
+        jobs.submit("b1", "bulk")
+        await asyncio.sleep(0.1)
+        jobs.submit("i3", "interactive")
+        await asyncio.sleep(0)
+        await jobs.release("i1")
+        order = list(jobs.started)
+        await jobs.release("b1")
+        await jobs.release("i2")
+        await jobs.release("i3")
+        return order, scheduler.stats_dict()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["i1", "i2", "b1"]
+    assert stats["starvation_promotions"] == 1
+    assert stats["lanes"]["bulk"]["wait_max_ms"] >= 50
+
+
+def test_cancelled_waiter_leaves_queue_and_slots_consistent():
+    async def scenario():
+        scheduler = PriorityScheduler(slots=1, bulk_share=0.5, max_wait=30)
+        jobs = _Jobs(scheduler)
+        jobs.submit("i1", "interactive")
+        jobs.submit("i2", "interactive")
+        await asyncio.sleep(0)
+        jobs.tasks["i2"].cancel()
+        await asyncio.sleep(0)
+        waiting = scheduler.stats_dict()["lanes"]["interactive"]["waiting"]
+        await jobs.release("i1")
+        jobs.submit("i3", "interactive")
+        await asyncio.sleep(0)
+        await jobs.release("i3")
+        return waiting, jobs.started, scheduler.stats_dict()["lanes"]["interactive"]
+
+    waiting, started, lane = asyncio.run(scenario())
+    assert waiting == 0
+    assert started == ["i1", "i3"]
+    assert lane["running"] == 0 and lane["completed"] == 2
@@ -0,0 +1,177 @@
+import logging
+import sqlite3
+
+import pytest
+
+from app import usage
+from app.agent import agent, tools
+from app.agent.tools import SearchResult, dedupe_results, lexical_overlap, rerank_results, token_matches, web_search
+from app.cache import get_cache, make_key
+from app.cassette import Cassette, CassetteMiss
+from app.usage import UsageLedger, UsageRecord
+
+
+class _FailingClient:
+    def search(self, **kwargs):
+        raise RuntimeError("tavily down")
+
+
+@pytest.fixture
+def tavily(monkeypatch):
+    """Tavily 클라이언트를 바꿔 끼울 수 있게 하고, 검색 캐시를 비운다."""
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setattr(tools, "TAVILY_AVAILABLE", True)
+    get_cache("search").clear()
+
+    def use(client):
+        monkeypatch.setattr(tools, "_get_tavily_client", lambda key: client)
+
+    yield use
+    get_cache("search").clear()
+
+
+class _CountingClient:
+    def __init__(self, title: str = "실제 검색") -> None:
+        self.title = title
+        self.calls = 0
+
+    def search(self, **kwargs):
+        self.calls += 1
+        return {"results": [{"title": self.title, "url": "https://example.com/live", "content": "본문", "score": 0.8}]}
+
+
+def _warm_search_cache(query: str) -> None:
+    stale = SearchResult(title="캐시된 결과", url="https://example.com/cached", content="오래된 본문", score=0.1)
+    get_cache("search").set(make_key("tavily", query, 3), [stale.to_dict()])
+
+
+def test_search_failure_is_logged_and_counted(tavily, caplog):
+    tavily(_FailingClient())
+    record = UsageRecord("/agent", "research")
+    token = usage._current.set(record)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.agent.tools"):
+            assert web_search("전기차 배터리") == []
+    finally:
+        usage._current.reset(token)
+    assert record.search_errors == 1
+    assert "tavily down" in caplog.text
+
+
+def test_search_failure_outside_request_context(tavily):
+    tavily(_FailingClient())
+    assert web_search("전기차 배터리") == []
+
+
+def test_ledger_writes_search_errors_and_migrates_old_file(tmp_path):
+    path = tmp_path / "usage.sqlite3"
+    # search_errors 열이 없던 이전 스키마
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, endpoint TEXT NOT NULL, "
+        "mode TEXT NOT NULL, lane TEXT, status TEXT NOT NULL, model TEXT, llm_calls INTEGER NOT NULL, "
+        "prompt_tokens INTEGER NOT NULL, completion_tokens INTEGER NOT NULL, cached_tokens INTEGER NOT NULL, "
+        "cost_usd REAL, search_calls INTEGER NOT NULL, doc_chars INTEGER NOT NULL, cache_hits TEXT NOT NULL, "
+        "queue_ms REAL NOT NULL, latency_ms REAL NOT NULL, node_ms TEXT NOT NULL)"
+    )
+    conn.commit()
+    conn.close()
+
+    ledger = UsageLedger(path, prices={})
+    record = UsageRecord("/agent", "research")
+    record.add_search()
+    record.add_search_error()
+    record.finish({})
+    ledger.submit(record)
+    ledger.close()
+
+    summary = ledger.summary(window=3600)
+    assert summary["total"]["search_calls"] == 1
+    assert summary["total"]["search_errors"] == 1
+
+
+def test_dedupe_results_merges_canonical_urls():
+    results = [
+        SearchResult(title="a", url="https://www.example.com/post?utm_source=x", content="짧은 본문", score=0.4),
+        SearchResult(title="a", url="https://example.com/post", content="조금 더 긴 본문입니다", score=0.9),
+    ]
+    deduped = dedupe_results(results)
+    assert len(deduped) == 1
+
+
+@pytest.mark.parametrize(
+    "query_token, text_tokens, expected",
+    [
+        ("langgraph", {"langgraph"}, True),
+        ("langgraph", {"langgraph에"}, True),
+        ("연구", {"연구를"}, True),
+        ("배터리", {"배터리에서"}, True),
+        ("information", {"inf"}, False),
+        ("information", {"informational"}, False),
+        ("배터리", {"배터리셀교체"}, False),
+        ("langgraph에", {"langgraph"}, False),
+        ("term", {"determine"}, False),
+    ],
+)
+def test_token_matches_allows_only_trailing_particles(query_token, text_tokens, expected):
+    assert token_matches(query_token, text_tokens) is expected
+
+
+def test_short_text_tokens_do_not_inflate_rerank():
+    question = "information retrieval evaluation"
+    assert lexical_overlap({"information", "retrieval", "evaluation"}, "inf ret eval") == 0.0
+    noise = SearchResult(title="inf", url="https://a.example", content="inf ret eval", score=0.5)
+    relevant = SearchResult(title="IR", url="https://b.example", content="Information retrieval evaluation", score=0.5)
+    assert rerank_results(question, [noise, relevant])[0] is relevant
+
+
+def test_record_run_bypasses_warm_search_cache(tavily, monkeypatch, tmp_path):
+    client = _CountingClient()
+    tavily(client)
+    _warm_search_cache("전기차 배터리")
+    cassette = Cassette(tmp_path / "run.jsonl.gz", "record")
+    monkeypatch.setattr(tools, "get_cassette", lambda: cassette)
+
+    results = web_search("전기차 배터리")
+    assert [r.title for r in results] == ["실제 검색"]
+    assert client.calls == 1 and cassette.recorded == 1
+    # 녹화 중 결과로 공유 캐시를 덮어쓰지도 않음
+    assert get_cache("search").get(make_key("tavily", "전기차 배터리", 3))[0]["title"] == "캐시된 결과"
+
+
+def test_replay_ignores_cache_and_raises_on_missing_entry(tavily, monkeypatch, tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    recorder = Cassette(path, "record")
+    tavily(_CountingClient("녹화된 결과"))
+    monkeypatch.setattr(tools, "get_cassette", lambda: recorder)
+    web_search("전기차 배터리")
+    recorder.save()
+
+    tavily(_FailingClient())
+    _warm_search_cache("전기차 배터리")
+    player = Cassette(path, "replay", latency="zero")
+    monkeypatch.setattr(tools, "get_cassette", lambda: player)
+    assert [r.title for r in web_search("전기차 배터리")] == ["녹화된 결과"]
+
+    record = UsageRecord("/agent", "research")
+    token = usage._current.set(record)
+    try:
+        with pytest.raises(CassetteMiss):
+            web_search("녹화하지 않은 질문")
+    finally:
+        usage._current.reset(token)
+    assert record.search_errors == 0 and player.misses == 1
+
+
+@pytest.mark.parametrize("error", [CassetteMiss("not recorded"), RuntimeError("down")])
+def test_perform_search_propagates_only_cassette_miss(monkeypatch, error):
+    def failing(question, query):
+        raise error
+
+    monkeypatch.setattr(agent, "run_search", failing)
+    state = {"question": "LangGraph 조사해줘", "research_iterations": 0, "max_iterations": 3}
+    if isinstance(error, CassetteMiss):
+        with pytest.raises(CassetteMiss):
+            agent.perform_search(state)
+    else:
+        assert agent.perform_search(state) == {}
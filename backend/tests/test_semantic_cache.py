@@ -0,0 +1,98 @@
+import pytest
+
+from app.agent.agent import RESEARCH_KEYWORDS, TRANSLATION_KEYWORDS
+from app.cache.semantic import SemanticCache, normalize_question, same_content_terms
+
+
+KEYWORDS = TRANSLATION_KEYWORDS + RESEARCH_KEYWORDS
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(capacity=100, threshold=0.9, strip_phrases=KEYWORDS)
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("LangGraph에 대해 조사해줘", "langgraph"),
+        ("LangGraph 리서치해줘", "langgraph"),
+        ("Deep Research: LangGraph", "langgraph"),
+        ("좀비 영화 좀 추천해줘", "좀비 영화 추천"),
+        ("Tell me about aboutness, please", "aboutness"),
+        ("researcher 채용 공고", "researcher 채용 공고"),
+        ("서울의 인구에 대해 알려줘", "서울의 인구"),
+    ],
+)
+def test_normalize_strips_phrases_only_at_word_boundaries(question, expected):
+    assert normalize_question(question, KEYWORDS) == expected
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("What is the capital of Australia?", "What is the capital of Austria?"),
+        ("2023년 전기차 판매량 알려줘", "2024년 전기차 판매량 알려줘"),
+        ("Python 3.11 release notes", "Python 3.12 release notes"),
+        ("서울 날씨 알려줘", "부산 날씨 알려줘"),
+        ("좀비 영화 추천", "영화 추천"),
+        ("LangGraph 튜토리얼", "LangChain 튜토리얼"),
+    ],
+)
+def test_different_entities_must_miss(cache, stored, asked):
+    cache.store(stored, "general", "stored answer")
+    assert cache.lookup(asked, "general") is None
+
+
+def test_similarity_alone_is_rejected(cache):
+    cache.store("What is the capital of Australia?", "general", "Canberra")
+    assert cache.lookup("What is the capital of Austria?", "general") is None
+    stats = cache.stats_dict()
+    assert stats["rejected"] == 1 and stats["hits"] == 0
+
+
+@pytest.mark.parametrize(
+    "stored, asked, mode",
+    [
+        ("LangGraph에 대해 조사해줘", "LangGraph 리서치", "research"),
+        ("What is the capital of Australia?", "what is the capital of australia", "general"),
+        ("서울의 인구 알려줘", "서울의 인구에 대해 설명해줘", "general"),
+    ],
+)
+def test_rewordings_hit(cache, stored, asked, mode):
+    cache.store(stored, mode, "stored answer")
+    hit = cache.lookup(asked, mode)
+    assert hit is not None and hit[0] == "stored answer"
+
+
+def test_rejected_top_match_falls_through_to_next_candidate(cache):
+    cache.store("capital of australia", "general", "Canberra")
+    cache.store("capital of austria", "general", "Vienna")
+    assert cache.lookup("Capital of Austria?", "general")[0] == "Vienna"
+    assert cache.lookup("Capital of Australia?", "general")[0] == "Canberra"
+
+
+def test_modes_and_freshness_are_separate(cache):
+    cache.freshness = {"research": 0}
+    cache.store("LangGraph", "general", "general answer")
+    cache.store("LangGraph 리서치", "research", "research answer")
+    assert cache.lookup("LangGraph", "general")[0] == "general answer"
+    assert cache.lookup("LangGraph", "translate") is None
+    # 신선도 창이 0이면 바로 만료
+    assert cache.lookup("LangGraph 리서치", "research") is None
+
+
+def test_same_content_terms_allows_only_short_hangul_particles():
+    assert same_content_terms(["서울의", "인구"], ["인구", "서울"])
+    assert same_content_terms(["langgraph를"], ["langgraph"])
+    assert not same_content_terms(["python"], ["pythonic"])
+    assert not same_content_terms(["서울", "인구"], ["서울"])
+    assert not same_content_terms([], [])
+    assert not same_content_terms([], ["서울"])
+
+
+@pytest.mark.parametrize("stored, asked", [("조사해줘", "리서치해줘"), ("research", "report")])
+def test_keyword_only_questions_never_hit(cache, stored, asked):
+    cache.store(stored, "research", "stored answer")
+    assert cache.lookup(asked, "research") is None
+    assert cache.stats_dict()["entries"] == 0
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.agent.singleflight import SingleFlight, flight_key
+
+
+def _gated(result="answer", events=()):
+    """gate가 열릴 때까지 워커 스레드에서 기다리는 실행 함수와 호출 횟수."""
+    gate = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def fn(emit):
+        calls.append(1)
+        for event in events:
+            emit(event)
+        started.set()
+        gate.wait(5)
+        return result
+
+    return fn, gate, started, calls
+
+
+async def _wait(event: threading.Event) -> None:
+    await asyncio.to_thread(event.wait, 5)
+
+
+def test_flight_key_ignores_case_and_whitespace():
+    assert flight_key("general", "  LangGraph   란? ") == flight_key("general", "langgraph 란?")
+    assert flight_key("general", "질문", "hash-a") != flight_key("general", "질문", "hash-b")
+    assert flight_key("general", "질문") != flight_key("research", "질문")
+
+
+def test_concurrent_identical_requests_share_one_execution():
+    async def scenario():
+        flights = SingleFlight()
+        fn, gate, started, calls = _gated()
+        first = asyncio.create_task(flights.run("k", fn))
+        await _wait(started)
+        second = asyncio.create_task(flights.run("k", fn))
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(first, second), calls, flights.stats_dict()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+    assert stats["executions"] == 1 and stats["coalesced_requests"] == 1 and stats["in_flight"] == 0
+
+
+def test_different_keys_and_finished_flights_run_again():
+    async def scenario():
+        flights = SingleFlight()
+        a = await flights.run("a", lambda emit: 1)
+        b = await flights.run("b", lambda emit: 2)
+        again = await flights.run("a", lambda emit: 3)
+        return (a, b, again), flights.stats_dict()
+
+    results, stats = asyncio.run(scenario())
+    assert results == (1, 2, 3)
+    assert stats["executions"] == 3 and stats["coalesced_requests"] == 0
+
+
+def test_late_stream_subscriber_gets_buffered_events_then_result():
+    events = [{"type": "token", "content": "안"}, {"type": "token", "content": "녕"}]
+
+    async def scenario():
+        flights = SingleFlight()
+        fn, gate, started, _ = _gated("안녕", events)
+
+        async def collect():
+            return [event async for event in flights.stream("k", fn)]
+
+        leader = asyncio.create_task(collect())
+        await _wait(started)
+        await asyncio.sleep(0.05)  # emit이 루프에 전달될 시간
+        follower = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(leader, follower), flights.stats_dict()
+
+    (leader, follower), stats = asyncio.run(scenario())
+    expected = events + [{"type": "result", "result": "안녕"}]
+    assert leader == expected and follower == expected
+    assert stats["coalesced_streams"] == 1
+
+
+def test_failure_reaches_every_joiner_and_clears_flight():
+    async def scenario():
+        flights = SingleFlight()
+        gate = threading.Event()
+
+        def fail(emit):
+            gate.wait(5)
+            raise RuntimeError("LLM 실패")
+
+        tasks = [asyncio.create_task(flights.run("k", fail)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        gate.set()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return outcomes, flights.stats_dict()
+
+    outcomes, stats = asyncio.run(scenario())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert stats["executions"] == 1 and stats["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_execution():
+    async def scenario():
+        flights = SingleFlight()
+        fn, gate, started, calls = _gated()
+        impatient = asyncio.create_task(flights.run("k", fn))
+        await _wait(started)
+        patient = asyncio.create_task(flights.run("k", fn))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient, calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == "answer" and len(calls) == 1
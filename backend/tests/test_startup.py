@@ -0,0 +1,98 @@
+"""콜드 스타트 단축(지연 import, 기동 시 예열) 테스트."""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.agent import agent, tools
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_importing_app_defers_heavy_optional_modules():
+    code = """
+        import json, sys
+        import app.main
+        print(json.dumps([m for m in ("pypdf", "tavily", "numpy") if m in sys.modules]))
+    """
+    env = {"OPENAI_API_KEY": "sk-test-dummy", "LLM_PROVIDERS": "stub", "PATH": "/usr/bin:/bin"}
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", textwrap.dedent(code)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+class _Provider:
+    def __init__(self, name: str, error: Exception | None = None) -> None:
+        self.name = name
+        self.error = error
+        self.warmed = []
+
+    def warmup(self, timeout: float) -> None:
+        self.warmed.append(timeout)
+        if self.error:
+            raise self.error
+
+
+class _Router:
+    def __init__(self, providers) -> None:
+        self.providers = providers
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    router = _Router([_Provider("openai"), _Provider("local", ConnectionError("refused"))])
+    monkeypatch.setattr(main, "get_llm", lambda: router)
+    monkeypatch.setattr(agent, "_agent_graph", None)
+    return router
+
+
+def test_lifespan_compiles_graph_and_warms_every_provider(fake_llm, monkeypatch, caplog):
+    monkeypatch.setattr(main.settings, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(main.settings, "WARMUP_TIMEOUT", 0.5)
+    with caplog.at_level("INFO", logger="app.main"):
+        with TestClient(main.app) as client:
+            assert agent._agent_graph is not None
+            # 한 공급자의 예열 실패가 기동을 막지 않음
+            assert client.get("/health").status_code == 200
+    assert [p.warmed for p in fake_llm.providers] == [[0.5], [0.5]]
+    assert "openai ok, local failed (ConnectionError)" in caplog.text
+    assert fake_llm.closed
+
+
+def test_warmup_can_be_disabled(fake_llm, monkeypatch):
+    monkeypatch.setattr(main.settings, "WARMUP_ON_STARTUP", False)
+    with TestClient(main.app):
+        assert agent._agent_graph is None
+    assert all(p.warmed == [] for p in fake_llm.providers)
+
+
+def test_tavily_client_is_created_once_per_key(monkeypatch):
+    created = []
+
+    class _Client:
+        def __init__(self, api_key):
+            created.append(api_key)
+
+    import tavily
+
+    monkeypatch.setattr(tavily, "TavilyClient", _Client)
+    tools._get_tavily_client.cache_clear()
+    try:
+        assert tools._get_tavily_client("a") is tools._get_tavily_client("a")
+        tools._get_tavily_client("b")
+    finally:
+        tools._get_tavily_client.cache_clear()
+    assert created == ["a", "b"]
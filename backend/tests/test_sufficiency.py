@@ -0,0 +1,152 @@
+"""연구 모드 검색 결과 충분성 평가와 추가 검색 결정 테스트."""
+
+import pytest
+
+from app.agent import agent, sufficiency
+from app.agent.agent import run_agent, should_continue_research
+from app.agent.sufficiency import assess_search_results, key_terms
+from app.agent.tools import SearchResult
+
+
+QUESTION = "2024년 전기차 배터리 시장 동향을 조사해줘"
+
+
+def _result(url: str, content: str, score=None, title: str = "") -> SearchResult:
+    return SearchResult(title=title, url=url, content=content, score=score)
+
+
+GOOD = [
+    _result("https://www.a.com/1", "2024년 전기차 배터리 시장 동향 요약", 0.9),
+    _result("https://b.org/2", "전기차 배터리 가격 하락과 시장 전망", 0.8),
+    _result("https://c.net/3", "2024 배터리 공급망 동향", 0.85),
+]
+OFF_TOPIC = [_result("https://a.com/x", "스마트폰 카메라 비교", 0.2)]
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        (QUESTION, ["2024년", "전기차", "배터리", "시장", "동향"]),
+        ("서울에서 부산까지 KTX 요금에 대해 알려줘", ["서울", "부산", "ktx", "요금"]),
+        # 조사를 떼면 한 글자만 남는 단어는 그대로 둔다
+        ("차를 연구해줘", ["차를"]),
+        ("LangGraph research report please", ["langgraph"]),
+        ("조사해줘", []),
+    ],
+)
+def test_key_terms_strip_request_words_and_particles(question, expected):
+    assert key_terms(question) == expected
+
+
+def test_good_results_are_sufficient():
+    assessment = assess_search_results(QUESTION, GOOD, threshold=0.5)
+    assert assessment.coverage == 1.0 and assessment.missing_terms == []
+    assert assessment.diversity == 1.0 and assessment.relevance == pytest.approx(0.85)
+    assert assessment.score == pytest.approx(0.6 + 0.2 + 0.2 * 0.85)
+    assert assessment.sufficient and ">=" in assessment.reason
+
+
+def test_off_topic_results_are_insufficient_and_list_missing_terms():
+    assessment = assess_search_results(QUESTION, OFF_TOPIC, threshold=0.5)
+    assert assessment.coverage == 0.0 and assessment.missing_terms == key_terms(QUESTION)
+    assert assessment.diversity == pytest.approx(1 / 3)
+    assert not assessment.sufficient and "<" in assessment.reason
+
+
+def test_threshold_boundary_and_default(monkeypatch):
+    results = [_result("https://a.com", "2024년 전기차"), _result("https://b.com", "배터리"), _result("https://c.com", "무관")]
+    question = "2024년 전기차 배터리 가격 전망 조사해줘"
+    assessment = assess_search_results(question, results, threshold=0.5)
+    # score가 없으면 relevance 가중치를 빼고 나머지로 정규화: (0.6 * 3/5 + 0.2 * 1) / 0.8 = 0.7
+    assert assessment.missing_terms == ["가격", "전망"] and assessment.relevance is None
+    assert assessment.score == pytest.approx(0.7)
+
+    half = [_result("https://a.com", "전기차"), _result("https://b.com", "무관")]
+    question = "전기차 충전 조사해줘"
+    # coverage 0.5, diversity 2/3 → (0.3 + 0.1333) / 0.8 ≈ 0.5417
+    assert assess_search_results(question, half, threshold=0.54).sufficient
+    assert not assess_search_results(question, half, threshold=0.55).sufficient
+    # threshold를 생략하면 설정값(기본 0.5)을 쓴다
+    monkeypatch.setattr(sufficiency.settings, "RESEARCH_SUFFICIENCY_THRESHOLD", 0.6)
+    assert not assess_search_results(question, half).sufficient
+
+
+def test_no_results_and_request_only_question():
+    empty = assess_search_results(QUESTION, [], threshold=0.5)
+    assert empty.score == 0.0 and not empty.sufficient and empty.reason == "검색 결과 없음"
+    # 핵심어가 없으면 출처/score로만 판단
+    assert assess_search_results("조사해줘", GOOD, threshold=0.5).coverage == 1.0
+
+
+def _state(**overrides) -> dict:
+    state = {"mode": "research", "research_iterations": 1, "max_iterations": 2, "search_assessment": {}}
+    state.update(overrides)
+    return state
+
+
+def _assessment(sufficient: bool, round_: int = 1, round_results: int = 3) -> dict:
+    return {
+        "sufficient": sufficient,
+        "reason": "점수",
+        "missing_terms": ["배터리"],
+        "round": round_,
+        "round_results": round_results,
+    }
+
+
+@pytest.mark.parametrize(
+    "state, decision",
+    [
+        (_state(mode="general"), "llm"),
+        (_state(search_assessment=_assessment(True)), "llm"),
+        (_state(search_assessment=_assessment(False)), "search"),
+        # 최대 회차에 도달하면 부족해도 답변 생성
+        (_state(research_iterations=2, search_assessment=_assessment(False, round_=2)), "llm"),
+        # 이번 회차 검색이 실패해 평가가 이전 회차 것이면 재시도하지 않음
+        (_state(research_iterations=2, max_iterations=3, search_assessment=_assessment(False, round_=1)), "llm"),
+        (_state(search_assessment=_assessment(False, round_results=0)), "llm"),
+    ],
+)
+def test_should_continue_research(state, decision):
+    assert should_continue_research(state) == decision
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """run_search 대역. 회차별로 rounds의 결과를 돌려주고 쿼리를 기록한다."""
+    state = type("State", (), {})()
+    state.queries = []
+    state.rounds = []
+
+    def fake_run_search(question, query):
+        state.queries.append(query)
+        results = state.rounds[min(len(state.queries), len(state.rounds)) - 1]
+        if isinstance(results, Exception):
+            raise results
+        return results
+
+    monkeypatch.setattr(agent, "run_search", fake_run_search)
+    monkeypatch.setattr(sufficiency.settings, "RESEARCH_SUFFICIENCY_THRESHOLD", 0.5)
+    return state
+
+
+@pytest.mark.parametrize(
+    "rounds, expected_searches, used_search",
+    [
+        ([GOOD], 1, True),
+        ([OFF_TOPIC, GOOD], 2, True),
+        # 계속 부족해도 최대 회차(2)에서 멈춘다
+        ([OFF_TOPIC, OFF_TOPIC, OFF_TOPIC], 2, True),
+        # 결과가 없거나 검색이 실패하면 쿼리를 바꿔 다시 찾지 않음
+        ([[]], 1, True),
+        ([RuntimeError("Tavily down")], 1, False),
+    ],
+)
+def test_research_loop_terminates(searches, rounds, expected_searches, used_search):
+    searches.rounds = rounds
+    answer, searched, _raw, _sources = run_agent(QUESTION, mode="research")
+    assert len(searches.queries) == expected_searches
+    assert searches.queries[0] == QUESTION
+    if expected_searches == 2:
+        assert searches.queries[1] == f"{QUESTION} 상세 정보"
+    assert answer and searched is used_search
@@ -0,0 +1,125 @@
+import asyncio
+import codecs
+import gzip
+import hashlib
+
+import pytest
+
+from app.files.loader import extract_bytes
+from app.files.textstream import SAMPLE_BYTES, Gunzip, TextBudgetReader, detect_encoding
+
+
+KOREAN = "한글 문서의 인코딩 판별 테스트입니다.\n두 번째 줄입니다."
+
+
+def _lines(count: int) -> str:
+    return "\n".join(f"{i}번째 줄: 로그 내용이 이어집니다." for i in range(count))
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (codecs.BOM_UTF8 + KOREAN.encode("utf-8"), "utf-8-sig"),
+        (KOREAN.encode("utf-16"), "utf-16"),
+        (codecs.BOM_UTF16_BE + KOREAN.encode("utf-16-be"), "utf-16"),
+        (codecs.BOM_UTF32_LE + KOREAN.encode("utf-32-le"), "utf-32"),
+        (codecs.BOM_UTF32_BE + KOREAN.encode("utf-32-be"), "utf-32"),
+        ("plain ASCII log line\n".encode("utf-16-le") * 4, "utf-16-le"),
+        ("plain ASCII log line\n".encode("utf-16-be") * 4, "utf-16-be"),
+        (KOREAN.encode("utf-8"), "utf-8"),
+        (b"plain ascii", "utf-8"),
+        (KOREAN.encode("cp949"), "cp949"),
+        # 표본 끝에서 잘린 멀티바이트 문자
+        (KOREAN.encode("utf-8")[:-1], "utf-8"),
+        ("한".encode("utf-8")[:2], "utf-8"),
+        (b"\xff\xff\xff\xff", "utf-8"),
+        (b"", "utf-8"),
+    ],
+)
+def test_detect_encoding(data, expected):
+    assert detect_encoding(data) == expected
+
+
+def _extract(data: bytes, max_length: int = 15_000, content_encoding=None):
+    return asyncio.run(extract_bytes("notes.txt", data, content_encoding, max_length))
+
+
+# BOM 없는 UTF-16은 영문 위주 텍스트(0 바이트가 한쪽에 몰림)만 판별 대상
+MIXED_LOG = "2024-03-01 ERROR connection reset by peer (서버 응답 없음)\nretry=3 status=failed"
+
+
+@pytest.mark.parametrize(
+    "text, encoding",
+    [
+        (KOREAN, "utf-8"),
+        (KOREAN, "utf-8-sig"),
+        (KOREAN, "utf-16"),
+        (KOREAN, "cp949"),
+        (MIXED_LOG, "utf-16-le"),
+        (MIXED_LOG, "utf-16-be"),
+    ],
+)
+def test_extract_decodes_each_encoding(text, encoding):
+    doc = _extract(text.encode(encoding))
+    assert doc.text == text
+    assert not doc.truncated
+
+
+def test_reader_stops_reading_once_budget_is_filled():
+    data = _lines(200_000).encode("utf-8")  # 약 7MB
+    doc = _extract(data, max_length=1_000)
+    assert len(doc.text) == 1_000 and doc.truncated
+    assert doc.text == _lines(200_000)[:1_000]
+    assert doc.bytes_read < len(data) // 10
+    assert doc.content_hash == hashlib.sha256(data[: doc.bytes_read]).hexdigest()
+
+
+def test_small_file_is_read_whole():
+    data = _lines(50).encode("utf-8")
+    doc = _extract(data)
+    assert doc.text == _lines(50)
+    assert doc.bytes_read == len(data) and not doc.truncated
+    assert doc.content_hash == hashlib.sha256(data).hexdigest()
+    assert doc.encoding == "utf-8"
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "cp949", "utf-16"])
+def test_multibyte_characters_split_across_chunks(encoding):
+    text = _lines(3_000)
+    data = text.encode(encoding)
+    assert len(data) > SAMPLE_BYTES
+    reader = TextBudgetReader(max_length=len(text) + 100)
+    for offset in range(0, len(data), 4_097):  # 홀수 크기 조각이라 문자 중간에서 끊긴다
+        reader.feed(data[offset:offset + 4_097])
+    result, total = reader.finish()
+    assert result == text and total == len(text)
+    assert "�" not in result
+
+
+def test_invalid_bytes_after_detection_become_replacement_chars():
+    data = ("가" * SAMPLE_BYTES).encode("utf-8") + b"\xff" + "끝".encode("utf-8")
+    reader = TextBudgetReader(max_length=10 * SAMPLE_BYTES)
+    reader.feed(data)
+    text, _ = reader.finish()
+    assert reader.encoding == "utf-8" and text.endswith("�끝")
+
+
+def test_gzip_content_encoding_is_decompressed():
+    data = _lines(20_000).encode("utf-8")
+    doc = _extract(gzip.compress(data), max_length=2_000, content_encoding="gzip")
+    assert doc.text == _lines(20_000)[:2_000] and doc.truncated
+    assert doc.bytes_read < len(data)
+
+
+def test_gunzip_limits_decompressed_size_and_rejects_corrupt_data():
+    bomb = gzip.compress(b"\0" * 1_000_000)
+    with pytest.raises(ValueError, match="너무 큽니다"):
+        list(Gunzip(max_size=100_000).feed(bomb))
+    with pytest.raises(ValueError, match="해제할 수 없습니다"):
+        list(Gunzip(max_size=100_000).feed(b"not gzip data"))
+
+
+@pytest.mark.parametrize("data", [b"", b"   \n\n  "])
+def test_empty_file_is_rejected(data):
+    with pytest.raises(ValueError):
+        _extract(data)
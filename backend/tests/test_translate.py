@@ -0,0 +1,91 @@
+"""문서 번역 파이프라인(app.agent.translate) 테스트."""
+
+import pytest
+
+from app.agent import translate
+from app.agent.translate import _split_markers, plan_translation, translate_document
+from app.files.artifacts import ArtifactStore
+from app.llm import LLMRouter
+from app.llm.stub import StubProvider
+
+
+DOC = "The battery warranty lasts eight years.\n이 줄은 이미 한국어입니다.\nCharging at home is recommended."
+
+
+class _Translator(StubProvider):
+    """스텁처럼 마지막 user 메시지를 돌려주되, strip_markers면 <<n>> 표시를 지운다."""
+
+    def __init__(self, strip_markers: bool = False) -> None:
+        super().__init__("translator", "translator-model")
+        self.strip_markers = strip_markers
+        self.bodies: list = []
+        self.total_tokens: list = []
+
+    def complete(self, messages, **kwargs):
+        self.bodies.append(messages[-1]["content"])
+        response = super().complete(messages, **kwargs)
+        if self.strip_markers:
+            message = response.choices[0].message
+            message.content = translate._MARKER_RE.sub("", message.content)
+        self.total_tokens.append(response.usage.total_tokens)
+        return response
+
+
+@pytest.fixture
+def translator(monkeypatch, tmp_path):
+    def install(strip_markers: bool = False) -> _Translator:
+        provider = _Translator(strip_markers)
+        monkeypatch.setattr(translate, "get_llm", lambda: LLMRouter([provider]))
+        return provider
+
+    monkeypatch.setattr(translate, "get_artifact_store", lambda: ArtifactStore(tmp_path, 3600))
+    return install
+
+
+def test_plan_skips_korean_segments_and_splits_batches():
+    plan = plan_translation(DOC, batch_chars=10_000)
+    assert [s.language for s in plan.segments] == ["latin", "ko", "latin"]
+    assert plan.batches == [[0, 2]]
+    assert plan_translation(DOC, batch_chars=10).batches == [[0], [2]]
+    summary = plan.to_dict()
+    assert summary["translate_segments"] == 2 and summary["skipped_segments"] == 1
+
+
+def test_split_markers_requires_every_marker():
+    assert _split_markers("<<1>>\n하나\n\n<<2>>\n둘", 2) == ["하나", "둘"]
+    assert _split_markers("<<2>>\n둘\n<<1>>\n하나", 2) == ["하나", "둘"]
+    assert _split_markers("<<1>>\n하나 둘", 2) is None
+    assert _split_markers("하나\n둘", 2) is None
+
+
+def _artifact_text(meta: dict, tmp_path) -> str:
+    return (tmp_path / f"{meta['artifact']['id']}.txt").read_text(encoding="utf-8")
+
+
+def test_batch_translation_keeps_segment_order(translator, tmp_path):
+    provider = translator()
+    answer, used_search, raw, sources, meta = translate_document("번역해줘", DOC, output_format="txt")
+    assert len(provider.bodies) == 1
+    assert _artifact_text(meta, tmp_path).split("\n")[:3] == DOC.split("\n")
+    assert meta["artifact"]["status"] == "complete" and raw["usage"]["total_tokens"] > 0
+
+
+def test_marker_mismatch_retranslates_batch_one_segment_at_a_time(translator, tmp_path):
+    provider = translator(strip_markers=True)
+    events = []
+    _, _, raw, _, meta = translate_document("번역해줘", DOC, events.append, output_format="txt")
+    # 묶음 1회 + 구간별 재번역 2회
+    assert len(provider.bodies) == 3
+    assert "<<2>>" in provider.bodies[0]
+    assert "<<1>>" in provider.bodies[1] and "<<2>>" not in provider.bodies[1]
+    lines = _artifact_text(meta, tmp_path).split("\n")
+    # 각 구간의 번역이 제자리에 들어가고, 묶음 번역문이 첫 구간 자리에 몰리지 않는다
+    first = lines.index("The battery warranty lasts eight years.")
+    korean = lines.index("이 줄은 이미 한국어입니다.")
+    last = lines.index("Charging at home is recommended.")
+    assert first < korean < last
+    assert sum("Charging at home" in line for line in lines) == 1
+    # 사용량은 세 번의 호출을 합산
+    assert raw["usage"]["total_tokens"] == sum(provider.total_tokens)
+    assert meta["artifact"]["segments_done"] == 3
+    assert [e["type"] for e in events][0] == "plan"
@@ -0,0 +1,184 @@
+"""사용량 원장(app.usage)과 /usage/summary 테스트."""
+
+import json
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, usage
+from app.usage import UsageLedger, UsageRecord, _aggregate, _percentile, price_for
+
+
+PRICES = {"gpt-4o-mini": [0.15, 0.6, 0.075], "gpt-4o": [2.5, 10.0, 1.25]}
+
+
+def _usage(prompt: int, completion: int, cached: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=completion,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+def _record(mode: str = "general", endpoint: str = "/agent", model: str = "gpt-4o-mini", ts: float | None = None,
+            status: str = "ok", latency_ms: float = 100.0, nodes: dict | None = None) -> UsageRecord:
+    record = UsageRecord(endpoint, mode)
+    if model:
+        record.add_llm(model, _usage(1000, 200, 400))
+    record.status = status
+    record.finish({name: {"wall_ms": ms, "calls": 1} for name, ms in (nodes or {}).items()})
+    record.latency_ms = latency_ms
+    if ts is not None:
+        record.ts = ts
+    return record
+
+
+def _write(path, records, **kwargs) -> UsageLedger:
+    ledger = UsageLedger(path, PRICES, **kwargs)
+    for record in records:
+        ledger.submit(record)
+    ledger.close()
+    return ledger
+
+
+def test_price_for_matches_longest_model_prefix():
+    assert price_for("gpt-4o-mini-2024-07-18", PRICES) == PRICES["gpt-4o-mini"]
+    assert price_for("gpt-4o-2024-08-06", PRICES) == PRICES["gpt-4o"]
+    assert price_for("gpt-4omni", PRICES) is None
+
+
+def test_record_row_sums_models_and_estimates_cost():
+    record = UsageRecord("/agent", "research", lane="batch", doc_chars=50)
+    record.add_llm("gpt-4o-mini", _usage(1000, 200, 400))
+    record.add_llm("gpt-4o", _usage(2000, 500))
+    record.add_llm("gpt-4o-mini", None)
+    record.add_search()
+    record.add_cache_hit("search")
+    record.finish({"search": {"wall_ms": 10.0, "calls": 2}})
+    row = dict(zip(usage._COLUMNS, record.row(PRICES)))
+    # 토큰을 더 많이 쓴 모델이 앞
+    assert row["model"] == "gpt-4o,gpt-4o-mini" and row["llm_calls"] == 3
+    assert (row["prompt_tokens"], row["completion_tokens"], row["cached_tokens"]) == (3000, 700, 400)
+    # 캐시된 입력은 캐시 단가로: (600 * 0.15 + 200 * 0.6 + 400 * 0.075 + 2000 * 2.5 + 500 * 10) / 1e6
+    assert row["cost_usd"] == pytest.approx((90 + 120 + 30 + 5000 + 5000) / 1_000_000)
+    assert json.loads(row["node_ms"]) == {"search": 20.0}
+    assert row["search_calls"] == 1 and row["search_errors"] == 0 and row["cache_hits"] == "search"
+    # 가격을 모르는 모델이 섞이면 비용은 None
+    record.add_llm("unknown-model", _usage(1, 1))
+    assert record.cost(PRICES) is None
+
+
+def test_percentile_and_aggregate():
+    ordered = [float(v) for v in range(1, 11)]
+    assert _percentile(ordered, 0.5) == 6.0 and _percentile(ordered, 0.99) == 10.0
+    assert _percentile([], 0.5) is None
+
+    records = [
+        _record(latency_ms=100.0, nodes={"llm": 80.0}),
+        _record(latency_ms=300.0, nodes={"llm": 40.0, "search": 20.0}, status="error"),
+        _record(model="", latency_ms=200.0, status="cancelled"),
+    ]
+    rows = [dict(zip(usage._COLUMNS, r.row(PRICES))) for r in records]
+    stats = _aggregate(rows)
+    assert (stats["requests"], stats["errors"], stats["cancelled"]) == (3, 1, 1)
+    assert stats["prompt_tokens"] == 2000 and stats["tokens_per_request"] == pytest.approx(2400 / 3, abs=0.1)
+    # 모델 호출이 없는 요청은 비용 0으로 집계된다
+    assert stats["unpriced_requests"] == 0 and stats["cost_usd"] == pytest.approx(2 * rows[0]["cost_usd"], abs=1e-6)
+    assert stats["latency_ms"] == {"p50": 200.0, "p90": 300.0, "p99": 300.0, "max": 300.0}
+    # 노드 평균은 그 노드가 실행된 요청 기준
+    assert stats["node_ms_avg"] == {"llm": 60.0, "search": 20.0}
+
+
+def test_summary_groups_by_cost_and_buckets(tmp_path):
+    now = time.time()
+    ledger = _write(tmp_path / "usage.sqlite3", [
+        _record("general", ts=now - 7000),
+        _record("research", model="gpt-4o", ts=now - 3000),
+        _record("research", model="gpt-4o", ts=now - 100, status="error"),
+        _record("general", ts=now - 10 * 3600),  # 창 밖
+    ])
+    assert ledger.stats_dict()["written"] == 4
+
+    summary = ledger.summary(window=2 * 3600, group_by="mode", bucket=3600)
+    assert summary["total"]["requests"] == 3
+    # 비용이 큰 그룹부터
+    assert list(summary["groups"]) == ["research", "general"]
+    assert summary["groups"]["research"]["errors"] == 1
+    buckets = summary["buckets"]
+    assert [sorted(b["groups"]) for b in buckets] == [["general"], ["research"]]
+    assert buckets[1]["start"] - buckets[0]["start"] == pytest.approx(3600)
+    assert sum(b["groups"]["research"]["requests"] for b in buckets if "research" in b["groups"]) == 2
+
+    by_model = ledger.summary(window=2 * 3600, group_by="model")
+    assert set(by_model["groups"]) == {"gpt-4o", "gpt-4o-mini"} and "buckets" not in by_model
+    assert ledger.summary(window=60, group_by="status")["total"] == {"requests": 0}
+    with pytest.raises(ValueError):
+        ledger.summary(window=60, group_by="lane")
+
+
+def _old_schema(path) -> None:
+    """search_errors 열이 추가되기 전의 원장 파일"""
+    conn = sqlite3.connect(path)
+    conn.executescript(usage._SCHEMA.replace(",\n    search_errors INTEGER NOT NULL DEFAULT 0", ""))
+    assert "search_errors" not in [row[1] for row in conn.execute("PRAGMA table_info(usage_log)")]
+    conn.execute("INSERT INTO usage_log (ts, endpoint, mode, status, llm_calls, prompt_tokens, completion_tokens, "
+                 "cached_tokens, search_calls, doc_chars, cache_hits, queue_ms, latency_ms, node_ms) "
+                 "VALUES (?, '/agent', 'general', 'ok', 1, 10, 5, 0, 2, 0, '', 0, 50, '{}')", (time.time() - 60,))
+    conn.commit()
+    conn.close()
+
+
+def test_schema_migration_keeps_old_rows(tmp_path):
+    path = tmp_path / "usage.sqlite3"
+    _old_schema(path)
+    ledger = _write(path, [_record("research")])
+    UsageLedger(path, PRICES).close()  # 이미 열이 있으면 다시 추가하지 않는다
+    columns = [row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(usage_log)")]
+    assert columns.count("search_errors") == 1
+    summary = ledger.summary(window=3600)
+    assert summary["total"]["requests"] == 2 and summary["total"]["search_errors"] == 0
+    assert summary["groups"]["general"]["search_calls"] == 2
+
+
+@pytest.mark.parametrize("retention_days, remaining", [(30.0, 1), (0, 2)])
+def test_retention_prunes_old_rows_on_write(tmp_path, retention_days, remaining):
+    path = tmp_path / "usage.sqlite3"
+    _write(path, [_record(ts=time.time() - 40 * 86400)], retention_days=0)
+    _write(path, [_record()], retention_days=retention_days)
+    count = sqlite3.connect(path).execute("SELECT COUNT(*) FROM usage_log").fetchone()[0]
+    assert count == remaining
+
+
+@pytest.fixture
+def ledger(monkeypatch, tmp_path):
+    """USAGE_LEDGER를 켜고 임시 파일 원장을 싱글톤으로 쓴다."""
+    instance = UsageLedger(tmp_path / "usage.sqlite3", PRICES)
+    monkeypatch.setattr(usage.settings, "USAGE_LEDGER", True)
+    monkeypatch.setattr(usage, "_ledger", instance)
+    yield instance
+    instance.close()
+
+
+def test_usage_summary_endpoint(ledger):
+    client = TestClient(main.app)
+    assert client.post("/agent", json={"question": "LangGraph가 뭐야?"}).status_code == 200
+    ledger.submit(_record("research", endpoint="/agent/stream", ts=time.time() - 1800))
+    ledger.close()
+
+    body = client.get("/usage/summary", params={"window": "1h", "group_by": "endpoint", "bucket": "30m"}).json()
+    assert body["window_s"] == 3600 and body["group_by"] == "endpoint"
+    assert set(body["groups"]) == {"/agent", "/agent/stream"}
+    metered = body["groups"]["/agent"]
+    assert metered["requests"] == 1 and metered["llm_calls"] >= 1 and metered["node_ms_avg"]
+    assert len(body["buckets"]) == 2
+
+    for params in ({"group_by": "lane"}, {"window": "soon"}, {"window": "0"}, {"bucket": "-1h"}):
+        assert client.get("/usage/summary", params=params).status_code == 400
+
+
+def test_usage_summary_disabled(monkeypatch):
+    monkeypatch.setattr(usage.settings, "USAGE_LEDGER", False)
+    assert TestClient(main.app).get("/usage/summary").status_code == 404
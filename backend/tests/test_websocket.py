@@ -0,0 +1,188 @@
+"""WS /ws/agent 채팅 세션(질문/답변, 취소, 오류 프레임, 문서 등록) 테스트."""
+
+import base64
+import gzip
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.agent import agent
+from app.llm import LLMRouter
+from app.llm.stub import StubProvider, _StubStream
+
+
+DOC_TEXT = "배터리 보증 기간은 8년입니다.\n충전은 완속을 권장합니다."
+
+
+class _Provider(StubProvider):
+    """
+    받은 메시지를 기록하는 스텁 공급자.
+    slow면 토큰 청크 사이마다 쉬어, 생성 도중 취소를 보낼 수 있게 한다.
+    """
+
+    def __init__(self, slow: bool = False) -> None:
+        super().__init__("ws", "ws-model")
+        self.slow = slow
+        self.messages: list = []
+        self.streams: list = []
+        self.yielded = 0
+        self.started = threading.Event()
+
+    def stream(self, messages, **kwargs):
+        self.messages.append(messages)
+        if not self.slow:
+            stream = super().stream(messages, **kwargs)
+        else:
+            stream = _StubStream(self._slow_chunks(messages))
+        self.streams.append(stream)
+        return stream
+
+    def _slow_chunks(self, messages):
+        for chunk in self._chunks(messages, "토큰 " * 200, include_usage=False):
+            self.yielded += 1
+            self.started.set()
+            yield chunk
+            time.sleep(0.01)
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def install(slow: bool = False) -> _Provider:
+        stub = _Provider(slow)
+        monkeypatch.setattr(agent, "get_llm", lambda: LLMRouter([stub]))
+        return stub
+
+    return install
+
+
+@pytest.fixture
+def ws():
+    with TestClient(main.app).websocket_connect("/ws/agent") as socket:
+        assert socket.receive_json() == {"type": "ready"}
+        yield socket
+
+
+def _until(socket, *types: str) -> list:
+    """types 중 하나가 올 때까지 받은 이벤트 목록 (마지막이 그 이벤트)"""
+    events = []
+    while True:
+        event = socket.receive_json()
+        events.append(event)
+        if event["type"] in types:
+            return events
+
+
+def test_question_round_trip_keeps_history(provider, ws):
+    stub = provider()
+    ws.send_json({"type": "question", "question": "LangGraph가 뭐야?", "id": "q1"})
+    events = _until(ws, "done", "error")
+    done = events[-1]
+    assert done["type"] == "done" and done["id"] == "q1"
+    assert done["answer"] == "LangGraph가 뭐야?" and done["used_search"] is False
+    tokens = [e for e in events if e["type"] == "token"]
+    assert tokens and all(e["id"] == "q1" for e in tokens)
+    assert "".join(e["content"] for e in tokens) == done["answer"]
+
+    # id를 생략하면 턴 번호가 붙고, 이전 턴이 대화 기록으로 전달된다
+    ws.send_json({"type": "question", "question": "예시도 보여줘"})
+    done = _until(ws, "done", "error")[-1]
+    assert done["type"] == "done" and done["id"] == 2
+    roles = [(m["role"], m["content"]) for m in stub.messages[-1][1:]]
+    assert roles == [
+        ("user", "LangGraph가 뭐야?"),
+        ("assistant", "LangGraph가 뭐야?"),
+        ("user", "예시도 보여줘"),
+    ]
+
+
+def test_cancel_mid_stream_stops_generation(provider, ws):
+    stub = provider(slow=True)
+    ws.send_json({"type": "question", "question": "긴 답변을 해줘", "id": "long"})
+    first = _until(ws, "token")[-1]
+    assert first["id"] == "long" and stub.started.is_set()
+    ws.send_json({"type": "cancel"})
+    events = _until(ws, "cancelled", "done", "error")
+    assert events[-1] == {"type": "cancelled", "id": "long"}
+    # 취소 후에는 스트림을 닫아 남은 토큰을 더 받지 않는다
+    yielded = stub.yielded
+    assert yielded < 200 and stub.streams[0].closed
+    time.sleep(0.05)
+    assert stub.yielded == yielded
+
+    # 세션은 다시 질문을 받을 수 있고, 취소된 턴은 대화 기록에 남지 않는다
+    stub.slow = False
+    ws.send_json({"type": "question", "question": "짧게 다시", "id": "again"})
+    done = _until(ws, "done", "error")[-1]
+    assert done["type"] == "done" and done["answer"] == "짧게 다시"
+    assert [m["role"] for m in stub.messages[-1]] == ["system", "user"]
+
+
+def test_question_while_busy_is_rejected(provider, ws):
+    provider(slow=True)
+    ws.send_json({"type": "question", "question": "첫 질문", "id": 1})
+    _until(ws, "token")
+    ws.send_json({"type": "question", "question": "두 번째 질문", "id": 2})
+    error = _until(ws, "error")[-1]
+    assert "이전 답변을 생성 중입니다" in error["detail"]
+    ws.send_json({"type": "cancel"})
+    assert _until(ws, "cancelled")[-1]["id"] == 1
+
+
+@pytest.mark.parametrize(
+    "send, detail",
+    [
+        (lambda s: s.send_text("not json"), "JSON 객체"),
+        (lambda s: s.send_json(["question"]), "JSON 객체"),
+        (lambda s: s.send_bytes(b"\x00\x01"), "JSON 객체"),
+        (lambda s: s.send_json({"type": "bogus"}), "알 수 없는 메시지 유형"),
+        (lambda s: s.send_json({"type": "question", "question": "   "}), "비어 있을 수 없습니다"),
+        (lambda s: s.send_json({"type": "cancel"}), "취소할 생성 작업이 없습니다"),
+        (lambda s: s.send_json({"type": "document", "filename": "a.docx", "data": "AAAA"}), "지원하지 않는 파일 형식"),
+    ],
+)
+def test_bad_message_gets_error_frame_and_connection_stays_open(provider, ws, send, detail):
+    provider()
+    send(ws)
+    error = ws.receive_json()
+    assert error["type"] == "error" and detail in error["detail"]
+    ws.send_json({"type": "question", "question": "아직 연결돼 있니?"})
+    assert _until(ws, "done", "error")[-1]["type"] == "done"
+
+
+def _assert_document_answer(ws, filename: str) -> None:
+    event = ws.receive_json()
+    assert event["type"] == "document" and event["filename"] == filename
+    assert event["chars"] == len(DOC_TEXT) and event["extraction"]["encoding"] == "utf-8"
+    ws.send_json({"type": "question", "question": "보증 기간은?", "id": "doc"})
+    done = _until(ws, "done", "error")[-1]
+    # 스텁은 문서 내용이 들어간 질문을 그대로 돌려준다
+    assert done["type"] == "done" and DOC_TEXT in done["answer"] and "질문: 보증 기간은?" in done["answer"]
+
+
+def test_base64_gzip_document_frame(provider, ws):
+    provider()
+    data = base64.b64encode(gzip.compress(DOC_TEXT.encode("utf-8"))).decode("ascii")
+    ws.send_json({"type": "document", "filename": "notes.txt", "data": data, "encoding": "gzip"})
+    _assert_document_answer(ws, "notes.txt")
+
+
+def test_document_sent_as_following_binary_frame(provider, ws):
+    provider()
+    ws.send_json({"type": "document", "filename": "notes.txt"})
+    ws.send_bytes(DOC_TEXT.encode("utf-8"))
+    _assert_document_answer(ws, "notes.txt")
+
+
+def test_clear_drops_document_and_history(provider, ws):
+    stub = provider()
+    ws.send_json({"type": "document", "filename": "notes.txt", "data": base64.b64encode(DOC_TEXT.encode()).decode()})
+    assert ws.receive_json()["type"] == "document"
+    ws.send_json({"type": "clear"})
+    assert ws.receive_json() == {"type": "cleared"}
+    ws.send_json({"type": "question", "question": "문서 없이 질문"})
+    done = _until(ws, "done", "error")[-1]
+    assert done["answer"] == "문서 없이 질문" and done["id"] == 1
+    assert DOC_TEXT not in str(stub.messages[-1])
@@ -1,13 +1,89 @@
+import json
+import time
+import uuid
+import zlib
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 
 BACKEND_URL = "https://ai-agent-backend-wvfl.onrender.com"
 
+UPLOAD_CHUNK_SIZE = 256 * 1024  # 업로드 스트리밍 단위 (256KB)
+STREAM_RENDER_INTERVAL = 0.05  # 스트리밍 답변 화면 갱신 최소 간격(초)
+
+# 이미 압축된 형식(PDF 내부 스트림은 Flate 압축)은 gzip 이득이 거의 없어 텍스트만 압축
+COMPRESSIBLE_TYPES = {"text/plain"}
+
 st.set_page_config(
     page_title="AI Agent",
     layout="wide",
 )
 
+# ======================
+# HTTP Client
+# ======================
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    모든 rerun/세션이 공유하는 HTTP 세션.
+    keep-alive 커넥션 풀을 재사용해 질문마다 TCP/TLS 연결을 새로 맺지 않는다.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def iter_multipart_upload(boundary: str, fields: dict, file_data: dict):
+    """
+    multipart/form-data 본문을 조각 단위로 생성한다 (chunked 전송).
+
+    파일 바이트는 memoryview로 잘라 복사 없이 보내며, 텍스트 파일은
+    gzip으로 압축하고 파트 헤더에 Content-Encoding: gzip을 표시한다.
+    """
+    for name, value in fields.items():
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode("utf-8")
+
+    compress = file_data["type"] in COMPRESSIBLE_TYPES
+    filename = file_data["name"].replace('"', "")
+    header = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {file_data['type'] or 'application/octet-stream'}\r\n"
+    )
+    if compress:
+        header += "Content-Encoding: gzip\r\n"
+    yield (header + "\r\n").encode("utf-8")
+
+    view = memoryview(file_data["bytes"])
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    for offset in range(0, len(view), UPLOAD_CHUNK_SIZE):
+        chunk = view[offset:offset + UPLOAD_CHUNK_SIZE]
+        if compressor is None:
+            yield chunk
+        else:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+    if compressor is not None:
+        yield compressor.flush()
+
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+def iter_stream_events(response: requests.Response):
+    """NDJSON 스트리밍 응답을 이벤트(dict) 단위로 읽는다."""
+    for line in response.iter_lines(chunk_size=1024):
+        if line:
+            yield json.loads(line)
+
+
 # ======================
 # Session State Init
 # ======================
@@ -136,48 +212,38 @@ if st.session_state.pending_question:
         with st.spinner("답변 생성 중..."):
 
             try:
+                session = get_http_session()
                 history = "\n".join(
                     f"{'사용자' if h['role']=='user' else 'AI'}: {h['content']}"
                     for h in st.session_state.conversation_history
                 )
+                payload_question = (
+                    f"{history}\n\n새 질문: {question}"
+                    if history else question
+                )
 
                 if st.session_state.current_file:
-                    payload_question = (
-                        f"{history}\n\n새 질문: {question}"
-                        if history else question
-                    )
-
-                    # 파일 데이터 준비
-                    file_data = st.session_state.current_file
-                    files = {
-                        "file": (
-                            file_data["name"],
-                            file_data["bytes"],
-                            file_data["type"]
-                        )
-                    }
-                    
+                    # 파일은 조각 단위로 스트리밍 업로드 (세션에 보관된 bytes를 복사하지 않음)
+                    boundary = uuid.uuid4().hex
                     # 타임아웃을 더 길게 설정 (큰 파일용)
                     # 연결 타임아웃 60초, 읽기 타임아웃 600초
-                    response = requests.post(
-                        f"{BACKEND_URL}/agent/file",
-                        data={"question": payload_question},
-                        files=files,
+                    response = session.post(
+                        f"{BACKEND_URL}/agent/file/stream",
+                        data=iter_multipart_upload(
+                            boundary,
+                            {"question": payload_question},
+                            st.session_state.current_file,
+                        ),
+                        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+                        stream=True,
                         timeout=(60, 600)  # (connect timeout, read timeout)
                     )
-                    
-                    # 파일 데이터 참조 제거 (메모리 정리)
-                    del files
                 else:
-                    payload_question = (
-                        f"{history}\n\n새 질문: {question}"
-                        if history else question
-                    )
-
-                    response = requests.post(
-                        f"{BACKEND_URL}/agent",
+                    response = session.post(
+                        f"{BACKEND_URL}/agent/stream",
                         json={"question": payload_question},
-                        timeout=300
+                        stream=True,
+                        timeout=(30, 300)
                     )
 
                 # 응답 상태 확인
@@ -190,14 +256,56 @@ if st.session_state.pending_question:
                         error_detail = response.text[:500]  # 너무 긴 경우 잘라냄
                     st.error(f"❌ 서버 오류 ({response.status_code}): {error_detail}")
                     st.stop()
-                
-                result = response.json()
 
-                answer = result.get("answer", "(빈 응답)")
+                # 토큰 스트리밍을 받아 같은 자리에 점진적으로 렌더링
+                placeholder = st.empty()
+                progress_bar = None
+                parts: list[str] = []
+                result = {}
+                last_render = 0.0
+                with response:
+                    for event in iter_stream_events(response):
+                        event_type = event.get("type")
+                        if event_type == "token":
+                            parts.append(event.get("content", ""))
+                            now = time.monotonic()
+                            if now - last_render >= STREAM_RENDER_INTERVAL:
+                                placeholder.markdown("".join(parts) + "▌")
+                                last_render = now
+                        elif event_type == "reset":
+                            parts.clear()
+                        elif event_type == "progress":
+                            # 번역 결과 파일 작성 진행률 (미리보기 이후 구간은 토큰으로 오지 않음)
+                            artifact = event.get("artifact", {})
+                            total = artifact.get("segments_total") or 1
+                            done = artifact.get("segments_done", 0)
+                            if progress_bar is None:
+                                progress_bar = st.progress(0.0)
+                            progress_bar.progress(min(1.0, done / total), text=f"번역 중 {done}/{total} 구간")
+                        elif event_type == "plan":
+                            # 번역 시작 전 작업 범위 안내 (이미 한국어인 구간은 건너뜀)
+                            plan = event.get("translation", {})
+                            tokens = plan.get("estimated_tokens", {})
+                            st.caption(
+                                f"🌐 번역 구간 {plan.get('translate_segments', 0)}개 "
+                                f"(한국어 등 건너뜀 {plan.get('skipped_segments', 0)}개) · "
+                                f"예상 토큰 입력 {tokens.get('input', 0):,} / 출력 {tokens.get('output', 0):,}"
+                            )
+                        elif event_type == "done":
+                            result = event
+                        elif event_type == "error":
+                            st.error(f"❌ {event.get('detail', '알 수 없는 오류')}")
+                            st.stop()
+
+                answer = result.get("answer") or "".join(parts) or "(빈 응답)"
                 used_search = result.get("used_search", False)
 
-                st.markdown(answer)
+                placeholder.markdown(answer)
                 st.caption("🔍 검색 기반 답변" if used_search else "💬 일반 답변")
+                artifact = result.get("artifact")
+                if artifact:
+                    # 전체 번역은 응답에 담기지 않으므로 결과 파일 링크로 내려받음
+                    st.link_button("📥 전체 번역 내려받기", f"{BACKEND_URL}{artifact['url']}")
 
                 # 메시지 저장
                 st.session_state.messages.append({